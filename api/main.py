@@ -5,22 +5,29 @@ Umožňuje headless použití anonymizačních služeb
 from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import hmac
 import uvicorn
-import tempfile
-import os
+import time
+from functools import lru_cache
 from pathlib import Path
 import sys
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 import uuid
 from datetime import datetime
+from pydantic import BaseModel, Field
 
 # Přidání root cesty pro importy
 root_path = Path(__file__).parent.parent
 sys.path.append(str(root_path))
 
 from services.presidio_service import PresidioService
-from services.batch_processor import BatchProcessor
-from models.document import Document, DocumentType, ProcessingStatus, BatchProcessingConfig
+from services.reidentification_vault import ApprovalError, ReidentificationVault
+from services.priority_lanes import BULK, INTERACTIVE, LaneFullError, PriorityLanes
+from services.request_coalescer import RequestCoalescer
+from services.upload_reader import UploadBudget, UploadBudgetExceededError, UploadTooLargeError, read_upload
+from services.worker_lifecycle import RecyclingService, WorkerLifecycle, current_rss_bytes
+from models.document import AnonymizedDocument, Document, DocumentType, ProcessingStatus
 from config.settings import ConfigManager
 from config.logging_config import get_logger
 
@@ -49,11 +56,135 @@ app.add_middleware(
 )
 
 # Dependency pro získání služeb
-def get_presidio_service() -> PresidioService:
-    return PresidioService()
+def _warm_up_service(service: PresidioService) -> None:
+    """Zahřeje novou instanci služby, aby první požadavek nečekal na inicializaci modelů"""
+    service.analyze_text("Pacient Jan Novák, Nemocnice Na Homolce, Praha 5.", "cs")
 
-def get_batch_processor() -> BatchProcessor:
-    return BatchProcessor()
+@lru_cache(maxsize=1)
+def get_service_pool() -> RecyclingService:
+    # Jen podle počtu požadavků - výměna instance v procesu RSS nesníží,
+    # limit paměti API patří recyklaci procesů (gunicorn --max-requests)
+    lifecycle = WorkerLifecycle(max_documents=config.anonymization.worker_max_documents)
+    return RecyclingService(PresidioService, lifecycle, warmup=_warm_up_service)
+
+def get_presidio_service() -> Iterator[PresidioService]:
+    # Instance se zapůjčí na dobu požadavku; po limitu ji nahradí zahřátá náhrada
+    with get_service_pool().acquire() as service:
+        yield service
+
+def _anonymize_text_batch(requests: List[Tuple[str, float]]) -> List[AnonymizedDocument]:
+    """Zpracuje dávku textových požadavků jedním dávkovým průchodem NLP modelu"""
+    # Požadavky se stejným prahem spolehlivosti sdílí jeden průchod
+    by_threshold = {}
+    for index, (_, confidence_threshold) in enumerate(requests):
+        by_threshold.setdefault(confidence_threshold, []).append(index)
+    results: List[Optional[AnonymizedDocument]] = [None] * len(requests)
+    with get_service_pool().acquire() as service:
+        for confidence_threshold, indexes in by_threshold.items():
+            documents = [Document(content=requests[index][0]) for index in indexes]
+            processed = service.process_documents(documents, batch_size=len(documents), score_threshold=confidence_threshold)
+            for index, anonymized in zip(indexes, processed):
+                results[index] = anonymized
+    return results
+
+@lru_cache(maxsize=1)
+def get_text_coalescer() -> RequestCoalescer:
+    # Souběžné požadavky /anonymize/text se slučují do dávek
+    return RequestCoalescer(
+        _anonymize_text_batch,
+        max_batch_size=config.anonymization.coalesce_max_batch_size,
+        max_wait_ms=config.anonymization.coalesce_max_wait_ms
+    )
+
+@lru_cache(maxsize=1)
+def get_priority_lanes() -> PriorityLanes:
+    # Interaktivní požadavky a hromadné dávky mají oddělené fronty a workery
+    return PriorityLanes(
+        interactive_workers=config.anonymization.interactive_workers,
+        interactive_queue=config.anonymization.interactive_queue,
+        bulk_workers=config.anonymization.bulk_workers,
+        bulk_queue=config.anonymization.bulk_queue,
+        max_bulk_pause=config.anonymization.bulk_max_pause_seconds
+    )
+
+def _lane_unavailable(error: LaneFullError) -> HTTPException:
+    """Odpověď pro požadavek odmítnutý plnou frontou pruhu"""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+@lru_cache(maxsize=1)
+def get_upload_budget() -> UploadBudget:
+    # Společný limit paměti pro obsah nahrávaných souborů všech požadavků;
+    # těla požadavků ukládá Starlette zvlášť (viz read_upload)
+    return UploadBudget(config.security.max_inflight_upload_mb * 1024 * 1024)
+
+def _max_upload_bytes() -> int:
+    """Maximální velikost jednoho nahraného souboru v bajtech"""
+    return config.security.max_upload_size_mb * 1024 * 1024
+
+def _upload_rejected(error: Exception, filename: Optional[str] = None) -> HTTPException:
+    """Odpověď pro upload nad limit souboru nebo nad paměťový rozpočet"""
+    if isinstance(error, UploadTooLargeError):
+        return HTTPException(
+            status_code=413,
+            detail=f"File {filename} too large. Max size: {config.security.max_upload_size_mb}MB"
+        )
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "5"})
+
+def _content_type(filename: str) -> str:
+    """Určí typ obsahu nahraného souboru podle přípony"""
+    return {
+        ".json": "application/json",
+        ".xml": "application/xml",
+        ".html": "text/html",
+    }.get(Path(filename).suffix.lower(), "text/plain")
+
+def _process_bulk_documents(documents: List[Document], pool: RecyclingService, lanes: PriorityLanes) -> List[dict]:
+    """Zpracuje dokumenty hromadného požadavku s přerušením ve prospěch interaktivních"""
+    results = []
+    for document in documents:
+        # Mezi dokumenty dostanou přednost čekající interaktivní požadavky
+        lanes.checkpoint()
+        try:
+            with pool.acquire() as service:
+                anonymized = service.process_document(document)
+            results.append({
+                "filename": document.id,
+                "status": "success",
+                "entities_found": len(anonymized.entities),
+                "error": None
+            })
+        except Exception as e:
+            app_logger.log_error(e, f"batch_document:{document.id}")
+            results.append({"filename": document.id, "status": "error", "entities_found": 0, "error": str(e)})
+    return results
+
+@lru_cache(maxsize=1)
+def get_reidentification_vault() -> ReidentificationVault:
+    if not config.security.vault_key:
+        raise HTTPException(status_code=503, detail="Re-identification vault is not configured (VAULT_KEY)")
+    return ReidentificationVault(str(config.vault_path), config.security.vault_key)
+
+_reidentify_bearer = HTTPBearer(auto_error=False)
+
+def get_reidentification_requester(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_reidentify_bearer)
+) -> str:
+    """Ověří API klíč žadatele o zpětnou identifikaci a vrátí jeho jméno"""
+    api_keys = config.security.reidentify_api_keys
+    if not api_keys:
+        raise HTTPException(status_code=503, detail="Re-identification is not configured (REIDENTIFY_API_KEYS)")
+    if credentials is not None:
+        presented = credentials.credentials.encode("utf-8")
+        for requester, api_key in api_keys.items():
+            if hmac.compare_digest(presented, api_key.encode("utf-8")):
+                return requester
+    raise HTTPException(status_code=401, detail="Invalid or missing API key", headers={"WWW-Authenticate": "Bearer"})
+
+class ReidentifyRequest(BaseModel):
+    """Požadavek na zpětnou identifikaci"""
+    approval_id: str = Field(..., min_length=1, description="ID schválené výzkumné žádosti")
+    tokens: List[str] = Field(..., min_length=1, max_length=100_000, description="Tokeny (pseudonymy) k identifikaci")
+    document_id: Optional[str] = Field(None, description="Omezení na jeden dokument")
 
 @app.get("/")
 async def root():
@@ -70,7 +201,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test spojení se službami
-        presidio = get_presidio_service()
+        presidio = get_service_pool().service
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
@@ -88,11 +219,15 @@ async def anonymize_text(
     text: str,
     confidence_threshold: float = 0.7,
     anonymization_method: str = "replace",
-    presidio_service: PresidioService = Depends(get_presidio_service)
+    coalescer: RequestCoalescer = Depends(get_text_coalescer),
+    lanes: PriorityLanes = Depends(get_priority_lanes)
 ):
     """
     Anonymizace textu
     
+    Souběžné požadavky se slučují do dávek zpracovaných jedním průchodem
+    NLP modelu (viz RequestCoalescer).
+    
     Args:
         text: Text k anonymizaci
         confidence_threshold: Práh spolehlivosti (0.0-1.0)
@@ -102,22 +237,19 @@ async def anonymize_text(
         app_logger.log_anonymization_start("text_input", anonymization_method)
         start_time = time.time()
         
-        # Provedení anonymizace
-        result = presidio_service.anonymize_text(
-            text, 
-            confidence_threshold=confidence_threshold,
-            anonymization_method=anonymization_method
-        )
+        # Provedení anonymizace v příští dávce (smyčka událostí mezitím obsluhuje další požadavky)
+        result = await lanes.run(INTERACTIVE, lambda: coalescer.submit((text, confidence_threshold)).result())
         
         duration = time.time() - start_time
-        entities_count = len(result.get('entities', []))
+        entities = [entity.model_dump(mode="json") for entity in result.entities]
+        entities_count = len(entities)
         
         app_logger.log_anonymization_complete("text_input", entities_count, duration)
         
         return {
             "success": True,
-            "anonymized_text": result.get('anonymized_text', ''),
-            "entities_found": result.get('entities', []),
+            "anonymized_text": result.content,
+            "entities_found": entities,
             "processing_time": duration,
             "metadata": {
                 "confidence_threshold": confidence_threshold,
@@ -126,6 +258,8 @@ async def anonymize_text(
             }
         }
         
+    except LaneFullError as e:
+        raise _lane_unavailable(e)
     except Exception as e:
         app_logger.log_error(e, "text_anonymization")
         raise HTTPException(status_code=500, detail=f"Anonymization failed: {str(e)}")
@@ -135,7 +269,9 @@ async def anonymize_file(
     file: UploadFile = File(...),
     confidence_threshold: float = 0.7,
     anonymization_method: str = "replace",
-    presidio_service: PresidioService = Depends(get_presidio_service)
+    presidio_service: PresidioService = Depends(get_presidio_service),
+    lanes: PriorityLanes = Depends(get_priority_lanes),
+    upload_budget: UploadBudget = Depends(get_upload_budget)
 ):
     """
     Anonymizace souboru
@@ -146,18 +282,7 @@ async def anonymize_file(
         anonymization_method: Metoda anonymizace
     """
     try:
-        # Kontrola velikosti souboru
-        file_size = 0
-        content = await file.read()
-        file_size = len(content)
-        
-        if file_size > config.security.max_upload_size_mb * 1024 * 1024:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"File too large. Max size: {config.security.max_upload_size_mb}MB"
-            )
-        
-        # Kontrola typu souboru
+        # Kontrola typu souboru (před čtením obsahu)
         file_extension = Path(file.filename).suffix.lower()
         if file_extension not in config.security.allowed_file_types:
             raise HTTPException(
@@ -165,64 +290,49 @@ async def anonymize_file(
                 detail=f"Unsupported file type: {file_extension}"
             )
         
-        app_logger.log_upload(file.filename, file_size)
-        app_logger.log_anonymization_start(file.filename, anonymization_method)
-        
-        start_time = time.time()
-        
-        # Vytvoření dočasného souboru
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Vytvoření Document objektu
-            document = Document(
-                filename=file.filename,
-                file_path=temp_file_path,
-                file_type=file_extension,
-                doc_type=DocumentType.TEXT if file_extension == '.txt' else DocumentType.DOCX
-            )
-            
-            # Provedení anonymizace
-            result = presidio_service.anonymize_document(
-                document,
-                confidence_threshold=confidence_threshold,
-                anonymization_method=anonymization_method
-            )
-            
-            duration = time.time() - start_time
-            entities_count = len(result.get('entities', []))
+        with upload_budget.lease() as lease:
+            # Čtení po blocích s kontrolou velikosti; rezervuje se obsah i dekódovaný text
+            try:
+                text = await read_upload(file, _max_upload_bytes(), lease)
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=415, detail=f"File {file.filename} is not UTF-8 text")
+            file_size = lease.uploaded
             
-            app_logger.log_anonymization_complete(file.filename, entities_count, duration)
+            app_logger.log_upload(file.filename, file_size)
+            app_logger.log_anonymization_start(file.filename, anonymization_method)
             
-            # Čtení anonymizovaného obsahu
-            with open(result['output_path'], 'r', encoding='utf-8') as f:
-                anonymized_content = f.read()
+            start_time = time.time()
             
-            return {
-                "success": True,
-                "filename": file.filename,
-                "anonymized_content": anonymized_content,
-                "entities_found": result.get('entities', []),
-                "processing_time": duration,
-                "metadata": {
-                    "original_size": file_size,
-                    "confidence_threshold": confidence_threshold,
-                    "method": anonymization_method,
-                    "entities_count": entities_count
-                }
+            # Provedení anonymizace
+            document = Document(id=file.filename, content=text, content_type=_content_type(file.filename))
+            result = await lanes.run(INTERACTIVE, presidio_service.process_document, document)
+        
+        duration = time.time() - start_time
+        entities = [entity.model_dump(mode="json") for entity in result.entities]
+        entities_count = len(entities)
+        
+        app_logger.log_anonymization_complete(file.filename, entities_count, duration)
+        
+        return {
+            "success": True,
+            "filename": file.filename,
+            "anonymized_content": result.content,
+            "entities_found": entities,
+            "processing_time": duration,
+            "metadata": {
+                "original_size": file_size,
+                "confidence_threshold": confidence_threshold,
+                "method": anonymization_method,
+                "entities_count": entities_count
             }
-            
-        finally:
-            # Vyčištění dočasných souborů
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-            if 'output_path' in result and os.path.exists(result['output_path']):
-                os.unlink(result['output_path'])
+        }
         
     except HTTPException:
         raise
+    except (UploadTooLargeError, UploadBudgetExceededError) as e:
+        raise _upload_rejected(e, file.filename)
+    except LaneFullError as e:
+        raise _lane_unavailable(e)
     except Exception as e:
         app_logger.log_error(e, f"file_anonymization:{file.filename}")
         raise HTTPException(status_code=500, detail=f"File anonymization failed: {str(e)}")
@@ -232,10 +342,15 @@ async def batch_process(
     files: List[UploadFile] = File(...),
     confidence_threshold: float = 0.7,
     anonymization_method: str = "replace",
-    batch_processor: BatchProcessor = Depends(get_batch_processor)
+    pool: RecyclingService = Depends(get_service_pool),
+    lanes: PriorityLanes = Depends(get_priority_lanes),
+    upload_budget: UploadBudget = Depends(get_upload_budget)
 ):
     """
     Batch zpracování více souborů
+    
+    Dávka běží v hromadném pruhu s vlastními workery a mezi dokumenty dává
+    přednost interaktivním požadavkům.
     """
     try:
         if len(files) > config.anonymization.max_batch_size:
@@ -244,77 +359,103 @@ async def batch_process(
                 detail=f"Too many files. Max batch size: {config.anonymization.max_batch_size}"
             )
         
-        # Vytvoření konfigurace pro batch
-        batch_config = BatchProcessingConfig(
-            confidence_threshold=confidence_threshold,
-            anonymization_method=anonymization_method,
-            batch_size=len(files)
-        )
-        
-        # Příprava souborů pro zpracování
-        documents = []
-        temp_files = []
-        
+        # Kontrola typů všech souborů před čtením obsahu
         for file in files:
-            content = await file.read()
             file_extension = Path(file.filename).suffix.lower()
-            
-            # Kontroly
-            if len(content) > config.security.max_upload_size_mb * 1024 * 1024:
-                raise HTTPException(status_code=413, detail=f"File {file.filename} too large")
-            
             if file_extension not in config.security.allowed_file_types:
                 raise HTTPException(status_code=415, detail=f"Unsupported file type: {file_extension}")
-            
-            # Dočasný soubor
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-                temp_file.write(content)
-                temp_files.append(temp_file.name)
-                
-                document = Document(
-                    filename=file.filename,
-                    file_path=temp_file.name,
-                    file_type=file_extension,
-                    doc_type=DocumentType.TEXT if file_extension == '.txt' else DocumentType.DOCX
-                )
-                documents.append(document)
         
-        try:
-            # Batch zpracování
-            start_time = time.time()
-            results = batch_processor.process_batch(documents, batch_config)
-            duration = time.time() - start_time
-            
-            # Příprava odpovědi
-            response_data = {
-                "success": True,
-                "processed_files": len(results),
-                "processing_time": duration,
-                "results": []
-            }
-            
-            for result in results:
-                response_data["results"].append({
-                    "filename": result.get('filename'),
-                    "status": result.get('status'),
-                    "entities_found": len(result.get('entities', [])),
-                    "error": result.get('error') if result.get('status') == 'error' else None
-                })
+        # Texty všech souborů dávky se drží v rezervaci rozpočtu až do konce zpracování
+        with upload_budget.lease() as lease:
+            documents = []
+            decode_errors = []
             
-            return response_data
+            for file in files:
+                try:
+                    text = await read_upload(file, _max_upload_bytes(), lease)
+                except UploadTooLargeError:
+                    raise HTTPException(status_code=413, detail=f"File {file.filename} too large")
+                except UnicodeDecodeError as e:
+                    decode_errors.append({"filename": file.filename, "status": "error", "entities_found": 0, "error": str(e)})
+                    continue
+                documents.append(Document(id=file.filename, content=text, content_type=_content_type(file.filename)))
             
-        finally:
-            # Vyčištění dočasných souborů
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
+            # Batch zpracování v hromadném pruhu
+            start_time = time.time()
+            results = await lanes.run(BULK, _process_bulk_documents, documents, pool, lanes) + decode_errors
+            duration = time.time() - start_time
+        
+        # Příprava odpovědi
+        return {
+            "success": True,
+            "processed_files": len(results),
+            "processing_time": duration,
+            "metadata": {
+                "confidence_threshold": confidence_threshold,
+                "method": anonymization_method
+            },
+            "results": results
+        }
     
     except HTTPException:
         raise
+    except UploadBudgetExceededError as e:
+        raise _upload_rejected(e)
+    except LaneFullError as e:
+        raise _lane_unavailable(e)
     except Exception as e:
         app_logger.log_error(e, "batch_processing")
         raise HTTPException(status_code=500, detail=f"Batch processing failed: {str(e)}")
 
+@app.post("/reidentify")
+async def reidentify(
+    request: ReidentifyRequest,
+    requester: str = Depends(get_reidentification_requester),
+    vault: ReidentificationVault = Depends(get_reidentification_vault)
+):
+    """
+    Hromadná zpětná identifikace pseudonymů pro schválené výzkumné žádosti
+    
+    Vyžaduje API klíč žadatele; schválení musí patřit jemu a výsledky se
+    omezí na dokumenty, na které se schválení vztahuje.
+    
+    Args:
+        request: ID schválené žádosti, tokeny a volitelné omezení na dokument
+    """
+    try:
+        start_time = time.time()
+        tokens = list(dict.fromkeys(request.tokens))
+        try:
+            vault.check_approval(request.approval_id, requester, len(tokens))
+        except ApprovalError as e:
+            app_logger.log_security_event(
+                "REIDENTIFICATION_DENIED",
+                f"requester={requester}, approval_id={request.approval_id}, tokens={len(tokens)}: {e}"
+            )
+            raise HTTPException(status_code=403, detail=str(e))
+        
+        app_logger.log_security_event(
+            "REIDENTIFICATION",
+            f"requester={requester}, approval_id={request.approval_id}, tokens={len(tokens)}, "
+            f"document_id={request.document_id}"
+        )
+        
+        matches = vault.lookup(tokens, document_id=request.document_id, approval_id=request.approval_id)
+        
+        return {
+            "success": True,
+            "approval_id": request.approval_id,
+            "resolved": sum(1 for records in matches.values() if records),
+            "unresolved": [token for token, records in matches.items() if not records],
+            "results": matches,
+            "processing_time": time.time() - start_time
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_logger.log_error(e, "reidentification")
+        raise HTTPException(status_code=500, detail=f"Re-identification failed: {str(e)}")
+
 @app.get("/stats")
 async def get_stats():
     """Statistiky použití API"""
@@ -324,7 +465,18 @@ async def get_stats():
             "total_requests": "N/A - implement database tracking",
             "total_files_processed": "N/A - implement database tracking", 
             "average_processing_time": "N/A - implement database tracking",
-            "uptime": "N/A - implement uptime tracking"
+            "uptime": "N/A - implement uptime tracking",
+            # RSS a recyklace služby (dokud služba nebyla použita, jen RSS procesu)
+            "presidio_service": (
+                get_service_pool().get_stats() if get_service_pool.cache_info().currsize
+                else {"process_rss_bytes": current_rss_bytes()}
+            ),
+            # Dosažené velikosti dávek slučování textových požadavků
+            "text_coalescer": get_text_coalescer().get_stats() if get_text_coalescer.cache_info().currsize else None,
+            # Obsazenost a latence interaktivního a hromadného pruhu
+            "lanes": get_priority_lanes().get_stats() if get_priority_lanes.cache_info().currsize else None,
+            # Paměť rezervovaná pro nahrávané soubory
+            "uploads": get_upload_budget().get_stats() if get_upload_budget.cache_info().currsize else None
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
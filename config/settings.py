@@ -21,11 +21,21 @@ class SecurityConfig:
     secret_key: str = "default-secret-key-change-in-production"
     jwt_expiration_hours: int = 24
     max_upload_size_mb: int = 100
+    max_inflight_upload_mb: int = 512  # Součet obsahu a textu nahrávaných souborů všech požadavků
     allowed_file_types: list = None
+    vault_key: Optional[str] = None  # Klíč trezoru pro zpětnou identifikaci (Fernet)
+    # API klíče pro zpětnou identifikaci: žadatel -> klíč (REIDENTIFY_API_KEYS="jmeno:klic,...")
+    reidentify_api_keys: dict = None
     
     def __post_init__(self):
         if self.allowed_file_types is None:
             self.allowed_file_types = ['.txt', '.docx', '.pdf', '.csv']
+        if self.vault_key is None:
+            self.vault_key = os.getenv("VAULT_KEY")
+        if self.reidentify_api_keys is None:
+            self.reidentify_api_keys = dict(
+                entry.split(":", 1) for entry in os.getenv("REIDENTIFY_API_KEYS", "").split(",") if ":" in entry
+            )
 
 @dataclass
 class AnonymizationConfig:
@@ -34,6 +44,19 @@ class AnonymizationConfig:
     default_anonymization_method: str = "replace"
     czech_model_path: str = "cs_core_news_sm"
     max_batch_size: int = 100
+    # Recyklace anonymizační služby a workerů (None = bez limitu)
+    worker_max_documents: Optional[int] = 5000
+    # Jen pro samostatné procesy (watchdog, pool); proces API recyklovat přes gunicorn --max-requests
+    worker_max_rss_mb: Optional[int] = 3072
+    # Slučování souběžných požadavků /anonymize/text do dávek
+    coalesce_max_batch_size: int = 16
+    coalesce_max_wait_ms: float = 5.0
+    # Pruhy API: interaktivní požadavky a hromadné dávky s oddělenou kapacitou
+    interactive_workers: int = 16
+    interactive_queue: int = 256
+    bulk_workers: int = 1
+    bulk_queue: int = 8
+    bulk_max_pause_seconds: float = 5.0
     
 @dataclass
 class AppConfig:
@@ -49,6 +72,7 @@ class AppConfig:
     export_dir: Path = base_dir / "exports" 
     log_dir: Path = base_dir / "logs"
     data_dir: Path = base_dir / "data"
+    vault_path: Path = data_dir / "reidentification_vault.db"
     
     # Sub-konfigurace
     database: DatabaseConfig = None
@@ -74,7 +74,11 @@ class BatchProcessingConfig(BaseModel):
     audit_directory: str = "./logs"
     supported_formats: List[str] = ["txt", "json"]
     parallel_processing: bool = True
-    timeout_seconds: int = 300
-    file_pattern: str = "*.txt"
+    workers: int = 1  # Počet paralelních procesů (1 = sekvenčně, průběžně při výčtu)
+    unit_tokens: int = 50_000  # Rozpočet tokenů pracovní jednotky paralelní dávky
+    timeout_seconds: int = 300  # Limit zpracování jednoho dokumentu (0 = bez limitu)
+    batch_timeout_seconds: Optional[int] = None  # Limit celé dávky (None = bez limitu)
+    file_pattern: str = "*.txt"  # Předpona "**/" zpracuje i podadresáře
+    file_order: str = "none"  # Pořadí souborů: none, name, mtime
     input_directory: str = "./uploads"
     metadata: Optional[Dict] = None
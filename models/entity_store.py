@@ -0,0 +1,254 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from models.document import DetectedEntity
+
+
+class EntityView:
+    """
+    Odlehčený pohled na jednu entitu v EntityStore.
+
+    Nevytváří kopii textu - `text` a `context` se počítají až při přístupu.
+    """
+
+    __slots__ = ("_store", "index")
+
+    def __init__(self, store: "EntityStore", index: int):
+        self._store = store
+        self.index = index
+
+    @property
+    def entity_type(self) -> str:
+        return self._store.type_names[self._store.type_ids[self.index]]
+
+    @property
+    def start(self) -> int:
+        return self._store.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self._store.ends[self.index]
+
+    @property
+    def score(self) -> float:
+        return self._store.scores[self.index]
+
+    @property
+    def text(self) -> str:
+        return self._store.text[self.start:self.end]
+
+    @property
+    def context(self) -> str:
+        return self._store.get_context(self.index)
+
+    def __repr__(self) -> str:
+        return f"EntityView({self.entity_type}, {self.start}, {self.end}, {self.score:.2f})"
+
+
+class EntityStore:
+    """
+    Kompaktní interní úložiště detekovaných entit.
+
+    Entity jsou uloženy v paralelních polích (typ, začátek, konec, skóre),
+    typy entit jsou převedeny na číselné ID. Pydantic modely (`DetectedEntity`)
+    se vytvářejí až na hranici API pomocí `to_detected_entities`.
+    """
+
+    __slots__ = ("text", "type_names", "_type_index", "type_ids", "starts", "ends", "scores")
+
+    def __init__(self, text: str = ""):
+        """
+        Inicializace prázdného úložiště.
+
+        Args:
+            text: Text, ke kterému se pozice entit vztahují
+        """
+        self.text = text
+        self.type_names: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self.type_ids = array("H")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.scores = array("d")
+
+    @classmethod
+    def from_results(cls, text: str, results: Iterable, offset: int = 0) -> "EntityStore":
+        """
+        Vytvoří úložiště z výsledků Presidio Analyzeru.
+
+        Args:
+            text: Text, ke kterému se výsledky vztahují
+            results: Výsledky analyzeru (objekty s entity_type, start, end, score)
+            offset: Posun pozic (pro výsledky analýzy části textu)
+
+        Returns:
+            Naplněné úložiště
+        """
+        store = cls(text)
+        store.extend_results(results, offset)
+        return store
+
+    def type_id(self, entity_type: str) -> int:
+        """Vrátí číselné ID typu entity, případně ho zaregistruje."""
+        type_id = self._type_index.get(entity_type)
+        if type_id is None:
+            type_id = len(self.type_names)
+            self._type_index[entity_type] = type_id
+            self.type_names.append(entity_type)
+        return type_id
+
+    def add(self, entity_type: str, start: int, end: int, score: float) -> int:
+        """
+        Přidá entitu.
+
+        Args:
+            entity_type: Typ entity
+            start: Počáteční pozice
+            end: Koncová pozice
+            score: Skóre jistoty
+
+        Returns:
+            Index přidané entity
+        """
+        self.type_ids.append(self.type_id(entity_type))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.scores.append(score)
+        return len(self.starts) - 1
+
+    def extend_results(self, results: Iterable, offset: int = 0) -> None:
+        """
+        Přidá výsledky analyzeru, volitelně s posunem pozic.
+
+        Args:
+            results: Výsledky analyzeru
+            offset: Posun pozic
+        """
+        for result in results:
+            self.add(result.entity_type, result.start + offset, result.end + offset, result.score)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[EntityView]:
+        for index in range(len(self.starts)):
+            yield EntityView(self, index)
+
+    def __getitem__(self, index: int) -> EntityView:
+        if not -len(self) <= index < len(self):
+            raise IndexError("EntityStore index out of range")
+        return EntityView(self, index % len(self))
+
+    def entity_type(self, index: int) -> str:
+        """Vrátí typ entity na daném indexu."""
+        return self.type_names[self.type_ids[index]]
+
+    def get_context(self, index: int, window: int = 20) -> str:
+        """
+        Získá kontext kolem entity.
+
+        Args:
+            index: Index entity
+            window: Velikost okna pro kontext
+
+        Returns:
+            Kontext kolem entity
+        """
+        context_start = max(0, self.starts[index] - window)
+        context_end = min(len(self.text), self.ends[index] + window)
+        return self.text[context_start:context_end]
+
+    def count_by_type(self) -> Dict[str, int]:
+        """
+        Spočítá entity podle typu.
+
+        Returns:
+            Slovník s počty entit podle typu
+        """
+        counts = [0] * len(self.type_names)
+        for type_id in self.type_ids:
+            counts[type_id] += 1
+        return {name: count for name, count in zip(self.type_names, counts) if count}
+
+    def select(self, indices: Iterable[int]) -> "EntityStore":
+        """
+        Vytvoří nové úložiště s vybranými entitami (ve zadaném pořadí).
+
+        Args:
+            indices: Indexy entit k zachování
+
+        Returns:
+            Nové úložiště se sdílenou tabulkou typů
+        """
+        selected = EntityStore(self.text)
+        selected.type_names = list(self.type_names)
+        selected._type_index = dict(self._type_index)
+        for index in indices:
+            selected.type_ids.append(self.type_ids[index])
+            selected.starts.append(self.starts[index])
+            selected.ends.append(self.ends[index])
+            selected.scores.append(self.scores[index])
+        return selected
+
+    def span_index(self) -> Dict[tuple, int]:
+        """Vrátí mapování (start, end) na index entity."""
+        return {(start, end): index for index, (start, end) in enumerate(zip(self.starts, self.ends))}
+
+    def to_detected_entity(self, index: int, with_context: bool = True) -> DetectedEntity:
+        """
+        Materializuje jednu entitu jako pydantic model.
+
+        Args:
+            index: Index entity
+            with_context: Zda dopočítat kontext kolem entity
+
+        Returns:
+            Detekovaná entita
+        """
+        start = self.starts[index]
+        end = self.ends[index]
+        # Data pocházejí z analyzeru a jsou již typově správná, validace se přeskakuje
+        return DetectedEntity.model_construct(
+            entity_type=self.type_names[self.type_ids[index]],
+            start=start,
+            end=end,
+            score=self.scores[index],
+            text=self.text[start:end],
+            context=self.get_context(index) if with_context else "",
+            metadata={},
+        )
+
+    def to_detected_entities(self, with_context: bool = True) -> List[DetectedEntity]:
+        """
+        Materializuje všechny entity jako pydantic modely.
+
+        Args:
+            with_context: Zda dopočítat kontext kolem entit
+
+        Returns:
+            Seznam detekovaných entit
+        """
+        return [self.to_detected_entity(index, with_context) for index in range(len(self))]
+
+    def to_results(self, result_cls, indices: Optional[Iterable[int]] = None) -> List:
+        """
+        Převede entity na objekty výsledků Presidia (analyzeru nebo anonymizeru).
+
+        Args:
+            result_cls: Třída výsledku (např. RecognizerResult)
+            indices: Indexy entit k převodu (None = všechny)
+
+        Returns:
+            Seznam výsledků
+        """
+        if indices is None:
+            indices = range(len(self))
+        return [
+            result_cls(
+                entity_type=self.type_names[self.type_ids[index]],
+                start=self.starts[index],
+                end=self.ends[index],
+                score=self.scores[index],
+            )
+            for index in indices
+        ]
@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional
+
+from presidio_anonymizer.operators import Operator, OperatorType
+
+
+class CzechBaseOperator(Operator):
+    """
+    Společný základ českých anonymizačních operátorů.
+
+    Operátory lze registrovat do Presidio `AnonymizerEngine` (`add_anonymizer`)
+    a zároveň používat dávkově v interním `FastAnonymizer` přes `operate_batch`.
+    """
+
+    def operate_batch(self, texts: List[str], params: Optional[Dict] = None) -> List[str]:
+        """
+        Anonymizuje seznam hodnot jednoho typu entity.
+
+        Args:
+            texts: Hodnoty k anonymizaci
+            params: Další parametry pro anonymizaci
+
+        Returns:
+            Anonymizované hodnoty ve stejném pořadí
+        """
+        operate = self.operate
+        return [operate(text, params) for text in texts]
+
+    def validate(self, params: Optional[Dict] = None) -> None:
+        """
+        Validace parametrů operátoru.
+
+        Args:
+            params: Parametry k validaci
+        """
+        # Operátory nemají žádné povinné parametry
+        pass
+
+    def operator_type(self) -> OperatorType:
+        """
+        Vrátí typ operátoru.
+
+        Returns:
+            Typ operátoru (anonymizace)
+        """
+        return OperatorType.Anonymize
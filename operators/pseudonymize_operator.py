@@ -0,0 +1,72 @@
+import logging
+from typing import Dict, List, Optional
+
+from presidio_anonymizer.entities import InvalidParamError
+
+from operators.base import CzechBaseOperator
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+class PseudonymizeOperator(CzechBaseOperator):
+    """
+    Operátor konzistentní pseudonymizace.
+
+    Nahrazuje entitu pseudonymem z perzistentního úložiště (`PseudonymStore`),
+    takže stejná hodnota dostane stejný pseudonym ve všech dokumentech.
+    Parametry: `store` (instance PseudonymStore) a `entity_type`
+    (Presidio ho doplňuje automaticky).
+    """
+
+    def operate(self, text: str = None, params: Optional[Dict] = None) -> str:
+        """
+        Nahradí hodnotu jejím pseudonymem.
+
+        Args:
+            text: Hodnota k pseudonymizaci
+            params: Parametry operátoru (store, entity_type)
+
+        Returns:
+            Pseudonym
+        """
+        if not text:
+            return ""
+        return params["store"].get_or_create(params["entity_type"], text)
+
+    def operate_batch(self, texts: List[str], params: Optional[Dict] = None) -> List[str]:
+        """
+        Nahradí všechny hodnoty jednoho typu entity jedním dávkovým vyhledáním.
+
+        Args:
+            texts: Hodnoty k pseudonymizaci
+            params: Parametry operátoru (store, entity_type)
+
+        Returns:
+            Pseudonymy ve stejném pořadí
+        """
+        return params["store"].bulk_get_or_create(params["entity_type"], texts)
+
+    def validate(self, params: Optional[Dict] = None) -> None:
+        """
+        Validace parametrů operátoru.
+
+        Args:
+            params: Parametry k validaci
+        """
+        if not params or params.get("store") is None:
+            raise InvalidParamError("Pseudonymize operator requires a 'store' parameter")
+        if not params.get("entity_type"):
+            raise InvalidParamError("Pseudonymize operator requires an 'entity_type' parameter")
+
+    def operator_name(self) -> str:
+        """
+        Vrátí název operátoru.
+
+        Returns:
+            Název operátoru
+        """
+        return "pseudonymize"
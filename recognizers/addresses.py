@@ -22,17 +22,23 @@ class CzechAddressRecognizer(EntityRecognizer):
     #   - (/\d+[a-zA-Z]?)? : volitelné číslo orientační za lomítkem, také může končit písmenem (např. /4b)
     #   - \s? mezi čísly a lomítkem povoluje mezery
     # Ulice může obsahovat více slov, tečky, pomlčky.
-    # ([a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ\s.-]+?) : Název ulice (non-greedy)
-    # \s+ : Mezera před číslem
+    # ([a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ.-][a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ\s.-]{0,59}?) :
+    #   Název ulice (non-greedy), začíná písmenem, tečkou nebo pomlčkou, nejvýš 60 znaků
+    # \s : Mezera před číslem (další mezery pohltí název, volající ho ořízne)
     # (\d+[a-zA-Z]?(\s?/\s?\d+[a-zA-Z]?)?) : Číslo popisné/orientační
-    STREET_WITH_NUMBER_REGEX = r"([a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ\s.-]+?)\s+(\d+[a-zA-Z]?(\s?/\s?\d+[a-zA-Z]?)?)\b"
+    # Délka názvu je omezená a za názvem je jediná mezera: neomezená třída
+    # s mezerami následovaná \s+ backtrackovala při hledání kvadraticky
+    # (viz recognizers/regex_safety.py).
+    STREET_WITH_NUMBER_REGEX = r"([a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ.-][a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ\s.-]{0,59}?)\s(\d+[a-zA-Z]?(\s?/\s?\d+[a-zA-Z]?)?)\b"
     
     # Město: Začíná velkým písmenem, může mít více částí (např. Nové Město na Moravě)
     # nebo být jednoduché. Může obsahovat i číslovky (např. Albrechtice I)
-    # ([A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ][a-zA-Záčďéěíňóřšťúůýž\s.-]*(?:\s+[IVXLCDM]+)?)\b
+    # ([A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ][a-zA-Záčďéěíňóřšťúůýž\s.-]{0,60})\b
+    # Římskou číslovku (" I") pokrývá už třída znaků (velká písmena i mezery);
+    # samostatná skupina (?:\s+[IVXLCDM]+)? soupeřila s třídou o mezery.
     # Tento regex je stále zjednodušený a může vyžadovat další zpřesnění.
     # Prozatím se zaměříme na kombinaci s PSČ a ulicí.
-    CITY_REGEX = r"\b([A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ][a-zA-Záčďéěíňóřšťúůýž\s.-]*(?:\s+[IVXLCDM]+)?)\b"
+    CITY_REGEX = r"\b([A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ][a-zA-Záčďéěíňóřšťúůýž\s.-]{0,60})\b"
 
     # Kontextová slova pro zvýšení spolehlivosti
     CONTEXT_WORDS = [
@@ -146,16 +152,9 @@ class CzechAddressRecognizer(EntityRecognizer):
                 continue # Již jsme našli adresu spojenou s tímto PSČ
 
         # Hledání ulice s číslem samostatně (s nižším skóre, pokud není PSČ)
+        # Shody obsažené v adrese s PSČ řeší centrální ConflictResolver v PresidioService
+        # (a odstranění obsažených duplicit v AnalyzerEngine), zde se nekontrolují.
         for street_match in self.street_with_number_pattern.finditer(text):
-            # Zkontrolujeme, zda tato shoda již nebyla pokryta v rámci adresy s PSČ
-            already_covered = False
-            for res in results:
-                if street_match.start() >= res.start and street_match.end() <= res.end:
-                    already_covered = True
-                    break
-            if already_covered:
-                continue
-
             street_text = street_match.group(0)
             street_name = street_match.group(1).strip()
             house_number = street_match.group(2).strip()
@@ -181,19 +180,7 @@ class CzechAddressRecognizer(EntityRecognizer):
                     )
                 )
         
-        # Odstranění překrývajících se výsledků s nižším skóre
-        # (jednoduchá implementace, může být vylepšena)
-        final_results = []
-        for res1 in sorted(results, key=lambda x: x.score, reverse=True):
-            is_overlapping = False
-            for res2 in final_results:
-                if res1.start < res2.end and res1.end > res2.start: # Overlap
-                    is_overlapping = True
-                    break
-            if not is_overlapping:
-                final_results.append(res1)
-                
-        return final_results
+        return results
 
     def get_context_based_score(self, text: str, match_start: int, match_end: int, window: int = 50) -> float:
         """
@@ -4,6 +4,8 @@ from typing import List, Optional, Tuple
 from presidio_analyzer import EntityRecognizer, RecognizerResult
 from presidio_analyzer.nlp_engine import NlpArtifacts
 
+from .checksum_validators import BATCH_VALIDATION_THRESHOLD, validate_birth_numbers
+
 
 class CzechBirthNumberRecognizer(EntityRecognizer):
     """
@@ -61,10 +63,16 @@ class CzechBirthNumberRecognizer(EntityRecognizer):
         if not any(entity in self.supported_entities for entity in entities):
             return results
         
-        matches = self.compiled_regex.finditer(text)
-        for match in matches:
+        matches = list(self.compiled_regex.finditer(text))
+        # U dokumentů s mnoha kandidáty se validuje dávkově jedním průchodem
+        if len(matches) >= BATCH_VALIDATION_THRESHOLD:
+            valid_mask = validate_birth_numbers([match.group(1) for match in matches])
+        else:
+            valid_mask = [self._is_valid_birth_number(match.group(1)) for match in matches]
+
+        for match, is_valid in zip(matches, valid_mask):
             birth_number = match.group(1)
-            if self._is_valid_birth_number(birth_number):
+            if is_valid:
                 start, end = match.span()
                 
                 # Kontrola kontextu pro zvýšení přesnosti
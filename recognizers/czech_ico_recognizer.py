@@ -4,6 +4,8 @@ from typing import List, Optional
 from presidio_analyzer import EntityRecognizer, RecognizerResult
 from presidio_analyzer.nlp_engine import NlpArtifacts
 
+from .checksum_validators import BATCH_VALIDATION_THRESHOLD, validate_icos
+
 
 class CzechICORecognizer(EntityRecognizer):
     """
@@ -43,7 +45,14 @@ class CzechICORecognizer(EntityRecognizer):
         self, text: str, entities: List[str], nlp_artifacts: NlpArtifacts
     ) -> List[RecognizerResult]:
         results = []
-        for match in self.ico_pattern.finditer(text):
+        matches = list(self.ico_pattern.finditer(text))
+        # U dokumentů s mnoha kandidáty se validuje dávkově jedním průchodem
+        if len(matches) >= BATCH_VALIDATION_THRESHOLD:
+            valid_mask = validate_icos([match.group(1) for match in matches])
+        else:
+            valid_mask = [self._is_valid_ico(match.group(1)) for match in matches]
+
+        for match, is_valid in zip(matches, valid_mask):
             start, end = match.span()
             ico_text = match.group(1)
 
@@ -52,7 +61,7 @@ class CzechICORecognizer(EntityRecognizer):
             #     continue
 
             # Validace IČO (kontrolní součet modulo 11)
-            if not self._is_valid_ico(ico_text):
+            if not is_valid:
                 continue
 
             score = self.DEFAULT_SCORE
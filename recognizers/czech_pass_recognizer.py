@@ -84,15 +84,8 @@ class CzechPassRecognizer(EntityRecognizer):
         for match in self.pass_pattern_numeric.finditer(text):
             start, end = match.span()
             pass_text = match.group(1)
-
-            is_overlapping_with_better_alphanum = False
-            for res in results: # Kontrola vůči již nalezeným alfanumerickým pasům
-                if res.entity_type == "CZECH_PASSPORT_NUMBER" and \
-                   (match.start() >= res.start and match.end() <= res.end and res.score > self.DEFAULT_SCORE_NUMERIC):
-                    is_overlapping_with_better_alphanum = True
-                    break
-            if is_overlapping_with_better_alphanum:
-                continue
+            # Číselný formát se s alfanumerickým nemůže překrývat (\b mezi písmenem
+            # a číslicí neleží), případné překryvy s jinými typy řeší ConflictResolver.
 
             score = self.DEFAULT_SCORE_NUMERIC
             text_before = text[max(0, start - 50):start].lower()
@@ -105,7 +98,7 @@ class CzechPassRecognizer(EntityRecognizer):
                     break
 
             # DEBUG:
-            # print(f"CzechPassRecognizer DEBUG (numeric): Match '{pass_text}', Score: {score}, Context: {context_found}, Overlap: {is_overlapping_with_better_alphanum}")
+            # print(f"CzechPassRecognizer DEBUG (numeric): Match '{pass_text}', Score: {score}, Context: {context_found}")
 
             if score > 0.5: # Prahová hodnota pro numerický pas
                 results.append(
@@ -122,11 +115,5 @@ class CzechPassRecognizer(EntityRecognizer):
                     )
                 )
 
-        final_results = []
-        seen_spans = set()
-        for res in sorted(results, key=lambda x: x.start):
-            if (res.start, res.end) not in seen_spans:
-                final_results.append(res)
-                seen_spans.add((res.start, res.end))
-
-        return final_results
+        results.sort(key=lambda x: x.start)
+        return results
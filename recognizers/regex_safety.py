@@ -0,0 +1,506 @@
+import logging
+import re
+import string
+import time
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Iterable, List, Tuple
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Presidio kompiluje vzory PatternRecognizer knihovnou `regex`
+try:
+    import regex
+except ImportError:
+    regex = None
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Opakování s horní mezí do tohoto počtu se považuje za omezené - backtracking
+# je nejvýš konstantní násobek
+BOUNDED_REPEAT_LIMIT = 100
+
+# Vzorek abecedy, na kterém se porovnávají znakové třídy (ASCII, čeština, NBSP)
+SAMPLE_ALPHABET = string.printable + "áčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ "
+
+# Výchozí rozpočet harnessu: mikrosekundy na znak vstupu a pevná rezerva
+# na šum měření krátkých vstupů
+DEFAULT_BUDGET_US_PER_CHAR = 5.0
+DEFAULT_BUDGET_FLOOR_SECONDS = 0.005
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_POSSESSIVE_REPEAT = getattr(sre_constants, "POSSESSIVE_REPEAT", None)
+
+
+@dataclass
+class CompiledPattern:
+    """Regulární výraz nalezený v rozpoznávači."""
+    recognizer: str
+    name: str
+    pattern: str
+    flags: int
+    compiled: object
+
+
+@dataclass
+class RegexIssue:
+    """Nejednoznačný kvantifikátor nalezený statickou analýzou."""
+    recognizer: str
+    name: str
+    pattern: str
+    kind: str
+    detail: str
+
+
+@dataclass
+class RegexTiming:
+    """Nejhorší naměřený čas vyhledávání na adversariálních vstupech."""
+    recognizer: str
+    name: str
+    pattern: str
+    worst_input: str
+    worst_length: int
+    worst_seconds: float
+    budget_seconds: float
+    passed: bool
+
+
+def collect_patterns(recognizer) -> List[CompiledPattern]:
+    """
+    Najde všechny regulární výrazy rozpoznávače.
+
+    Prochází zkompilované vzory uložené v atributech (české rozpoznávače)
+    a vzory Presidio `PatternRecognizer.patterns`.
+
+    Args:
+        recognizer: Instance rozpoznávače
+
+    Returns:
+        Nalezené vzory
+    """
+    recognizer_name = getattr(recognizer, "name", type(recognizer).__name__)
+    patterns = []
+    for attribute, value in sorted(vars(recognizer).items()):
+        if isinstance(value, re.Pattern):
+            patterns.append(CompiledPattern(recognizer_name, attribute, value.pattern, value.flags, value))
+
+    flags = getattr(recognizer, "global_regex_flags", 0) or 0
+    for pattern in getattr(recognizer, "patterns", None) or []:
+        engine = regex if regex is not None else re
+        compiled = engine.compile(pattern.regex, flags=flags)
+        patterns.append(CompiledPattern(recognizer_name, pattern.name, pattern.regex, int(flags), compiled))
+    return patterns
+
+
+# --- Statická analýza ------------------------------------------------------
+
+def _category_matches(category, char: str) -> bool:
+    """Vyhodnotí kategorii znaků (\\d, \\s, \\w a jejich negace) pro jeden znak."""
+    name = str(category)
+    negate = "_NOT_" in name
+    if "DIGIT" in name:
+        result = char.isdecimal()
+    elif "SPACE" in name:
+        result = char.isspace()
+    elif "WORD" in name:
+        result = char.isalnum() or char == "_"
+    elif "LINEBREAK" in name:
+        result = char == "\n"
+    else:
+        result = True
+    return result != negate
+
+
+def _item_matches(op, av, char: str, flags: int) -> bool:
+    """Zjistí, zda jednoznakový prvek parse stromu přijme daný znak."""
+    if op == sre_constants.LITERAL:
+        return ord(char) == av
+    if op == sre_constants.NOT_LITERAL:
+        return ord(char) != av
+    if op == sre_constants.ANY:
+        return char != "\n" or bool(flags & re.DOTALL)
+    if op == sre_constants.CATEGORY:
+        return _category_matches(av, char)
+    if op == sre_constants.RANGE:
+        return av[0] <= ord(char) <= av[1]
+    if op == sre_constants.IN:
+        negate = any(item_op == sre_constants.NEGATE for item_op, _ in av)
+        matched = any(
+            _item_matches(item_op, item_av, char, flags)
+            for item_op, item_av in av
+            if item_op != sre_constants.NEGATE
+        )
+        return matched != negate
+    return False
+
+
+def _atom_chars(op, av, flags: int) -> FrozenSet[str]:
+    """Vrátí znaky vzorku abecedy, které jednoznakový prvek přijme."""
+    chars = set()
+    for char in SAMPLE_ALPHABET:
+        candidates = {char, char.lower(), char.upper()} if flags & re.IGNORECASE else {char}
+        if any(_item_matches(op, av, candidate, flags) for candidate in candidates):
+            chars.add(char)
+    return frozenset(chars)
+
+
+def _is_repeat(op) -> bool:
+    return op in _REPEATS or (_POSSESSIVE_REPEAT is not None and op == _POSSESSIVE_REPEAT)
+
+
+def _is_unbounded(op, av) -> bool:
+    """Opakování s horní mezí nad BOUNDED_REPEAT_LIMIT (nebo bez meze)."""
+    return _is_repeat(op) and av[1] > BOUNDED_REPEAT_LIMIT
+
+
+def _nullable(sequence, flags: int) -> bool:
+    """Zjistí, zda posloupnost prvků může odpovídat prázdnému řetězci."""
+    return all(_item_nullable(op, av, flags) for op, av in sequence)
+
+
+def _item_nullable(op, av, flags: int) -> bool:
+    if _is_repeat(op):
+        return av[0] == 0 or _nullable(av[2], flags)
+    if op == sre_constants.SUBPATTERN:
+        return _nullable(av[-1], flags)
+    if op == sre_constants.BRANCH:
+        return any(_nullable(branch, flags) for branch in av[1])
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.GROUPREF):
+        return True
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _nullable(av, flags)
+    return False
+
+
+def _edge_chars(sequence, flags: int, from_end: bool) -> FrozenSet[str]:
+    """Znaky, kterými může posloupnost začínat (nebo končit)."""
+    chars = set()
+    for op, av in (reversed(sequence) if from_end else sequence):
+        chars |= _item_edge_chars(op, av, flags, from_end)
+        if not _item_nullable(op, av, flags):
+            break
+    return frozenset(chars)
+
+
+def _item_edge_chars(op, av, flags: int, from_end: bool) -> FrozenSet[str]:
+    if _is_repeat(op):
+        return _edge_chars(av[2], flags, from_end)
+    if op == sre_constants.SUBPATTERN:
+        return _edge_chars(av[-1], flags, from_end)
+    if op == sre_constants.BRANCH:
+        return frozenset().union(*(_edge_chars(branch, flags, from_end) for branch in av[1]))
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _edge_chars(av, flags, from_end)
+    if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN, sre_constants.CATEGORY):
+        return _atom_chars(op, av, flags)
+    return frozenset()
+
+
+def _loop_edge_chars(op, av, flags: int, from_end: bool) -> FrozenSet[str]:
+    """
+    Znaky, které může na začátku (konci) prvku pohltit neomezené opakování.
+
+    Pro `(jméno[a-z]+)` na konci vrátí znaky `[a-z]`, pro `\\d` prázdnou množinu.
+    """
+    if _is_unbounded(op, av):
+        return _edge_chars(av[2], flags, from_end)
+    if _is_repeat(op):
+        return _loop_sequence_edge(av[2], flags, from_end)
+    if op == sre_constants.SUBPATTERN:
+        return _loop_sequence_edge(av[-1], flags, from_end)
+    if op == sre_constants.BRANCH:
+        return frozenset().union(*(_loop_sequence_edge(branch, flags, from_end) for branch in av[1]))
+    return frozenset()
+
+
+def _loop_sequence_edge(sequence, flags: int, from_end: bool) -> FrozenSet[str]:
+    chars = set()
+    for op, av in (reversed(sequence) if from_end else sequence):
+        chars |= _loop_edge_chars(op, av, flags, from_end)
+        if not _item_nullable(op, av, flags):
+            break
+    return frozenset(chars)
+
+
+def _contains_unbounded(sequence) -> bool:
+    """Zjistí, zda posloupnost obsahuje (v libovolné hloubce) neomezené opakování."""
+    for op, av in sequence:
+        if _is_unbounded(op, av):
+            return True
+        for child in _children(op, av):
+            if _contains_unbounded(child):
+                return True
+    return False
+
+
+def _children(op, av) -> List:
+    """Vnořené posloupnosti prvku parse stromu."""
+    if _is_repeat(op):
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return [av]
+    return []
+
+
+def _describe(chars: Iterable[str]) -> str:
+    sample = sorted(chars)[:6]
+    return ", ".join(repr(char) for char in sample)
+
+
+def _analyze_sequence(sequence, flags: int, found: List[Tuple[str, str]]) -> None:
+    """Rekurzivně hledá nejednoznačné kvantifikátory v posloupnosti."""
+    items = list(sequence)
+    for index, (op, av) in enumerate(items):
+        # Vnořený kvantifikátor: tělo neomezeného opakování obsahuje další
+        # neomezené opakování a konec iterace se může překrývat se začátkem další
+        if _is_unbounded(op, av) and _contains_unbounded(av[2]):
+            body = av[2]
+            overlap = _edge_chars(body, flags, True) & _edge_chars(body, flags, False)
+            if overlap or _nullable(body, flags):
+                found.append((
+                    "nested_quantifier",
+                    f"repeated group can split the same input in many ways (shared chars: {_describe(overlap)})",
+                ))
+
+        # Sousední kvantifikátory: neomezené opakování následované (přes nepovinné
+        # prvky) dalším opakováním se stejnými znaky
+        tail = _loop_edge_chars(op, av, flags, True)
+        if tail:
+            for next_op, next_av in items[index + 1:]:
+                head = _loop_edge_chars(next_op, next_av, flags, False)
+                if _is_repeat(next_op) and next_av[1] > 1:
+                    head |= _edge_chars(next_av[2], flags, False)
+                overlap = tail & head
+                if overlap:
+                    found.append((
+                        "overlapping_quantifiers",
+                        f"adjacent quantifiers compete for the same chars ({_describe(overlap)})",
+                    ))
+                    break
+                if not _item_nullable(next_op, next_av, flags):
+                    break
+
+        for child in _children(op, av):
+            _analyze_sequence(child, flags, found)
+
+
+def find_ambiguous_quantifiers(pattern: str, flags: int = 0) -> List[Tuple[str, str]]:
+    """
+    Najde kvantifikátory, které mohou backtrackovat superlineárně.
+
+    Hledá dva vzory (a to jen u opakování s mezí nad BOUNDED_REPEAT_LIMIT):
+    vnořené kvantifikátory typu `(\\w+\\s?)+` a sousední kvantifikátory
+    se společnými znaky typu `[a-z\\s]+\\s+`. Znakové třídy se porovnávají
+    na vzorku abecedy SAMPLE_ALPHABET.
+
+    Args:
+        pattern: Zdrojový text regulárního výrazu
+        flags: Příznaky kompilace
+
+    Returns:
+        Seznam dvojic (druh problému, popis)
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags & ~getattr(re, "TEMPLATE", 0))
+    except Exception as e:
+        logger.warning(f"Cannot parse pattern {pattern!r} for safety analysis: {str(e)}")
+        return []
+    found: List[Tuple[str, str]] = []
+    _analyze_sequence(list(parsed), flags | parsed.state.flags, found)
+    # Stejný problém nalezený na více úrovních se hlásí jednou
+    return list(dict.fromkeys(found))
+
+
+def analyze_recognizers(recognizers: Iterable) -> List[RegexIssue]:
+    """
+    Staticky zkontroluje všechny regulární výrazy rozpoznávačů.
+
+    Args:
+        recognizers: Instance rozpoznávačů
+
+    Returns:
+        Nalezené problémy
+    """
+    issues = []
+    for recognizer in recognizers:
+        for compiled in collect_patterns(recognizer):
+            for kind, detail in find_ambiguous_quantifiers(compiled.pattern, compiled.flags):
+                issues.append(RegexIssue(compiled.recognizer, compiled.name, compiled.pattern, kind, detail))
+    return issues
+
+
+# --- Fuzz / benchmark harness ----------------------------------------------
+
+def _loop_chars(sequence, flags: int) -> List[FrozenSet[str]]:
+    """Znakové množiny všech opakování ve vzoru (zdroj adversariálních vstupů)."""
+    sets = []
+    for op, av in sequence:
+        if _is_repeat(op) and av[1] > 1:
+            sets.append(_edge_chars(av[2], flags, False) | _edge_chars(av[2], flags, True))
+        for child in _children(op, av):
+            sets.extend(_loop_chars(child, flags))
+    return sets
+
+
+def _representatives(chars: FrozenSet[str]) -> List[str]:
+    """Vybere z množiny znaků po jednom zástupci písmen, číslic, mezer a ostatních."""
+    groups = [str.isalpha, str.isdecimal, str.isspace, lambda char: True]
+    picked = []
+    for group in groups:
+        for char in sorted(chars):
+            if group(char) and char not in picked:
+                picked.append(char)
+                break
+    return picked
+
+
+def generate_adversarial_inputs(pattern: str, flags: int = 0) -> List[Tuple[str, Callable[[int], str]]]:
+    """
+    Vytvoří generátory adversariálních vstupů pro daný vzor.
+
+    Vstupy opakují znaky, které pohlcují kvantifikátory vzoru (jednotlivě
+    i ve dvojicích, např. "a a a ..."), a končí znakem, který shodu pokazí -
+    tak se vynutí maximální backtracking.
+
+    Args:
+        pattern: Zdrojový text regulárního výrazu
+        flags: Příznaky kompilace
+
+    Returns:
+        Seznam dvojic (popis vstupu, funkce délka -> vstup)
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        loop_sets = _loop_chars(list(parsed), flags | parsed.state.flags)
+    except Exception:
+        loop_sets = []
+    chars: List[str] = []
+    for chars_set in loop_sets:
+        for char in _representatives(chars_set):
+            if char not in chars:
+                chars.append(char)
+    if not chars:
+        chars = ["a", " ", "1"]
+
+    units = [char for char in chars]
+    units += [first + second for first in chars for second in chars if first != second]
+
+    generators = []
+    for unit in units:
+        for suffix in ("!", "\x00"):
+            generators.append((
+                f"{unit!r} * n + {suffix!r}",
+                lambda length, unit=unit, suffix=suffix: unit * max(1, length // len(unit)) + suffix,
+            ))
+    return generators
+
+
+def measure_worst_case(
+    compiled: CompiledPattern,
+    max_length: int = 20_000,
+    budget_us_per_char: float = DEFAULT_BUDGET_US_PER_CHAR,
+    budget_floor_seconds: float = DEFAULT_BUDGET_FLOOR_SECONDS,
+) -> RegexTiming:
+    """
+    Změří nejhorší čas vyhledávání vzoru na adversariálních vstupech.
+
+    Délka vstupu roste geometricky (x1.5) od 8 znaků do `max_length`;
+    měření daného vstupu skončí při první délce, která překročí lineární
+    rozpočet `budget_floor_seconds + budget_us_per_char * délka`, takže
+    i exponenciální vzor se změří v rozumném čase.
+
+    Args:
+        compiled: Měřený vzor
+        max_length: Maximální délka vstupu
+        budget_us_per_char: Rozpočet v mikrosekundách na znak vstupu
+        budget_floor_seconds: Pevná rezerva rozpočtu v sekundách
+
+    Returns:
+        Nejhorší měření (vůči rozpočtu)
+    """
+    worst = RegexTiming(compiled.recognizer, compiled.name, compiled.pattern, "", 0, 0.0, budget_floor_seconds, True)
+    worst_ratio = -1.0
+    for description, generate in generate_adversarial_inputs(compiled.pattern, compiled.flags):
+        length = 8
+        while length <= max_length:
+            text = generate(length)
+            start_time = time.perf_counter()
+            for _ in compiled.compiled.finditer(text):
+                pass
+            elapsed = time.perf_counter() - start_time
+            budget = budget_floor_seconds + budget_us_per_char * len(text) / 1_000_000
+            if elapsed / budget > worst_ratio:
+                worst_ratio = elapsed / budget
+                worst = RegexTiming(
+                    compiled.recognizer,
+                    compiled.name,
+                    compiled.pattern,
+                    description,
+                    len(text),
+                    elapsed,
+                    budget,
+                    elapsed <= budget,
+                )
+            if elapsed > budget:
+                break
+            length = int(length * 1.5) + 1
+    return worst
+
+
+def benchmark_recognizers(recognizers: Iterable, max_length: int = 20_000, **budget) -> List[RegexTiming]:
+    """
+    Změří nejhorší čas všech regulárních výrazů rozpoznávačů.
+
+    Args:
+        recognizers: Instance rozpoznávačů
+        max_length: Maximální délka adversariálního vstupu
+        **budget: Parametry rozpočtu pro `measure_worst_case`
+
+    Returns:
+        Měření pro každý vzor
+    """
+    return [
+        measure_worst_case(compiled, max_length=max_length, **budget)
+        for recognizer in recognizers
+        for compiled in collect_patterns(recognizer)
+    ]
+
+
+def log_regex_issues(recognizers: Iterable, strict: bool = False) -> List[RegexIssue]:
+    """
+    Zkontroluje vzory rozpoznávačů při startu a nalezené problémy zaloguje.
+
+    Args:
+        recognizers: Instance rozpoznávačů
+        strict: Vyvolat výjimku, pokud se najde problém
+
+    Returns:
+        Nalezené problémy
+
+    Raises:
+        ValueError: Pokud je `strict` a některý vzor je nejednoznačný
+    """
+    issues = analyze_recognizers(recognizers)
+    for issue in issues:
+        logger.warning(
+            f"Potentially super-linear regex in {issue.recognizer}.{issue.name} "
+            f"({issue.kind}): {issue.detail} - {issue.pattern}"
+        )
+    if issues and strict:
+        raise ValueError(f"{len(issues)} recognizer patterns with ambiguous quantifiers")
+    return issues
@@ -17,6 +17,7 @@ from .czech_op_recognizer import CzechOPRecognizer # Přidán import pro OP
 from .czech_pass_recognizer import CzechPassRecognizer # Přidán import pro Pasy
 from .czech_rp_recognizer import CzechRPRecognizer # Přidán import pro ŘP
 from .custom_spacy_recognizer import CustomSpacyRecognizerCs # Nový import
+from .regex_safety import log_regex_issues
 
 # Nastavení loggeru
 logging.basicConfig(
@@ -39,6 +40,7 @@ class CzechRecognizerRegistry:
             registry: Presidio registr rozpoznávačů
         """
         logger.info("Registering specialized Czech recognizers")
+        existing_recognizers = list(registry.recognizers)
         
         # Vytvoření a registrace rozpoznávače českých rodných čísel
         birth_number_recognizer = CzechBirthNumberRecognizer()
@@ -122,6 +124,13 @@ class CzechRecognizerRegistry:
         
         # Zde budou přidány další specializované české rozpoznávače
         
+        # Statická kontrola regulárních výrazů nově registrovaných rozpoznávačů
+        # (nejednoznačné kvantifikátory mohou backtrackovat superlineárně)
+        log_regex_issues(
+            recognizer for recognizer in registry.recognizers
+            if not any(recognizer is existing for existing in existing_recognizers)
+        )
+        
         logger.info("All Czech recognizers registered successfully")
     
     @staticmethod
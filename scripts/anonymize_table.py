@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Anonymizace velkých tabulek (CSV, Parquet) z příkazové řádky.
+
+Příklad:
+    python scripts/anonymize_table.py export.csv export_anon.csv \\
+        --column rc=CZECH_BIRTH_NUMBER --skip-column hemoglobin
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.presidio_service import PresidioService
+from services.tabular_processor import DEFAULT_CHUNK_SIZE, TabularProcessor
+
+
+def parse_column_plans(columns, skip_columns):
+    """
+    Sestaví explicitní plány sloupců z argumentů.
+
+    Args:
+        columns: Hodnoty --column ve tvaru NAZEV=TYP[,TYP...] (NAZEV=* = všechny)
+        skip_columns: Názvy sloupců, které se neanalyzují
+
+    Returns:
+        Slovník název sloupce -> typy entit
+    """
+    plans = {}
+    for value in columns:
+        name, _, entities = value.partition("=")
+        if not name or not entities:
+            raise argparse.ArgumentTypeError(f"Invalid column plan '{value}', expected NAME=ENTITY[,ENTITY]")
+        plans[name] = None if entities == "*" else [entity.strip() for entity in entities.split(",") if entity.strip()]
+    for name in skip_columns:
+        plans[name] = []
+    return plans
+
+
+def main():
+    """Hlavní funkce CLI."""
+    parser = argparse.ArgumentParser(description="Anonymizace tabulek CSV/Parquet po blocích")
+    parser.add_argument("input", help="Vstupní soubor (.csv, .parquet)")
+    parser.add_argument("output", help="Výstupní soubor (.csv, .parquet)")
+    parser.add_argument("--column", action="append", default=[], help="Plán sloupce NAZEV=TYP[,TYP] (lze opakovat)")
+    parser.add_argument("--skip-column", action="append", default=[], help="Sloupec, který se neanalyzuje (lze opakovat)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Počet řádků jednoho bloku")
+    parser.add_argument("--language", default="cs", help="Jazyk analyzační pipeline")
+    parser.add_argument("--quiet", action="store_true", help="Vypsat jen souhrnné statistiky")
+    args = parser.parse_args()
+
+    if args.quiet:
+        logging.disable(logging.INFO)
+
+    try:
+        column_plans = parse_column_plans(args.column, args.skip_column)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    processor = TabularProcessor(
+        PresidioService(),
+        column_plans=column_plans,
+        chunk_size=args.chunk_size,
+        language=args.language,
+    )
+    stats = processor.process_file(args.input, args.output)
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark anonymizace velkých dokumentů.
+Porovnává Presidio AnonymizerEngine s interním FastAnonymizer na syntetickém
+dokumentu se zadanou velikostí a počtem entit. V režimu --operators měří
+cenu českých operátorů na 10 000 entit.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import RecognizerResult
+
+from models.entity_store import EntityStore
+from services.fast_anonymizer import FastAnonymizer
+from services.operator_plan import OperatorPlan
+
+ENTITY_SAMPLES = {
+    "PERSON": ["Jan Novák", "Marie Svobodová", "Petr Dvořák"],
+    "CZECH_BIRTH_NUMBER": ["760506/1234", "856215/1234", "7605061234"],
+    "EMAIL_ADDRESS": ["jan.novak@email.com", "info@nemocnice.cz"],
+    "CZECH_DIAGNOSIS_CODE": ["J45.0", "E11.9", "I10"],
+    "CZECH_ADDRESS": ["Vinohradská 123, Praha 2, 120 00", "náměstí Míru 5, Brno"],
+    "CZECH_MEDICAL_FACILITY": ["Fakultní nemocnice Motol", "Poliklinika Budějovická"],
+}
+
+
+def build_document(size_bytes: int, entity_count: int, seed: int = 42):
+    """
+    Vytvoří syntetický dokument s rovnoměrně rozmístěnými entitami.
+
+    Returns:
+        Tuple (text, seznam (typ, start, end))
+    """
+    rng = random.Random(seed)
+    filler_length = max(1, size_bytes // entity_count - 20)
+    filler = ("Pacient byl vyšetřen a propuštěn do domácí péče. " * (filler_length // 50 + 1))[:filler_length]
+
+    parts = []
+    spans = []
+    position = 0
+    for _ in range(entity_count):
+        parts.append(filler)
+        position += len(filler)
+        entity_type = rng.choice(list(ENTITY_SAMPLES))
+        value = rng.choice(ENTITY_SAMPLES[entity_type])
+        parts.append(value)
+        spans.append((entity_type, position, position + len(value)))
+        position += len(value)
+    parts.append(filler)
+    return "".join(parts), spans
+
+
+def benchmark(size_bytes: int, entity_count: int, repeat: int, skip_presidio: bool) -> None:
+    """Spustí benchmark a vypíše výsledky."""
+    text, spans = build_document(size_bytes, entity_count)
+    print(f"📄 Dokument: {len(text.encode('utf-8')) / 1024 / 1024:.2f} MB, {len(spans)} entit")
+
+    fast_anonymizer = FastAnonymizer()
+    store = EntityStore(text)
+    for entity_type, start, end in spans:
+        store.add(entity_type, start, end, 0.85)
+
+    best_fast = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fast_result = fast_anonymizer.anonymize(text, store)
+        best_fast = min(best_fast, time.perf_counter() - start_time)
+    print(f"⚡ FastAnonymizer:          {best_fast * 1000:10.1f} ms")
+
+    if skip_presidio:
+        return
+
+    engine = AnonymizerEngine()
+    best_presidio = float("inf")
+    for _ in range(repeat):
+        results = [RecognizerResult(entity_type, start, end, 0.85) for entity_type, start, end in spans]
+        start_time = time.perf_counter()
+        presidio_result = engine.anonymize(text=text, analyzer_results=results)
+        best_presidio = min(best_presidio, time.perf_counter() - start_time)
+    print(f"🐢 Presidio AnonymizerEngine: {best_presidio * 1000:8.1f} ms")
+    print(f"📈 Zrychlení: {best_presidio / best_fast:.1f}x")
+    print(f"✅ Shodný výstup: {presidio_result.text == fast_result.text}")
+
+
+def benchmark_operators(entity_count: int, repeat: int) -> None:
+    """Změří cenu operátorů z výchozího plánu na zadaný počet entit."""
+    plan = OperatorPlan()
+    print(f"🛠️ Cena operátorů na {entity_count} entit:")
+    for entity_type, (operator_name, batch_operator) in plan.batch_operators.items():
+        samples = ENTITY_SAMPLES[entity_type]
+        values = [samples[i % len(samples)] for i in range(entity_count)]
+        best = float("inf")
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            batch_operator(values)
+            best = min(best, time.perf_counter() - start_time)
+        print(f"   {operator_name:<26} {best * 1000:8.1f} ms")
+
+
+def main():
+    """Hlavní funkce benchmarku."""
+    parser = argparse.ArgumentParser(description="Benchmark anonymizace velkých dokumentů")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Velikost dokumentu v MB")
+    parser.add_argument("--entities", type=int, default=10000, help="Počet entit v dokumentu")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování (bere se nejlepší čas)")
+    parser.add_argument("--skip-presidio", action="store_true", help="Neměřit Presidio AnonymizerEngine")
+    parser.add_argument("--operators", action="store_true", help="Změřit cenu českých operátorů na 10 000 entit")
+    args = parser.parse_args()
+
+    if args.operators:
+        benchmark_operators(10000, args.repeat)
+        return
+
+    benchmark(int(args.size_mb * 1024 * 1024), args.entities, args.repeat, args.skip_presidio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Kontrola regulárních výrazů českých rozpoznávačů na katastrofický backtracking.
+
+Spustí statickou analýzu kvantifikátorů a měření nejhoršího času na
+adversariálních vstupech; skončí s chybou, pokud některý vzor překročí
+lineární rozpočet.
+
+Příklad:
+    python scripts/check_regex_safety.py --max-length 50000
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from presidio_analyzer import RecognizerRegistry
+
+from recognizers.regex_safety import (
+    DEFAULT_BUDGET_FLOOR_SECONDS,
+    DEFAULT_BUDGET_US_PER_CHAR,
+    analyze_recognizers,
+    benchmark_recognizers,
+)
+from recognizers.registry import CzechRecognizerRegistry
+
+
+def main():
+    """Hlavní funkce CLI."""
+    parser = argparse.ArgumentParser(description="Kontrola regulárních výrazů rozpoznávačů (ReDoS)")
+    parser.add_argument("--max-length", type=int, default=20_000, help="Maximální délka adversariálního vstupu")
+    parser.add_argument("--budget-us-per-char", type=float, default=DEFAULT_BUDGET_US_PER_CHAR, help="Rozpočet v µs na znak")
+    parser.add_argument("--budget-floor", type=float, default=DEFAULT_BUDGET_FLOOR_SECONDS, help="Pevná rezerva rozpočtu v sekundách")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    registry = RecognizerRegistry(supported_languages=["cs"])
+    CzechRecognizerRegistry.register_czech_recognizers(registry)
+    logging.disable(logging.NOTSET)
+
+    issues = analyze_recognizers(registry.recognizers)
+    for issue in issues:
+        print(f"⚠️  {issue.recognizer}.{issue.name}: {issue.kind} - {issue.detail}")
+
+    failed = 0
+    timings = benchmark_recognizers(
+        registry.recognizers,
+        max_length=args.max_length,
+        budget_us_per_char=args.budget_us_per_char,
+        budget_floor_seconds=args.budget_floor,
+    )
+    for timing in timings:
+        status = "✅" if timing.passed else "❌"
+        failed += not timing.passed
+        print(
+            f"{status} {timing.recognizer}.{timing.name}: {timing.worst_seconds * 1000:.2f} ms "
+            f"(rozpočet {timing.budget_seconds * 1000:.2f} ms) na {timing.worst_length} znacích {timing.worst_input}"
+        )
+
+    print(f"\n{len(timings)} vzorů, {len(issues)} varování analýzy, {failed} nad rozpočtem")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Správa schválení zpětné identifikace v trezoru.
+
+Příklad:
+    python scripts/manage_approvals.py grant IRB-2024-001 researcher --documents doc1 doc2 --valid-days 30
+    python scripts/manage_approvals.py grant IRB-2024-001 researcher --documents-file dokumenty.txt
+    python scripts/manage_approvals.py revoke IRB-2024-001
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from config.settings import ConfigManager
+from services.reidentification_vault import DEFAULT_APPROVAL_MAX_TOKENS, ReidentificationVault
+
+
+def open_vault(args) -> ReidentificationVault:
+    """Otevře trezor z konfigurace nebo z cesty zadané na příkazové řádce."""
+    config = ConfigManager.get_config()
+    if not config.security.vault_key:
+        sys.exit("Re-identification vault is not configured (VAULT_KEY)")
+    return ReidentificationVault(args.vault or str(config.vault_path), config.security.vault_key)
+
+
+def grant(args) -> None:
+    """Zaregistruje schválenou žádost."""
+    document_ids = list(args.documents or [])
+    if args.documents_file:
+        document_ids.extend(
+            line.strip() for line in Path(args.documents_file).read_text(encoding="utf-8").splitlines() if line.strip()
+        )
+    vault = open_vault(args)
+    vault.grant_approval(
+        args.approval_id,
+        args.grantee,
+        document_ids,
+        valid_seconds=args.valid_days * 86400,
+        max_tokens=args.max_tokens,
+    )
+    vault.close()
+    print(json.dumps({"approval_id": args.approval_id, "grantee": args.grantee, "documents": len(document_ids)}, indent=2))
+
+
+def revoke(args) -> None:
+    """Zruší schválenou žádost."""
+    vault = open_vault(args)
+    revoked = vault.revoke_approval(args.approval_id)
+    vault.close()
+    print(json.dumps({"approval_id": args.approval_id, "revoked": revoked}, indent=2))
+
+
+def main():
+    """Hlavní funkce CLI."""
+    parser = argparse.ArgumentParser(description="Správa schválení zpětné identifikace")
+    parser.add_argument("--vault", help="Cesta k SQLite souboru trezoru (výchozí z konfigurace)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    grant_parser = subparsers.add_parser("grant", help="Zaregistrovat schválenou žádost")
+    grant_parser.add_argument("approval_id", help="ID schválené žádosti")
+    grant_parser.add_argument("grantee", help="Žadatel (jméno z REIDENTIFY_API_KEYS)")
+    grant_parser.add_argument("--documents", nargs="+", help="ID dokumentů, na které se schválení vztahuje")
+    grant_parser.add_argument("--documents-file", help="Soubor s ID dokumentů (jedno na řádek)")
+    grant_parser.add_argument("--valid-days", type=float, default=30, help="Platnost schválení ve dnech")
+    grant_parser.add_argument("--max-tokens", type=int, default=DEFAULT_APPROVAL_MAX_TOKENS, help="Maximální počet tokenů v jednom požadavku")
+    grant_parser.set_defaults(handler=grant)
+
+    revoke_parser = subparsers.add_parser("revoke", help="Zrušit schválenou žádost")
+    revoke_parser.add_argument("approval_id", help="ID schválené žádosti")
+    revoke_parser.set_defaults(handler=revoke)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
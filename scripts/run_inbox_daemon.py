@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Průběžná anonymizace souborů ukládaných do vstupního adresáře (inboxu).
+
+Příklad:
+    python scripts/run_inbox_daemon.py data/inbox data/outbox data/errors data/audit \\
+        --pattern "*.txt" --archive-dir data/processed
+"""
+
+import argparse
+import json
+import signal
+import sys
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.batch_processor import BatchProcessor
+from services.inbox_daemon import InboxDaemon
+from services.presidio_service import PresidioService
+from services.worker_lifecycle import WorkerLifecycle
+
+
+def main():
+    """Hlavní funkce CLI."""
+    parser = argparse.ArgumentParser(description="Démon pro průběžné zpracování vstupního adresáře")
+    parser.add_argument("input_dir", help="Sledovaný vstupní adresář")
+    parser.add_argument("output_dir", help="Adresář pro anonymizované dokumenty")
+    parser.add_argument("error_dir", help="Adresář pro dokumenty s chybou zpracování")
+    parser.add_argument("audit_dir", help="Adresář auditního logu")
+    parser.add_argument("--pattern", default="*.txt", help="Vzor názvu vstupních souborů")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Interval kontroly adresáře v sekundách")
+    parser.add_argument("--stable-seconds", type=float, default=2.0, help="Doba beze změny, po které je soubor zapsaný")
+    parser.add_argument("--require-ready-marker", action="store_true", help="Zpracovat jen soubory se značkou .ready")
+    parser.add_argument("--archive-dir", help="Adresář pro zpracované vstupy (jinak se z inboxu smažou)")
+    parser.add_argument("--document-timeout", type=float, default=300, help="Limit zpracování dokumentu v sekundách (0 = bez limitu)")
+    parser.add_argument("--worker-max-documents", type=int, help="Recyklovat worker po tolika dokumentech")
+    parser.add_argument("--worker-max-rss-mb", type=float, help="Recyklovat worker po překročení RSS v MB")
+    parser.add_argument("--no-inotify", action="store_true", help="Vždy hlídat adresář dotazováním")
+    args = parser.parse_args()
+
+    # Modely se načtou jednou při startu a zůstanou zahřáté po celou dobu běhu
+    batch_processor = BatchProcessor(
+        PresidioService(),
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        error_dir=args.error_dir,
+        audit_dir=args.audit_dir,
+        document_timeout=args.document_timeout or None,
+        worker_lifecycle=WorkerLifecycle(args.worker_max_documents, args.worker_max_rss_mb),
+    )
+    daemon = InboxDaemon(
+        batch_processor,
+        file_pattern=args.pattern,
+        poll_interval=args.poll_interval,
+        stable_seconds=args.stable_seconds,
+        require_ready_marker=args.require_ready_marker,
+        archive_dir=args.archive_dir,
+        use_inotify=not args.no_inotify,
+    )
+
+    # Ukončení po dokončení rozpracovaného souboru
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: daemon.stop())
+
+    stats = daemon.run()
+    batch_processor.audit_log.close()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
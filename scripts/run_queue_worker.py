@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Distribuované zpracování dokumentů přes frontu práce.
+
+Příklad:
+    python scripts/run_queue_worker.py enqueue data/queue.db data/input --pattern "*.txt"
+    python scripts/run_queue_worker.py work data/queue.db --processes 4 --until-empty
+    python scripts/run_queue_worker.py export data/queue.db data/output
+"""
+
+import argparse
+import json
+import signal
+import sys
+from pathlib import Path
+
+# Přidání root directory do Python path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.queue_worker import DEFAULT_BATCH_SIZE, DEFAULT_VISIBILITY_TIMEOUT, QueueWorker, run_worker_processes
+from services.work_queue import SqliteWorkQueue
+
+
+def enqueue(args) -> None:
+    """Zařadí soubory vstupního adresáře do fronty."""
+    queue = SqliteWorkQueue(args.queue)
+    input_dir = Path(args.input_dir)
+    messages = []
+    for path in sorted(input_dir.rglob(args.pattern)):
+        if path.is_file():
+            # ID zprávy je relativní cesta - opakované zařazení adresáře je bezpečné
+            message_id = path.relative_to(input_dir).as_posix()
+            messages.append((message_id, {"id": message_id, "content": path.read_text(encoding="utf-8")}))
+    inserted = queue.enqueue_many(messages)
+    print(json.dumps({"files": len(messages), "enqueued": inserted}, indent=2, ensure_ascii=False))
+
+
+def work(args) -> None:
+    """Spustí workery nad frontou."""
+    from services.presidio_service import PresidioService
+
+    # Modely se načtou jednou v rodiči, procesy workerů je sdílí po forku
+    presidio_service = PresidioService()
+
+    def worker_factory() -> QueueWorker:
+        worker = QueueWorker(
+            presidio_service,
+            SqliteWorkQueue(args.queue, max_attempts=args.max_attempts),
+            batch_size=args.batch_size,
+            visibility_timeout=args.visibility_timeout,
+        )
+        # Ukončení po dokončení rozpracované dávky
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *_: worker.stop())
+        return worker
+
+    if args.processes == 1:
+        stats = [worker_factory().run(until_empty=args.until_empty)]
+    else:
+        # Rodič jen čeká na workery, signál ukončí každý worker sám
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        stats = run_worker_processes(worker_factory, args.processes, until_empty=args.until_empty)
+    print(json.dumps({"workers": stats, "queue": SqliteWorkQueue(args.queue).get_stats()}, indent=2, ensure_ascii=False))
+
+
+def export(args) -> None:
+    """Zapíše výsledky fronty do výstupního adresáře."""
+    queue = SqliteWorkQueue(args.queue)
+    output_dir = Path(args.output_dir)
+    exported = 0
+    for message_id, result in queue.results():
+        output_path = output_dir / message_id
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(result["content"], encoding="utf-8")
+        exported += 1
+    print(json.dumps({"exported": exported, "dead": queue.dead_messages()}, indent=2, ensure_ascii=False))
+
+
+def main():
+    """Hlavní funkce CLI."""
+    parser = argparse.ArgumentParser(description="Zpracování dokumentů přes frontu práce")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Zařadit soubory do fronty")
+    enqueue_parser.add_argument("queue", help="Cesta k SQLite souboru fronty")
+    enqueue_parser.add_argument("input_dir", help="Vstupní adresář")
+    enqueue_parser.add_argument("--pattern", default="*.txt", help="Vzor názvu vstupních souborů")
+    enqueue_parser.set_defaults(handler=enqueue)
+
+    work_parser = subparsers.add_parser("work", help="Spustit workery")
+    work_parser.add_argument("queue", help="Cesta k SQLite souboru fronty")
+    work_parser.add_argument("--processes", type=int, default=1, help="Počet procesů workerů")
+    work_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Počet dokumentů v dávce")
+    work_parser.add_argument("--visibility-timeout", type=float, default=DEFAULT_VISIBILITY_TIMEOUT, help="Doba skrytí vyzvednuté dávky v sekundách")
+    work_parser.add_argument("--max-attempts", type=int, default=5, help="Maximální počet doručení zprávy")
+    work_parser.add_argument("--until-empty", action="store_true", help="Skončit, jakmile je fronta prázdná")
+    work_parser.set_defaults(handler=work)
+
+    export_parser = subparsers.add_parser("export", help="Zapsat výsledky do adresáře")
+    export_parser.add_argument("queue", help="Cesta k SQLite souboru fronty")
+    export_parser.add_argument("output_dir", help="Adresář pro anonymizované dokumenty")
+    export_parser.set_defaults(handler=export)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
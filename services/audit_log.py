@@ -0,0 +1,295 @@
+import glob
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí počet záznamů v jednom segmentu, po kterém se otevře nový
+DEFAULT_SEGMENT_RECORDS = 1_000_000
+
+# Politiky trvanlivosti zápisu: SQLite `synchronous` pro každou dávku
+DURABILITY_MODES = {"normal": "NORMAL", "full": "FULL"}
+
+_COLUMNS = ("timestamp", "document_id", "success", "entities_detected", "processing_time_ms", "error_message", "details")
+
+
+class AuditLog:
+    """
+    Append-only auditní log zpracování dokumentů.
+
+    Záznamy se ukládají do segmentů `audit-NNNNN.db` (SQLite ve WAL režimu)
+    s indexem podle ID dokumentu a času. Volání `record` jen vloží záznam do
+    fronty; zápis obstarává vlákno na pozadí, které záznamy ukládá po dávkách
+    jednou transakcí (nejpozději po `flush_interval` sekundách nebo po
+    `batch_size` záznamech). Politika `durability` určuje, zda se při každé
+    dávce volá fsync ("full"), nebo až při checkpointu WAL ("normal").
+    Po dosažení `max_segment_records` se otevře nový segment.
+    """
+
+    def __init__(
+        self,
+        audit_dir: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        durability: str = "normal",
+        max_segment_records: int = DEFAULT_SEGMENT_RECORDS,
+    ):
+        """
+        Inicializace auditního logu.
+
+        Args:
+            audit_dir: Adresář se segmenty logu
+            flush_interval: Maximální prodleva zápisu dávky v sekundách
+            batch_size: Maximální počet záznamů v jedné dávce
+            durability: Politika fsync ("normal", "full")
+            max_segment_records: Počet záznamů, po kterém se log rotuje
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability '{durability}', expected one of {tuple(DURABILITY_MODES)}")
+        self.audit_dir = audit_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.durability = durability
+        self.max_segment_records = max_segment_records
+        self._stats = {"records_queued": 0, "records_written": 0, "batches": 0, "write_time_ms": 0.0, "rotations": 0}
+
+        os.makedirs(audit_dir, exist_ok=True)
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        """Spustí vlákno zapisovače (i znovu v procesu vzniklém forkem)."""
+        self._pid = os.getpid()
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run_writer, name="audit-log-writer", daemon=True)
+        self._writer.start()
+
+    def segments(self) -> List[str]:
+        """Vrátí cesty ke všem segmentům v pořadí vzniku."""
+        return sorted(glob.glob(os.path.join(self.audit_dir, "audit-*.db")))
+
+    def _open_segment(self, path: str) -> sqlite3.Connection:
+        """Otevře (a případně vytvoří) segment logu."""
+        connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={DURABILITY_MODES[self.durability]}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS audit_records ("
+            " id INTEGER PRIMARY KEY,"
+            " timestamp TEXT NOT NULL,"
+            " document_id TEXT,"
+            " success INTEGER NOT NULL,"
+            " entities_detected INTEGER,"
+            " processing_time_ms INTEGER,"
+            " error_message TEXT,"
+            " details TEXT"
+            ")"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_audit_document ON audit_records (document_id)")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_records (timestamp)")
+        return connection
+
+    def _next_segment_path(self) -> str:
+        """Vrátí cestu k dalšímu segmentu."""
+        segments = self.segments()
+        number = int(os.path.basename(segments[-1])[6:11]) + 1 if segments else 0
+        return os.path.join(self.audit_dir, f"audit-{number:05d}.db")
+
+    def _run_writer(self) -> None:
+        """Smyčka zapisovače: sbírá záznamy z fronty a zapisuje je po dávkách."""
+        segments = self.segments()
+        connection = self._open_segment(segments[-1] if segments else self._next_segment_path())
+        segment_records = connection.execute("SELECT COUNT(*) FROM audit_records").fetchone()[0]
+
+        running = True
+        while running:
+            rows, waiters = [], []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.append(item)
+                if not running or len(rows) >= self.batch_size:
+                    break
+                try:
+                    # Po požadavku na flush se dávka zapíše hned, bez čekání
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0) if not waiters else 0)
+                except queue.Empty:
+                    break
+
+            if rows:
+                if segment_records + len(rows) > self.max_segment_records and segment_records:
+                    connection.close()
+                    connection = self._open_segment(self._next_segment_path())
+                    segment_records = 0
+                    with self._stats_lock:
+                        self._stats["rotations"] += 1
+                start_time = time.perf_counter()
+                try:
+                    connection.execute("BEGIN")
+                    connection.executemany(
+                        f"INSERT INTO audit_records ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        rows,
+                    )
+                    connection.execute("COMMIT")
+                    segment_records += len(rows)
+                    with self._stats_lock:
+                        self._stats["records_written"] += len(rows)
+                        self._stats["batches"] += 1
+                        self._stats["write_time_ms"] += (time.perf_counter() - start_time) * 1000
+                except sqlite3.Error as e:
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                    logger.error(f"Failed to write {len(rows)} audit records: {str(e)}")
+            for waiter in waiters:
+                waiter.set()
+        connection.close()
+
+    def _ensure_writer(self) -> None:
+        """Po forku vlákno zapisovače v potomkovi neběží - spustí se znovu."""
+        if self._pid != os.getpid():
+            self._start_writer()
+
+    def record(
+        self,
+        document_id: Optional[str],
+        success: bool,
+        entities_detected: Optional[int] = None,
+        processing_time_ms: Optional[int] = None,
+        error_message: Optional[str] = None,
+        details: Optional[Dict] = None,
+    ) -> None:
+        """
+        Zařadí auditní záznam k zápisu.
+
+        Args:
+            document_id: ID dokumentu
+            success: Příznak úspěšného zpracování
+            entities_detected: Počet detekovaných entit
+            processing_time_ms: Doba zpracování v milisekundách
+            error_message: Chybová zpráva v případě neúspěchu
+            details: Další údaje (uloží se jako JSON)
+        """
+        self._ensure_writer()
+        if self._closed:
+            raise ValueError("Audit log is closed")
+        self._queue.put((
+            datetime.now().isoformat(),
+            document_id,
+            int(success),
+            entities_detected,
+            processing_time_ms,
+            error_message,
+            json.dumps(details, ensure_ascii=False) if details else None,
+        ))
+        with self._stats_lock:
+            self._stats["records_queued"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Počká, až se zapíší všechny dosud zařazené záznamy.
+
+        Args:
+            timeout: Maximální doba čekání v sekundách (None = bez omezení)
+
+        Returns:
+            True, pokud byly záznamy zapsány
+        """
+        self._ensure_writer()
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def query(
+        self,
+        document_id: Optional[str] = None,
+        success: Optional[bool] = None,
+        since: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict]:
+        """
+        Vyhledá auditní záznamy ve všech segmentech.
+
+        Args:
+            document_id: ID dokumentu (používá index)
+            success: Filtr podle výsledku zpracování
+            since: Jen záznamy od daného času (ISO formát)
+            limit: Maximální počet vrácených záznamů
+
+        Returns:
+            Záznamy od nejnovějších
+        """
+        conditions, params = [], []
+        if document_id is not None:
+            conditions.append("document_id = ?")
+            params.append(document_id)
+        if success is not None:
+            conditions.append("success = ?")
+            params.append(int(success))
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        results: List[Dict] = []
+        for path in reversed(self.segments()):
+            if len(results) >= limit:
+                break
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30.0)
+            try:
+                rows = connection.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM audit_records{where} ORDER BY id DESC LIMIT ?",
+                    params + [limit - len(results)],
+                ).fetchall()
+            finally:
+                connection.close()
+            for row in rows:
+                record = dict(zip(_COLUMNS, row))
+                record["success"] = bool(record["success"])
+                record["details"] = json.loads(record["details"]) if record["details"] else {}
+                results.append(record)
+        return results
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky logu.
+
+        Returns:
+            Slovník s počty zařazených a zapsaných záznamů, dávek a rotací
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["write_time_ms"] = round(stats["write_time_ms"], 3)
+        stats["records_pending"] = self._queue.qsize()
+        stats["segments"] = len(self.segments())
+        return stats
+
+    def close(self) -> None:
+        """Zapíše zbývající záznamy a ukončí zapisovač."""
+        if self._closed or self._pid != os.getpid():
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
@@ -1,8 +1,13 @@
 import logging
+import multiprocessing
 import os
+import heapq
 import json
+import queue
 import time
-from typing import Dict, List, Optional, Union
+from collections import deque
+from itertools import count, islice
+from typing import Callable, Dict, Iterator, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -12,6 +17,22 @@ root_path = Path(__file__).parent.parent
 sys.path.append(str(root_path))
 
 from models.document import Document, AnonymizedDocument, BatchProcessingConfig
+from services.audit_log import AuditLog
+from services.batch_scheduler import BatchScheduler, WorkUnit, core_utilization, merge_documents, split_document
+from services.document_watchdog import DocumentTimeoutError, DocumentWatchdog, transferable_error
+from services.file_enumerator import FileEntry, FileEnumerator
+from services.jsonl_source import JsonlSource
+from services.lease_manager import CLAIMED, HELD, LeaseManager
+from services.retry_policy import (
+    Quarantine,
+    QuarantinedDocumentError,
+    RetryPolicy,
+    content_hash,
+    failure_fingerprint,
+)
+from services.shard_writer import DEFAULT_SHARD_BYTES, ShardWriter
+from services.tabular_processor import DEFAULT_CHUNK_SIZE, TabularProcessor
+from services.worker_lifecycle import WorkerLifecycle, current_rss_bytes
 
 # Nastavení loggeru
 logging.basicConfig(
@@ -20,6 +41,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Stav pro workery zpracování JSONL; nastaví se před forkem, takže ho
+# procesy zdědí bez serializace služby
+_jsonl_worker_state: Dict = {}
+
+
+def _process_jsonl_range(record_range: tuple) -> tuple:
+    """Zpracuje rozsah záznamů JSONL ve worker procesu."""
+    state = _jsonl_worker_state
+    if state.get("source") is None or state.get("pid") != os.getpid():
+        state["source"] = JsonlSource(state["input_path"])
+        state["pid"] = os.getpid()
+    output, range_stats = state["processor"]._process_jsonl_range(state["source"], *record_range, **state["options"])
+    range_stats["worker_pid"] = os.getpid()
+    range_stats["worker_rss_bytes"] = current_rss_bytes()
+    return output, range_stats
+
+
+# Stav pro workery paralelní dávky (nastaví se před forkem, viz výše)
+_batch_worker_state: Dict = {}
+
+
+def _process_batch_unit(unit: WorkUnit) -> Dict:
+    """Zpracuje pracovní jednotku paralelní dávky ve worker procesu."""
+    state = _batch_worker_state
+    return state["processor"]._process_unit(unit, state["deadline"])
+
+
 class BatchProcessor:
     """
     Služba pro dávkové zpracování dokumentů.
@@ -28,6 +76,12 @@ class BatchProcessor:
     s podporou pro zotavení z chyb, monitoring a audit.
     """
     
+    # Podporované způsoby uložení výstupu
+    OUTPUT_MODES = ("files", "shards")
+    
+    # Počet souborů, které si uzel v paralelním režimu převezme najednou
+    LEASE_ROUND_FILES = 256
+    
     def __init__(
         self,
         presidio_service,
@@ -38,6 +92,15 @@ class BatchProcessor:
         batch_size: int = 10,
         max_retries: int = 3,
         retry_delay: int = 5,
+        reidentification_vault=None,
+        output_mode: str = "files",
+        max_shard_bytes: int = DEFAULT_SHARD_BYTES,
+        audit_log: Optional[AuditLog] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        quarantine: Optional[Quarantine] = None,
+        document_timeout: Optional[float] = None,
+        worker_lifecycle: Optional[WorkerLifecycle] = None,
+        lease_manager: Optional[LeaseManager] = None,
     ):
         """
         Inicializace služby pro dávkové zpracování.
@@ -51,7 +114,28 @@ class BatchProcessor:
             batch_size: Velikost dávky (počet dokumentů zpracovaných najednou)
             max_retries: Maximální počet pokusů o zpracování dokumentu
             retry_delay: Prodleva mezi pokusy o zpracování (v sekundách)
+            reidentification_vault: Volitelný ReidentificationVault pro uložení
+                původních hodnot nahrazených entit
+            output_mode: Způsob uložení výstupu - "files" (soubor a .meta.json
+                pro každý dokument) nebo "shards" (tar shardy s indexem
+                a jeden manifest za běh)
+            max_shard_bytes: Maximální velikost jednoho shardu v bajtech
+            audit_log: Auditní log (None = AuditLog v adresáři audit_dir)
+            retry_policy: Politika opakování (None = max_retries pokusů
+                s exponenciální prodlevou od retry_delay sekund)
+            quarantine: Karanténa dokumentů s deterministickou chybou
+                (None = quarantine.db v adresáři audit_dir)
+            document_timeout: Časový limit zpracování jednoho dokumentu
+                v sekundách mimo process_batch (None = bez limitu); dávka
+                používá BatchProcessingConfig.timeout_seconds
+            worker_lifecycle: Pravidla recyklace workerů (watchdog a procesy
+                process_jsonl) podle počtu dokumentů a RSS (None = bez recyklace)
+            lease_manager: Koordinace více uzlů nad sdíleným vstupním adresářem
+                (None = uzel zpracuje všechny soubory)
         """
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output_mode}', expected one of {self.OUTPUT_MODES}")
+
         self.presidio_service = presidio_service
         self.input_dir = input_dir
         self.output_dir = output_dir
@@ -60,11 +144,24 @@ class BatchProcessor:
         self.batch_size = batch_size
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.reidentification_vault = reidentification_vault
+        self.output_mode = output_mode
+        self.max_shard_bytes = max_shard_bytes
+        self._shard_writer: Optional[ShardWriter] = None
         
         # Vytvoření adresářů, pokud neexistují
         for directory in [input_dir, output_dir, error_dir, audit_dir]:
             os.makedirs(directory, exist_ok=True)
         
+        self.audit_log = audit_log or AuditLog(audit_dir)
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries, base_delay=retry_delay)
+        self.quarantine = quarantine or Quarantine(os.path.join(audit_dir, "quarantine.db"))
+        self.document_timeout = document_timeout
+        # Worker s časovým limitem se nastartuje až při prvním dokumentu s limitem
+        self.worker_lifecycle = worker_lifecycle or WorkerLifecycle()
+        self.watchdog = DocumentWatchdog(presidio_service, self.worker_lifecycle)
+        self.lease_manager = lease_manager
+        
         logger.info(f"Batch processor initialized with batch size {batch_size}")
     
     def process_batch(self, config: Optional[BatchProcessingConfig] = None) -> Dict:
@@ -83,19 +180,23 @@ class BatchProcessor:
         if not config:
             config = BatchProcessingConfig()
         
-        # Získání seznamu souborů ke zpracování
-        input_files = self._get_input_files(config.file_pattern)
+        # Průběžný výčet souborů - zpracování začne hned prvním souborem
+        input_files = self._get_input_files(config.file_pattern, config.file_order)
         
         # Omezení počtu souborů podle velikosti dávky
         if config.max_files and config.max_files > 0:
-            input_files = input_files[:config.max_files]
+            input_files = islice(input_files, config.max_files)
         
         # Inicializace statistik
         stats = {
-            "total_files": len(input_files),
+            "total_files": 0,
             "processed_files": 0,
             "successful_files": 0,
             "failed_files": 0,
+            "quarantined_files": 0,
+            "timed_out_files": 0,
+            "retried_attempts": 0,
+            "batch_deadline_exceeded": False,
             "total_entities_detected": 0,
             "entities_by_type": {},
             "start_time": datetime.now().isoformat(),
@@ -103,57 +204,91 @@ class BatchProcessor:
             "processing_time_ms": 0,
         }
         
+        # Snímek statistik pseudonymizace, aby se do dávky započítal jen její podíl
+        pseudonym_store = getattr(self.presidio_service, "pseudonym_store", None)
+        pseudonym_stats_start = pseudonym_store.get_stats() if pseudonym_store else None
+        
+        # Ve shardovém režimu jde výstup celé dávky do shardů jednoho běhu
+        if self.output_mode == "shards":
+            self._shard_writer = ShardWriter(self.output_dir, max_shard_bytes=self.max_shard_bytes)
+        
+        # Limit na dokument vynucuje watchdog; po limitu dávky se nové soubory
+        # už nezačínají (zůstanou ve vstupním adresáři pro další běh)
+        timeout = config.timeout_seconds or None
+        batch_deadline = start_time + config.batch_timeout_seconds if config.batch_timeout_seconds else None
+        
+        # Opakované pokusy čekají v haldě podle času, kdy mají proběhnout;
+        # mezitím se zpracovávají další soubory dávky
+        retries: List[tuple] = []
+        sequence = count()
+        
+        workers = config.workers if config.parallel_processing else 1
+        if workers > 1 and self.output_mode != "files":
+            logger.warning("Parallel batch processing requires the 'files' output mode, processing sequentially")
+            workers = 1
+        
+        # Soubory, které při koordinaci uzlů zpracovává jiný uzel
+        contested: List[FileEntry] = []
+        
+        if workers > 1:
+            # Paralelní dávka podle plánu z velikostí souborů (potřebuje celý výčet);
+            # při koordinaci uzlů se soubory převezmou po kolech, aby zbyly i ostatním
+            entries = list(input_files)
+            round_size = self.LEASE_ROUND_FILES if self.lease_manager else max(len(entries), 1)
+            for offset in range(0, len(entries), round_size):
+                if batch_deadline and time.time() >= batch_deadline:
+                    stats["batch_deadline_exceeded"] = True
+                    break
+                claimed = self._claim_entries(entries[offset:offset + round_size], contested)
+                self._process_scheduled(
+                    claimed, workers, config.unit_tokens, timeout, batch_deadline, retries, sequence, stats
+                )
+            input_files = iter(())
+        
         # Zpracování souborů v dávkách
-        for i, file_path in enumerate(input_files):
-            logger.info(f"Processing file {i+1}/{len(input_files)}: {file_path}")
+        for i, entry in enumerate(input_files):
+            if batch_deadline and time.time() >= batch_deadline:
+                stats["batch_deadline_exceeded"] = True
+                logger.warning(f"Batch deadline of {config.batch_timeout_seconds} s exceeded, stopping batch")
+                break
+            if not self._claim_entries([entry], contested):
+                continue
+            self._run_due_retries(retries, sequence, stats, timeout, wait=False)
+            stats["total_files"] += 1
+            logger.info(f"Processing file {i+1}: {entry.path}")
             
-            try:
-                # Načtení dokumentu
-                document = self._load_document(file_path)
-                
-                # Anonymizace dokumentu
-                anonymized_document = self._process_document_with_retry(document)
-                
-                # Uložení anonymizovaného dokumentu
-                output_path = self._save_anonymized_document(anonymized_document)
-                
-                # Aktualizace statistik
-                stats["processed_files"] += 1
-                stats["successful_files"] += 1
-                stats["total_entities_detected"] += len(anonymized_document.entities)
-                
-                # Aktualizace počtu entit podle typu
-                for entity in anonymized_document.entities:
-                    entity_type = entity.original_entity.entity_type
-                    if entity_type in stats["entities_by_type"]:
-                        stats["entities_by_type"][entity_type] += 1
-                    else:
-                        stats["entities_by_type"][entity_type] = 1
-                
-                # Vytvoření auditního záznamu
-                self._create_audit_record(document, anonymized_document, True)
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
-                
-                # Přesun souboru do adresáře s chybami
-                self._move_to_error_dir(file_path)
-                
-                # Aktualizace statistik
-                stats["processed_files"] += 1
-                stats["failed_files"] += 1
-                
-                # Vytvoření auditního záznamu pro chybu (bez document objektu)
-                try:
-                    doc = self._load_document(file_path)
-                    self._create_audit_record(doc, None, False, str(e))
-                except:
-                    self._create_audit_record(None, None, False, str(e))
+            result = self.process_file(entry.path, entry, timeout=timeout)
+            self._apply_file_result(result, entry, 1, retries, sequence, stats)
+        
+        # Dokončení zbývajících opakovaných pokusů - teprve teď se čeká
+        self._run_due_retries(retries, sequence, stats, timeout, wait=True, deadline=batch_deadline)
+        
+        # Soubory jiných uzlů dokončí jejich uzel, nebo po jeho výpadku tento
+        if contested:
+            self._process_contested(contested, timeout, batch_deadline, retries, sequence, stats)
         
         # Dokončení statistik
         end_time = time.time()
         stats["end_time"] = datetime.now().isoformat()
         stats["processing_time_ms"] = int((end_time - start_time) * 1000)
+        if pseudonym_store:
+            stats["pseudonymization"] = pseudonym_store.get_stats(since=pseudonym_stats_start)
+        if self.reidentification_vault:
+            self.reidentification_vault.flush()
+            stats["reidentification_vault"] = self.reidentification_vault.get_stats()
+        self.audit_log.flush()
+        stats["audit_log"] = self.audit_log.get_stats()
+        stats["watchdog"] = self.watchdog.get_stats()
+        if self._shard_writer:
+            manifest_path = self._shard_writer.close()
+            stats["shards"] = {**self._shard_writer.get_stats(), "manifest": manifest_path}
+            self._shard_writer = None
+        if self.lease_manager:
+            # Nedokončené soubory (limit dávky) se uvolní pro ostatní uzly a další běh
+            self.lease_manager.release_all()
+            stats["coordination"] = self.lease_manager.get_stats()
+            self.lease_manager.write_node_stats(stats)
+            stats["run_summary"] = self.lease_manager.merge_run_summary()
         
         # Uložení souhrnných statistik
         self._save_batch_stats(stats)
@@ -161,25 +296,845 @@ class BatchProcessor:
         logger.info(f"Batch processing completed: {stats['successful_files']} successful, {stats['failed_files']} failed")
         return stats
     
-    def _get_input_files(self, file_pattern: str = "*.txt") -> List[str]:
+    def _lease_key(self, entry: FileEntry) -> str:
+        """Vrátí klíč lease souboru - cestu relativně ke vstupnímu adresáři (shodnou na všech uzlech)."""
+        return os.path.relpath(entry.path, self.input_dir)
+    
+    def _claim_entries(self, entries: List[FileEntry], contested: List[FileEntry]) -> List[FileEntry]:
         """
-        Získá seznam souborů ke zpracování.
+        Převezme soubory ke zpracování tímto uzlem.
+        
+        Args:
+            entries: Soubory k převzetí
+            contested: Seznam, do kterého se přidají soubory držené jinými uzly
+            
+        Returns:
+            Soubory, které uzel převzal (bez koordinace všechny)
+        """
+        if not self.lease_manager:
+            return entries
+        claimed = []
+        for entry in entries:
+            status = self.lease_manager.claim(self._lease_key(entry))
+            if status == CLAIMED:
+                claimed.append(entry)
+            elif status == HELD:
+                contested.append(entry)
+        return claimed
+    
+    def _process_contested(
+        self,
+        contested: List[FileEntry],
+        timeout: Optional[float],
+        deadline: Optional[float],
+        retries: List[tuple],
+        sequence: Iterator[int],
+        stats: Dict,
+    ) -> None:
+        """
+        Počká na soubory zpracovávané jinými uzly a převezme ty, jejichž lease vypršel.
+        
+        Args:
+            contested: Soubory držené jinými uzly
+            timeout: Časový limit zpracování dokumentu v sekundách
+            deadline: Čas konce dávky (time.time()), None = bez limitu
+            retries: Halda naplánovaných pokusů
+            sequence: Čítač pro stabilní pořadí v haldě
+            stats: Statistiky dávky
+        """
+        while contested:
+            if deadline and time.time() >= deadline:
+                stats["batch_deadline_exceeded"] = True
+                break
+            pending: List[FileEntry] = []
+            for entry in self._claim_entries(contested, pending):
+                logger.info(f"Processing file {entry.path} taken over from another node")
+                stats["total_files"] += 1
+                result = self.process_file(entry.path, entry, timeout=timeout)
+                self._apply_file_result(result, entry, 1, retries, sequence, stats)
+            self._run_due_retries(retries, sequence, stats, timeout, wait=True, deadline=deadline)
+            contested = pending
+            if contested:
+                time.sleep(self.lease_manager.heartbeat_interval)
+    
+    def _process_scheduled(
+        self,
+        entries: List[FileEntry],
+        workers: int,
+        unit_tokens: int,
+        timeout: Optional[float],
+        deadline: Optional[float],
+        retries: List[tuple],
+        sequence: Iterator[int],
+        stats: Dict,
+    ) -> None:
+        """
+        Zpracuje soubory dávky paralelně podle plánu z jejich velikostí.
+        
+        Jednotky se předávají workerům od nejdražší (viz `BatchScheduler`).
+        Části rozděleného souboru se po dokončení spojí a soubor se uloží
+        v rodičovském procesu. Workery poolu nemohou spouštět další procesy,
+        limit na dokument proto hlídá rodič: jednotka dostane limit za každý
+        svůj soubor a rozběhne se jich nejvýše tolik, kolik je workerů. Uvízlý
+        worker (např. katastrofický backtracking regulárního výrazu) nejde
+        z poolu ukončit samostatně, a tak se ukončí celý pool a nastartuje nový;
+        přerušené jednotky se v něm zopakují a soubory jednotky, která limit
+        nestihla nebo skončila chybou, se po paralelní fázi zpracují v rodiči
+        s limitem ve workeru watchdogu. Workery poolu se recyklují po počtu dokumentů z
+        `worker_lifecycle`; limit dávky platí.
+        
+        Args:
+            entries: Soubory dávky
+            workers: Počet paralelních procesů
+            unit_tokens: Rozpočet tokenů pracovní jednotky
+            timeout: Časový limit zpracování dokumentu v sekundách (None = document_timeout)
+            deadline: Čas konce dávky (time.time()), None = bez limitu
+            retries: Halda naplánovaných pokusů
+            sequence: Čítač pro stabilní pořadí v haldě
+            stats: Statistiky dávky
+        """
+        plan = BatchScheduler(workers, unit_tokens).plan(entries)
+        if not plan.units:
+            return
+        
+        # Záznamy v trezoru se zapíší před forkem, aby se ve workerech neduplikovaly
+        if self.reidentification_vault:
+            self.reidentification_vault.flush()
+        _batch_worker_state.clear()
+        _batch_worker_state.update({"processor": self, "deadline": deadline})
+        
+        timeout = timeout if timeout is not None else self.document_timeout
+        pool_size = min(workers, len(plan.units))
+        # Recyklace po počtu dokumentů: pool po daném počtu jednotek nahradí
+        # worker novým forkem rodiče, který má modely zahřáté
+        max_tasks = None
+        if self.worker_lifecycle.max_documents:
+            documents = sum(len(unit.entries) for unit in plan.units)
+            max_tasks = max(1, self.worker_lifecycle.max_documents * len(plan.units) // documents)
+        
+        parallel_start = time.monotonic()
+        busy_seconds = 0.0
+        pieces: Dict[str, List] = {}
+        pending = deque(plan.units)
+        # Rozběhnuté jednotky: klíč -> (jednotka, čas vypršení limitu)
+        running: Dict[int, tuple] = {}
+        finished: queue.Queue = queue.Queue()
+        task_keys = count()
+        # Soubory jednotek, které nestihly limit nebo selhaly - zpracují se v rodiči
+        fallback: Dict[str, FileEntry] = {}
+        timed_out_units = 0
+        failed_units = 0
+        pool = multiprocessing.get_context("fork").Pool(pool_size, maxtasksperchild=max_tasks)
+        try:
+            while pending or running:
+                # Jednotek běží nejvýše tolik, kolik je workerů, takže každá
+                # začne hned po odeslání a její limit se počítá od té chvíle
+                while pending and len(running) < pool_size:
+                    unit = pending.popleft()
+                    if unit.is_split and unit.entries[0].path in fallback:
+                        continue
+                    key = next(task_keys)
+                    expires_at = time.monotonic() + timeout * len(unit.entries) if timeout else None
+                    running[key] = (unit, expires_at)
+                    pool.apply_async(
+                        _process_batch_unit,
+                        (unit,),
+                        callback=lambda result, key=key: finished.put((key, result, None)),
+                        error_callback=lambda error, key=key: finished.put((key, None, error)),
+                    )
+                
+                expirations = [expires_at for _, expires_at in running.values() if expires_at]
+                wait = max(0.0, min(expirations) - time.monotonic()) if expirations else None
+                try:
+                    key, unit_result, error = finished.get(timeout=wait)
+                except queue.Empty:
+                    now = time.monotonic()
+                    # Uvízlý worker nejde ukončit samostatně - ukončí se celý pool
+                    pool.terminate()
+                    pool.join()
+                    for unit, expires_at in running.values():
+                        present = self._present_entries(unit, stats)
+                        if expires_at and expires_at <= now:
+                            timed_out_units += 1
+                            logger.warning(
+                                f"Work unit with {len(unit.entries)} file(s) exceeded its "
+                                f"{timeout * len(unit.entries):g} s limit, pool restarted"
+                            )
+                            for entry in present:
+                                fallback[entry.path] = entry
+                                pieces.pop(entry.path, None)
+                        elif present:
+                            pending.appendleft(WorkUnit(present, unit.tokens, unit.part, unit.parts))
+                    running.clear()
+                    pool = multiprocessing.get_context("fork").Pool(pool_size, maxtasksperchild=max_tasks)
+                    continue
+                
+                if key not in running:
+                    # Výsledek jednotky z ukončeného poolu
+                    continue
+                unit, _ = running.pop(key)
+                if error is not None:
+                    # Chyba mimo zpracování souborů (např. zápis auditu) neruší dávku,
+                    # soubory jednotky se zpracují v rodiči a dostanou vlastní výsledek
+                    failed_units += 1
+                    logger.error(
+                        f"Work unit with {len(unit.entries)} file(s) failed, "
+                        f"processing its files sequentially: {str(error)}"
+                    )
+                    for entry in self._present_entries(unit, stats):
+                        fallback[entry.path] = entry
+                        pieces.pop(entry.path, None)
+                    continue
+                busy_seconds += unit_result["busy_seconds"]
+                for entry, result in unit_result["files"]:
+                    if result is None:
+                        stats["batch_deadline_exceeded"] = True
+                        continue
+                    stats["total_files"] += 1
+                    self._apply_file_result(result, entry, 1, retries, sequence, stats)
+                
+                for entry, part, parts, piece in unit_result["pieces"]:
+                    if entry.path in fallback:
+                        continue
+                    collected = pieces.setdefault(entry.path, [None] * parts)
+                    collected[part] = piece
+                    if any(item is None for item in collected):
+                        continue
+                    del pieces[entry.path]
+                    if any(status == "skipped" for status, _, _ in collected):
+                        # Soubor zůstává ve vstupním adresáři pro další běh
+                        stats["batch_deadline_exceeded"] = True
+                        continue
+                    stats["total_files"] += 1
+                    result = self.process_file(entry.path, entry, anonymize=self._merge_parts(collected))
+                    self._apply_file_result(result, entry, 1, retries, sequence, stats)
+        except BaseException:
+            # Na rozběhnuté (třeba uvízlé) jednotky se při chybě nečeká
+            pool.terminate()
+            raise
+        finally:
+            pool.close()
+            pool.join()
+            _batch_worker_state.clear()
+        
+        # Soubory uvízlých a selhaných jednotek se zpracují po jednom s limitem ve watchdogu
+        for entry in fallback.values():
+            if deadline and time.time() >= deadline:
+                stats["batch_deadline_exceeded"] = True
+                break
+            stats["total_files"] += 1
+            result = self.process_file(entry.path, entry, timeout=timeout)
+            self._apply_file_result(result, entry, 1, retries, sequence, stats)
+        
+        # Při převzetí po kolech se plány a časy kol sčítají
+        scheduling = {
+            **plan.stats,
+            "timed_out_units": timed_out_units,
+            "failed_units": failed_units,
+            "busy_seconds": busy_seconds,
+            "wall_seconds": time.monotonic() - parallel_start,
+        }
+        for key, value in stats.get("scheduling", {}).items():
+            if key in ("units", "estimated_tokens", "split_files", "packed_files", "makespan_bound_tokens",
+                       "timed_out_units", "failed_units", "busy_seconds", "wall_seconds"):
+                scheduling[key] += value
+        scheduling["core_utilization"] = core_utilization(scheduling["busy_seconds"], scheduling["wall_seconds"], workers)
+        scheduling["busy_seconds"] = round(scheduling["busy_seconds"], 3)
+        scheduling["wall_seconds"] = round(scheduling["wall_seconds"], 3)
+        stats["scheduling"] = scheduling
+        logger.info(f"Parallel batch core utilization {stats['scheduling']['core_utilization']:.0%}")
+    
+    def _present_entries(self, unit: WorkUnit, stats: Dict) -> List[FileEntry]:
+        """
+        Vrátí soubory přerušené jednotky, které jsou stále ve vstupním adresáři.
+        
+        Soubor, který už ukončený worker přesunul do adresáře s chybami,
+        se započítá jako neúspěšný (jeho auditní záznam s workerem zanikl).
+        
+        Args:
+            unit: Jednotka přerušená ukončením poolu
+            stats: Statistiky dávky
+            
+        Returns:
+            Soubory jednotky ke zpracování
+        """
+        present = []
+        for entry in unit.entries:
+            if unit.is_split or os.path.exists(entry.path):
+                present.append(entry)
+                continue
+            logger.warning(f"File {entry.path} was moved to the error directory by a terminated worker")
+            stats["total_files"] += 1
+            stats["processed_files"] += 1
+            stats["failed_files"] += 1
+            if self.lease_manager:
+                self.lease_manager.complete(self._lease_key(entry))
+        return present
+    
+    def _process_unit(self, unit: WorkUnit, deadline: Optional[float]) -> Dict:
+        """
+        Zpracuje pracovní jednotku paralelní dávky (ve worker procesu).
+        
+        Args:
+            unit: Pracovní jednotka
+            deadline: Čas konce dávky (time.time()); pozdější soubory se přeskočí
+            
+        Returns:
+            Výsledky celých souborů, výsledky částí a doba zpracování jednotky
+        """
+        start_time = time.monotonic()
+        files, pieces = [], []
+        for entry in unit.entries:
+            if deadline and time.time() >= deadline:
+                if unit.is_split:
+                    pieces.append((entry, unit.part, unit.parts, ("skipped", None, 0)))
+                else:
+                    files.append((entry, None))
+                continue
+            if unit.is_split:
+                pieces.append((entry, unit.part, unit.parts, self._anonymize_part(entry, unit.part, unit.parts)))
+            else:
+                # Limit na dokument hlídá rodič (viz `_process_scheduled`)
+                files.append((entry, self.process_file(entry.path, entry, timeout=0)))
+        
+        # Záznamy z workeru se do trezoru a auditu zapíší dřív, než proces skončí
+        if self.reidentification_vault:
+            self.reidentification_vault.flush()
+        self.audit_log.flush()
+        return {"files": files, "pieces": pieces, "busy_seconds": time.monotonic() - start_time}
+    
+    def _anonymize_part(self, entry: FileEntry, part: int, parts: int) -> tuple:
+        """
+        Anonymizuje jednu část rozděleného souboru.
+        
+        Args:
+            entry: Rozdělovaný soubor
+            part: Pořadí části (od 0)
+            parts: Počet částí
+            
+        Returns:
+            Tuple (stav, anonymizovaná část nebo výjimka, pozice začátku části)
+        """
+        try:
+            document = self._load_document(entry.path, entry)
+            if self.quarantine.contains(content_hash(document.content)):
+                raise QuarantinedDocumentError(f"Document {document.id} is quarantined")
+            piece, offset = split_document(document, part, parts)
+            return "ok", self.presidio_service.process_document(piece), offset
+        except Exception as e:
+            return "error", transferable_error(e), 0
+    
+    @staticmethod
+    def _merge_parts(collected: List[tuple]) -> Callable[[Document], AnonymizedDocument]:
+        """Vrátí funkci, která z částí sestaví anonymizovaný dokument (nebo vyvolá chybu části)."""
+        def merge(document: Document) -> AnonymizedDocument:
+            for status, payload, _ in collected:
+                if status == "error":
+                    raise payload
+            return merge_documents(document, [(payload, offset) for _, payload, offset in collected])
+        return merge
+    
+    def _apply_file_result(
+        self,
+        result: Dict,
+        entry: FileEntry,
+        attempt: int,
+        retries: List[tuple],
+        sequence: Iterator[int],
+        stats: Dict,
+    ) -> None:
+        """
+        Započítá výsledek zpracování souboru, případně naplánuje další pokus.
+        
+        Args:
+            result: Výsledek z `process_file`
+            entry: Zpracovaný soubor
+            attempt: Pořadí pokusu (od 1)
+            retries: Halda naplánovaných pokusů (čas, pořadí, soubor, pokus)
+            sequence: Čítač pro stabilní pořadí v haldě
+            stats: Statistiky dávky
+        """
+        if result.get("retry"):
+            stats["retried_attempts"] += 1
+            heapq.heappush(retries, (time.monotonic() + result["delay"], next(sequence), entry, attempt + 1))
+            return
+        
+        stats["processed_files"] += 1
+        if result["success"]:
+            stats["successful_files"] += 1
+            stats["total_entities_detected"] += result["entities_detected"]
+            for entity_type, entity_count in result["entities_by_type"].items():
+                stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + entity_count
+        else:
+            stats["failed_files"] += 1
+            if result.get("quarantined"):
+                stats["quarantined_files"] += 1
+            if result.get("timed_out"):
+                stats["timed_out_files"] += 1
+        if self.lease_manager:
+            self.lease_manager.complete(self._lease_key(entry))
+    
+    def _run_due_retries(
+        self,
+        retries: List[tuple],
+        sequence: Iterator[int],
+        stats: Dict,
+        timeout: Optional[float],
+        wait: bool,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """
+        Provede naplánované pokusy, jejichž čas nastal.
+        
+        Args:
+            retries: Halda naplánovaných pokusů
+            sequence: Čítač pro stabilní pořadí v haldě
+            stats: Statistiky dávky
+            timeout: Časový limit zpracování dokumentu v sekundách
+            wait: Čekat i na pokusy naplánované do budoucna (konec dávky)
+            deadline: Čas konce dávky (time.time()); pozdější pokusy se vzdají
+        """
+        while retries:
+            due_time, _, entry, attempt = retries[0]
+            delay = due_time - time.monotonic()
+            if delay > 0:
+                if not wait:
+                    return
+                if deadline and time.time() + delay >= deadline:
+                    # Soubor zůstává ve vstupním adresáři pro další běh
+                    stats["batch_deadline_exceeded"] = True
+                    logger.warning(f"Batch deadline exceeded, {len(retries)} retries left for the next run")
+                    return
+                time.sleep(delay)
+            heapq.heappop(retries)
+            logger.info(f"Retrying file {entry.path} (attempt {attempt}/{self.retry_policy.max_attempts})")
+            result = self.process_file(entry.path, entry, attempt, timeout=timeout)
+            self._apply_file_result(result, entry, attempt, retries, sequence, stats)
+    
+    def process_file(
+        self,
+        file_path: str,
+        entry: Optional[FileEntry] = None,
+        attempt: int = 1,
+        timeout: Optional[float] = None,
+        anonymize: Optional[Callable[[Document], AnonymizedDocument]] = None,
+    ) -> Dict:
+        """
+        Provede jeden pokus o zpracování vstupního souboru: načtení,
+        anonymizace, uložení a audit.
+        
+        Přechodná chyba se neopakuje hned - výsledek obsahuje `retry`
+        a prodlevu `delay` a soubor zůstává na místě, takže další pokus
+        naplánuje volající. Při definitivní chybě se soubor přesune do adresáře
+        s chybami; dokument s deterministickou chybou se navíc zařadí do
+        karantény a příště se už nezpracovává. Úspěšně zpracovaný soubor zůstává
+        na místě (o jeho dalším osudu rozhoduje volající).
+        
+        S časovým limitem běží analýza ve workeru watchdogu; dokument, který limit
+        nestihne, skončí se stavem `timed_out` (a jako deterministická chyba
+        v karanténě).
+        
+        Args:
+            file_path: Cesta k souboru
+            entry: Údaje o souboru z výčtu (None = zjistí se jedním voláním stat)
+            attempt: Pořadí pokusu (od 1)
+            timeout: Časový limit analýzy v sekundách (None = document_timeout)
+            anonymize: Náhrada anonymizace dokumentu (např. spojení již
+                anonymizovaných částí rozděleného souboru)
+            
+        Returns:
+            Výsledek zpracování (success, output_path, entities_detected,
+            entities_by_type; při chybě retry, delay, quarantined, timed_out,
+            error_path, error)
+        """
+        document = None
+        document_hash = None
+        try:
+            # Načtení dokumentu
+            document = self._load_document(file_path, entry)
+            
+            # Dokument v karanténě se nezpracovává
+            document_hash = content_hash(document.content)
+            if self.quarantine.contains(document_hash):
+                raise QuarantinedDocumentError(f"Document {document.id} is quarantined")
+            
+            # Anonymizace dokumentu (s limitem ve workeru watchdogu)
+            timeout = timeout if timeout is not None else self.document_timeout
+            if anonymize is not None:
+                anonymized_document = anonymize(document)
+            elif timeout:
+                anonymized_document = self.watchdog.process_document(document, timeout)
+            else:
+                anonymized_document = self.presidio_service.process_document(document)
+            
+            # Uložení anonymizovaného dokumentu
+            output_path = self._save_anonymized_document(anonymized_document)
+            
+            # Záznam do trezoru pro zpětnou identifikaci (zapisuje se po dávkách)
+            if self.reidentification_vault:
+                self.reidentification_vault.record_document(anonymized_document)
+            
+            # Vytvoření auditního záznamu
+            self._create_audit_record(document, anonymized_document, True)
+            
+        except Exception as e:
+            error_class = self.retry_policy.classify(e)
+            if self.retry_policy.should_retry(e, attempt):
+                delay = self.retry_policy.backoff(attempt)
+                logger.warning(
+                    f"Attempt {attempt}/{self.retry_policy.max_attempts} for {file_path} failed "
+                    f"({type(e).__name__}), retrying in {delay:.1f} s: {str(e)}"
+                )
+                return {"success": False, "retry": True, "delay": delay, "error": str(e)}
+            
+            logger.error(f"Error processing file {file_path}: {str(e)}")
+            timed_out = isinstance(e, DocumentTimeoutError)
+            details = {
+                "source_file": file_path,
+                "status": "timed_out" if timed_out else "failed",
+                "error_type": type(e).__name__,
+                "error_class": error_class,
+                "attempts": attempt,
+                "fingerprint": failure_fingerprint(e),
+            }
+            
+            # Deterministická chyba se při dalším běhu zopakuje - dokument do karantény
+            quarantined = isinstance(e, QuarantinedDocumentError)
+            if quarantined:
+                # Otisk původní chyby, kvůli které je dokument v karanténě
+                record = self.quarantine.get(document_hash) or {}
+                details["fingerprint"] = record.get("fingerprint")
+            elif error_class == "deterministic" and document_hash is not None:
+                details["fingerprint"] = self.quarantine.add(document_hash, document.id, e)
+                quarantined = True
+            details["quarantined"] = quarantined
+            
+            # Přesun souboru do adresáře s chybami
+            error_path = self._move_to_error_dir(file_path) if os.path.exists(file_path) else None
+            
+            # Auditní záznam chyby - soubor už je v adresáři s chybami,
+            # ID dokumentu je název souboru (viz _load_document)
+            self.audit_log.record(os.path.basename(file_path), False, error_message=str(e), details=details)
+            return {
+                "success": False,
+                "quarantined": quarantined,
+                "timed_out": timed_out,
+                "error_path": error_path,
+                "error": str(e),
+            }
+        
+        # Počty entit ze statistik dokumentu, bez procházení entit
+        document_stats = anonymized_document.statistics or {}
+        return {
+            "success": True,
+            "output_path": output_path,
+            "entities_detected": document_stats.get("total_entities_detected", len(anonymized_document.entities)),
+            "entities_by_type": document_stats.get("entities_by_type", {}),
+        }
+    
+    def process_jsonl(
+        self,
+        input_path: str,
+        output_path: Optional[str] = None,
+        workers: int = 1,
+        range_size: int = 1000,
+        text_field: str = "text",
+        id_field: str = "id",
+    ) -> Dict:
+        """
+        Zpracuje velký JSONL soubor (jeden dokument na řádek).
+        
+        Soubor se čte přes index pozic záznamů (`JsonlSource`), takže workery
+        zpracovávají disjunktní rozsahy záznamů bez sekvenčního čtení souboru.
+        Výstupem je JSONL se stejnými záznamy ve stejném pořadí, ve kterých je
+        text nahrazen anonymizovaným textem.
+        
+        Args:
+            input_path: Cesta ke vstupnímu JSONL souboru
+            output_path: Cesta k výstupnímu souboru (None = stejný název ve výstupním adresáři)
+            workers: Počet paralelních procesů
+            range_size: Počet záznamů v jednom rozsahu workeru
+            text_field: Pole záznamu s textem k anonymizaci
+            id_field: Pole záznamu s ID dokumentu
+            
+        Returns:
+            Statistiky o zpracování souboru
+        """
+        start_time = time.time()
+        output_path = output_path or os.path.join(self.output_dir, os.path.basename(input_path))
+        options = {"text_field": text_field, "id_field": id_field}
+        
+        stats = {
+            "input_file": input_path,
+            "output_file": output_path,
+            "total_records": 0,
+            "successful_records": 0,
+            "failed_records": 0,
+            "skipped_records": 0,
+            "total_entities_detected": 0,
+            "entities_by_type": {},
+            "workers": workers,
+            "ranges": 0,
+            "worker_processes": 0,
+            "worker_rss_bytes_max": 0,
+            "worker_rss_limit_exceeded": 0,
+            "start_time": datetime.now().isoformat(),
+            "end_time": None,
+            "processing_time_ms": 0,
+        }
+        
+        # Index se sestaví (a uloží) v rodičovském procesu, workery ho jen načtou
+        source = JsonlSource(input_path)
+        ranges = source.ranges(range_size)
+        stats["total_records"] = len(source)
+        stats["ranges"] = len(ranges)
+        
+        temporary_path = f"{output_path}.tmp"
+        worker_pids = set()
+        pool = None
+        try:
+            if workers > 1 and len(ranges) > 1:
+                # Záznamy v trezoru se zapíší před forkem, aby se ve workerech neduplikovaly
+                if self.reidentification_vault:
+                    self.reidentification_vault.flush()
+                _jsonl_worker_state.clear()
+                _jsonl_worker_state.update({"processor": self, "input_path": input_path, "options": options})
+                # Recyklace po počtu dokumentů: pool po daném počtu rozsahů nahradí
+                # worker novým forkem rodiče, který má modely zahřáté
+                max_tasks = None
+                if self.worker_lifecycle.max_documents:
+                    max_tasks = max(1, self.worker_lifecycle.max_documents // range_size)
+                pool = multiprocessing.get_context("fork").Pool(workers, maxtasksperchild=max_tasks)
+                results = pool.imap(_process_jsonl_range, ranges)
+            else:
+                results = (self._process_jsonl_range(source, start, stop, **options) for start, stop in ranges)
+            
+            # Výsledky rozsahů přichází v pořadí vstupu
+            with open(temporary_path, "wb") as f:
+                for output, range_stats in results:
+                    f.write(output)
+                    for key in ("successful_records", "failed_records", "skipped_records", "total_entities_detected"):
+                        stats[key] += range_stats[key]
+                    for entity_type, count in range_stats["entities_by_type"].items():
+                        stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + count
+                    if "worker_pid" in range_stats:
+                        self._record_worker_memory(stats, range_stats, worker_pids)
+            os.replace(temporary_path, output_path)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+                _jsonl_worker_state.clear()
+            source.close()
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        
+        stats["end_time"] = datetime.now().isoformat()
+        stats["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        if self.reidentification_vault:
+            self.reidentification_vault.flush()
+            stats["reidentification_vault"] = self.reidentification_vault.get_stats()
+        self._save_batch_stats(stats)
+        
+        logger.info(
+            f"JSONL processing completed: {stats['successful_records']} successful, "
+            f"{stats['failed_records']} failed, {stats['skipped_records']} skipped"
+        )
+        return stats
+    
+    def _record_worker_memory(self, stats: Dict, range_stats: Dict, worker_pids: set) -> None:
+        """
+        Započítá paměť workeru, který zpracoval rozsah JSONL.
+        
+        Pool neumí worker ukončit uprostřed práce bez ztráty rozsahu, limit RSS
+        se proto u procesů poolu jen hlídá; recyklují se po počtu dokumentů.
+        
+        Args:
+            stats: Statistiky zpracování souboru
+            range_stats: Statistiky rozsahu z workeru
+            worker_pids: PID dosud použitých workerů (doplní se)
+        """
+        worker_pids.add(range_stats["worker_pid"])
+        stats["worker_processes"] = len(worker_pids)
+        rss_bytes = range_stats["worker_rss_bytes"]
+        stats["worker_rss_bytes_max"] = max(stats["worker_rss_bytes_max"], rss_bytes)
+        max_rss_mb = self.worker_lifecycle.max_rss_mb
+        if max_rss_mb and rss_bytes > max_rss_mb * 1024 * 1024:
+            stats["worker_rss_limit_exceeded"] += 1
+            logger.warning(
+                f"JSONL worker {range_stats['worker_pid']} uses {rss_bytes / (1024 * 1024):.0f} MB "
+                f"(limit {max_rss_mb:g} MB), lower worker_lifecycle.max_documents"
+            )
+    
+    def _process_jsonl_range(
+        self, source: JsonlSource, start: int, stop: int, text_field: str = "text", id_field: str = "id"
+    ) -> tuple:
+        """
+        Anonymizuje rozsah záznamů JSONL.
+        
+        Args:
+            source: Vstupní zdroj
+            start: Pořadí prvního záznamu
+            stop: Pořadí za posledním záznamem
+            text_field: Pole záznamu s textem k anonymizaci
+            id_field: Pole záznamu s ID dokumentu
+            
+        Returns:
+            Tuple obsahující výstupní řádky (UTF-8) a statistiky rozsahu
+        """
+        stats = {
+            "successful_records": 0,
+            "failed_records": 0,
+            "skipped_records": 0,
+            "total_entities_detected": 0,
+            "entities_by_type": {},
+        }
+        lines = []
+        source_name = os.path.basename(source.path)
+        
+        for index in range(start, stop):
+            try:
+                record = source.read_record(index)
+            except ValueError as e:
+                logger.error(f"Invalid JSON record {index} in {source.path}: {str(e)}")
+                lines.append(json.dumps({"_record_index": index, "_error": "invalid JSON record"}))
+                self.audit_log.record(f"{source_name}:{index}", False, error_message="invalid JSON record")
+                stats["failed_records"] += 1
+                continue
+            
+            text = record.get(text_field) if isinstance(record, dict) else None
+            if not isinstance(text, str):
+                lines.append(json.dumps(record, ensure_ascii=False))
+                stats["skipped_records"] += 1
+                continue
+            
+            document_id = str(record.get(id_field, f"{source_name}:{index}"))
+            metadata = {"source_file": source.path, "record_index": index}
+            if record.get("language"):
+                metadata["language"] = record["language"]
+            
+            try:
+                anonymized_document = self._process_document_with_retry(Document(
+                    id=document_id,
+                    content=text,
+                    content_type=record.get("content_type", "text/plain"),
+                    metadata=metadata,
+                ))
+            except Exception as e:
+                logger.error(f"Error processing record {document_id}: {str(e)}")
+                self.audit_log.record(document_id, False, error_message=str(e), details={"record_index": index})
+                # Původní text se do výstupu nikdy nezapíše
+                lines.append(json.dumps({id_field: document_id, "_record_index": index, "_error": str(e)}, ensure_ascii=False))
+                stats["failed_records"] += 1
+                continue
+            
+            record[text_field] = anonymized_document.content
+            lines.append(json.dumps(record, ensure_ascii=False))
+            self._create_audit_record(None, anonymized_document, True)
+            if self.reidentification_vault:
+                self.reidentification_vault.record_document(anonymized_document)
+            
+            stats["successful_records"] += 1
+            document_stats = anonymized_document.statistics or {}
+            stats["total_entities_detected"] += document_stats.get("total_entities_detected", 0)
+            for entity_type, count in document_stats.get("entities_by_type", {}).items():
+                stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + count
+        
+        # Záznamy z workeru se do trezoru a auditu zapíší dřív, než proces skončí
+        if self.reidentification_vault:
+            self.reidentification_vault.flush()
+        self.audit_log.flush()
+        
+        output = ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+        return output, stats
+    
+    def process_tabular(
+        self,
+        file_pattern: str = "*.csv",
+        column_plans: Optional[Dict[str, Optional[List[str]]]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        output_format: Optional[str] = None,
+    ) -> Dict:
+        """
+        Zpracuje tabulkové soubory (CSV, Parquet) po blocích a po sloupcích.
         
         Args:
             file_pattern: Vzor pro filtrování souborů
+            column_plans: Explicitní plány sloupců (název -> typy entit)
+            chunk_size: Počet řádků jednoho bloku
+            output_format: Formát výstupu ("csv", "parquet"; None = jako vstup)
+            
+        Returns:
+            Statistiky o zpracování souborů
+        """
+        start_time = time.time()
+        processor = TabularProcessor(self.presidio_service, column_plans=column_plans, chunk_size=chunk_size)
+        input_files = self._get_input_files(file_pattern)
+        
+        stats = {
+            "total_files": 0,
+            "processed_files": 0,
+            "successful_files": 0,
+            "failed_files": 0,
+            "total_rows": 0,
+            "entities_by_type": {},
+            "files": [],
+            "start_time": datetime.now().isoformat(),
+            "end_time": None,
+            "processing_time_ms": 0,
+        }
+        
+        for entry in input_files:
+            file_path = entry.path
+            stats["total_files"] += 1
+            logger.info(f"Processing table: {file_path}")
+            stem, extension = os.path.splitext(os.path.basename(file_path))
+            if output_format:
+                extension = ".parquet" if output_format == "parquet" else ".csv"
+            output_path = os.path.join(self.output_dir, f"{stem}{extension}")
+            
+            try:
+                file_stats = processor.process_file(file_path, output_path)
+                stats["successful_files"] += 1
+                stats["total_rows"] += file_stats["rows"]
+                for entity_type, count in file_stats["entities_by_type"].items():
+                    stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + count
+                stats["files"].append(file_stats)
+            except Exception as e:
+                logger.error(f"Error processing table {file_path}: {str(e)}")
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                self._move_to_error_dir(file_path)
+                stats["failed_files"] += 1
+            stats["processed_files"] += 1
+        
+        stats["end_time"] = datetime.now().isoformat()
+        stats["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        self._save_batch_stats(stats)
+        
+        logger.info(f"Tabular processing completed: {stats['successful_files']} successful, {stats['failed_files']} failed")
+        return stats
+    
+    def _get_input_files(self, file_pattern: str = "*.txt", order: str = "none") -> Iterator[FileEntry]:
+        """
+        Průběžně vyjmenuje soubory ke zpracování.
+        
+        Args:
+            file_pattern: Vzor pro filtrování souborů (předpona `**/` = i podadresáře)
+            order: Pořadí souborů ("none", "name", "mtime")
             
         Returns:
-            Seznam cest k souborům
+            Iterátor nalezených souborů s údaji o velikosti a časech
         """
-        input_path = Path(self.input_dir)
-        return [str(f) for f in input_path.glob(file_pattern) if f.is_file()]
+        return iter(FileEnumerator(self.input_dir, file_pattern, order=order))
     
-    def _load_document(self, file_path: str) -> Document:
+    def _load_document(self, file_path: str, entry: Optional[FileEntry] = None) -> Document:
         """
         Načte dokument ze souboru.
         
         Args:
             file_path: Cesta k souboru
+            entry: Údaje o souboru z výčtu (None = zjistí se jedním voláním stat)
             
         Returns:
             Načtený dokument
@@ -189,6 +1144,10 @@ class BatchProcessor:
         with open(file_path, "r", encoding="utf-8") as f:
             content = f.read()
         
+        if entry is None:
+            stat = os.stat(file_path)
+            entry = FileEntry(file_path, file_name, stat.st_size, stat.st_ctime, stat.st_mtime)
+        
         # Určení typu obsahu podle přípony souboru
         content_type = "text/plain"
         if file_path.endswith(".json"):
@@ -205,9 +1164,9 @@ class BatchProcessor:
             content_type=content_type,
             metadata={
                 "source_file": file_path,
-                "file_size": os.path.getsize(file_path),
-                "created_at": datetime.fromtimestamp(os.path.getctime(file_path)).isoformat(),
-                "modified_at": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
+                "file_size": entry.size,
+                "created_at": datetime.fromtimestamp(entry.ctime).isoformat(),
+                "modified_at": datetime.fromtimestamp(entry.mtime).isoformat(),
             }
         )
         
@@ -215,7 +1174,11 @@ class BatchProcessor:
     
     def _process_document_with_retry(self, document: Document) -> AnonymizedDocument:
         """
-        Zpracuje dokument s možností opakování při chybě.
+        Zpracuje dokument s opakováním přechodných chyb podle politiky opakování.
+        
+        Deterministická chyba se neopakuje a dokument se zařadí do karantény.
+        Mezi pokusy se čeká přímo (používá se pro záznamy uvnitř jednoho rozsahu
+        JSONL, kde na výsledek čeká pořadí výstupu).
         
         Args:
             document: Dokument ke zpracování
@@ -224,22 +1187,29 @@ class BatchProcessor:
             Anonymizovaný dokument
             
         Raises:
-            Exception: Pokud se zpracování nezdaří ani po maximálním počtu pokusů
+            QuarantinedDocumentError: Pokud je dokument v karanténě
+            Exception: Pokud se zpracování nezdaří ani po posledním povoleném pokusu
         """
-        last_exception = None
+        document_hash = content_hash(document.content)
+        if self.quarantine.contains(document_hash):
+            raise QuarantinedDocumentError(f"Document {document.id} is quarantined")
         
-        for attempt in range(self.max_retries):
+        attempt = 1
+        while True:
             try:
                 return self.presidio_service.process_document(document)
             except Exception as e:
-                last_exception = e
-                logger.warning(f"Attempt {attempt+1}/{self.max_retries} failed: {str(e)}")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-        
-        # Pokud se dostaneme sem, všechny pokusy selhaly
-        raise last_exception or Exception("Failed to process document after multiple attempts")
+                if not self.retry_policy.should_retry(e, attempt):
+                    if self.retry_policy.classify(e) == "deterministic":
+                        self.quarantine.add(document_hash, document.id, e)
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                logger.warning(
+                    f"Attempt {attempt}/{self.retry_policy.max_attempts} failed ({type(e).__name__}), "
+                    f"retrying in {delay:.1f} s: {str(e)}"
+                )
+                time.sleep(delay)
+                attempt += 1
     
     def _save_anonymized_document(self, document: AnonymizedDocument) -> str:
         """
@@ -249,14 +1219,19 @@ class BatchProcessor:
             document: Anonymizovaný dokument k uložení
             
         Returns:
-            Cesta k uloženému souboru
+            Cesta k uloženému souboru (ve shardovém režimu umístění v shardu)
         """
+        if self._shard_writer:
+            return self._shard_writer.write(document)
+        
         # Vytvoření názvu výstupního souboru
         document_id = document.original_document_id or "unknown"
         output_file = os.path.join(self.output_dir, document_id)
         
-        # Uložení obsahu dokumentu
-        with open(output_file, "w", encoding="utf-8") as f:
+        # Uložení obsahu dokumentu přes dočasný soubor, aby konzumenti výstupního
+        # adresáře nikdy neviděli rozepsaný dokument
+        temporary_file = f"{output_file}.tmp"
+        with open(temporary_file, "w", encoding="utf-8") as f:
             f.write(document.content)
         
         # Uložení metadat a statistik do doprovodného JSON souboru
@@ -269,9 +1244,13 @@ class BatchProcessor:
             "anonymized_at": datetime.now().isoformat(),
         }
         
-        with open(metadata_file, "w", encoding="utf-8") as f:
+        with open(f"{metadata_file}.tmp", "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
         
+        # Metadata se zveřejní dřív než obsah - objeví-li se dokument, je kompletní
+        os.replace(f"{metadata_file}.tmp", metadata_file)
+        os.replace(temporary_file, output_file)
+        
         return output_file
     
     def _move_to_error_dir(self, file_path: str) -> str:
@@ -306,49 +1285,36 @@ class BatchProcessor:
         anonymized_document: Optional[AnonymizedDocument],
         success: bool,
         error_message: Optional[str] = None,
-    ) -> str:
+    ) -> None:
         """
-        Vytvoří auditní záznam o zpracování dokumentu.
+        Zařadí auditní záznam o zpracování dokumentu do auditního logu.
+        
+        Záznam se jen vloží do fronty, zápis po dávkách obstarává AuditLog.
         
         Args:
             original_document: Původní dokument
             anonymized_document: Anonymizovaný dokument
             success: Příznak úspěšného zpracování
             error_message: Chybová zpráva v případě neúspěchu
-            
-        Returns:
-            Cesta k auditnímu záznamu
         """
-        # Vytvoření základních informací pro audit
-        audit_data = {
-            "timestamp": datetime.now().isoformat(),
-            "success": success,
-            "document_id": original_document.id if original_document else None,
-        }
+        if original_document is not None:
+            document_id = original_document.id
+        elif anonymized_document is not None:
+            document_id = anonymized_document.original_document_id
+        else:
+            document_id = None
         
-        # Přidání informací o zpracování
         if success and anonymized_document:
             stats = anonymized_document.statistics or {}
-            audit_data.update({
-                "entities_detected": len(anonymized_document.entities),
-                "entities_by_type": stats.get("entities_by_type", {}),
-                "processing_time_ms": stats.get("processing_time_ms", 0),
-            })
-        elif error_message:
-            audit_data["error_message"] = error_message
-        
-        # Vytvoření názvu auditního souboru
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        document_id = original_document.id if original_document else "unknown"
-        audit_file = os.path.join(
-            self.audit_dir, f"audit_{document_id}_{timestamp}.json"
-        )
-        
-        # Uložení auditního záznamu
-        with open(audit_file, "w", encoding="utf-8") as f:
-            json.dump(audit_data, f, indent=2, ensure_ascii=False)
-        
-        return audit_file
+            self.audit_log.record(
+                document_id,
+                True,
+                entities_detected=stats.get("total_entities_detected", len(anonymized_document.entities)),
+                processing_time_ms=stats.get("processing_time_ms", 0),
+                details={"entities_by_type": stats.get("entities_by_type", {})},
+            )
+        else:
+            self.audit_log.record(document_id, success, error_message=error_message)
     
     def _save_batch_stats(self, stats: Dict) -> str:
         """
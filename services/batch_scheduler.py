@@ -0,0 +1,292 @@
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from models.document import AnonymizedDocument, AnonymizedEntity, DetectedEntity, Document
+from services.file_enumerator import FileEntry
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Odhad velikosti tokenu českého textu v UTF-8 (slovo s mezerou a diakritikou)
+BYTES_PER_TOKEN = 6
+
+# Výchozí rozpočet tokenů jedné pracovní jednotky
+DEFAULT_UNIT_TOKENS = 50_000
+
+# Menší jednotky už nevyváží režii předání práce workeru
+MIN_UNIT_TOKENS = 2_000
+
+# Kolik jednotek má připadnout na worker, aby se konec dávky dal vyrovnat
+UNITS_PER_WORKER = 4
+
+# Dokumenty s těmito příponami se analyzují po uzlech struktury, ne jako
+# souvislý text - nerozdělují se
+UNSPLITTABLE_SUFFIXES = (".json", ".xml", ".html")
+
+# Rozsah hledání místa řezu kolem ideální pozice (podíl délky části)
+_CUT_WINDOW = 0.25
+
+
+@dataclass
+class WorkUnit:
+    """Pracovní jednotka workeru: několik malých souborů nebo jedna část velkého."""
+    entries: List[FileEntry]
+    tokens: int
+    part: int = 0
+    parts: int = 1
+
+    @property
+    def is_split(self) -> bool:
+        """Zda jednotka zpracovává jen část rozděleného souboru."""
+        return self.parts > 1
+
+
+@dataclass
+class SchedulePlan:
+    """Naplánované jednotky dávky od nejdražší a souhrn plánu."""
+    units: List[WorkUnit]
+    stats: Dict = field(default_factory=dict)
+
+
+def estimate_tokens(size_bytes: int) -> int:
+    """
+    Odhadne počet tokenů souboru podle jeho velikosti.
+
+    Args:
+        size_bytes: Velikost souboru v bajtech
+
+    Returns:
+        Odhad počtu tokenů (nejméně 1)
+    """
+    return max(1, size_bytes // BYTES_PER_TOKEN)
+
+
+class BatchScheduler:
+    """
+    Plánování dávky pro paralelní zpracování podle velikosti souborů.
+
+    Cílem je minimální doba dávky (makespan). Jednotky se workerům předávají
+    od nejdražší (longest processing time first), takže velké dokumenty
+    nezačínají až na konci dávky, kdy by ostatní workery stály. Malé soubory
+    se balí do jednotek do rozpočtu tokenů, aby režie předání práce
+    nepřevážila; dokument nad rozpočet se rozdělí na části zpracované
+    různými workery. Rozpočet se u malých dávek zmenšuje, aby na každý
+    worker připadlo několik jednotek.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        unit_tokens: int = DEFAULT_UNIT_TOKENS,
+        min_unit_tokens: int = MIN_UNIT_TOKENS,
+    ):
+        """
+        Inicializace plánovače.
+
+        Args:
+            workers: Počet paralelních workerů
+            unit_tokens: Maximální rozpočet tokenů jedné jednotky
+            min_unit_tokens: Nejmenší rozpočet po zmenšení pro malou dávku
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if unit_tokens < 1:
+            raise ValueError("unit_tokens must be at least 1")
+        self.workers = workers
+        self.unit_tokens = unit_tokens
+        self.min_unit_tokens = min(min_unit_tokens, unit_tokens)
+
+    def plan(self, entries: Sequence[FileEntry]) -> SchedulePlan:
+        """
+        Rozdělí soubory dávky do pracovních jednotek.
+
+        Args:
+            entries: Soubory dávky (s velikostí z výčtu adresáře)
+
+        Returns:
+            Plán s jednotkami seřazenými od nejdražší
+        """
+        costs = [(estimate_tokens(entry.size), entry) for entry in entries]
+        total_tokens = sum(tokens for tokens, _ in costs)
+        budget = max(self.min_unit_tokens, min(self.unit_tokens, total_tokens // (self.workers * UNITS_PER_WORKER)))
+        units: List[WorkUnit] = []
+
+        small: List[Tuple[int, FileEntry]] = []
+        split_files = 0
+        for tokens, entry in costs:
+            if tokens > budget and not entry.name.lower().endswith(UNSPLITTABLE_SUFFIXES):
+                parts = math.ceil(tokens / budget)
+                units.extend(WorkUnit([entry], math.ceil(tokens / parts), part, parts) for part in range(parts))
+                split_files += 1
+            else:
+                small.append((tokens, entry))
+
+        # Balení od největších: soubor se přidá do otevřené jednotky, dokud se vejde
+        small.sort(key=lambda item: item[0], reverse=True)
+        current: Optional[WorkUnit] = None
+        for tokens, entry in small:
+            if current is not None and current.tokens + tokens <= budget:
+                current.entries.append(entry)
+                current.tokens += tokens
+                continue
+            current = WorkUnit([entry], tokens)
+            units.append(current)
+        packed_files = sum(len(unit.entries) for unit in units if len(unit.entries) > 1)
+
+        units.sort(key=lambda unit: unit.tokens, reverse=True)
+        plan = SchedulePlan(units, {
+            "workers": self.workers,
+            "units": len(units),
+            "unit_tokens": budget,
+            "estimated_tokens": total_tokens,
+            "split_files": split_files,
+            "packed_files": packed_files,
+            # Dolní mez doby dávky v tokenech: největší jednotka nebo rovnoměrný podíl
+            "makespan_bound_tokens": max([math.ceil(total_tokens / self.workers)] + [unit.tokens for unit in units[:1]]),
+        })
+        logger.info(
+            f"Scheduled {len(entries)} files into {len(plan.units)} units "
+            f"({split_files} split, {packed_files} packed, budget {budget} tokens)"
+        )
+        return plan
+
+
+def split_text(text: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Rozdělí text na části přibližně stejné délky.
+
+    Řez se hledá v okolí ideální pozice nejprve na hranici odstavce, potom
+    řádku a nakonec mezery, aby entita (jméno, adresa) nebyla rozdělena.
+    Výsledek je deterministický, takže každý worker dopočítá stejné hranice.
+
+    Args:
+        text: Text dokumentu
+        parts: Požadovaný počet částí
+
+    Returns:
+        Seznam (start, end) pozic částí pokrývajících celý text
+    """
+    if parts <= 1 or len(text) < parts:
+        return [(0, len(text))]
+    step = len(text) / parts
+    window = max(1, int(step * _CUT_WINDOW))
+    cuts = [0]
+    for index in range(1, parts):
+        ideal = int(step * index)
+        low = max(cuts[-1] + 1, ideal - window)
+        high = min(len(text), ideal + window)
+        cut = ideal
+        for separator in ("\n\n", "\n", " "):
+            # Nejbližší výskyt oddělovače před nebo za ideální pozicí
+            positions = [p for p in (text.rfind(separator, low, ideal), text.find(separator, ideal, high)) if p != -1]
+            if positions:
+                cut = min(positions, key=lambda position: abs(position - ideal)) + len(separator)
+                break
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    cuts.append(len(text))
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def split_document(document: Document, part: int, parts: int) -> Tuple[Document, int]:
+    """
+    Vytvoří dokument z jedné části rozděleného dokumentu.
+
+    Args:
+        document: Celý dokument
+        part: Pořadí části (od 0)
+        parts: Počet částí
+
+    Returns:
+        Tuple obsahující dokument části a pozici jejího začátku v celém textu
+    """
+    bounds = split_text(document.content, parts)
+    if part >= len(bounds):
+        # Krátký text se rozdělil na méně částí - tato část je prázdná
+        start = end = len(document.content)
+    else:
+        start, end = bounds[part]
+    piece = document.model_copy(update={
+        "content": document.content[start:end],
+        "metadata": {**(document.metadata or {}), "split_part": part, "split_parts": parts},
+    })
+    return piece, start
+
+
+def merge_documents(
+    document: Document, pieces: Sequence[Tuple[AnonymizedDocument, int]]
+) -> AnonymizedDocument:
+    """
+    Spojí anonymizované části rozděleného dokumentu.
+
+    Args:
+        document: Původní celý dokument
+        pieces: Anonymizované části s pozicí začátku v původním textu, v pořadí
+
+    Returns:
+        Anonymizovaný celý dokument
+    """
+    entities = []
+    entities_by_type: Dict[str, int] = {}
+    total_entities = 0
+    conflicts_resolved = 0
+    for piece, offset in pieces:
+        for entity in piece.entities:
+            original = entity.original_entity
+            entities.append(AnonymizedEntity.model_construct(
+                original_entity=DetectedEntity.model_construct(
+                    entity_type=original.entity_type,
+                    start=original.start + offset,
+                    end=original.end + offset,
+                    score=original.score,
+                    text=original.text,
+                    context=original.context,
+                    metadata=original.metadata,
+                ),
+                anonymized_text=entity.anonymized_text,
+                operator_name=entity.operator_name,
+                metadata=entity.metadata,
+            ))
+        statistics = piece.statistics or {}
+        total_entities += statistics.get("total_entities_detected", len(piece.entities))
+        conflicts_resolved += statistics.get("conflicts_resolved", 0)
+        for entity_type, count in statistics.get("entities_by_type", {}).items():
+            entities_by_type[entity_type] = entities_by_type.get(entity_type, 0) + count
+
+    return AnonymizedDocument(
+        id=f"anon_{document.id}" if document.id else None,
+        content="".join(piece.content for piece, _ in pieces),
+        content_type=document.content_type,
+        original_document_id=document.id,
+        entities=entities,
+        metadata={**(document.metadata or {}), "split_parts": len(pieces)},
+        statistics={
+            "total_entities_detected": total_entities,
+            "entities_by_type": entities_by_type,
+            "conflicts_resolved": conflicts_resolved,
+            "split_parts": len(pieces),
+        },
+    )
+
+
+def core_utilization(busy_seconds: float, wall_seconds: float, workers: int) -> float:
+    """
+    Vrátí využití workerů: podíl času, kdy workery zpracovávaly jednotky.
+
+    Args:
+        busy_seconds: Součet doby zpracování všech jednotek
+        wall_seconds: Doba paralelní fáze dávky
+        workers: Počet workerů
+
+    Returns:
+        Využití v rozsahu 0-1
+    """
+    if wall_seconds <= 0 or workers < 1:
+        return 0.0
+    return round(min(1.0, busy_seconds / (wall_seconds * workers)), 4)
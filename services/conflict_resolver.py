@@ -0,0 +1,180 @@
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+from models.entity_store import EntityStore
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí pořadí důležitosti typů entit (nejdůležitější první). Validované
+# identifikátory mají přednost před obecnějšími formáty se stejným tvarem,
+# např. rodné číslo před číslem pojištěnce, které sdílí stejný regex.
+DEFAULT_ENTITY_PRIORITY = [
+    "CZECH_BIRTH_NUMBER",
+    "CZECH_HEALTH_INSURANCE_NUMBER",
+    "CZECH_ICO",
+    "CZECH_DIC",
+    "CZECH_BANK_ACCOUNT_NUMBER",
+    "CZECH_PASSPORT_NUMBER",
+    "CZECH_OP_NUMBER",
+    "CZECH_RP_NUMBER",
+    "CZECH_DIAGNOSIS_CODE",
+    "EMAIL_ADDRESS",
+    "CZECH_PHONE_NUMBER",
+    "PHONE_NUMBER",
+    "CZECH_ADDRESS",
+    "CZECH_MEDICAL_FACILITY",
+    "PERSON",
+    "LOCATION",
+]
+
+
+class ConflictResolver:
+    """
+    Centrální řešení překryvů entit ze všech rozpoznávačů.
+
+    Entity se jedním průchodem seřazeným podle začátku (sweep line) rozdělí
+    na shluky vzájemně se překrývajících úseků. Uvnitř shluku se entity
+    berou v pořadí podle zvolené politiky a přijímají se, pokud nekolidují
+    s již přijatými. Obsazenost pozic shluku se vede ve Fenwickově stromu nad
+    komprimovanými souřadnicemi; přijaté úseky se nepřekrývají, takže každá
+    buňka se obsadí nejvýše jednou. Celková složitost je O(n log n) i ve
+    shluku, kde se překrývají všechny entity; výsledkem jsou nepřekrývající
+    se entity.
+
+    Politiky:
+        highest_score: vyšší skóre, pak delší úsek, pak priorita typu
+        longest_span: delší úsek, pak vyšší skóre, pak priorita typu
+        entity_priority: priorita typu, pak vyšší skóre, pak delší úsek
+    """
+
+    POLICIES = ("highest_score", "longest_span", "entity_priority")
+
+    def __init__(self, policy: str = "highest_score", entity_priority: Optional[List[str]] = None):
+        """
+        Inicializace resolveru.
+
+        Args:
+            policy: Politika výběru mezi kolidujícími entitami
+            entity_priority: Pořadí typů entit od nejdůležitějšího
+                (None = DEFAULT_ENTITY_PRIORITY)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown conflict policy '{policy}', expected one of {self.POLICIES}")
+        self.policy = policy
+        priority = entity_priority if entity_priority is not None else DEFAULT_ENTITY_PRIORITY
+        self._priority: Dict[str, int] = {entity_type: rank for rank, entity_type in enumerate(priority)}
+
+    def resolve(self, store: EntityStore) -> EntityStore:
+        """
+        Vyřeší překryvy entit v úložišti.
+
+        Args:
+            store: Úložiště detekovaných entit
+
+        Returns:
+            Nové úložiště s nepřekrývajícími se entitami seřazenými podle pozice
+        """
+        indices = self.select_indices(store)
+        if len(indices) < len(store):
+            logger.debug(f"Conflict resolution dropped {len(store) - len(indices)} of {len(store)} entities")
+        return store.select(indices)
+
+    def select_indices(self, store: EntityStore) -> List[int]:
+        """
+        Vybere indexy entit, které přežijí řešení konfliktů.
+
+        Args:
+            store: Úložiště detekovaných entit
+
+        Returns:
+            Indexy vybraných entit seřazené podle začátku
+        """
+        starts, ends = store.starts, store.ends
+        order = sorted(range(len(store)), key=lambda i: (starts[i], -ends[i]))
+
+        selected: List[int] = []
+        cluster: List[int] = []
+        cluster_end = -1
+        for index in order:
+            if cluster and starts[index] >= cluster_end:
+                selected.extend(self._resolve_cluster(store, cluster))
+                cluster = []
+            cluster.append(index)
+            cluster_end = max(cluster_end, ends[index]) if len(cluster) > 1 else ends[index]
+        if cluster:
+            selected.extend(self._resolve_cluster(store, cluster))
+        return selected
+
+    def _resolve_cluster(self, store: EntityStore, cluster: Sequence[int]) -> List[int]:
+        """
+        Vybere nepřekrývající se entity z jednoho shluku překryvů.
+
+        Args:
+            store: Úložiště detekovaných entit
+            cluster: Indexy entit shluku seřazené podle začátku
+
+        Returns:
+            Přijaté indexy seřazené podle začátku
+        """
+        if len(cluster) == 1:
+            return list(cluster)
+
+        starts, ends = store.starts, store.ends
+        rank_by_type = [self._priority.get(name, len(self._priority)) for name in store.type_names]
+
+        def sort_key(i: int) -> tuple:
+            length = ends[i] - starts[i]
+            rank = rank_by_type[store.type_ids[i]]
+            if self.policy == "highest_score":
+                return (-store.scores[i], -length, rank, starts[i])
+            if self.policy == "longest_span":
+                return (-length, -store.scores[i], rank, starts[i])
+            return (rank, -store.scores[i], -length, starts[i])
+
+        # Komprimované souřadnice: buňka j je úsek [points[j], points[j + 1])
+        points = sorted({starts[i] for i in cluster} | {ends[i] for i in cluster})
+        occupied = _FenwickTree(len(points))
+        accepted: List[int] = []
+        for index in sorted(cluster, key=sort_key):
+            first = bisect_left(points, starts[index])
+            last = bisect_left(points, ends[index])
+            # Entita nulové délky koliduje s úsekem, do kterého padne její začátek
+            if occupied.range_sum(first, max(last, first + 1)):
+                continue
+            for cell in range(first, last):
+                occupied.add(cell, 1)
+            accepted.append(index)
+        accepted.sort(key=lambda i: starts[i])
+        return accepted
+
+
+class _FenwickTree:
+    """Fenwickův strom pro součty na intervalech (přičtení i dotaz v O(log n))."""
+
+    def __init__(self, size: int):
+        self._tree = [0] * (size + 1)
+
+    def add(self, position: int, value: int) -> None:
+        """Přičte hodnotu na pozici."""
+        position += 1
+        while position < len(self._tree):
+            self._tree[position] += value
+            position += position & -position
+
+    def _prefix_sum(self, end: int) -> int:
+        """Součet pozic [0, end)."""
+        total = 0
+        while end > 0:
+            total += self._tree[end]
+            end -= end & -end
+        return total
+
+    def range_sum(self, start: int, end: int) -> int:
+        """Součet pozic [start, end)."""
+        return self._prefix_sum(min(end, len(self._tree) - 1)) - self._prefix_sum(start)
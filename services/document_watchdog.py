@@ -0,0 +1,245 @@
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+from typing import Dict, Optional
+
+from services.worker_lifecycle import WorkerLifecycle, current_rss_bytes
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+class DocumentTimeoutError(Exception):
+    """Zpracování dokumentu překročilo časový limit a worker byl ukončen."""
+
+
+class WorkerCrashedError(ChildProcessError):
+    """Worker skončil bez odpovědi (např. ukončen kvůli nedostatku paměti)."""
+
+
+def transferable_error(error: Exception) -> Exception:
+    """
+    Vrátí výjimku, kterou lze předat z workeru rodičovskému procesu.
+
+    Args:
+        error: Výjimka vyvolaná ve workeru
+
+    Returns:
+        Původní výjimka, nebo RuntimeError s jejím popisem, pokud ji nejde serializovat
+    """
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {str(error)}")
+
+
+def _run_worker(presidio_service, connection) -> None:
+    """
+    Smyčka workeru: přijímá dokumenty a vrací výsledek nebo výjimku, svoji RSS
+    a statistiky, které by jinak zůstaly jen v paměti workeru.
+    """
+    # Ctrl+C řeší rodič, worker ukončí on
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pseudonym_store = getattr(presidio_service, "pseudonym_store", None)
+    while True:
+        try:
+            document = connection.recv()
+        except EOFError:
+            break
+        if document is None:
+            break
+        pseudonym_stats = pseudonym_store.get_stats() if pseudonym_store else None
+        try:
+            response = ("ok", presidio_service.process_document(document))
+        except Exception as e:
+            # Výjimka se rodiči předá jen, pokud ji jde přenést mezi procesy
+            response = ("error", transferable_error(e))
+        state = {"pseudonymization": pseudonym_store.get_stats(since=pseudonym_stats) if pseudonym_store else None}
+        connection.send(response + (current_rss_bytes(), state))
+    connection.close()
+
+
+class DocumentWatchdog:
+    """
+    Zpracování dokumentů v ukončitelném workeru s časovým limitem.
+
+    Analýza běží v procesu vytvořeném forkem z procesu se zahřátou
+    PresidioService, takže worker modely nenačítá znovu (sdílí je
+    copy-on-write). Když dokument nestihne limit (např. katastrofický
+    backtracking regulárního výrazu), worker se zabije a hned se nastartuje
+    nový; volající dostane `DocumentTimeoutError`. Na platformách bez forku
+    se dokument zpracuje přímo, bez vynucení limitu.
+
+    Statistiky pseudonymizace za dokument vrací worker spolu s výsledkem
+    a rodič je připočte ke svému úložišti; ze vráceného dokumentu si rodič
+    uloží i směrování a pseudonymy do svých cache, takže je zdědí každý
+    další worker.
+
+    Podle `lifecycle` se worker po určitém počtu dokumentů nebo po překročení
+    RSS recykluje: náhrada se forkne (se zahřátými modely) dřív, než se starý
+    worker po dokončení dokumentu ukončí, takže další dokument nečeká.
+    """
+
+    def __init__(self, presidio_service, lifecycle: Optional[WorkerLifecycle] = None):
+        """
+        Inicializace watchdogu.
+
+        Args:
+            presidio_service: Zahřátá instance PresidioService
+            lifecycle: Pravidla recyklace workeru (None = bez recyklace)
+        """
+        self.presidio_service = presidio_service
+        self.lifecycle = lifecycle or WorkerLifecycle()
+        self._process = None
+        self._connection = None
+        self._pid = None
+        self._stats = {"documents": 0, "timeouts": 0, "crashes": 0, "restarts": 0}
+        self.supported = "fork" in multiprocessing.get_all_start_methods()
+        if not self.supported:
+            logger.warning("Fork is not available, document timeouts will not be enforced")
+
+    def _start(self) -> None:
+        """Nastartuje worker (forkem, modely se nenačítají znovu)."""
+        context = multiprocessing.get_context("fork")
+        parent_connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=_run_worker,
+            args=(self.presidio_service, child_connection),
+            name="document-watchdog-worker",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        # Nový worker začíná s čistou pamětí
+        self.lifecycle.reset()
+        self._process = process
+        self._connection = parent_connection
+        self._pid = os.getpid()
+
+    def _ensure_started(self) -> None:
+        """Spustí worker, pokud neběží (i v procesu vzniklém forkem)."""
+        if self._process is None or self._pid != os.getpid() or not self._process.is_alive():
+            if self._process is not None and self._pid == os.getpid():
+                self._stats["restarts"] += 1
+                self._stop_worker()
+            self._start()
+
+    def _recycle(self, reason: str) -> None:
+        """Nahradí worker novým; starý se ukončí až po nastartování náhrady."""
+        self.lifecycle.recycled(reason)
+        previous_process, previous_connection = self._process, self._connection
+        self._start()
+        try:
+            previous_connection.send(None)
+            previous_process.join(timeout=5)
+        except (OSError, ValueError):
+            pass
+        if previous_process.is_alive():
+            previous_process.kill()
+            previous_process.join()
+        previous_connection.close()
+
+    def _stop_worker(self) -> None:
+        """Okamžitě ukončí worker."""
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+        if self._connection is not None:
+            self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def process_document(self, document, timeout: float):
+        """
+        Zpracuje dokument ve workeru s časovým limitem.
+
+        Args:
+            document: Dokument ke zpracování
+            timeout: Časový limit v sekundách
+
+        Returns:
+            Anonymizovaný dokument
+
+        Raises:
+            DocumentTimeoutError: Pokud zpracování nestihlo limit
+            WorkerCrashedError: Pokud worker skončil bez odpovědi
+            Exception: Výjimka vyvolaná při zpracování ve workeru
+        """
+        if not self.supported:
+            return self.presidio_service.process_document(document)
+
+        self._ensure_started()
+        self._stats["documents"] += 1
+        start_time = time.monotonic()
+        try:
+            self._connection.send(document)
+            ready = self._connection.poll(timeout)
+            response = self._connection.recv() if ready else None
+        except (EOFError, OSError):
+            self._stats["crashes"] += 1
+            exit_code = self._process.exitcode if self._process else None
+            self._stats["restarts"] += 1
+            self._stop_worker()
+            raise WorkerCrashedError(f"Worker exited without a response (exit code {exit_code})")
+
+        if response is None:
+            # Worker uvízl - zabije se a nahradí novým
+            self._stats["timeouts"] += 1
+            self._stats["restarts"] += 1
+            self._stop_worker()
+            self._start()
+            raise DocumentTimeoutError(
+                f"Document {document.id} exceeded the {timeout:g} s limit "
+                f"({time.monotonic() - start_time:.1f} s), worker restarted"
+            )
+
+        status, payload, rss_bytes, state = response
+        self._merge_worker_state(document, payload if status == "ok" else None, state)
+        reason = self.lifecycle.record(rss_bytes)
+        if reason:
+            self._recycle(reason)
+        if status == "error":
+            raise payload
+        return payload
+
+    def _merge_worker_state(self, document, result, state: Dict) -> None:
+        """Převezme do rodičovského procesu statistiky a cache vrácené workerem."""
+        pseudonym_store = getattr(self.presidio_service, "pseudonym_store", None)
+        if pseudonym_store is not None and state.get("pseudonymization"):
+            pseudonym_store.merge_stats(state["pseudonymization"])
+        if result is not None and hasattr(self.presidio_service, "remember_result"):
+            self.presidio_service.remember_result(document, result)
+
+    def close(self) -> None:
+        """Ukončí worker."""
+        if self._process is None or self._pid != os.getpid():
+            return
+        try:
+            self._connection.send(None)
+            self._process.join(timeout=5)
+        except (OSError, ValueError):
+            pass
+        self._stop_worker()
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky watchdogu.
+
+        Returns:
+            Slovník s počty dokumentů, vypršených limitů, pádů a restartů workeru
+            a metrikami recyklace (počty recyklací, RSS workeru)
+        """
+        return {
+            **self._stats,
+            "worker_alive": bool(self._process and self._process.is_alive()),
+            "lifecycle": self.lifecycle.get_stats(),
+        }
@@ -0,0 +1,99 @@
+import logging
+import os
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Iterator, List, Optional
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Podporovaná pořadí souborů
+FILE_ORDERS = ("none", "name", "mtime")
+
+# Předpona vzoru pro rekurzivní procházení podadresářů
+RECURSIVE_PREFIX = "**/"
+
+
+@dataclass
+class FileEntry:
+    """Nalezený soubor s údaji z jediného volání stat."""
+    path: str
+    name: str
+    size: int
+    ctime: float
+    mtime: float
+
+
+class FileEnumerator:
+    """
+    Průběžný výčet souborů v adresáři přes `os.scandir`.
+
+    Soubory se vrací postupně, takže zpracování začne hned prvním souborem
+    a paměť neroste s velikostí adresáře. Údaje o velikosti a časech se čtou
+    jediným (na většině systémů cachovaným) `DirEntry.stat()`.
+
+    Vzor se porovnává s názvem souboru; předpona `**/` (např. `**/*.txt`)
+    zapne procházení podadresářů. Pořadí:
+
+    - "none": pořadí adresáře, plně průběžné
+    - "name": podle názvu v rámci každého adresáře (paměť úměrná jednomu adresáři)
+    - "mtime": nejstarší soubory první napříč celým stromem (drží seznam všech
+      nalezených souborů, ne jejich obsah)
+    """
+
+    def __init__(self, root: str, pattern: str = "*", order: str = "none", recursive: Optional[bool] = None):
+        """
+        Inicializace výčtu.
+
+        Args:
+            root: Kořenový adresář
+            pattern: Vzor názvu souboru (fnmatch), volitelně s předponou `**/`
+            order: Pořadí souborů ("none", "name", "mtime")
+            recursive: Procházet podadresáře (None = podle předpony vzoru)
+        """
+        if order not in FILE_ORDERS:
+            raise ValueError(f"Unknown file order '{order}', expected one of {FILE_ORDERS}")
+        self.root = root
+        self.recursive = pattern.startswith(RECURSIVE_PREFIX) if recursive is None else recursive
+        self.pattern = pattern[len(RECURSIVE_PREFIX):] if pattern.startswith(RECURSIVE_PREFIX) else pattern
+        self.order = order
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        if self.order == "mtime":
+            return iter(sorted(self._walk(), key=lambda entry: (entry.mtime, entry.path)))
+        return self._walk()
+
+    def _walk(self) -> Iterator[FileEntry]:
+        """Prochází strom adresářů bez rekurze a vrací vyhovující soubory."""
+        pending: List[str] = [self.root]
+        while pending:
+            directory = pending.pop()
+            try:
+                iterator = os.scandir(directory)
+            except OSError as e:
+                logger.warning(f"Cannot list directory {directory}: {str(e)}")
+                continue
+
+            with iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name) if self.order == "name" else iterator
+                subdirectories = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                subdirectories.append(entry.path)
+                            continue
+                        if not entry.is_file() or not fnmatchcase(entry.name, self.pattern):
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        # Soubor mezitím zmizel (např. přesunut jiným workerem)
+                        continue
+                    yield FileEntry(entry.path, entry.name, stat.st_size, stat.st_ctime, stat.st_mtime)
+
+            # Podadresáře v opačném pořadí, aby se procházely v pořadí výčtu
+            pending.extend(reversed(subdirectories))
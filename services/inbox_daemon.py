@@ -0,0 +1,303 @@
+import logging
+import os
+import select
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from services.file_enumerator import FileEntry, FileEnumerator
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# inotify je volitelný - bez něj se adresář hlídá dotazováním
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+# Přípona značky, kterou producent ohlásí dokončený zápis souboru
+READY_SUFFIX = ".ready"
+
+
+class InboxDaemon:
+    """
+    Dlouhodobě běžící zpracování vstupního adresáře (inboxu).
+
+    Démon drží jeden BatchProcessor (a s ním zahřátou PresidioService), hlídá
+    `input_dir` a každý nový soubor zpracuje, jakmile je celý zapsaný:
+
+    - existuje značka `<soubor>.ready`, nebo
+    - velikost ani čas změny souboru se nezměnily po dobu `stable_seconds`
+      (lze vypnout volbou `require_ready_marker`).
+
+    Výstup se zapisuje atomicky (dočasný soubor a `os.replace`), chybné soubory
+    přesouvá BatchProcessor do adresáře s chybami. Zpracovaný vstup se přesune
+    do `archive_dir`, případně se z inboxu smaže. Přesuny jsou atomické jen
+    v rámci jednoho souborového systému.
+
+    Na změny čeká přes inotify (je-li k dispozici balíček `inotify_simple`),
+    jinak dotazováním každých `poll_interval` sekund; adresář se znovu čte jen
+    při změně jeho mtime nebo když čekají rozepsané soubory či opakované pokusy.
+    """
+
+    def __init__(
+        self,
+        batch_processor,
+        file_pattern: str = "*.txt",
+        poll_interval: float = 1.0,
+        stable_seconds: float = 2.0,
+        require_ready_marker: bool = False,
+        archive_dir: Optional[str] = None,
+        use_inotify: bool = True,
+    ):
+        """
+        Inicializace démona.
+
+        Args:
+            batch_processor: BatchProcessor se zahřátou PresidioService
+            file_pattern: Vzor názvu vstupních souborů (fnmatch)
+            poll_interval: Maximální prodleva mezi kontrolami adresáře v sekundách
+            stable_seconds: Doba, po kterou se soubor nesmí měnit, aby byl považován za zapsaný
+            require_ready_marker: Zpracovat jen soubory se značkou `.ready`
+            archive_dir: Adresář pro zpracované vstupy (None = vstupy se smažou)
+            use_inotify: Použít inotify, je-li k dispozici
+        """
+        if batch_processor.output_mode != "files":
+            raise ValueError("Inbox daemon requires the 'files' output mode")
+        if file_pattern.endswith(READY_SUFFIX):
+            raise ValueError(f"File pattern must not match '{READY_SUFFIX}' markers")
+
+        self.batch_processor = batch_processor
+        self.input_dir = batch_processor.input_dir
+        self.file_pattern = file_pattern
+        self.poll_interval = poll_interval
+        self.stable_seconds = stable_seconds
+        self.require_ready_marker = require_ready_marker
+        self.archive_dir = archive_dir
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+
+        # Sledované rozepsané soubory: cesta -> (velikost, mtime, od kdy beze změny)
+        self._candidates: Dict[str, Tuple[int, float, float]] = {}
+        # Soubory s přechodnou chybou: cesta -> (čas dalšího pokusu, pořadí pokusu)
+        self._retries: Dict[str, Tuple[float, int]] = {}
+        self._directory_mtime: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._stats = {
+            "scans": 0,
+            "processed_files": 0,
+            "successful_files": 0,
+            "failed_files": 0,
+            "quarantined_files": 0,
+            "timed_out_files": 0,
+            "retried_attempts": 0,
+            "total_entities_detected": 0,
+            "started_at": None,
+            "last_processed_at": None,
+        }
+
+        self._inotify = None
+        if use_inotify and INotify is not None:
+            self._inotify = INotify()
+            self._inotify.add_watch(
+                self.input_dir,
+                inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE | inotify_flags.ATTRIB,
+            )
+        logger.info(
+            f"Inbox daemon watching {self.input_dir} ({'inotify' if self._inotify else 'polling'}, "
+            f"pattern {file_pattern})"
+        )
+
+    def _directory_changed(self) -> bool:
+        """Zjistí, zda se od poslední kontroly změnil obsah adresáře (podle mtime)."""
+        try:
+            mtime = os.stat(self.input_dir).st_mtime_ns
+        except OSError:
+            return False
+        changed = mtime != self._directory_mtime
+        self._directory_mtime = mtime
+        return changed
+
+    def scan(self) -> List[FileEntry]:
+        """
+        Najde soubory připravené ke zpracování.
+
+        Returns:
+            Zapsané soubory od nejstarších
+        """
+        # Bez změny adresáře, rozepsaných souborů a čekajících pokusů není co číst
+        if not self._directory_changed() and not self._candidates and not self._retries:
+            return []
+        self._stats["scans"] += 1
+
+        now = time.monotonic()
+        ready: List[FileEntry] = []
+        candidates: Dict[str, Tuple[int, float, float]] = {}
+        for entry in FileEnumerator(self.input_dir, self.file_pattern, order="mtime", recursive=False):
+            # Značky nejsou dokumenty, i když je vzor (např. "*") zahrne
+            if entry.path.endswith(READY_SUFFIX):
+                continue
+            # Soubor s čekajícím pokusem už byl celý zapsaný
+            if entry.path in self._retries or os.path.exists(entry.path + READY_SUFFIX):
+                ready.append(entry)
+                continue
+            if self.require_ready_marker:
+                candidates[entry.path] = (entry.size, entry.mtime, now)
+                continue
+
+            previous = self._candidates.get(entry.path)
+            if previous and previous[:2] == (entry.size, entry.mtime):
+                if now - previous[2] >= self.stable_seconds:
+                    ready.append(entry)
+                    continue
+                candidates[entry.path] = previous
+            else:
+                # Nový nebo stále zapisovaný soubor - měření stability začíná znovu
+                candidates[entry.path] = (entry.size, entry.mtime, now)
+
+        # Soubory, které mezitím zmizely, se přestanou sledovat
+        self._candidates = candidates
+        present = {entry.path for entry in ready}
+        self._retries = {path: retry for path, retry in self._retries.items() if path in present}
+        return ready
+
+    def run_once(self) -> int:
+        """
+        Provede jednu kontrolu inboxu a zpracuje připravené soubory.
+
+        Returns:
+            Počet zpracovaných souborů
+        """
+        processed = 0
+        for entry in self.scan():
+            if self._stop_event.is_set():
+                break
+            # Přechodná chyba - další pokus až po uplynutí prodlevy, ostatní soubory mezitím běží
+            due_time, attempt = self._retries.get(entry.path, (0.0, 1))
+            if due_time > time.monotonic():
+                continue
+            logger.info(f"Processing inbox file {entry.path}")
+            result = self.batch_processor.process_file(entry.path, entry, attempt)
+            if result.get("retry"):
+                self._retries[entry.path] = (time.monotonic() + result["delay"], attempt + 1)
+                self._stats["retried_attempts"] += 1
+                continue
+            self._retries.pop(entry.path, None)
+
+            self._stats["processed_files"] += 1
+            self._stats["last_processed_at"] = datetime.now().isoformat()
+            if result["success"]:
+                self._stats["successful_files"] += 1
+                self._stats["total_entities_detected"] += result["entities_detected"]
+                self._retire_input(entry.path)
+            else:
+                self._stats["failed_files"] += 1
+                if result.get("quarantined"):
+                    self._stats["quarantined_files"] += 1
+                if result.get("timed_out"):
+                    self._stats["timed_out_files"] += 1
+            self._remove_marker(entry.path)
+            processed += 1
+
+        # Trezor zapisuje po dávkách - po každé dávce inboxu se vyprázdní
+        if processed and self.batch_processor.reidentification_vault:
+            self.batch_processor.reidentification_vault.flush()
+        return processed
+
+    def _retire_input(self, file_path: str) -> None:
+        """Odstraní zpracovaný vstup z inboxu (přesunem do archivu nebo smazáním)."""
+        try:
+            if not self.archive_dir:
+                os.remove(file_path)
+                return
+            file_name = os.path.basename(file_path)
+            archive_path = os.path.join(self.archive_dir, file_name)
+            if os.path.exists(archive_path):
+                name, extension = os.path.splitext(file_name)
+                timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+                archive_path = os.path.join(self.archive_dir, f"{name}_{timestamp}{extension}")
+            os.replace(file_path, archive_path)
+        except OSError as e:
+            logger.error(f"Cannot remove processed file {file_path} from inbox: {str(e)}")
+
+    @staticmethod
+    def _remove_marker(file_path: str) -> None:
+        """Smaže značku `.ready` zpracovaného souboru, pokud existuje."""
+        try:
+            os.remove(file_path + READY_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    def _wait(self) -> None:
+        """Počká na změnu v adresáři nebo na uplynutí intervalu dotazování."""
+        if self._inotify is None:
+            self._stop_event.wait(self.poll_interval)
+            return
+        # Čekání na událost inotify - při rozepsaných souborech nejdéle poll_interval
+        try:
+            readable, _, _ = select.select([self._inotify.fileno()], [], [], self.poll_interval)
+        except InterruptedError:
+            return
+        if readable:
+            self._inotify.read(timeout=0)
+            # Vynucení nového čtení, i když se mtime adresáře nezměnil (zápis do souboru)
+            self._directory_mtime = None
+
+    def run(self, max_idle_cycles: Optional[int] = None) -> Dict:
+        """
+        Hlavní smyčka démona; běží do zavolání `stop`.
+
+        Args:
+            max_idle_cycles: Ukončit po tolika kontrolách bez práce (None = běžet stále)
+
+        Returns:
+            Statistiky démona
+        """
+        self._stats["started_at"] = datetime.now().isoformat()
+        idle_cycles = 0
+        try:
+            while not self._stop_event.is_set():
+                if self.run_once():
+                    idle_cycles = 0
+                    continue
+                idle_cycles += 1
+                if max_idle_cycles is not None and idle_cycles >= max_idle_cycles:
+                    break
+                self._wait()
+        finally:
+            self.batch_processor.audit_log.flush()
+            self.batch_processor.watchdog.close()
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+        logger.info(
+            f"Inbox daemon stopped: {self._stats['successful_files']} successful, "
+            f"{self._stats['failed_files']} failed"
+        )
+        return self.get_stats()
+
+    def stop(self) -> None:
+        """Požádá smyčku o ukončení (lze volat ze signal handleru)."""
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky démona.
+
+        Returns:
+            Slovník s počty kontrol a zpracovaných souborů a stavem workeru
+            (recyklace, RSS)
+        """
+        return {
+            **self._stats,
+            "pending_files": len(self._candidates),
+            "retry_pending_files": len(self._retries),
+            "inotify": self._inotify is not None,
+            "watchdog": self.batch_processor.watchdog.get_stats(),
+        }
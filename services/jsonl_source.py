@@ -0,0 +1,168 @@
+import json
+import logging
+import mmap
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Velikost bloku, po kterém se při stavbě indexu hledají konce řádků
+INDEX_SCAN_BLOCK = 64 * 1024 * 1024
+
+# Přípona souboru s indexem uloženého vedle JSONL souboru
+INDEX_SUFFIX = ".idx"
+
+
+class JsonlSource:
+    """
+    Vstupní zdroj nad jedním velkým JSONL souborem.
+
+    Soubor se namapuje do paměti (`mmap`) a jednou se pro něj sestaví index
+    pozic řádků (začátek a konec každého neprázdného záznamu). Index se uloží
+    vedle souboru (`<soubor>.idx`) a při dalším otevření se použije, pokud
+    odpovídá velikosti a času změny souboru. Libovolný záznam nebo rozsah
+    záznamů se pak čte přímo podle pozic, bez sekvenčního čtení souboru
+    a bez jeho načtení do paměti, takže paralelní workery mohou zpracovávat
+    disjunktní rozsahy záznamů.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        """
+        Inicializace zdroje.
+
+        Args:
+            path: Cesta k JSONL souboru
+            index_path: Cesta k souboru s indexem (None = `<path>.idx`)
+        """
+        self.path = path
+        self.index_path = index_path or f"{path}{INDEX_SUFFIX}"
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # Prázdný soubor nelze namapovat
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.starts, self.ends = self._load_or_build_index()
+
+    def _source_signature(self) -> Tuple[int, int]:
+        """Vrátí velikost a čas změny zdrojového souboru."""
+        stat = os.fstat(self._file.fileno())
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_or_build_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Načte index ze souboru, nebo ho sestaví a uloží.
+
+        Returns:
+            Pole začátků a konců záznamů (pozice v bajtech)
+        """
+        size, mtime_ns = self._source_signature()
+        if os.path.exists(self.index_path):
+            try:
+                with np.load(self.index_path) as index:
+                    if int(index["source_size"]) == size and int(index["source_mtime_ns"]) == mtime_ns:
+                        return index["starts"], index["ends"]
+                logger.info(f"Index {self.index_path} is stale, rebuilding")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Cannot read index {self.index_path}: {str(e)}, rebuilding")
+
+        starts, ends = self._build_index()
+        temporary_path = f"{self.index_path}.tmp{os.getpid()}"
+        try:
+            with open(temporary_path, "wb") as f:
+                np.savez(f, starts=starts, ends=ends, source_size=size, source_mtime_ns=mtime_ns)
+            os.replace(temporary_path, self.index_path)
+        except OSError as e:
+            # Index je jen zrychlení, zdroj funguje i bez jeho uložení
+            logger.warning(f"Cannot save index {self.index_path}: {str(e)}")
+        logger.info(f"Built index for {self.path}: {len(starts)} records")
+        return starts, ends
+
+    def _build_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sestaví index neprázdných řádků vektorovým hledáním konců řádků po blocích.
+
+        Returns:
+            Pole začátků a konců záznamů (konec bez znaku nového řádku)
+        """
+        size = len(self._mmap)
+        newlines = [
+            np.flatnonzero(
+                np.frombuffer(self._mmap, dtype=np.uint8, count=min(INDEX_SCAN_BLOCK, size - offset), offset=offset) == 0x0A
+            ) + offset
+            for offset in range(0, size, INDEX_SCAN_BLOCK)
+        ]
+        newlines = np.concatenate(newlines).astype(np.int64) if newlines else np.empty(0, dtype=np.int64)
+
+        starts = np.concatenate(([0], newlines + 1)).astype(np.int64)
+        ends = np.concatenate((newlines, [size])).astype(np.int64)
+        # Zakončení CRLF
+        if size:
+            crlf = ends > starts
+            crlf[crlf] = np.frombuffer(self._mmap, dtype=np.uint8)[ends[crlf] - 1] == 0x0D
+            ends = ends - crlf
+        non_empty = ends > starts
+        return starts[non_empty], ends[non_empty]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def read_raw(self, index: int) -> bytes:
+        """Vrátí surové bajty záznamu."""
+        return self._mmap[int(self.starts[index]):int(self.ends[index])]
+
+    def read_record(self, index: int) -> Dict:
+        """
+        Načte a rozparsuje jeden záznam.
+
+        Args:
+            index: Pořadí záznamu
+
+        Returns:
+            Rozparsovaný JSON objekt
+        """
+        return json.loads(self.read_raw(index))
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Prochází záznamy v rozsahu [start, stop).
+
+        Args:
+            start: Pořadí prvního záznamu
+            stop: Pořadí za posledním záznamem (None = do konce)
+
+        Returns:
+            Iterátor dvojic (pořadí záznamu, záznam)
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield index, self.read_record(index)
+
+    def ranges(self, range_size: int) -> List[Tuple[int, int]]:
+        """
+        Rozdělí záznamy na disjunktní souvislé rozsahy pro workery.
+
+        Args:
+            range_size: Počet záznamů v jednom rozsahu
+
+        Returns:
+            Seznam rozsahů (start, stop) v pořadí souboru
+        """
+        return [(start, min(start + range_size, len(self))) for start in range(0, len(self), range_size)]
+
+    def close(self) -> None:
+        """Uvolní mapování a zavře soubor."""
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "JsonlSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,211 @@
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Krátké referenční texty, ze kterých se při startu sestaví n-gramové profily.
+# Texty záměrně pokrývají běžnou i zdravotnickou slovní zásobu, protože právě
+# ta převažuje v dokumentech, které zpracováváme.
+_TRAINING_TEXTS = {
+    "cs": (
+        "Pacient byl přijat na interní oddělení pro bolesti na hrudi a dušnost. "
+        "Při přijetí byl při vědomí, orientovaný, bez známek krvácení. "
+        "V anamnéze uvádí vysoký krevní tlak, cukrovku druhého typu a stav po operaci kyčle. "
+        "Rodinná anamnéza je bez pozoruhodností, otec zemřel na srdeční selhání. "
+        "Doporučujeme kontrolu u praktického lékaře za čtrnáct dní a pokračovat v léčbě. "
+        "Pacientka žije se svým manželem v rodinném domě, kouří deset cigaret denně. "
+        "Laboratorní výsledky ukázaly zvýšené hodnoty cholesterolu a mírnou anémii. "
+        "Byla provedena rentgenová vyšetření plic, která neprokázala zánětlivé změny. "
+        "Propouštíme do domácího ošetřování ve stabilizovaném stavu, dieta šetřící. "
+        "Čtvrtý den hospitalizace došlo ke zhoršení, proto jsme změnili antibiotika. "
+        "Všechny údaje jsou důvěrné a slouží pouze pro potřeby zdravotní péče."
+    ),
+    "sk": (
+        "Pacient bol prijatý na interné oddelenie pre bolesti na hrudníku a dýchavičnosť. "
+        "Pri prijatí bol pri vedomí, orientovaný, bez známok krvácania. "
+        "V anamnéze uvádza vysoký krvný tlak, cukrovku druhého typu a stav po operácii bedra. "
+        "Rodinná anamnéza je bez pozoruhodností, otec zomrel na zlyhanie srdca. "
+        "Odporúčame kontrolu u všeobecného lekára o štrnásť dní a pokračovať v liečbe. "
+        "Pacientka žije so svojím manželom v rodinnom dome, fajčí desať cigariet denne. "
+        "Laboratórne výsledky ukázali zvýšené hodnoty cholesterolu a miernu anémiu. "
+        "Bolo vykonané röntgenové vyšetrenie pľúc, ktoré nepreukázalo zápalové zmeny. "
+        "Prepúšťame do domácej starostlivosti v stabilizovanom stave, diéta šetriaca. "
+        "Štvrtý deň hospitalizácie došlo k zhoršeniu, preto sme zmenili antibiotiká. "
+        "Všetky údaje sú dôverné a slúžia iba pre potreby zdravotnej starostlivosti."
+    ),
+    "en": (
+        "The patient was admitted to the internal medicine ward with chest pain and dyspnea. "
+        "On admission he was conscious, oriented, without signs of bleeding. "
+        "His medical history includes high blood pressure, type two diabetes and hip surgery. "
+        "Family history is unremarkable, his father died of heart failure. "
+        "We recommend a follow up with the general practitioner in two weeks and continued treatment. "
+        "The patient lives with her husband in a family house and smokes ten cigarettes a day. "
+        "Laboratory results showed elevated cholesterol levels and mild anemia. "
+        "A chest x-ray was performed which did not show any inflammatory changes. "
+        "We are discharging the patient home in a stable condition with a light diet. "
+        "On the fourth day of hospitalization the condition worsened, so we changed the antibiotics. "
+        "All information is confidential and should only be used for the purposes of health care."
+    ),
+}
+
+_NON_LETTER_REGEX = re.compile(r"[^\w]+|[\d_]+")
+_PARAGRAPH_SPLIT_REGEX = re.compile(r"\n[ \t]*\n")
+
+
+@dataclass
+class LanguageSegment:
+    """Úsek textu (typicky odstavec nebo souvislá skupina odstavců) v jednom jazyce."""
+    start: int
+    end: int
+    language: str
+    confidence: float
+
+
+class LanguageDetector:
+    """
+    Lehký identifikátor jazyka bez externích závislostí.
+
+    Pro každý podporovaný jazyk (cs, en, sk) drží log-pravděpodobnosti znakových
+    n-gramů (1-3) a text přiřadí jazyku s nejvyšším součtem. Kromě detekce jazyka
+    celého textu umí rozdělit smíšený dokument na odstavce a sloučit sousední
+    odstavce stejného jazyka do segmentů.
+    """
+
+    SUPPORTED_LANGUAGES = ("cs", "en", "sk")
+
+    def __init__(
+        self,
+        max_ngram: int = 3,
+        max_chars: int = 1000,
+        min_letters: int = 20,
+    ):
+        """
+        Inicializace detektoru.
+
+        Args:
+            max_ngram: Nejdelší n-gram použitý v profilu
+            max_chars: Kolik znaků z textu (odstavce) se maximálně vyhodnocuje
+            min_letters: Minimální počet písmen, pod kterým je odstavec považován
+                za příliš krátký a přebírá jazyk okolního textu
+        """
+        self.max_ngram = max_ngram
+        self.max_chars = max_chars
+        self.min_letters = min_letters
+        self._profiles: Dict[str, Dict[str, float]] = {}
+        self._unseen_log_prob: Dict[str, float] = {}
+
+        for language, training_text in _TRAINING_TEXTS.items():
+            counts = Counter(self._extract_ngrams(training_text))
+            total = sum(counts.values())
+            vocabulary = len(counts) + 1
+            # Laplaceovo vyhlazení, aby neznámé n-gramy nevynulovaly skóre
+            self._profiles[language] = {
+                gram: math.log((count + 1) / (total + vocabulary))
+                for gram, count in counts.items()
+            }
+            self._unseen_log_prob[language] = math.log(1 / (total + vocabulary))
+
+    def detect(self, text: str, default: str = "cs") -> Tuple[str, float]:
+        """
+        Určí jazyk textu.
+
+        Args:
+            text: Text k vyhodnocení
+            default: Jazyk vrácený pro text bez dostatku písmen
+
+        Returns:
+            Tuple (kód jazyka, jistota 0-1)
+        """
+        grams = self._extract_ngrams(text[:self.max_chars])
+        if not grams:
+            return default, 0.0
+
+        scores = {}
+        for language, profile in self._profiles.items():
+            unseen = self._unseen_log_prob[language]
+            scores[language] = sum(profile.get(gram, unseen) for gram in grams)
+
+        # Jistota jako softmax průměrného skóre na n-gram
+        best_language = max(scores, key=scores.get)
+        best_score = scores[best_language]
+        normalizer = sum(
+            math.exp((score - best_score) / len(grams) * 10) for score in scores.values()
+        )
+        return best_language, 1.0 / normalizer
+
+    def detect_segments(self, text: str, default: str = "cs") -> List[LanguageSegment]:
+        """
+        Rozdělí text na jazykově homogenní segmenty po odstavcích.
+
+        Krátké odstavce (např. nadpisy nebo samotná čísla) přebírají jazyk
+        předchozího segmentu, případně celého dokumentu. Sousední odstavce
+        se stejným jazykem se slučují, takže jednojazyčný dokument vždy
+        vrátí právě jeden segment.
+
+        Args:
+            text: Celý text dokumentu
+            default: Jazyk pro dokument bez dostatku písmen
+
+        Returns:
+            Seznam segmentů pokrývajících celý text
+        """
+        document_language, document_confidence = self.detect(text, default)
+        if not text:
+            return [LanguageSegment(0, 0, document_language, document_confidence)]
+
+        segments: List[LanguageSegment] = []
+        position = 0
+        for separator in list(_PARAGRAPH_SPLIT_REGEX.finditer(text)) + [None]:
+            end = separator.end() if separator else len(text)
+            paragraph = text[position:end]
+            if self._count_letters(paragraph) >= self.min_letters:
+                language, confidence = self.detect(paragraph, document_language)
+            elif segments:
+                language, confidence = segments[-1].language, segments[-1].confidence
+            else:
+                language, confidence = document_language, document_confidence
+
+            if segments and segments[-1].language == language:
+                segments[-1].end = end
+                segments[-1].confidence = min(segments[-1].confidence, confidence)
+            else:
+                segments.append(LanguageSegment(position, end, language, confidence))
+            position = end
+            if position >= len(text):
+                break
+
+        return segments
+
+    def _extract_ngrams(self, text: str) -> List[str]:
+        """
+        Rozloží text na znakové n-gramy slov (s mezerou jako hranicí slova).
+
+        Args:
+            text: Text k rozložení
+
+        Returns:
+            Seznam n-gramů
+        """
+        grams = []
+        for word in _NON_LETTER_REGEX.split(text.lower()):
+            if not word:
+                continue
+            padded = f" {word} "
+            for n in range(1, self.max_ngram + 1):
+                for i in range(len(padded) - n + 1):
+                    grams.append(padded[i:i + n])
+        return grams
+
+    @staticmethod
+    def _count_letters(text: str) -> int:
+        """Spočítá písmena v textu."""
+        return sum(1 for char in text if char.isalpha())
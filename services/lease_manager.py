@@ -0,0 +1,355 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výsledky pokusu o převzetí práce
+CLAIMED = "claimed"
+HELD = "held"
+DONE = "done"
+
+# Součty, které se ve společném souhrnu běhu sčítají přes uzly
+SUMMED_STATS = (
+    "total_files",
+    "processed_files",
+    "successful_files",
+    "failed_files",
+    "quarantined_files",
+    "timed_out_files",
+    "retried_attempts",
+    "total_entities_detected",
+)
+
+
+def merge_node_stats(node_stats: List[Dict]) -> Dict:
+    """
+    Sloučí statistiky dávky jednotlivých uzlů do souhrnu běhu.
+
+    Args:
+        node_stats: Statistiky uzlů (z `BatchProcessor.process_batch`)
+
+    Returns:
+        Souhrn běhu se součty, entitami podle typu a přehledem uzlů
+    """
+    summary: Dict = {key: 0 for key in SUMMED_STATS}
+    summary.update({"entities_by_type": {}, "stolen_leases": 0, "nodes": {}, "start_time": None, "end_time": None})
+    for stats in node_stats:
+        for key in SUMMED_STATS:
+            summary[key] += stats.get(key, 0)
+        for entity_type, count in stats.get("entities_by_type", {}).items():
+            summary["entities_by_type"][entity_type] = summary["entities_by_type"].get(entity_type, 0) + count
+        coordination = stats.get("coordination", {})
+        summary["stolen_leases"] += coordination.get("stolen", 0)
+        summary["nodes"][coordination.get("node_id", f"node-{len(summary['nodes'])}")] = {
+            "processed_files": stats.get("processed_files", 0),
+            "processing_time_ms": stats.get("processing_time_ms", 0),
+        }
+        if stats.get("start_time") and (summary["start_time"] is None or stats["start_time"] < summary["start_time"]):
+            summary["start_time"] = stats["start_time"]
+        if stats.get("end_time") and (summary["end_time"] is None or stats["end_time"] > summary["end_time"]):
+            summary["end_time"] = stats["end_time"]
+    return summary
+
+
+class LeaseManager:
+    """
+    Koordinace více uzlů nad sdíleným vstupním adresářem pomocí lease souborů.
+
+    Uzel si každou položku práce (soubor, rozsah záznamů) před zpracováním
+    převezme vytvořením lease souboru v adresáři běhu `lease_dir`. Lease se
+    vytváří pevným odkazem (`os.link`) na dočasný soubor, který je atomický
+    i na NFS - uspěje vždy jen jeden uzel. Vlákno uzlu obnovuje čas změny
+    držených lease souborů (heartbeat); lease, který se neobnovil déle než
+    `ttl` sekund, patří mrtvému uzlu a jiný uzel ho převezme přejmenováním.
+    Dokončená položka dostane značku `.done` a žádný uzel ji už nezpracuje.
+
+    Doručení je "alespoň jednou": uzel, který se jen zasekl déle než `ttl`,
+    může položku dokončit souběžně s uzlem, který ji převzal. Výstupy se
+    zapisují atomicky se stejným obsahem, takže duplicitní zpracování
+    nepoškodí data, jen se projeví ve statistikách. Časy se porovnávají
+    s místními hodinami uzlu - `ttl` musí výrazně převyšovat rozdíl hodin
+    mezi uzly.
+
+    Adresář běhu patří jednomu běhu dávky; nový běh potřebuje nový adresář.
+    """
+
+    def __init__(
+        self,
+        lease_dir: str,
+        node_id: Optional[str] = None,
+        ttl: float = 60.0,
+        heartbeat_interval: Optional[float] = None,
+    ):
+        """
+        Inicializace správce lease.
+
+        Args:
+            lease_dir: Sdílený adresář běhu s lease soubory a statistikami uzlů
+            node_id: Jednoznačné ID uzlu (None = název stroje a PID)
+            ttl: Doba v sekundách, po které lease bez heartbeatu vyprší
+            heartbeat_interval: Interval obnovy lease (None = třetina ttl)
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.lease_dir = lease_dir
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval or ttl / 3
+        self.nodes_dir = os.path.join(lease_dir, "nodes")
+        os.makedirs(self.nodes_dir, exist_ok=True)
+
+        self._held: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stats = {"claimed": 0, "stolen": 0, "completed": 0, "released": 0, "lost": 0, "held_by_others": 0}
+
+    @staticmethod
+    def _key_name(key: str) -> str:
+        """Převede klíč položky na název souboru (stejný na všech uzlech)."""
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _lease_path(self, key: str) -> str:
+        return os.path.join(self.lease_dir, f"{self._key_name(key)}.lease")
+
+    def _done_path(self, key: str) -> str:
+        return os.path.join(self.lease_dir, f"{self._key_name(key)}.done")
+
+    def _write_unique(self, suffix: str, payload: Dict) -> str:
+        """Zapíše obsah do souboru s názvem jedinečným pro uzel a vrátí jeho cestu."""
+        path = os.path.join(self.lease_dir, f".{self.node_id}.{threading.get_ident()}.{time.monotonic_ns()}{suffix}")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        return path
+
+    def _link(self, key: str, target: str) -> bool:
+        """Atomicky vytvoří lease; False, pokud ho drží jiný uzel."""
+        temporary_path = self._write_unique(".tmp", {
+            "key": key,
+            "node_id": self.node_id,
+            "pid": os.getpid(),
+            "claimed_at": datetime.now().isoformat(),
+        })
+        try:
+            os.link(temporary_path, target)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(temporary_path)
+
+    def claim(self, key: str) -> str:
+        """
+        Pokusí se převzít položku práce.
+
+        Args:
+            key: Klíč položky (např. cesta souboru relativně ke vstupnímu adresáři)
+
+        Returns:
+            "claimed" (převzato, případně od mrtvého uzlu), "held" (zpracovává
+            jiný živý uzel) nebo "done" (už dokončeno)
+        """
+        if os.path.exists(self._done_path(key)):
+            return DONE
+        lease_path = self._lease_path(key)
+        if not self._link(key, lease_path) and not self._steal(key, lease_path):
+            self._stats["held_by_others"] += 1
+            return HELD
+        # Položku mohl mezitím dokončit jiný uzel (značka před uvolněním lease)
+        if os.path.exists(self._done_path(key)):
+            self._remove(lease_path)
+            return DONE
+        with self._lock:
+            self._held[key] = lease_path
+        self._stats["claimed"] += 1
+        self._ensure_heartbeat()
+        return CLAIMED
+
+    def _steal(self, key: str, lease_path: str) -> bool:
+        """Převezme vypršený lease mrtvého uzlu."""
+        try:
+            lease_stat = os.stat(lease_path)
+        except FileNotFoundError:
+            # Lease se mezitím uvolnil
+            return self._link(key, lease_path)
+        age = time.time() - lease_stat.st_mtime
+        if age < self.ttl:
+            return False
+        # Přejmenování vypršeného lease uspěje jen jednomu uzlu
+        stale_path = os.path.join(self.lease_dir, f".{self.node_id}.{time.monotonic_ns()}.stale")
+        try:
+            os.rename(lease_path, stale_path)
+        except FileNotFoundError:
+            return False
+        if os.stat(stale_path).st_ino != lease_stat.st_ino:
+            # Mezitím lease převzal jiný uzel a přejmenoval se jeho nový lease - vrátí se zpět
+            try:
+                os.link(stale_path, lease_path)
+            except FileExistsError:
+                pass
+            self._remove(stale_path)
+            return False
+        self._remove(stale_path)
+        self._stats["stolen"] += 1
+        logger.warning(f"Node {self.node_id} took over expired lease for {key} ({age:.0f} s without heartbeat)")
+        return self._link(key, lease_path)
+
+    def complete(self, key: str) -> None:
+        """
+        Označí položku za dokončenou a uvolní její lease.
+
+        Args:
+            key: Klíč položky
+        """
+        done_path = self._done_path(key)
+        if not os.path.exists(done_path):
+            os.replace(self._write_unique(".done.tmp", {"key": key, "node_id": self.node_id}), done_path)
+        self._stats["completed"] += 1
+        self._drop(key)
+
+    def release(self, key: str) -> None:
+        """
+        Uvolní lease bez dokončení (položku převezme jiný uzel nebo další běh).
+
+        Args:
+            key: Klíč položky
+        """
+        if self._drop(key):
+            self._stats["released"] += 1
+
+    def release_all(self) -> None:
+        """Uvolní všechny držené lease a zastaví heartbeat."""
+        with self._lock:
+            keys = list(self._held)
+        for key in keys:
+            self.release(key)
+        self._stop_event.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+
+    def holds(self, key: str) -> bool:
+        """Zjistí, zda uzel drží lease položky."""
+        with self._lock:
+            return key in self._held
+
+    def _drop(self, key: str) -> bool:
+        """Odebere lease z držených a smaže jeho soubor, pokud ho uzel stále vlastní."""
+        with self._lock:
+            lease_path = self._held.pop(key, None)
+        if lease_path is None:
+            return False
+        if self._owner(lease_path) == self.node_id:
+            self._remove(lease_path)
+        return True
+
+    @staticmethod
+    def _owner(lease_path: str) -> Optional[str]:
+        """Vrátí ID uzlu, který drží lease (None, pokud lease neexistuje)."""
+        try:
+            with open(lease_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("node_id")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _ensure_heartbeat(self) -> None:
+        """Spustí vlákno heartbeatu (i znovu v procesu vzniklém forkem)."""
+        if self._heartbeat is not None and self._heartbeat.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self._heartbeat = threading.Thread(target=self._run_heartbeat, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _run_heartbeat(self) -> None:
+        """Smyčka heartbeatu: obnovuje čas změny držených lease."""
+        while not self._stop_event.wait(self.heartbeat_interval):
+            self.heartbeat()
+
+    def heartbeat(self) -> None:
+        """Obnoví všechny držené lease; lease převzatý jiným uzlem se přestane držet."""
+        with self._lock:
+            held = list(self._held.items())
+        for key, lease_path in held:
+            try:
+                if self._owner(lease_path) == self.node_id:
+                    os.utime(lease_path)
+                    continue
+            except FileNotFoundError:
+                pass
+            logger.warning(f"Node {self.node_id} lost lease for {key}")
+            with self._lock:
+                self._held.pop(key, None)
+            self._stats["lost"] += 1
+
+    def write_node_stats(self, stats: Dict) -> str:
+        """
+        Uloží statistiky uzlu do adresáře běhu.
+
+        Args:
+            stats: Statistiky dávky uzlu
+
+        Returns:
+            Cesta k souboru se statistikami uzlu
+        """
+        path = os.path.join(self.nodes_dir, f"{self.node_id}.json")
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, path)
+        return path
+
+    def merge_run_summary(self) -> Dict:
+        """
+        Sloučí statistiky všech uzlů, které už doběhly, do souhrnu běhu.
+
+        Souhrn se zapíše do `run_summary.json`; poslední doběhnuvší uzel
+        zapíše úplný souhrn.
+
+        Returns:
+            Souhrn běhu (viz `merge_node_stats`)
+        """
+        node_stats = []
+        for name in sorted(os.listdir(self.nodes_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.nodes_dir, name), "r", encoding="utf-8") as f:
+                    node_stats.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Cannot read node stats {name}: {str(e)}")
+        summary = merge_node_stats(node_stats)
+        path = os.path.join(self.lease_dir, "run_summary.json")
+        temporary_path = self._write_unique(".summary.tmp", summary)
+        os.replace(temporary_path, path)
+        return summary
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky uzlu.
+
+        Returns:
+            Slovník s ID uzlu a počty převzatých, převzatých po mrtvých uzlech,
+            dokončených, uvolněných a ztracených lease
+        """
+        with self._lock:
+            held = len(self._held)
+        return {"node_id": self.node_id, **self._stats, "held": held}
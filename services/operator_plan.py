@@ -0,0 +1,114 @@
+import logging
+from typing import Dict, List, Optional, Tuple, Type
+
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import OperatorConfig
+
+from operators.base import CzechBaseOperator
+from operators.czech_address_operator import CzechAddressOperator
+from operators.czech_birth_number_operator import CzechBirthNumberOperator
+from operators.czech_medical_diagnosis_operator import CzechMedicalDiagnosisOperator
+from operators.czech_medical_facility_operator import CzechMedicalFacilityOperator
+from operators.pseudonymize_operator import PseudonymizeOperator
+from services.fast_anonymizer import BatchOperator
+from services.pseudonym_store import PseudonymStore
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí přiřazení českých operátorů k typům entit. Ostatní typy
+# se nahrazují výchozím `<TYP_ENTITY>`.
+DEFAULT_OPERATORS: Dict[str, Type[CzechBaseOperator]] = {
+    "CZECH_BIRTH_NUMBER": CzechBirthNumberOperator,
+    "CZECH_ADDRESS": CzechAddressOperator,
+    "CZECH_MEDICAL_FACILITY": CzechMedicalFacilityOperator,
+    "CZECH_DIAGNOSIS_CODE": CzechMedicalDiagnosisOperator,
+}
+
+# Typy entit identifikující pacienta, které se při zapnuté pseudonymizaci
+# nahrazují konzistentním pseudonymem místo jednorázové anonymizace
+DEFAULT_PSEUDONYMIZED_ENTITIES = [
+    "PERSON",
+    "CZECH_BIRTH_NUMBER",
+    "CZECH_HEALTH_INSURANCE_NUMBER",
+    "CZECH_OP_NUMBER",
+    "CZECH_PASSPORT_NUMBER",
+    "EMAIL_ADDRESS",
+    "CZECH_PHONE_NUMBER",
+    "PHONE_NUMBER",
+]
+
+
+class OperatorPlan:
+    """
+    Předpřipravený plán operátorů podle typu entity.
+
+    Plán se sestaví jednou při startu služby: instance operátorů, jejich
+    dávkové funkce pro `FastAnonymizer` a `OperatorConfig` pro Presidio
+    `AnonymizerEngine`. Při anonymizaci se tak už nic nevyhledává ani nevytváří.
+    """
+
+    def __init__(
+        self,
+        operators: Optional[Dict[str, Type[CzechBaseOperator]]] = None,
+        params: Optional[Dict[str, Dict]] = None,
+        pseudonym_store: Optional[PseudonymStore] = None,
+        pseudonymized_entities: Optional[List[str]] = None,
+    ):
+        """
+        Inicializace plánu.
+
+        Args:
+            operators: Mapování typ entity -> třída operátoru (None = DEFAULT_OPERATORS)
+            params: Volitelné parametry operátorů podle typu entity
+            pseudonym_store: Úložiště pseudonymů; pokud je zadané, vybrané typy
+                entit se pseudonymizují konzistentně napříč dokumenty
+            pseudonymized_entities: Typy entit k pseudonymizaci
+                (None = DEFAULT_PSEUDONYMIZED_ENTITIES)
+        """
+        self.operator_classes = dict(DEFAULT_OPERATORS if operators is None else operators)
+        self.params = dict(params or {})
+
+        if pseudonym_store is not None:
+            if pseudonymized_entities is None:
+                pseudonymized_entities = DEFAULT_PSEUDONYMIZED_ENTITIES
+            for entity_type in pseudonymized_entities:
+                self.operator_classes[entity_type] = PseudonymizeOperator
+                self.params[entity_type] = {"store": pseudonym_store, "entity_type": entity_type}
+
+        # Jedna instance pro každou třídu operátoru, sdílená mezi typy entit
+        instances = {cls: cls() for cls in set(self.operator_classes.values())}
+        self.operators: Dict[str, CzechBaseOperator] = {
+            entity_type: instances[cls] for entity_type, cls in self.operator_classes.items()
+        }
+        for entity_type, operator in self.operators.items():
+            operator.validate(self.params.get(entity_type))
+
+        self.batch_operators: Dict[str, Tuple[str, BatchOperator]] = {
+            entity_type: (operator.operator_name(), self._bind_batch(operator, self.params.get(entity_type)))
+            for entity_type, operator in self.operators.items()
+        }
+        self.operator_configs: Dict[str, OperatorConfig] = {
+            entity_type: OperatorConfig(operator.operator_name(), self.params.get(entity_type, {}))
+            for entity_type, operator in self.operators.items()
+        }
+
+    @staticmethod
+    def _bind_batch(operator: CzechBaseOperator, params: Optional[Dict]) -> BatchOperator:
+        """Vrátí dávkovou funkci operátoru s navázanými parametry."""
+        return lambda values: operator.operate_batch(values, params)
+
+    def register(self, anonymizer: AnonymizerEngine) -> None:
+        """
+        Zaregistruje operátory plánu do Presidio AnonymizerEngine.
+
+        Args:
+            anonymizer: Engine, do kterého se operátory přidají
+        """
+        for cls in set(self.operator_classes.values()):
+            anonymizer.add_anonymizer(cls)
+        logger.info(f"Registered {len(set(self.operator_classes.values()))} Czech operators for {len(self.operators)} entity types")
@@ -1,4 +1,7 @@
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Union
 import sys
 from pathlib import Path
@@ -8,13 +11,19 @@ root_path = Path(__file__).parent.parent
 sys.path.append(str(root_path))
 
 from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
-from presidio_analyzer.nlp_engine import NlpEngineProvider
+from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngineProvider
 from presidio_anonymizer import AnonymizerEngine
-# from presidio_anonymizer.entities import OperatorConfig # Není použito
 from presidio_analyzer.recognizer_result import RecognizerResult
 
 from models.document import Document, AnonymizedDocument, DetectedEntity, AnonymizedEntity
+from models.entity_store import EntityStore
 from recognizers.registry import CzechRecognizerRegistry
+from services.language_detector import LanguageDetector
+from services.fast_anonymizer import FastAnonymizer
+from services.conflict_resolver import ConflictResolver
+from services.operator_plan import OperatorPlan
+from services.pseudonym_store import PseudonymStore
+from services.structured_processor import StructuredProcessor
 
 # Nastavení loggeru
 logging.basicConfig(
@@ -27,10 +36,36 @@ class PresidioService:
     """
     Služba pro anonymizaci dokumentů pomocí Microsoft Presidio.
     """
+
+    # Mapování detekovaného jazyka na analyzační pipeline. Slovenština nemá
+    # vlastní model ani rozpoznávače, česká pipeline je jí nejblíže.
+    LANGUAGE_PIPELINES = {"cs": "cs", "sk": "cs", "en": "en"}
+
+    # Hodnoty metadata["language"], které znamenají automatickou detekci
+    AUTO_LANGUAGE_VALUES = (None, "", "auto", "mixed")
+
+    # Výchozí minimální skóre entity - nižší práh pro vyšší recall
+    SCORE_THRESHOLD = 0.3
+
+    # Maximální počet dokumentů, jejichž směrování se drží v cache
+    ROUTING_CACHE_SIZE = 1024
     
-    def __init__(self):
+    def __init__(
+        self,
+        use_fast_anonymizer: bool = True,
+        conflict_policy: Optional[str] = "highest_score",
+        pseudonym_store: Optional[PseudonymStore] = None,
+    ):
         """
         Inicializace služby Presidio.
+        
+        Args:
+            use_fast_anonymizer: Použít interní rychlou anonymizaci místo
+                Presidio AnonymizerEngine
+            conflict_policy: Politika řešení překryvů entit napříč rozpoznávači
+                (highest_score, longest_span, entity_priority; None = vypnuto)
+            pseudonym_store: Úložiště pro konzistentní pseudonymizaci osob
+                a identifikátorů napříč dokumenty (None = bez pseudonymizace)
         """
         nlp_configuration = {
             "nlp_engine_name": "spacy",
@@ -56,8 +91,23 @@ class PresidioService:
         # Registrace specializovaných českých rozpoznávačů do nakonfigurovaného registru
         CzechRecognizerRegistry.register_czech_recognizers(registry)
         
-        # Inicializace anonymizeru
+        # Inicializace anonymizeru a plánu českých operátorů (sestaví se jednou)
+        self.pseudonym_store = pseudonym_store
+        self.operator_plan = OperatorPlan(pseudonym_store=pseudonym_store)
         self.anonymizer = AnonymizerEngine()
+        self.operator_plan.register(self.anonymizer)
+        self.fast_anonymizer = FastAnonymizer(self.operator_plan.batch_operators)
+        self.use_fast_anonymizer = use_fast_anonymizer
+        self.conflict_resolver = ConflictResolver(conflict_policy) if conflict_policy else None
+
+        # Detekce jazyka a cache rozhodnutí o směrování dokumentů
+        self.language_detector = LanguageDetector()
+        # Službu sdílí vlákna pruhů a dávkovače, LRU cache proto chrání zámek
+        self._routing_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._routing_lock = threading.Lock()
+
+        # Anonymizace JSON/XML/HTML dokumentů po textových uzlech
+        self.structured_processor = StructuredProcessor(self)
         
         logger.info("Presidio service initialized with English and Czech (multilang model) support and Czech recognizers")
     
@@ -70,43 +120,39 @@ class PresidioService:
             language: Jazyk textu (výchozí: čeština)
             
         Returns:
-            Tuple obsahující seznam detekovaných entit a původní výsledky analyzeru
+            Tuple obsahující seznam detekovaných entit a výsledky analyzeru po vyřešení překryvů
         """
         logger.info(f"Analyzing text (length: {len(text)}) using language: {language}")
         
-        # Seznam entit k detekci - vezmeme všechny, které registry podporují pro daný jazyk
-        # Pokud bychom chtěli omezit, museli bychom to zde specifikovat.
-        # Prozatím necháme Presidio, ať si samo vybere relevantní pro daný jazyk z registru.
-        entities_to_detect = None
-        
         # Analýza textu pomocí Presidio Analyzer
         # Zde předáváme language, AnalyzerEngine by měl interně vybrat správný model
         # a relevantní rozpoznávače z registru pro daný jazyk.
-        results = self.analyzer.analyze(
-            text=text,
-            language=language,
-            entities=entities_to_detect,
-            allow_list=None, # Prozatím bez allow-listu
-            score_threshold=0.3  # Nižší práh pro vyšší recall, můžeme upravit
-        )
+        store = self._resolve_conflicts(EntityStore.from_results(text, self._run_analyzer(text, language)))
         
-        # Konverze výsledků na DetectedEntity
-        detected_entities = []
-        for result in results:
-            entity = DetectedEntity(
-                entity_type=result.entity_type,
-                start=result.start,
-                end=result.end,
-                score=result.score,
-                text=text[result.start:result.end],
-                context=self._get_context(text, result.start, result.end),
-                # recognition_metadata by se dalo přidat, pokud by bylo relevantní
-                metadata={}
-            )
-            detected_entities.append(entity)
+        # Konverze výsledků na DetectedEntity - až zde, na hranici API
+        detected_entities = store.to_detected_entities()
         
         logger.info(f"Detected {len(detected_entities)} entities")
-        return detected_entities, results # Vracíme i původní results pro anonymizaci
+        return detected_entities, store.to_results(RecognizerResult) # Vracíme i výsledky pro anonymizaci
+
+    def analyze_to_store(
+        self, text: str, language: str = "cs", entities: Optional[List[str]] = None
+    ) -> EntityStore:
+        """
+        Analyzuje text a vrátí entity v kompaktním interním úložišti.
+        
+        Na rozdíl od `analyze_text` nevytváří pydantic modely ani kopie textu entit,
+        je proto vhodná pro interní zpracování dokumentů s mnoha entitami.
+        
+        Args:
+            text: Text k analýze
+            language: Jazyk analyzační pipeline
+            entities: Seznam entit k detekci (None = všechny)
+            
+        Returns:
+            Úložiště detekovaných entit
+        """
+        return self._resolve_conflicts(EntityStore.from_results(text, self._run_analyzer(text, language, entities)))
     
     def anonymize_text(
         self, 
@@ -124,63 +170,85 @@ class PresidioService:
         Returns:
             Tuple obsahující anonymizovaný text a seznam anonymizovaných entit
         """
-        logger.info(f"Anonymizing text based on {len(analyzer_results)} analyzer results")
+        return self.anonymize_store(text, EntityStore.from_results(text, analyzer_results))
+
+    def anonymize_store(self, text: str, store: EntityStore) -> tuple[str, List[AnonymizedEntity]]:
+        """
+        Anonymizuje text na základě entit v interním úložišti.
+        
+        Args:
+            text: Text k anonymizaci
+            store: Úložiště detekovaných entit
+            
+        Returns:
+            Tuple obsahující anonymizovaný text a seznam anonymizovaných entit
+        """
+        logger.info(f"Anonymizing text based on {len(store)} analyzer results")
+
+        if self.use_fast_anonymizer:
+            return self._anonymize_store_fast(text, store)
         
-        # Anonymizace textu s použitím původních výsledků analyzeru
+        # Anonymizace textu - anonymizer může výsledky upravovat (slučování),
+        # proto dostává vlastní kopie vytvořené z úložiště
         anonymized_result = self.anonymizer.anonymize(
             text=text,
-            analyzer_results=analyzer_results
-            # Operátory můžeme konfigurovat zde, pokud bychom chtěli jiné než defaultní
-            # operators={"DEFAULT": OperatorConfig("replace", {"new_value": "<ANONYMIZED>"})}
+            analyzer_results=store.to_results(RecognizerResult),
+            operators=self.operator_plan.operator_configs
         )
         
-        # Vytvoření seznamu anonymizovaných entit z anonymized_result.items
+        # Mapování položek anonymizeru na entity v úložišti podle pozic start a end.
+        # Pydantic modely se vytváří jen jednou, bez opakované validace a bez kontextu.
+        span_index = store.span_index()
         anonymized_entities = []
-        # Potřebujeme původní detekované entity pro vytvoření AnonymizedEntity
-        # To je trochu nešikovné, pokud bychom neměli původní DetectedEntity.
-        # Prozatím předpokládáme, že si je volající podržel, nebo je zrekonstruujeme.
-        # Zde by bylo lepší mít původní DetectedEntity.
-        # Pro jednoduchost nyní vytvoříme AnonymizedEntity s informacemi, které máme.
-
-        # Získání mapování z RecognizerResult na text entity
-        # Toto je složitější, protože anonymizer_result.items neobsahuje přímo původní text entity,
-        # ale operátor a nový text.
-        # Nejlepší by bylo, kdyby anonymize vracel i mapování na původní entity,
-        # nebo kdybychom si DetectedEntity předávali.
-
-        # Prozatímní zjednodušení:
-        # Budeme iterovat přes anonymizer_result.items a snažit se vytvořit AnonymizedEntity.
-        # Původní text entity budeme muset odvodit z text[item.start:item.end]
-        # Původní typ entity a skóre také z analyzer_results.
-
-        # Mapování RecognizerResult (z analyzer_results) na AnonymizerResultItem (z anonymized_result.items)
-        # je založeno na pozicích start a end.
-
-        # Vytvoříme slovník pro rychlé vyhledání RecognizerResult podle pozice
-        analyzer_results_map = {(res.start, res.end): res for res in analyzer_results}
-
         for item in anonymized_result.items:
-            original_recognizer_result = analyzer_results_map.get((item.start, item.end))
-            if original_recognizer_result:
-                original_entity_obj = DetectedEntity(
-                    entity_type=original_recognizer_result.entity_type,
-                    start=original_recognizer_result.start,
-                    end=original_recognizer_result.end,
-                    score=original_recognizer_result.score,
-                    text=text[original_recognizer_result.start:original_recognizer_result.end],
-                    context="", # Kontext bychom mohli doplnit, pokud bychom ho měli u RecognizerResult
-                    metadata={}
-                )
-                anonymized_entity = AnonymizedEntity(
-                    original_entity=original_entity_obj,
+            index = span_index.get((item.start, item.end))
+            if index is not None:
+                anonymized_entities.append(AnonymizedEntity.model_construct(
+                    original_entity=store.to_detected_entity(index, with_context=False),
                     anonymized_text=item.text, # Toto je již anonymizovaný text
                     operator_name=item.operator,
                     metadata={}
-                )
-                anonymized_entities.append(anonymized_entity)
+                ))
         
         logger.info(f"Text anonymized successfully")
         return anonymized_result.text, anonymized_entities
+
+    def _anonymize_store_fast(self, text: str, store: EntityStore) -> tuple[str, List[AnonymizedEntity]]:
+        """
+        Anonymizuje text interním rychlým anonymizátorem.
+        
+        Anonymizátor vrací náhrady spolu s indexem původní entity, takže
+        každá anonymizovaná entita je přesně spárována se svou detekcí.
+        
+        Args:
+            text: Text k anonymizaci
+            store: Úložiště detekovaných entit
+            
+        Returns:
+            Tuple obsahující anonymizovaný text a seznam anonymizovaných entit
+        """
+        result = self.fast_anonymizer.anonymize(text, store)
+
+        anonymized_entities = []
+        for index, start, end, replacement, operator_name in result.items:
+            original_entity = DetectedEntity.model_construct(
+                entity_type=store.entity_type(index),
+                start=start,
+                end=end,
+                score=store.scores[index],
+                text=text[start:end],
+                context="",
+                metadata={}
+            )
+            anonymized_entities.append(AnonymizedEntity.model_construct(
+                original_entity=original_entity,
+                anonymized_text=replacement,
+                operator_name=operator_name,
+                metadata={}
+            ))
+
+        logger.info(f"Text anonymized successfully")
+        return result.text, anonymized_entities
     
     def process_document(self, document: Document) -> AnonymizedDocument:
         """
@@ -193,33 +261,94 @@ class PresidioService:
             Anonymizovaný dokument
         """
         logger.info(f"Processing document: {document.id}")
+
+        # Strukturované dokumenty se analyzují jen v textových uzlech
+        if self.structured_processor.supports(document.content_type):
+            return self.structured_processor.process(document)
+
+        # Směrování dokumentu (nebo jednotlivých odstavců smíšeného dokumentu)
+        # do analyzační pipeline podle metadat nebo detekovaného jazyka
+        routing = self._route_document(document)
+        detected = self._analyze_segments(document.content, routing["segments"])
+
+        anonymized_document = self._build_document(document, routing, detected)
         
-        # Detekce entit - použití jazyka dokumentu, pokud je specifikován, jinak výchozí 'cs'
-        # Prozatím předpokládáme, že jazyk je 'cs' nebo 'en' podle toho, co podporujeme.
-        # Pokud by dokument měl vlastní atribut language, mohli bychom ho použít.
-        # Pro tento příklad použijeme 'cs' jako výchozí, pokud není řečeno jinak.
-        # V našem případě testovací skript volá analyze_text s explicitním jazykem.
-
-        # Použijeme 'cs' jako výchozí pro process_document, pokud dokument nemá specifikovaný jazyk
-        # a pokud je 'cs' podporováno.
-        # V tomto bodě je PresidioService již inicializováno s podporou pro 'en' a 'cs'.
-        # PresidioService by měl mít nějakou logiku pro určení jazyka, pokud není explicitně dán.
-        # Prozatím, pokud Document nemá jazyk, použijeme 'cs'.
-        lang_to_use = document.metadata.get("language", "cs") if document.metadata else "cs"
-        if lang_to_use not in self.analyzer.supported_languages:
-            logger.warning(f"Language '{lang_to_use}' not supported by analyzer, defaulting to 'en'.")
-            lang_to_use = "en" # Fallback na angličtinu, pokud specifikovaný jazyk není podporován
-
-        detected_entities, analyzer_results = self.analyze_text(document.content, language=lang_to_use)
+        logger.info(f"Document processed successfully")
+        return anonymized_document
+
+    def process_documents(
+        self,
+        documents: List[Document],
+        batch_size: int = 32,
+        score_threshold: Optional[float] = None,
+    ) -> List[AnonymizedDocument]:
+        """
+        Zpracuje více dokumentů najednou s dávkovým během NLP modelu.
+
+        Segmenty všech dokumentů se seskupí podle analyzační pipeline a spaCy
+        je zpracuje jedním voláním `process_batch`, rozpoznávače pak běží nad
+        hotovými NLP artefakty. Výsledek je stejný jako u `process_document`
+        pro každý dokument zvlášť. Strukturované dokumenty se zpracují
+        jednotlivě.
+
+        Args:
+            documents: Dokumenty ke zpracování
+            batch_size: Počet textů v jednom průchodu NLP modelu
+            score_threshold: Minimální skóre detekované entity
+                (None = výchozí práh služby)
+
+        Returns:
+            Anonymizované dokumenty ve stejném pořadí
+        """
+        results: List[Optional[AnonymizedDocument]] = [None] * len(documents)
+        routings: Dict[int, Dict] = {}
+        # Segmenty podle pipeline: (index dokumentu, posun, text segmentu)
+        jobs: Dict[str, List[tuple]] = {}
+        for index, document in enumerate(documents):
+            if self.structured_processor.supports(document.content_type):
+                results[index] = self.structured_processor.process(document)
+                continue
+            routing = self._route_document(document)
+            routings[index] = routing
+            for segment in routing["segments"]:
+                segment_text = document.content[segment["start"]:segment["end"]]
+                jobs.setdefault(segment["pipeline"], []).append((index, segment["start"], segment_text))
+
+        stores = {index: EntityStore(documents[index].content) for index in routings}
+        for pipeline, segments in jobs.items():
+            texts = [segment_text for _, _, segment_text in segments]
+            batch = self.nlp_engine.process_batch(texts, language=pipeline, batch_size=batch_size)
+            for (index, offset, segment_text), (_, nlp_artifacts) in zip(segments, batch):
+                stores[index].extend_results(
+                    self._run_analyzer(segment_text, pipeline, nlp_artifacts=nlp_artifacts, score_threshold=score_threshold),
+                    offset,
+                )
+
+        for index, routing in routings.items():
+            results[index] = self._build_document(documents[index], routing, stores[index])
+        logger.info(f"Processed batch of {len(documents)} documents ({sum(map(len, jobs.values()))} segments)")
+        return results
+
+    def _build_document(self, document: Document, routing: Dict, detected: EntityStore) -> AnonymizedDocument:
+        """
+        Vyřeší překryvy entit, anonymizuje text a sestaví výsledný dokument.
+
+        Args:
+            document: Zpracovávaný dokument
+            routing: Rozhodnutí o směrování dokumentu
+            detected: Detekované entity s pozicemi vůči celému textu
+
+        Returns:
+            Anonymizovaný dokument
+        """
+        # Jednotné řešení překryvů entit ze všech rozpoznávačů a segmentů
+        store = self._resolve_conflicts(detected)
         
         # Anonymizace textu
-        anonymized_text, anonymized_entities = self.anonymize_text(
-            document.content, 
-            analyzer_results # Předáváme přímo výsledky z analyzeru
-        )
+        anonymized_text, anonymized_entities = self.anonymize_store(document.content, store)
         
         # Vytvoření anonymizovaného dokumentu
-        anonymized_document = AnonymizedDocument(
+        return AnonymizedDocument(
             id=f"anon_{document.id}" if document.id else None,
             content=anonymized_text,
             content_type=document.content_type,
@@ -227,46 +356,179 @@ class PresidioService:
             entities=anonymized_entities,
             metadata=document.metadata,
             statistics={
-                "total_entities_detected": len(detected_entities),
-                "entities_by_type": self._count_entities_by_type(detected_entities),
+                "total_entities_detected": len(store),
+                "entities_by_type": store.count_by_type(),
+                "conflicts_resolved": len(detected) - len(store),
+                "language_routing": routing,
                 "processing_time_ms": 0  # Toto by mělo být měřeno reálně
             }
         )
-        
-        logger.info(f"Document processed successfully")
-        return anonymized_document
     
-    def _get_context(self, text: str, start: int, end: int, window: int = 20) -> str:
+    def _run_analyzer(
+        self,
+        text: str,
+        language: str,
+        entities: Optional[List[str]] = None,
+        nlp_artifacts: Optional[NlpArtifacts] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[RecognizerResult]:
         """
-        Získá kontext kolem entity.
+        Spustí Presidio Analyzer nad textem v dané pipeline.
         
         Args:
-            text: Celý text
-            start: Počáteční pozice entity
-            end: Koncová pozice entity
-            window: Velikost okna pro kontext
+            text: Text k analýze
+            language: Jazyk analyzační pipeline
+            entities: Seznam entit k detekci (None = všechny)
+            nlp_artifacts: Hotové NLP artefakty z dávkového běhu modelu
+                (None = model se spustí nad textem)
+            score_threshold: Minimální skóre entity (None = výchozí práh)
             
         Returns:
-            Kontext kolem entity
+            Výsledky analyzeru
         """
-        context_start = max(0, start - window)
-        context_end = min(len(text), end + window)
-        return text[context_start:context_end]
-    
-    def _count_entities_by_type(self, entities: List[DetectedEntity]) -> Dict[str, int]:
+        return self.analyzer.analyze(
+            text=text,
+            language=language,
+            entities=entities,
+            allow_list=None, # Prozatím bez allow-listu
+            score_threshold=self.SCORE_THRESHOLD if score_threshold is None else score_threshold,
+            nlp_artifacts=nlp_artifacts,
+        )
+
+    def _route_document(self, document: Document) -> Dict:
+        """
+        Rozhodne, kterou analyzační pipeline použít pro dokument či jeho odstavce.
+        
+        Explicitně zadaný podporovaný jazyk v metadatech má přednost. Jinak se
+        jazyk detekuje po odstavcích. Rozhodnutí se ukládá do cache podle ID
+        a otisku obsahu dokumentu, takže opakované zpracování detekci přeskočí.
+        
+        Args:
+            document: Dokument ke zpracování
+            
+        Returns:
+            Slovník se zdrojem rozhodnutí, jazykem dokumentu a seznamem segmentů
+        """
+        requested = document.metadata.get("language") if document.metadata else None
+
+        if requested not in self.AUTO_LANGUAGE_VALUES:
+            pipeline = requested
+            if pipeline not in self.analyzer.supported_languages:
+                logger.warning(f"Language '{requested}' not supported by analyzer, defaulting to 'en'.")
+                pipeline = "en" # Fallback na angličtinu, pokud specifikovaný jazyk není podporován
+            return {
+                "source": "metadata",
+                "language": requested,
+                "cached": False,
+                "segments": [{
+                    "start": 0,
+                    "end": len(document.content),
+                    "language": requested,
+                    "pipeline": pipeline,
+                    "confidence": 1.0,
+                }],
+            }
+
+        cache_key = self._routing_cache_key(document)
+        with self._routing_lock:
+            cached = self._routing_cache.get(cache_key)
+            if cached is not None:
+                self._routing_cache.move_to_end(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        segments = self.language_detector.detect_segments(document.content)
+        languages = {segment.language for segment in segments}
+        routing = {
+            "source": "detected",
+            "language": segments[0].language if len(languages) == 1 else "mixed",
+            "cached": False,
+            "segments": [
+                {
+                    "start": segment.start,
+                    "end": segment.end,
+                    "language": segment.language,
+                    "pipeline": self.LANGUAGE_PIPELINES.get(segment.language, "cs"),
+                    "confidence": round(segment.confidence, 3),
+                }
+                for segment in segments
+            ],
+        }
+
+        self._store_routing(cache_key, routing)
+
+        logger.info(f"Document {document.id} routed as '{routing['language']}' ({len(segments)} segments)")
+        return routing
+
+    @staticmethod
+    def _routing_cache_key(document: Document) -> tuple:
+        """Klíč cache směrování: ID a otisk obsahu dokumentu."""
+        return (document.id, hashlib.sha1(document.content.encode("utf-8")).hexdigest())
+
+    def _store_routing(self, cache_key: tuple, routing: Dict) -> None:
+        """Uloží rozhodnutí o směrování do LRU cache."""
+        with self._routing_lock:
+            self._routing_cache[cache_key] = routing
+            self._routing_cache.move_to_end(cache_key)
+            if len(self._routing_cache) > self.ROUTING_CACHE_SIZE:
+                self._routing_cache.popitem(last=False)
+
+    def remember_result(self, document: Document, anonymized_document: AnonymizedDocument) -> None:
+        """
+        Převezme do cache tohoto procesu výsledek zpracování z jiného procesu.
+
+        Worker watchdogu zpracovává dokumenty v procesu vzniklém forkem, jeho
+        cache se proto do rodiče nepropíše a po ukončení workeru by se ztratila.
+        Rodič si z vráceného dokumentu uloží detekované směrování a pseudonymy,
+        takže je zdědí i další worker.
+
+        Args:
+            document: Původní dokument
+            anonymized_document: Výsledek zpracování z jiného procesu
+        """
+        routing = (anonymized_document.statistics or {}).get("language_routing")
+        # Strukturované dokumenty se směrují podle spojených textových uzlů, ne obsahu
+        if routing and routing.get("source") == "detected" and not self.structured_processor.supports(document.content_type):
+            self._store_routing(self._routing_cache_key(document), {**routing, "cached": False})
+
+        if self.pseudonym_store is not None:
+            for entity in anonymized_document.entities:
+                if entity.operator_name == "pseudonymize":
+                    original = entity.original_entity
+                    self.pseudonym_store.remember(original.entity_type, original.text, entity.anonymized_text)
+
+    def _analyze_segments(self, text: str, segments: List[Dict]) -> EntityStore:
+        """
+        Analyzuje jednotlivé segmenty textu v jejich pipeline a výsledky převede
+        na pozice v celém textu.
+        
+        Args:
+            text: Celý text dokumentu
+            segments: Segmenty z rozhodnutí o směrování
+            
+        Returns:
+            Úložiště entit s pozicemi vůči celému textu
+        """
+        if len(segments) == 1:
+            return EntityStore.from_results(text, self._run_analyzer(text, segments[0]["pipeline"]))
+
+        store = EntityStore(text)
+        for segment in segments:
+            offset = segment["start"]
+            segment_text = text[offset:segment["end"]]
+            store.extend_results(self._run_analyzer(segment_text, segment["pipeline"]), offset)
+        return store
+
+    def _resolve_conflicts(self, store: EntityStore) -> EntityStore:
         """
-        Spočítá entity podle typu.
+        Vyřeší překryvy entit podle nastavené politiky.
         
         Args:
-            entities: Seznam entit
+            store: Úložiště detekovaných entit
             
         Returns:
-            Slovník s počty entit podle typu
+            Úložiště s nepřekrývajícími se entitami (beze změny, pokud je řešení vypnuto)
         """
-        counts = {}
-        for entity in entities:
-            if entity.entity_type in counts:
-                counts[entity.entity_type] += 1
-            else:
-                counts[entity.entity_type] = 1
-        return counts
+        if self.conflict_resolver is None:
+            return store
+        return self.conflict_resolver.resolve(store)
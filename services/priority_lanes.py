@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Pruhy provozu
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Počet posledních požadavků, ze kterých se počítají percentily latence
+LATENCY_SAMPLES = 1024
+
+
+class LaneFullError(Exception):
+    """Fronta pruhu je plná, požadavek se nepřijme."""
+
+
+def latency_percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Spočítá percentily latence (metoda nejbližšího pořadí).
+
+    Args:
+        samples: Naměřené hodnoty v sekundách
+
+    Returns:
+        Slovník p50/p95/p99 v milisekundách (prázdný bez vzorků)
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        f"p{percentile}": round(ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)] * 1000, 3)
+        for percentile in (50, 95, 99)
+    }
+
+
+class Lane:
+    """Pruh provozu: vlastní workery a omezená fronta čekajících požadavků."""
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        """
+        Inicializace pruhu.
+
+        Args:
+            name: Název pruhu
+            workers: Počet souběžně zpracovávaných požadavků
+            max_queue: Maximální počet požadavků čekajících na worker
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"lane-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._queue_waits: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._stats = {"admitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    @property
+    def pending(self) -> int:
+        """Počet přijatých a dosud nedokončených požadavků."""
+        return self._pending
+
+    def admit(self) -> None:
+        """
+        Přijme požadavek do pruhu.
+
+        Raises:
+            LaneFullError: Pokud jsou všechny workery obsazené a fronta plná
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise LaneFullError(f"Lane '{self.name}' is full ({self._pending} requests pending)")
+            self._pending += 1
+            self._stats["admitted"] += 1
+
+    def started(self) -> None:
+        """Zaznamená začátek zpracování přijatého požadavku."""
+        with self._lock:
+            self._running += 1
+
+    def finished(self, queue_wait: float, latency: float, success: bool) -> None:
+        """
+        Zaznamená dokončení požadavku.
+
+        Args:
+            queue_wait: Doba čekání ve frontě pruhu v sekundách
+            latency: Celková doba od přijetí v sekundách
+            success: Zda zpracování skončilo bez chyby
+        """
+        with self._lock:
+            self._pending -= 1
+            self._running -= 1
+            self._stats["completed" if success else "failed"] += 1
+            self._queue_waits.append(queue_wait)
+            self._latencies.append(latency)
+
+    def withdraw(self) -> None:
+        """Vrátí přijatý požadavek, který se nezačal zpracovávat (zrušení, ukončení pruhu)."""
+        with self._lock:
+            self._pending -= 1
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky pruhu.
+
+        Returns:
+            Slovník s počty požadavků, obsazeností a percentily latence
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+            })
+            queue_waits = list(self._queue_waits)
+            latencies = list(self._latencies)
+        stats["queue_wait_ms"] = latency_percentiles(queue_waits)
+        stats["latency_ms"] = latency_percentiles(latencies)
+        return stats
+
+
+class PriorityLanes:
+    """
+    Oddělení interaktivního a hromadného provozu.
+
+    Každý pruh má vlastní workery a vlastní omezenou frontu, takže dávka
+    souborů nevyčerpá kapacitu pro interaktivní požadavky a plná fronta
+    jednoho pruhu odmítá jen své požadavky. Hromadná práce navíc volá mezi
+    dokumenty `checkpoint`: dokud jsou v interaktivním pruhu rozpracované
+    nebo čekající požadavky, dávka se pozastaví (nejvýše `max_bulk_pause`
+    sekund v kuse, aby pod trvalou interaktivní zátěží nestála úplně).
+    """
+
+    def __init__(
+        self,
+        interactive_workers: int = 16,
+        interactive_queue: int = 256,
+        bulk_workers: int = 1,
+        bulk_queue: int = 8,
+        max_bulk_pause: float = 5.0,
+    ):
+        """
+        Inicializace pruhů.
+
+        Args:
+            interactive_workers: Souběžné interaktivní požadavky
+            interactive_queue: Maximální počet čekajících interaktivních požadavků
+            bulk_workers: Souběžné hromadné požadavky
+            bulk_queue: Maximální počet čekajících hromadných požadavků
+            max_bulk_pause: Nejdelší souvislé pozastavení hromadné práce v sekundách
+        """
+        self.lanes = {
+            INTERACTIVE: Lane(INTERACTIVE, interactive_workers, interactive_queue),
+            BULK: Lane(BULK, bulk_workers, bulk_queue),
+        }
+        self.max_bulk_pause = max_bulk_pause
+        self._interactive_idle = threading.Condition()
+        self._preemption = {"preemptions": 0, "preempted_seconds": 0.0}
+
+    def submit(self, lane_name: str, function: Callable, *args, **kwargs) -> Future:
+        """
+        Přijme úlohu do pruhu a předá ji jeho workerům.
+
+        Args:
+            lane_name: Pruh ("interactive" nebo "bulk")
+            function: Funkce úlohy
+            *args: Poziční argumenty funkce
+            **kwargs: Pojmenované argumenty funkce
+
+        Returns:
+            Future s výsledkem úlohy
+
+        Raises:
+            LaneFullError: Pokud je fronta pruhu plná
+        """
+        lane = self.lanes[lane_name]
+        lane.admit()
+        admitted = time.monotonic()
+
+        def task():
+            started = time.monotonic()
+            lane.started()
+            success = False
+            try:
+                result = function(*args, **kwargs)
+                success = True
+                return result
+            finally:
+                lane.finished(started - admitted, time.monotonic() - admitted, success)
+                self._notify(lane_name)
+
+        def withdraw_cancelled(future: Future) -> None:
+            # Volající odešel dřív, než se úloha začala zpracovávat
+            if future.cancelled():
+                lane.withdraw()
+                self._notify(lane_name)
+
+        try:
+            future = lane.executor.submit(task)
+        except RuntimeError:
+            # Pruh byl ukončen
+            lane.withdraw()
+            raise
+        future.add_done_callback(withdraw_cancelled)
+        return future
+
+    def _notify(self, lane_name: str) -> None:
+        """Probudí pozastavenou hromadnou práci po ubytí interaktivního požadavku."""
+        if lane_name == INTERACTIVE:
+            with self._interactive_idle:
+                self._interactive_idle.notify_all()
+
+    async def run(self, lane_name: str, function: Callable, *args, **kwargs) -> Any:
+        """
+        Spustí úlohu v pruhu a počká na výsledek bez blokování smyčky událostí.
+
+        Args:
+            lane_name: Pruh ("interactive" nebo "bulk")
+            function: Funkce úlohy
+            *args: Poziční argumenty funkce
+            **kwargs: Pojmenované argumenty funkce
+
+        Returns:
+            Výsledek úlohy
+        """
+        return await asyncio.wrap_future(self.submit(lane_name, function, *args, **kwargs))
+
+    def checkpoint(self) -> float:
+        """
+        Místo, kde lze hromadnou práci přerušit (volá se mezi dokumenty).
+
+        Returns:
+            Doba pozastavení v sekundách (0 = interaktivní pruh byl volný)
+        """
+        interactive = self.lanes[INTERACTIVE]
+        if not interactive.pending:
+            return 0.0
+        started = time.monotonic()
+        deadline = started + self.max_bulk_pause
+        with self._interactive_idle:
+            while interactive.pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._interactive_idle.wait(remaining)
+            paused = time.monotonic() - started
+            self._preemption["preemptions"] += 1
+            self._preemption["preempted_seconds"] += paused
+        return paused
+
+    def shutdown(self) -> None:
+        """Ukončí workery všech pruhů po dokončení rozpracovaných úloh."""
+        for lane in self.lanes.values():
+            lane.executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky pruhů.
+
+        Returns:
+            Slovník se statistikami každého pruhu a přerušení hromadné práce
+        """
+        stats = {name: lane.get_stats() for name, lane in self.lanes.items()}
+        with self._interactive_idle:
+            stats[BULK]["preemptions"] = self._preemption["preemptions"]
+            stats[BULK]["preempted_seconds"] = round(self._preemption["preempted_seconds"], 3)
+        return stats
@@ -0,0 +1,317 @@
+import hashlib
+import hmac
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from services.sqlite_connections import SqliteConnections
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Typy entit, u kterých se při normalizaci ignorují oddělovače (lomítka, mezery)
+NUMERIC_ID_TYPES = {
+    "CZECH_BIRTH_NUMBER",
+    "CZECH_HEALTH_INSURANCE_NUMBER",
+    "CZECH_ICO",
+    "CZECH_DIC",
+    "CZECH_OP_NUMBER",
+    "CZECH_PASSPORT_NUMBER",
+    "CZECH_PHONE_NUMBER",
+    "PHONE_NUMBER",
+}
+
+# Počet parametrů v jednom dotazu IN (...) - bezpečně pod limitem SQLite
+_SQL_CHUNK_SIZE = 500
+
+# Počet zkrácených kandidátů pseudonymu, než se při kolizích použije celý hash
+_MAX_COLLISION_ATTEMPTS = 16
+
+
+class PseudonymStore:
+    """
+    Perzistentní úložiště konzistentních pseudonymů.
+
+    Klíčem mapování je klíčovaný hash (HMAC-SHA256) typu entity
+    a normalizované hodnoty, původní hodnoty se neukládají. Mapování v lokálním
+    SQLite souboru (WAL, tabulka bez rowid s primárním klíčem typ + hash) je
+    autoritativní: hash -> pseudonym, přičemž pseudonym je unikátní (UNIQUE
+    index). Nový pseudonym se navrhne ze zkráceného hashe; pokud ho už má jiná
+    hodnota, zkusí se další kandidát odvozený z hashe a počítadla, takže kolize
+    zkrácených hashů nikdy nesloučí dva pacienty pod jeden pseudonym. Před
+    databází je LRU cache v paměti procesu.
+
+    Vyhledávání je dávkové: `bulk_get_or_create` vyřídí všechny hodnoty
+    jednoho typu z dokumentu jedním dotazem a jednou zápisovou transakcí.
+    Souběžní zapisovatelé (dávkoví workeři) zakládají pseudonymy uvnitř
+    `BEGIN IMMEDIATE` a před zápisem znovu načtou, co mezitím zapsal jiný
+    proces, takže stejná hodnota dostane ve sdílené databázi vždy jeden
+    pseudonym.
+    """
+
+    def __init__(self, path: str, secret_key: str, cache_size: int = 100_000, token_length: int = 12):
+        """
+        Inicializace úložiště.
+
+        Args:
+            path: Cesta k SQLite souboru
+            secret_key: Tajný klíč pro odvození pseudonymů
+            cache_size: Maximální počet položek v LRU cache
+            token_length: Počet hexadecimálních znaků pseudonymu (kolize
+                zkrácených hashů se řeší v úložišti)
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.token_length = token_length
+        self._key = secret_key.encode("utf-8")
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connections = SqliteConnections(path)
+        self._stats = {
+            "lookups": 0,
+            "cache_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "collisions": 0,
+            "bulk_calls": 0,
+            "lookup_time_ms": 0.0,
+            "max_lookup_ms": 0.0,
+        }
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS pseudonyms ("
+            " entity_type TEXT NOT NULL,"
+            " value_hash BLOB NOT NULL,"
+            " pseudonym TEXT NOT NULL,"
+            " PRIMARY KEY (entity_type, value_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._connections.get().execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS pseudonyms_pseudonym ON pseudonyms (pseudonym)"
+        )
+
+    @staticmethod
+    def normalize(entity_type: str, value: str) -> str:
+        """
+        Normalizuje hodnotu tak, aby různé zápisy téže entity měly stejný pseudonym.
+
+        Args:
+            entity_type: Typ entity
+            value: Původní hodnota
+
+        Returns:
+            Normalizovaná hodnota
+        """
+        normalized = " ".join(value.split()).casefold()
+        if entity_type in NUMERIC_ID_TYPES:
+            normalized = normalized.replace("/", "").replace(" ", "").replace("-", "")
+        return normalized
+
+    def _digest(self, entity_type: str, normalized: str) -> bytes:
+        """Klíčovaný hash typu entity a normalizované hodnoty."""
+        message = f"{entity_type}\x00{normalized}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def _candidates(self, entity_type: str, digest: bytes) -> Iterator[str]:
+        """
+        Navrhne kandidáty pseudonymu pro hash v pevném pořadí.
+
+        První kandidát je zkrácený hash, další zkrácené HMAC hashe s počítadlem;
+        poslední je celý hash, který je unikátní stejně jako primární klíč.
+        """
+        yield f"{entity_type}_{digest.hex()[:self.token_length]}"
+        for attempt in range(1, _MAX_COLLISION_ATTEMPTS):
+            candidate = hmac.new(self._key, digest + attempt.to_bytes(4, "big"), hashlib.sha256).hexdigest()
+            yield f"{entity_type}_{candidate[:self.token_length]}"
+        yield f"{entity_type}_{digest.hex()}"
+
+    def get_or_create(self, entity_type: str, value: str) -> str:
+        """
+        Vrátí pseudonym jedné hodnoty.
+
+        Args:
+            entity_type: Typ entity
+            value: Původní hodnota
+
+        Returns:
+            Pseudonym
+        """
+        return self.bulk_get_or_create(entity_type, [value])[0]
+
+    def bulk_get_or_create(self, entity_type: str, values: Sequence[str]) -> List[str]:
+        """
+        Vrátí pseudonymy pro všechny hodnoty jednoho typu entity.
+
+        Args:
+            entity_type: Typ entity
+            values: Původní hodnoty (mohou se opakovat)
+
+        Returns:
+            Pseudonymy ve stejném pořadí jako `values`
+        """
+        start_time = time.perf_counter()
+        keys = [(entity_type, self.normalize(entity_type, value)) for value in values]
+        resolved: Dict[Tuple[str, str], str] = {}
+        missing: List[Tuple[str, str]] = []
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                pseudonym = self._cache.get(key)
+                if pseudonym is None:
+                    missing.append(key)
+                else:
+                    self._cache.move_to_end(key)
+                    resolved[key] = pseudonym
+            cache_hits = len(resolved)
+
+        store_hits = 0
+        created = 0
+        collisions = 0
+        if missing:
+            digests = {key: self._digest(entity_type, key[1]) for key in missing}
+            stored = self._select(entity_type, list(digests.values()))
+            store_hits = len(stored)
+            new_digests = [digest for digest in digests.values() if digest not in stored]
+            if new_digests:
+                inserted, created, collisions = self._insert(entity_type, new_digests)
+                store_hits += len(new_digests) - created
+                stored.update(inserted)
+            for key, digest in digests.items():
+                resolved[key] = stored[digest]
+
+            with self._lock:
+                for key in missing:
+                    self._cache[key] = resolved[key]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        with self._lock:
+            self._stats["lookups"] += len(values)
+            self._stats["cache_hits"] += cache_hits
+            self._stats["store_hits"] += store_hits
+            self._stats["misses"] += created
+            self._stats["collisions"] += collisions
+            self._stats["bulk_calls"] += 1
+            self._stats["lookup_time_ms"] += elapsed_ms
+            self._stats["max_lookup_ms"] = max(self._stats["max_lookup_ms"], elapsed_ms)
+
+        return [resolved[key] for key in keys]
+
+    def remember(self, entity_type: str, value: str, pseudonym: str) -> None:
+        """
+        Vloží známý pseudonym do LRU cache (např. pseudonym založený v jiném procesu).
+
+        Args:
+            entity_type: Typ entity
+            value: Původní hodnota
+            pseudonym: Pseudonym hodnoty z úložiště
+        """
+        key = (entity_type, self.normalize(entity_type, value))
+        with self._lock:
+            self._cache[key] = pseudonym
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def merge_stats(self, delta: Dict) -> None:
+        """
+        Připočte statistiky vyhledávání z jiného procesu (např. workeru watchdogu).
+
+        Args:
+            delta: Rozdíl statistik vrácený `get_stats(since=...)` v jiném procesu
+        """
+        with self._lock:
+            for key in ("lookups", "cache_hits", "store_hits", "misses", "collisions", "bulk_calls", "lookup_time_ms"):
+                self._stats[key] += delta.get(key, 0)
+            self._stats["max_lookup_ms"] = max(self._stats["max_lookup_ms"], delta.get("max_lookup_ms", 0.0))
+
+    def _select(self, entity_type: str, digests: List[bytes]) -> Dict[bytes, str]:
+        """Načte uložené pseudonymy pro dané hashe (po blocích)."""
+        connection = self._connections.get()
+        stored: Dict[bytes, str] = {}
+        for offset in range(0, len(digests), _SQL_CHUNK_SIZE):
+            chunk = digests[offset:offset + _SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT value_hash, pseudonym FROM pseudonyms WHERE entity_type = ? AND value_hash IN ({placeholders})",
+                [entity_type, *chunk],
+            )
+            stored.update((bytes(value_hash), pseudonym) for value_hash, pseudonym in rows)
+        return stored
+
+    def _insert(self, entity_type: str, digests: List[bytes]) -> Tuple[Dict[bytes, str], int, int]:
+        """
+        Založí pseudonymy pro nové hashe jednou zápisovou transakcí.
+
+        Returns:
+            Mapování hash -> pseudonym, počet založených pseudonymů a počet kolizí
+        """
+        connection = self._connections.get()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Jiný zapisovatel mohl hodnoty založit mezi čtením a zámkem
+            mapping = self._select(entity_type, digests)
+            created = 0
+            collisions = 0
+            for digest in digests:
+                if digest in mapping:
+                    continue
+                for candidate in self._candidates(entity_type, digest):
+                    try:
+                        connection.execute(
+                            "INSERT INTO pseudonyms (entity_type, value_hash, pseudonym) VALUES (?, ?, ?)",
+                            (entity_type, digest, candidate),
+                        )
+                    except sqlite3.IntegrityError:
+                        collisions += 1
+                        continue
+                    mapping[digest] = candidate
+                    created += 1
+                    break
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if collisions:
+            logger.warning(f"Resolved {collisions} pseudonym collisions for {entity_type}")
+        return mapping, created, collisions
+
+    def __len__(self) -> int:
+        return self._connections.get().execute("SELECT COUNT(*) FROM pseudonyms").fetchone()[0]
+
+    def get_stats(self, since: Optional[Dict] = None) -> Dict:
+        """
+        Vrátí statistiky vyhledávání.
+
+        Args:
+            since: Dřívější snímek statistik - vrátí se jen rozdíl od něj
+
+        Returns:
+            Slovník s počty zásahů cache, úložiště, nových pseudonymů, kolizí a latencí
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        if since:
+            for key in ("lookups", "cache_hits", "store_hits", "misses", "collisions", "bulk_calls", "lookup_time_ms"):
+                stats[key] -= since.get(key, 0)
+        unique = stats["cache_hits"] + stats["store_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["cache_hits"] + stats["store_hits"]) / unique, 4) if unique else 0.0
+        stats["avg_lookup_ms"] = round(stats["lookup_time_ms"] / stats["bulk_calls"], 3) if stats["bulk_calls"] else 0.0
+        stats["lookup_time_ms"] = round(stats["lookup_time_ms"], 3)
+        stats["max_lookup_ms"] = round(stats["max_lookup_ms"], 3)
+        return stats
+
+    def close(self) -> None:
+        """Uzavře spojení aktuálního vlákna."""
+        self._connections.close()
+
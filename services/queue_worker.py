@@ -0,0 +1,235 @@
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from models.document import AnonymizedDocument, Document
+from services.retry_policy import RetryPolicy
+from services.work_queue import DEAD, QueueMessage, WorkQueue
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí počet zpráv vyzvednutých najednou (a zpracovaných jedním během modelu)
+DEFAULT_BATCH_SIZE = 32
+
+# Výchozí doba skrytí vyzvednuté dávky v sekundách
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+
+
+class QueueWorker:
+    """
+    Worker, který z fronty vyzvedává dávky dokumentů a anonymizuje je.
+
+    Dávka se zpracuje jedním voláním `process_documents` (dávkový běh NLP
+    modelu). Pokud dávka selže, zpracují se její dokumenty jednotlivě, aby
+    jeden vadný dokument nezdržel ostatní; neúspěšný dokument se podle
+    politiky opakování vrátí do fronty s prodlevou, nebo se přesune mezi
+    mrtvé zprávy. Výsledek se zapisuje do fronty idempotentně, takže
+    opakované doručení po pádu workeru nic nepoškodí.
+    """
+
+    def __init__(
+        self,
+        presidio_service,
+        queue: WorkQueue,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Inicializace workeru.
+
+        Args:
+            presidio_service: Instance PresidioService (nebo služby se stejným rozhraním)
+            queue: Fronta práce
+            batch_size: Maximální počet zpráv vyzvednutých najednou
+            visibility_timeout: Doba skrytí vyzvednuté dávky v sekundách
+                (musí pokrýt zpracování celé dávky)
+            retry_policy: Politika opakování neúspěšných dokumentů
+                (None = výchozí politika)
+            poll_interval: Prodleva mezi dotazy na prázdnou frontu v sekundách
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.presidio_service = presidio_service
+        self.queue = queue
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self.stats = {
+            "batches": 0,
+            "messages": 0,
+            "completed": 0,
+            "duplicates": 0,
+            "retried": 0,
+            "dead": 0,
+            "batch_fallbacks": 0,
+            "busy_seconds": 0.0,
+        }
+
+    def stop(self) -> None:
+        """Požádá worker o ukončení po dokončení rozpracované dávky."""
+        self._stop.set()
+
+    def run(self, max_batches: Optional[int] = None, until_empty: bool = False) -> Dict:
+        """
+        Zpracovává dávky z fronty, dokud není worker zastaven.
+
+        Args:
+            max_batches: Ukončit po tolika dávkách (None = bez omezení)
+            until_empty: Ukončit, jakmile fronta nemá viditelné zprávy
+
+        Returns:
+            Statistiky workeru
+        """
+        started = time.time()
+        batches = 0
+        while not self._stop.is_set() and (max_batches is None or batches < max_batches):
+            if self.run_once():
+                batches += 1
+                continue
+            if until_empty:
+                break
+            self._stop.wait(self.poll_interval)
+        return self.get_stats(time.time() - started)
+
+    def run_once(self) -> int:
+        """
+        Vyzvedne a zpracuje jednu dávku.
+
+        Returns:
+            Počet zpracovaných zpráv (0 = fronta nemá viditelné zprávy)
+        """
+        messages = self.queue.dequeue(self.batch_size, self.visibility_timeout)
+        if not messages:
+            return 0
+
+        started = time.time()
+        self.stats["batches"] += 1
+        self.stats["messages"] += len(messages)
+        # Neplatná zpráva se nezpracuje ani při dalším doručení - rovnou se
+        # vyřadí (politika ji vyhodnotí jako deterministickou chybu) a dávka
+        # pokračuje s platnými dokumenty
+        valid: List[QueueMessage] = []
+        documents: List[Document] = []
+        for message in messages:
+            try:
+                document = Document(**message.payload)
+            except Exception as e:
+                self._fail(message, e)
+                continue
+            valid.append(message)
+            documents.append(document)
+        if not documents:
+            self.stats["busy_seconds"] += time.time() - started
+            return len(messages)
+
+        try:
+            results = self._process_documents(documents)
+        except Exception as e:
+            logger.warning(f"Batch of {len(documents)} documents failed ({type(e).__name__}), processing one by one")
+            self.stats["batch_fallbacks"] += 1
+            results = None
+
+        for index, message in enumerate(valid):
+            if results is not None:
+                self._complete(message, results[index])
+                continue
+            try:
+                self._complete(message, self.presidio_service.process_document(documents[index]))
+            except Exception as e:
+                self._fail(message, e)
+        self.stats["busy_seconds"] += time.time() - started
+        return len(messages)
+
+    def _process_documents(self, documents: List[Document]) -> List[AnonymizedDocument]:
+        """Zpracuje dávku dokumentů (dávkově, pokud to služba umí)."""
+        process_documents = getattr(self.presidio_service, "process_documents", None)
+        if process_documents is not None:
+            return process_documents(documents, batch_size=self.batch_size)
+        return [self.presidio_service.process_document(document) for document in documents]
+
+    def _complete(self, message: QueueMessage, anonymized_document: AnonymizedDocument) -> None:
+        """Zapíše výsledek zprávy."""
+        if self.queue.complete(message, anonymized_document.model_dump(mode="json")):
+            self.stats["completed"] += 1
+        else:
+            self.stats["duplicates"] += 1
+
+    def _fail(self, message: QueueMessage, error: Exception) -> None:
+        """Vrátí neúspěšnou zprávu do fronty, nebo ji přesune mezi mrtvé."""
+        logger.error(f"Error processing message {message.id}: {str(error)}")
+        retry = self.retry_policy.should_retry(error, message.attempts)
+        delay = self.retry_policy.backoff(message.attempts) if retry else 0.0
+        if self.queue.fail(message, error, retry, delay) == DEAD:
+            self.stats["dead"] += 1
+        else:
+            self.stats["retried"] += 1
+
+    def get_stats(self, wall_seconds: Optional[float] = None) -> Dict:
+        """
+        Vrátí statistiky workeru.
+
+        Args:
+            wall_seconds: Doba běhu workeru pro výpočet propustnosti
+
+        Returns:
+            Slovník s počty dávek a zpráv a průměrnou velikostí dávky
+        """
+        stats = dict(self.stats)
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        stats["average_batch_size"] = round(stats["messages"] / stats["batches"], 2) if stats["batches"] else 0.0
+        if wall_seconds:
+            stats["wall_seconds"] = round(wall_seconds, 3)
+            stats["messages_per_second"] = round(stats["messages"] / wall_seconds, 2)
+        return stats
+
+
+def _run_worker_process(worker_factory: Callable[[], QueueWorker], until_empty: bool, results) -> None:
+    """Vstupní bod procesu workeru."""
+    worker = worker_factory()
+    results.put(worker.run(until_empty=until_empty))
+
+
+def run_worker_processes(
+    worker_factory: Callable[[], QueueWorker], processes: int, until_empty: bool = False
+) -> List[Dict]:
+    """
+    Spustí workery v samostatných procesech a počká na jejich konec.
+
+    Procesy vznikají forkem, takže modely načtené (a zahřáté) v rodiči před
+    voláním sdílí všechny workery bez opětovného načítání. Každý proces
+    otevírá vlastní spojení k frontě.
+
+    Args:
+        worker_factory: Funkce vytvářející worker (volá se v procesu workeru)
+        processes: Počet procesů
+        until_empty: Ukončit workery, jakmile je fronta prázdná
+
+    Returns:
+        Statistiky jednotlivých workerů
+    """
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    context = multiprocessing.get_context("fork")
+    results = context.SimpleQueue()
+    workers = [
+        context.Process(target=_run_worker_process, args=(worker_factory, until_empty, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stats = [results.get() for worker in workers if worker.exitcode == 0]
+    logger.info(f"{len(stats)} of {processes} queue workers finished")
+    return stats
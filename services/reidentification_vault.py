@@ -0,0 +1,365 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from cryptography.fernet import Fernet
+
+from models.document import AnonymizedDocument
+from services.sqlite_connections import SqliteConnections
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Počet parametrů v jednom dotazu IN (...) - bezpečně pod limitem SQLite
+_SQL_CHUNK_SIZE = 500
+
+# Operátory, jejichž výstup jednoznačně určuje původní hodnotu. Obecné tokeny
+# jako <PERSON> sdílí všechny výskyty typu, trezor je proto neukládá - jinak
+# by jeden dotaz vrátil všechny uložené hodnoty daného typu.
+REIDENTIFIABLE_OPERATORS = {"pseudonymize"}
+
+# Výchozí maximální počet tokenů v jednom vyhledání pro jedno schválení
+DEFAULT_APPROVAL_MAX_TOKENS = 1000
+
+
+class ApprovalError(Exception):
+    """Schválení zpětné identifikace neexistuje, vypršelo nebo nepokrývá požadavek."""
+
+
+class ReidentificationVault:
+    """
+    Šifrovaný trezor pro zpětnou identifikaci anonymizovaných záznamů.
+
+    Pro každou pseudonymizovanou entitu ukládá token (pseudonym v anonymizovaném
+    dokumentu), ID dokumentu, pozici, typ entity a původní hodnotu zašifrovanou
+    Fernetem (AES-128-CBC + HMAC). Entity nahrazené obecným tokenem (<PERSON>)
+    se neukládají, protože token neurčuje jednu hodnotu.
+    Vyhledávání podle tokenu používá index, nikdy neprochází celou tabulku.
+
+    Vyhledání je vázané na schválení (`grant_approval`): schválení patří
+    jednomu žadateli, má platnost, limit tokenů na dotaz a výčet dokumentů,
+    mimo které se nic nevrátí.
+
+    Zápisy se hromadí v paměti a zapisují po dávkách (`flush_size` záznamů)
+    jednou transakcí přes `executemany`, takže zapnutý trezor dávkové
+    zpracování výrazně nezpomalí.
+    """
+
+    def __init__(self, path: str, key: Union[str, bytes], flush_size: int = 5000):
+        """
+        Inicializace trezoru.
+
+        Args:
+            path: Cesta k SQLite souboru
+            key: Klíč Fernet (viz `generate_key`)
+            flush_size: Počet záznamů, po kterém se vyrovnávací paměť zapíše
+        """
+        self.path = path
+        self.flush_size = flush_size
+        self._fernet = Fernet(key)
+        self._buffer: List[Tuple[str, str, int, int, str, str]] = []
+        self._lock = threading.Lock()
+        self._connections = SqliteConnections(path)
+        self._stats = {
+            "records_buffered": 0,
+            "records_skipped": 0,
+            "records_written": 0,
+            "flushes": 0,
+            "flush_time_ms": 0.0,
+            "lookups": 0,
+            "tokens_requested": 0,
+            "records_returned": 0,
+        }
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connections.get()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS vault_entries ("
+            " token TEXT NOT NULL,"
+            " document_id TEXT,"
+            " start INTEGER NOT NULL,"
+            " end INTEGER NOT NULL,"
+            " entity_type TEXT NOT NULL,"
+            " value BLOB NOT NULL"
+            ")"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_vault_token ON vault_entries (token, document_id)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS approvals ("
+            " approval_id TEXT PRIMARY KEY,"
+            " grantee TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " max_tokens INTEGER NOT NULL"
+            ")"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS approval_documents ("
+            " approval_id TEXT NOT NULL,"
+            " document_id TEXT NOT NULL,"
+            " PRIMARY KEY (approval_id, document_id)"
+            ") WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def generate_key() -> str:
+        """Vygeneruje nový klíč trezoru."""
+        return Fernet.generate_key().decode("ascii")
+
+    def record(self, document_id: Optional[str], entity_type: str, start: int, end: int, token: str, value: str) -> None:
+        """
+        Přidá jeden záznam do vyrovnávací paměti.
+
+        Args:
+            document_id: ID původního dokumentu
+            entity_type: Typ entity
+            start: Počáteční pozice entity v původním dokumentu
+            end: Koncová pozice entity v původním dokumentu
+            token: Text, kterým byla entita nahrazena
+            value: Původní hodnota
+        """
+        with self._lock:
+            self._buffer.append((token, document_id, start, end, entity_type, value))
+            self._stats["records_buffered"] += 1
+            should_flush = len(self._buffer) >= self.flush_size
+        if should_flush:
+            self.flush()
+
+    def record_document(self, document: AnonymizedDocument) -> int:
+        """
+        Přidá do vyrovnávací paměti pseudonymizované entity dokumentu.
+
+        Entity nahrazené jiným operátorem než REIDENTIFIABLE_OPERATORS se
+        přeskočí.
+
+        Args:
+            document: Anonymizovaný dokument
+
+        Returns:
+            Počet přidaných záznamů
+        """
+        rows = [
+            (
+                entity.anonymized_text,
+                document.original_document_id,
+                entity.original_entity.start,
+                entity.original_entity.end,
+                entity.original_entity.entity_type,
+                entity.original_entity.text,
+            )
+            for entity in document.entities
+            if entity.operator_name in REIDENTIFIABLE_OPERATORS
+        ]
+        with self._lock:
+            self._buffer.extend(rows)
+            self._stats["records_buffered"] += len(rows)
+            self._stats["records_skipped"] += len(document.entities) - len(rows)
+            should_flush = len(self._buffer) >= self.flush_size
+        if should_flush:
+            self.flush()
+        return len(rows)
+
+    def flush(self) -> int:
+        """
+        Zašifruje a zapíše vyrovnávací paměť jednou transakcí.
+
+        Returns:
+            Počet zapsaných záznamů
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+
+        start_time = time.perf_counter()
+        encrypt = self._fernet.encrypt
+        encrypted = [
+            (token, document_id, start, end, entity_type, encrypt(value.encode("utf-8")))
+            for token, document_id, start, end, entity_type, value in rows
+        ]
+        connection = self._connections.get()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO vault_entries (token, document_id, start, end, entity_type, value) VALUES (?, ?, ?, ?, ?, ?)",
+                encrypted,
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            # Záznamy se vrátí do vyrovnávací paměti, aby se neztratily
+            with self._lock:
+                self._buffer[:0] = rows
+            raise
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        with self._lock:
+            self._stats["records_written"] += len(rows)
+            self._stats["flushes"] += 1
+            self._stats["flush_time_ms"] += elapsed_ms
+        logger.debug(f"Vault flushed {len(rows)} records in {elapsed_ms:.1f} ms")
+        return len(rows)
+
+    def grant_approval(
+        self,
+        approval_id: str,
+        grantee: str,
+        document_ids: Sequence[str],
+        valid_seconds: float,
+        max_tokens: int = DEFAULT_APPROVAL_MAX_TOKENS,
+    ) -> None:
+        """
+        Zaregistruje schválenou žádost o zpětnou identifikaci.
+
+        Args:
+            approval_id: ID schválené žádosti
+            grantee: Žadatel, který smí schválení použít
+            document_ids: Dokumenty, na které se schválení vztahuje
+            valid_seconds: Doba platnosti od teď v sekundách
+            max_tokens: Maximální počet tokenů v jednom vyhledání
+        """
+        if not document_ids:
+            raise ValueError("approval must be limited to at least one document")
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        connection = self._connections.get()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO approvals (approval_id, grantee, expires_at, max_tokens) VALUES (?, ?, ?, ?)",
+                (approval_id, grantee, time.time() + valid_seconds, max_tokens),
+            )
+            connection.execute("DELETE FROM approval_documents WHERE approval_id = ?", (approval_id,))
+            connection.executemany(
+                "INSERT OR IGNORE INTO approval_documents (approval_id, document_id) VALUES (?, ?)",
+                [(approval_id, document_id) for document_id in document_ids],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def revoke_approval(self, approval_id: str) -> bool:
+        """
+        Zruší schválení.
+
+        Args:
+            approval_id: ID schválené žádosti
+
+        Returns:
+            True, pokud schválení existovalo
+        """
+        connection = self._connections.get()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = connection.execute("DELETE FROM approvals WHERE approval_id = ?", (approval_id,)).rowcount
+            connection.execute("DELETE FROM approval_documents WHERE approval_id = ?", (approval_id,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return deleted > 0
+
+    def check_approval(self, approval_id: str, grantee: str, token_count: int) -> Dict:
+        """
+        Ověří, že schválení smí daný žadatel použít pro daný počet tokenů.
+
+        Args:
+            approval_id: ID schválené žádosti
+            grantee: Ověřený žadatel
+            token_count: Počet požadovaných tokenů
+
+        Returns:
+            Slovník s údaji schválení
+
+        Raises:
+            ApprovalError: Pokud schválení neexistuje, patří jinému žadateli,
+                vypršelo nebo limit tokenů nestačí
+        """
+        row = self._connections.get().execute(
+            "SELECT grantee, expires_at, max_tokens FROM approvals WHERE approval_id = ?", (approval_id,)
+        ).fetchone()
+        # Neexistující a cizí schválení se od sebe navenek nerozliší
+        if row is None or row[0] != grantee:
+            raise ApprovalError(f"Approval '{approval_id}' not found for this requester")
+        _, expires_at, max_tokens = row
+        if expires_at <= time.time():
+            raise ApprovalError(f"Approval '{approval_id}' has expired")
+        if token_count > max_tokens:
+            raise ApprovalError(f"Approval '{approval_id}' allows at most {max_tokens} tokens per request")
+        return {"approval_id": approval_id, "grantee": grantee, "expires_at": expires_at, "max_tokens": max_tokens}
+
+    def lookup(
+        self,
+        tokens: Sequence[str],
+        document_id: Optional[str] = None,
+        approval_id: Optional[str] = None,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Hromadně vyhledá původní hodnoty podle tokenů.
+
+        Args:
+            tokens: Tokeny (pseudonymy) k zpětné identifikaci
+            document_id: Omezení na jeden dokument (None = všechny dokumenty)
+            approval_id: Omezení na dokumenty schválené žádosti (None = bez omezení,
+                jen pro interní použití; API vždy předává schválení)
+
+        Returns:
+            Slovník token -> seznam výskytů (dokument, pozice, typ entity, hodnota)
+        """
+        unique_tokens = list(dict.fromkeys(tokens))
+        results: Dict[str, List[Dict]] = {token: [] for token in unique_tokens}
+        connection = self._connections.get()
+        decrypt = self._fernet.decrypt
+
+        for offset in range(0, len(unique_tokens), _SQL_CHUNK_SIZE):
+            chunk = unique_tokens[offset:offset + _SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            query = (
+                "SELECT token, document_id, start, end, entity_type, value FROM vault_entries"
+                f" WHERE token IN ({placeholders})"
+            )
+            params: List = list(chunk)
+            if document_id is not None:
+                query += " AND document_id = ?"
+                params.append(document_id)
+            if approval_id is not None:
+                query += " AND document_id IN (SELECT document_id FROM approval_documents WHERE approval_id = ?)"
+                params.append(approval_id)
+            for token, row_document_id, start, end, entity_type, value in connection.execute(query, params):
+                results[token].append({
+                    "document_id": row_document_id,
+                    "start": start,
+                    "end": end,
+                    "entity_type": entity_type,
+                    "value": decrypt(value).decode("utf-8"),
+                })
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._stats["tokens_requested"] += len(unique_tokens)
+            self._stats["records_returned"] += sum(len(matches) for matches in results.values())
+        return results
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky trezoru.
+
+        Returns:
+            Slovník s počty zapsaných záznamů, dávek a vyhledávání
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["records_pending"] = len(self._buffer)
+        stats["flush_time_ms"] = round(stats["flush_time_ms"], 3)
+        return stats
+
+    def close(self) -> None:
+        """Zapíše zbývající záznamy a uzavře spojení aktuálního vlákna."""
+        self.flush()
+        self._connections.close()
@@ -0,0 +1,189 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí maximální počet požadavků v jedné dávce
+DEFAULT_MAX_BATCH_SIZE = 16
+
+# Výchozí maximální čekání na další požadavky do dávky v milisekundách
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Značka pro ukončení dispatcheru
+_STOP = object()
+
+
+class RequestCoalescer:
+    """
+    Slučování souběžných požadavků do dávek (dynamic micro-batching).
+
+    Požadavek se zařadí do fronty a volající dostane future. Dispatcher
+    vezme první čekající požadavek a nejvýše `max_wait_ms` přibírá další,
+    dokud dávka nedosáhne `max_batch_size`; celou dávku pak zpracuje jedním
+    voláním handleru (jeden dávkový průchod NLP modelu) a výsledky rozdá
+    jednotlivým future. Při nízké zátěži se tak latence zvýší nejvýše
+    o `max_wait_ms`, při vysoké se režie modelu rozloží na celou dávku.
+    Pokud dávka selže, zpracují se její požadavky jednotlivě, aby jeden
+    vadný požadavek neshodil ostatní.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        workers: int = 1,
+    ):
+        """
+        Inicializace slučovače.
+
+        Args:
+            handler: Funkce zpracující seznam požadavků; vrací výsledky ve stejném pořadí
+            max_batch_size: Maximální počet požadavků v dávce
+            max_wait_ms: Maximální čekání na další požadavky od příchodu prvního
+                v milisekundách (0 = slučují se jen už čekající požadavky)
+            workers: Počet vláken dispatcheru (dávek zpracovávaných současně)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "batch_sizes": {},
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+        self._threads = [
+            threading.Thread(target=self._dispatch, name=f"request-coalescer-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, request: Any) -> Future:
+        """
+        Zařadí požadavek do příští dávky.
+
+        Args:
+            request: Požadavek předaný handleru
+
+        Returns:
+            Future s výsledkem požadavku
+        """
+        if self._closed:
+            raise RuntimeError("RequestCoalescer is closed")
+        future: Future = Future()
+        self._queue.put((request, future, time.monotonic()))
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Ukončí dispatcher po zpracování již zařazených požadavků.
+
+        Args:
+            timeout: Maximální čekání na každé vlákno dispatcheru v sekundách
+        """
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _dispatch(self) -> None:
+        """Smyčka dispatcheru: sestavuje dávky a předává je handleru."""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run(batch)
+            if stop:
+                return
+
+    def _run(self, batch: List[Tuple[Any, Future, float]]) -> None:
+        """Zpracuje dávku a rozdá výsledky volajícím."""
+        started = time.monotonic()
+        # Požadavky, jejichž volající mezitím odešel, se nezpracují
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        waits = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        with self._lock:
+            self._stats["requests"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["batch_sizes"][len(batch)] = self._stats["batch_sizes"].get(len(batch), 0) + 1
+            self._stats["wait_ms_total"] += sum(waits)
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], max(waits))
+
+        try:
+            results = self.handler([request for request, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Handler returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            with self._lock:
+                self._stats["failed_batches"] += 1
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(f"Batch of {len(batch)} requests failed ({type(e).__name__}), processing one by one")
+            for request, future, _ in batch:
+                try:
+                    future.set_result(self.handler([request])[0])
+                except Exception as error:
+                    future.set_exception(error)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky slučování.
+
+        Returns:
+            Slovník s počty požadavků a dávek, rozdělením velikostí dávek
+            a čekáním požadavků na dávku
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["batch_sizes"] = dict(sorted(self._stats["batch_sizes"].items()))
+        wait_ms_total = stats.pop("wait_ms_total")
+        stats["average_batch_size"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["average_wait_ms"] = round(wait_ms_total / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 3)
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait_ms
+        stats["queued"] = self._queue.qsize()
+        return stats
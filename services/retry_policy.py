@@ -0,0 +1,282 @@
+import hashlib
+import logging
+import random
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+
+from services.sqlite_connections import SqliteConnections
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Třídy chyb
+TRANSIENT = "transient"
+DETERMINISTIC = "deterministic"
+
+# Chyby prostředí, u kterých má smysl zkusit dokument znovu (zamčená databáze,
+# síť a timeouty, plný disk, nedostatek paměti). Ostatní výjimky vyvolává
+# obsah dokumentu a další pokus by skončil stejně.
+DEFAULT_TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    OSError,
+    MemoryError,
+    sqlite3.OperationalError,
+)
+
+# Chyby, které jsou deterministické, i když dědí z přechodné třídy
+DEFAULT_DETERMINISTIC_ERRORS: Tuple[Type[BaseException], ...] = (
+    FileNotFoundError,
+    IsADirectoryError,
+    PermissionError,
+)
+
+# Čísla ve zprávě (offsety, délky, ID) se při otisku chyby ignorují
+_NUMBER_RE = re.compile(r"\d+")
+
+
+class RetryPolicy:
+    """
+    Politika opakování zpracování dokumentu.
+
+    Chyby dělí na přechodné (opakují se s exponenciálně rostoucí prodlevou
+    s náhodným rozptylem) a deterministické (neopakují se vůbec). Politika
+    sama nečeká - vrací jen prodlevu, plánování dalšího pokusu je na volajícím,
+    aby čekání neblokovalo zbytek dávky.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        jitter: float = 0.5,
+        transient_errors: Tuple[Type[BaseException], ...] = DEFAULT_TRANSIENT_ERRORS,
+        deterministic_errors: Tuple[Type[BaseException], ...] = DEFAULT_DETERMINISTIC_ERRORS,
+    ):
+        """
+        Inicializace politiky.
+
+        Args:
+            max_attempts: Maximální počet pokusů o zpracování dokumentu
+            base_delay: Prodleva před druhým pokusem v sekundách
+            max_delay: Horní mez prodlevy v sekundách
+            jitter: Podíl prodlevy, o který se náhodně zkrátí (0 = bez rozptylu)
+            transient_errors: Třídy výjimek považované za přechodné
+            deterministic_errors: Třídy výjimek, které jsou deterministické vždy
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.transient_errors = transient_errors
+        self.deterministic_errors = deterministic_errors
+
+    def classify(self, error: BaseException) -> str:
+        """
+        Určí třídu chyby.
+
+        Args:
+            error: Výjimka ze zpracování
+
+        Returns:
+            "transient" nebo "deterministic"
+        """
+        if isinstance(error, self.deterministic_errors):
+            return DETERMINISTIC
+        if isinstance(error, self.transient_errors):
+            return TRANSIENT
+        return DETERMINISTIC
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """
+        Rozhodne, zda zkusit zpracování znovu.
+
+        Args:
+            error: Výjimka z pokusu
+            attempt: Pořadí neúspěšného pokusu (od 1)
+
+        Returns:
+            True, pokud je chyba přechodná a zbývají pokusy
+        """
+        return attempt < self.max_attempts and self.classify(error) == TRANSIENT
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Vrátí prodlevu před dalším pokusem.
+
+        Args:
+            attempt: Pořadí neúspěšného pokusu (od 1)
+
+        Returns:
+            Prodleva v sekundách
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+
+def content_hash(content: str) -> str:
+    """
+    Vrátí otisk obsahu dokumentu, podle kterého se pozná v karanténě.
+
+    Args:
+        content: Obsah dokumentu
+
+    Returns:
+        SHA-256 hex digest
+    """
+    return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def failure_fingerprint(error: BaseException) -> str:
+    """
+    Vrátí otisk chyby: typ výjimky a zpráva bez čísel.
+
+    Stejná chyba na různých místech dokumentu (jiný offset) má stejný otisk.
+
+    Args:
+        error: Výjimka ze zpracování
+
+    Returns:
+        Zkrácený SHA-256 hex digest
+    """
+    signature = f"{type(error).__module__}.{type(error).__qualname__}:{_NUMBER_RE.sub('#', str(error))}"
+    return hashlib.sha256(signature.encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+class QuarantinedDocumentError(Exception):
+    """Dokument je v karanténě a nezpracovává se."""
+
+
+class Quarantine:
+    """
+    Karanténa dokumentů, jejichž zpracování deterministicky selhává.
+
+    Dokumenty se evidují podle otisku obsahu (SHA-256), takže se přeskočí
+    i přejmenovaná kopie. Ukládá se jen typ a otisk chyby, nikdy obsah
+    dokumentu ani text chybové zprávy (ten může obsahovat osobní údaje;
+    celá zpráva je v auditním logu). Úložiště je SQLite (WAL), spojení
+    se vytváří zvlášť pro každé vlákno a proces.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializace karantény.
+
+        Args:
+            path: Cesta k SQLite souboru
+        """
+        self.path = path
+        self._connections = SqliteConnections(path)
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS quarantine ("
+            " content_hash TEXT PRIMARY KEY,"
+            " document_id TEXT,"
+            " error_type TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " first_seen TEXT NOT NULL,"
+            " last_seen TEXT NOT NULL,"
+            " occurrences INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def add(self, document_hash: str, document_id: Optional[str], error: BaseException) -> str:
+        """
+        Zařadí dokument do karantény (opakované zařazení zvýší počet výskytů).
+
+        Args:
+            document_hash: Otisk obsahu dokumentu (viz `content_hash`)
+            document_id: ID dokumentu
+            error: Výjimka, se kterou zpracování selhalo
+
+        Returns:
+            Otisk chyby
+        """
+        fingerprint = failure_fingerprint(error)
+        now = datetime.now().isoformat()
+        self._connections.get().execute(
+            "INSERT INTO quarantine (content_hash, document_id, error_type, fingerprint, first_seen, last_seen, occurrences)"
+            " VALUES (?, ?, ?, ?, ?, ?, 1)"
+            " ON CONFLICT (content_hash) DO UPDATE SET"
+            " document_id = excluded.document_id, error_type = excluded.error_type,"
+            " fingerprint = excluded.fingerprint, last_seen = excluded.last_seen,"
+            " occurrences = occurrences + 1",
+            [document_hash, document_id, type(error).__name__, fingerprint, now, now],
+        )
+        logger.warning(f"Document {document_id} quarantined ({type(error).__name__}, fingerprint {fingerprint})")
+        return fingerprint
+
+    def get(self, document_hash: str) -> Optional[Dict]:
+        """
+        Vrátí záznam karantény pro dokument.
+
+        Args:
+            document_hash: Otisk obsahu dokumentu
+
+        Returns:
+            Záznam karantény, nebo None, pokud dokument v karanténě není
+        """
+        rows = self._select("WHERE content_hash = ?", [document_hash], 1)
+        return rows[0] if rows else None
+
+    def contains(self, document_hash: str) -> bool:
+        """Zjistí, zda je dokument v karanténě."""
+        return self._connections.get().execute(
+            "SELECT 1 FROM quarantine WHERE content_hash = ?", [document_hash]
+        ).fetchone() is not None
+
+    def list(self, limit: int = 1000) -> List[Dict]:
+        """
+        Vrátí dokumenty v karanténě.
+
+        Args:
+            limit: Maximální počet záznamů
+
+        Returns:
+            Záznamy od naposledy zařazených
+        """
+        return self._select("ORDER BY last_seen DESC", [], limit)
+
+    def release(self, document_hash: str) -> bool:
+        """
+        Propustí dokument z karantény (např. po opravě rozpoznávače).
+
+        Args:
+            document_hash: Otisk obsahu dokumentu
+
+        Returns:
+            True, pokud byl dokument v karanténě
+        """
+        cursor = self._connections.get().execute("DELETE FROM quarantine WHERE content_hash = ?", [document_hash])
+        return cursor.rowcount > 0
+
+    def _select(self, clause: str, params: List, limit: int) -> List[Dict]:
+        """Načte záznamy karantény jako slovníky."""
+        columns = ("content_hash", "document_id", "error_type", "fingerprint", "first_seen", "last_seen", "occurrences")
+        rows = self._connections.get().execute(
+            f"SELECT {', '.join(columns)} FROM quarantine {clause} LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky karantény.
+
+        Returns:
+            Slovník s počtem dokumentů a počty podle typu chyby
+        """
+        rows = self._connections.get().execute(
+            "SELECT error_type, COUNT(*) FROM quarantine GROUP BY error_type"
+        ).fetchall()
+        return {"documents": sum(count for _, count in rows), "by_error_type": dict(rows)}
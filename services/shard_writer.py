@@ -0,0 +1,211 @@
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from models.document import AnonymizedDocument
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí maximální velikost jednoho shardu
+DEFAULT_SHARD_BYTES = 256 * 1024 * 1024
+
+# Výchozí maximální počet dokumentů v jednom shardu
+DEFAULT_SHARD_DOCUMENTS = 50_000
+
+_UNSAFE_NAME_REGEX = re.compile(r"[^\w.\-]+")
+
+
+class ShardWriter:
+    """
+    Výstup anonymizovaných dokumentů do shardů (tar archivů) omezené velikosti.
+
+    Místo souboru s obsahem a `.meta.json` pro každý dokument se dokumenty
+    připojují do aktuálního shardu `shard-<run>-NNNNN.tar`. Po dosažení
+    velikosti nebo počtu dokumentů se shard uzavře, vedle něj se zapíše jeho
+    index (`.index.json` s pozicí a velikostí každého dokumentu v archivu)
+    a začne se nový shard. Metadata a statistiky všech dokumentů běhu se
+    hromadí po sloupcích a na konci se zapíší do jednoho manifestu
+    `manifest-<run>.parquet`.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        run_id: Optional[str] = None,
+        max_shard_bytes: int = DEFAULT_SHARD_BYTES,
+        max_shard_documents: int = DEFAULT_SHARD_DOCUMENTS,
+    ):
+        """
+        Inicializace zapisovače.
+
+        Args:
+            output_dir: Adresář pro shardy a manifest
+            run_id: Identifikátor běhu (None = časové razítko a náhodná přípona)
+            max_shard_bytes: Maximální velikost obsahu jednoho shardu v bajtech
+            max_shard_documents: Maximální počet dokumentů v jednom shardu
+        """
+        self.output_dir = output_dir
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.max_shard_bytes = max_shard_bytes
+        self.max_shard_documents = max_shard_documents
+        self.shards: List[str] = []
+
+        self._tar: Optional[tarfile.TarFile] = None
+        self._shard_path: Optional[str] = None
+        self._shard_index: List[Dict] = []
+        self._shard_bytes = 0
+        self._manifest: Dict[str, List] = {
+            "document_id": [],
+            "original_document_id": [],
+            "shard": [],
+            "member": [],
+            "offset": [],
+            "size": [],
+            "content_type": [],
+            "total_entities": [],
+            "entities_by_type": [],
+            "metadata": [],
+            "anonymized_at": [],
+        }
+        self._closed = False
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _open_shard(self) -> None:
+        """Otevře nový shard."""
+        self._shard_path = os.path.join(self.output_dir, f"shard-{self.run_id}-{len(self.shards):05d}.tar")
+        self._tar = tarfile.open(self._shard_path, "w")
+        self._shard_index = []
+        self._shard_bytes = 0
+        self.shards.append(self._shard_path)
+
+    def _close_shard(self) -> None:
+        """Uzavře aktuální shard a zapíše jeho index."""
+        if self._tar is None:
+            return
+        self._tar.close()
+        with open(f"{self._shard_path}.index.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {"shard": os.path.basename(self._shard_path), "documents": self._shard_index},
+                f,
+                ensure_ascii=False,
+            )
+        logger.info(f"Shard {self._shard_path} closed: {len(self._shard_index)} documents, {self._shard_bytes} bytes")
+        self._tar = None
+
+    def write(self, document: AnonymizedDocument) -> str:
+        """
+        Připojí anonymizovaný dokument do aktuálního shardu.
+
+        Args:
+            document: Anonymizovaný dokument
+
+        Returns:
+            Umístění dokumentu ve tvaru `<shard>:<člen archivu>`
+        """
+        if self._closed:
+            raise ValueError("Shard writer is closed")
+
+        data = document.content.encode("utf-8")
+        if self._tar is not None and (
+            self._shard_bytes + len(data) > self.max_shard_bytes
+            or len(self._shard_index) >= self.max_shard_documents
+        ):
+            self._close_shard()
+        if self._tar is None:
+            self._open_shard()
+
+        document_id = document.original_document_id or "unknown"
+        member = f"{len(self._shard_index):06d}_{_UNSAFE_NAME_REGEX.sub('_', document_id)}"
+        info = tarfile.TarInfo(member)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+        # Pozice dat člena v archivu (data jsou zarovnána na bloky tar)
+        # umožní číst dokument bez procházení archivu
+        padded_size = (len(data) + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE * tarfile.BLOCKSIZE
+        offset = self._tar.offset - padded_size
+        self._shard_index.append({"document_id": document_id, "member": member, "offset": offset, "size": len(data)})
+        self._shard_bytes += len(data)
+
+        statistics = document.statistics or {}
+        shard_name = os.path.basename(self._shard_path)
+        manifest = self._manifest
+        manifest["document_id"].append(document.id)
+        manifest["original_document_id"].append(document_id)
+        manifest["shard"].append(shard_name)
+        manifest["member"].append(member)
+        manifest["offset"].append(offset)
+        manifest["size"].append(len(data))
+        manifest["content_type"].append(document.content_type)
+        manifest["total_entities"].append(statistics.get("total_entities_detected", len(document.entities)))
+        manifest["entities_by_type"].append(json.dumps(statistics.get("entities_by_type", {}), ensure_ascii=False))
+        manifest["metadata"].append(json.dumps(document.metadata or {}, ensure_ascii=False, default=str))
+        manifest["anonymized_at"].append(datetime.now().isoformat())
+
+        return f"{shard_name}:{member}"
+
+    def close(self) -> Optional[str]:
+        """
+        Uzavře poslední shard a zapíše manifest běhu.
+
+        Returns:
+            Cesta k manifestu (None, pokud nebyl zapsán žádný dokument)
+        """
+        if self._closed:
+            return None
+        self._closed = True
+        self._close_shard()
+        if not self._manifest["document_id"]:
+            return None
+
+        manifest_path = os.path.join(self.output_dir, f"manifest-{self.run_id}.parquet")
+        pd.DataFrame(self._manifest).to_parquet(manifest_path, index=False)
+        logger.info(f"Manifest {manifest_path} written: {len(self._manifest['document_id'])} documents in {len(self.shards)} shards")
+        return manifest_path
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky zápisu.
+
+        Returns:
+            Slovník s počtem dokumentů, shardů a zapsaných bajtů
+        """
+        return {
+            "run_id": self.run_id,
+            "documents": len(self._manifest["document_id"]),
+            "shards": len(self.shards),
+            "bytes": sum(self._manifest["size"]),
+        }
+
+    @staticmethod
+    def read_document(shard_path: str, offset: int, size: int) -> str:
+        """
+        Přečte dokument ze shardu podle pozice z indexu nebo manifestu.
+
+        Args:
+            shard_path: Cesta k shardu
+            offset: Pozice dat dokumentu v archivu
+            size: Velikost dat dokumentu v bajtech
+
+        Returns:
+            Obsah dokumentu
+        """
+        with open(shard_path, "rb") as f:
+            f.seek(offset)
+            return f.read(size).decode("utf-8")
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SqliteConnections:
+    """
+    SQLite spojení pro každé vlákno zvlášť.
+
+    Spojení se vytvoří při prvním použití ve vlákně v režimu autocommit
+    (transakce řídí volající přes BEGIN) s WAL žurnálem, takže čtení
+    neblokuje zápis z jiných vláken a procesů. Spojení zděděné forkem
+    z rodičovského procesu se nesmí sdílet - v novém procesu se otevře nové.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Inicializace.
+
+        Args:
+            path: Cesta k SQLite souboru
+            timeout: Jak dlouho čekat na zámek databáze v sekundách
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        """Vrátí spojení aktuálního vlákna (vytvoří ho při prvním použití)."""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def close(self) -> None:
+        """Uzavře spojení aktuálního vlákna."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+        self._local.connection = None
@@ -0,0 +1,591 @@
+import bisect
+import html
+import json
+import logging
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from html.parser import HTMLParser
+from json.decoder import scanstring
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.document import AnonymizedDocument, AnonymizedEntity, DetectedEntity, Document
+from models.entity_store import EntityStore
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Oddělovač textových uzlů ve spojeném textu pro analýzu. Prázdný řádek
+# odděluje i odstavce pro detekci jazyka.
+NODE_SEPARATOR = "\n\n"
+
+# Elementy HTML, jejichž obsah není text dokumentu
+HTML_SKIPPED_TAGS = ("script", "style", "template")
+
+# Elementy HTML bez ukončovací značky
+HTML_VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+))
+
+# Atributy HTML, které nenesou text dokumentu (vzhled), a proto se neanalyzují
+HTML_SKIPPED_ATTRIBUTES = ("class", "style")
+
+_XML_DECLARATION_REGEX = re.compile(r"^\s*<\?xml[^>]*\?>\s*")
+
+# Prolog XML před kořenovým elementem: deklarace, instrukce, komentáře a DOCTYPE
+# (včetně interní podmnožiny v hranatých závorkách)
+_XML_PROLOG_REGEX = re.compile(r"(?:\s*(?:<\?.*?\?>|<!--.*?-->|<!DOCTYPE(?:[^\[>]|\[.*?\])*>))*\s*", re.DOTALL)
+
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+_JSON_WHITESPACE_REGEX = re.compile(r"[ \t\n\r]*")
+
+# Atribut v počáteční značce HTML: název a volitelná hodnota v uvozovkách nebo bez nich
+_HTML_ATTRIBUTE_REGEX = re.compile(
+    r"""([^\s/>=][^\s/>=]*)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+
+
+@dataclass
+class TextNode:
+    """Textový uzel strukturovaného dokumentu."""
+    path: str
+    text: str
+
+
+@dataclass
+class NodeAnonymization:
+    """Výsledek anonymizace textových uzlů."""
+    # Anonymizované texty všech uzlů ve stejném pořadí
+    texts: List[str]
+    # Pořadí uzlů, ve kterých došlo k náhradě
+    changed: List[int]
+    # Entity oříznuté na uzly (pozice ve spojeném textu)
+    store: EntityStore
+    # Pro každou náhradu: (uzel, index v úložišti, start a end v uzlu, náhrada, operátor)
+    items: List[Tuple[int, int, int, int, str, str]]
+    conflicts_resolved: int = 0
+
+
+class JsonDocumentFormat:
+    """
+    Textové uzly dokumentu JSON - všechny řetězcové hodnoty (klíče ne).
+
+    Cesta uzlu jsou klíče a indexy oddělené tečkou, např. `patients.0.name`.
+    Pozice řetězců se zaznamenají v původním textu a při serializaci se
+    nahradí jen změněné řetězce, takže formátování, pořadí klíčů i zápis
+    čísel (např. `1.0e5`) zůstanou beze změny.
+    """
+
+    def __init__(self, content: str):
+        # Kontrola celého dokumentu - chybný vstup vyvolá JSONDecodeError
+        json.loads(content)
+        self._content = content
+        self._decoder = json.JSONDecoder()
+        # (start, end) řetězcových hodnot včetně uvozovek v původním textu
+        self._spans: List[Tuple[int, int]] = []
+        self.nodes: List[TextNode] = []
+        self._collect(self._skip_whitespace(0), "")
+
+    def _skip_whitespace(self, position: int) -> int:
+        return _JSON_WHITESPACE_REGEX.match(self._content, position).end()
+
+    def _collect(self, position: int, path: str) -> int:
+        """Projde hodnotu začínající na pozici a vrátí pozici za ní."""
+        content = self._content
+        char = content[position]
+        if char == '"':
+            value, end = scanstring(content, position + 1)
+            self._spans.append((position, end))
+            self.nodes.append(TextNode(path, value))
+            return end
+        if char not in "{[":
+            # Číslo, true, false nebo null
+            return self._decoder.raw_decode(content, position)[1]
+
+        closing = "}" if char == "{" else "]"
+        position = self._skip_whitespace(position + 1)
+        index = 0
+        while content[position] != closing:
+            if char == "{":
+                key, position = scanstring(content, position + 1)
+                # Přeskočí dvojtečku za klíčem
+                position = self._skip_whitespace(self._skip_whitespace(position) + 1)
+            else:
+                key = index
+            position = self._collect(position, f"{path}.{key}" if path else str(key))
+            position = self._skip_whitespace(position)
+            if content[position] == ",":
+                position = self._skip_whitespace(position + 1)
+            index += 1
+        return position + 1
+
+    def serialize(self, replacements: Dict[int, str]) -> str:
+        parts = []
+        position = 0
+        for index in sorted(replacements):
+            start, end = self._spans[index]
+            parts.append(self._content[position:start])
+            parts.append(json.dumps(replacements[index], ensure_ascii=False))
+            position = end
+        parts.append(self._content[position:])
+        return "".join(parts)
+
+
+class _NamespaceTreeBuilder(ET.TreeBuilder):
+    """TreeBuilder, který zaznamená deklarace jmenných prostorů u elementů."""
+
+    def __init__(self):
+        super().__init__(insert_comments=True, insert_pis=True)
+        self._pending: List[Tuple[str, str]] = []
+        # Element -> deklarace (prefix, uri) uvedené v jeho počáteční značce
+        self.declarations: Dict[ET.Element, List[Tuple[str, str]]] = {}
+
+    def start_ns(self, prefix: str, uri: str) -> None:
+        self._pending.append((prefix, uri))
+
+    def start(self, tag, attrs):
+        element = super().start(tag, attrs)
+        if self._pending:
+            self.declarations[element] = self._pending
+            self._pending = []
+        return element
+
+
+class XmlDocumentFormat:
+    """
+    Textové uzly dokumentu XML - text a konce (tail) elementů a hodnoty atributů.
+
+    Cesta uzlu jsou názvy elementů bez jmenného prostoru oddělené lomítkem,
+    např. `record/patient/name`, atribut má cestu `record/patient/@id`.
+    Konec elementu patří jeho rodiči. Při serializaci se zachová prolog
+    (deklarace, DOCTYPE, komentáře) a původní prefixy jmenných prostorů.
+    """
+
+    def __init__(self, content: str):
+        declaration = _XML_DECLARATION_REGEX.match(content)
+        declaration_length = declaration.end() if declaration else 0
+        self._prolog = _XML_PROLOG_REGEX.match(content).group(0)
+        self._builder = _NamespaceTreeBuilder()
+        parser = ET.XMLParser(target=self._builder)
+        # Deklarace se nepředává (kódování řetězce už je dané), DOCTYPE ano
+        parser.feed(content[declaration_length:])
+        self._root = parser.close()
+        self._slots: List[Tuple[ET.Element, str]] = []
+        self.nodes: List[TextNode] = []
+        self._collect(self._root, "")
+
+    @staticmethod
+    def _local_name(name: str) -> str:
+        return name.rsplit("}", 1)[-1]
+
+    def _collect(self, element: ET.Element, parent_path: str) -> None:
+        if not isinstance(element.tag, str):
+            # Komentář nebo instrukce pro zpracování - analyzuje se jen konec
+            path = parent_path
+        else:
+            tag = self._local_name(element.tag)
+            path = f"{parent_path}/{tag}" if parent_path else tag
+            for name, value in element.attrib.items():
+                self._slots.append((element, f"@{name}"))
+                self.nodes.append(TextNode(f"{path}/@{self._local_name(name)}", value))
+            if element.text:
+                self._slots.append((element, "text"))
+                self.nodes.append(TextNode(path, element.text))
+            for child in element:
+                self._collect(child, path)
+        if element.tail and parent_path:
+            self._slots.append((element, "tail"))
+            self.nodes.append(TextNode(parent_path, element.tail))
+
+    def _restore_prefixes(self, element: ET.Element, scope: Dict[str, str]) -> None:
+        """Přepíše kvalifikované názvy na původní prefixy a vrátí deklarace xmlns."""
+        declarations = self._builder.declarations.get(element, [])
+        if declarations:
+            scope = dict(scope)
+            for prefix, uri in declarations:
+                scope[uri] = prefix
+        if isinstance(element.tag, str):
+            element.tag = self._qualified_name(element.tag, scope, attribute=False)
+            attributes = {
+                self._qualified_name(name, scope, attribute=True): value for name, value in element.attrib.items()
+            }
+            for prefix, uri in declarations:
+                attributes[f"xmlns:{prefix}" if prefix else "xmlns"] = uri
+            element.attrib.clear()
+            element.attrib.update(attributes)
+        for child in element:
+            self._restore_prefixes(child, scope)
+
+    @staticmethod
+    def _qualified_name(name: str, scope: Dict[str, str], attribute: bool) -> str:
+        if not name.startswith("{"):
+            return name
+        uri, local = name[1:].split("}", 1)
+        prefix = scope.get(uri)
+        # Atribut bez prefixu nepatří do výchozího jmenného prostoru; neznámý
+        # jmenný prostor nechá ElementTree (vygeneruje vlastní prefix)
+        if prefix is None or (attribute and not prefix):
+            return name
+        return f"{prefix}:{local}" if prefix else local
+
+    def serialize(self, replacements: Dict[int, str]) -> str:
+        for index, text in replacements.items():
+            element, attribute = self._slots[index]
+            if attribute.startswith("@"):
+                element.attrib[attribute[1:]] = text
+            else:
+                setattr(element, attribute, text)
+        self._restore_prefixes(self._root, {_XML_NAMESPACE: "xml"})
+        return self._prolog + ET.tostring(self._root, encoding="unicode")
+
+
+class _HtmlTextCollector(HTMLParser):
+    """Parser zaznamenávající pozice textových uzlů v původním HTML."""
+
+    def __init__(self, content: str):
+        super().__init__(convert_charrefs=True)
+        self._line_offsets = [0] + [match.end() for match in re.finditer("\n", content)]
+        self._stack: List[str] = []
+        self._pending: Optional[Tuple[int, str]] = None
+        self.content = content
+        # (start, end, cesta, druh) uzlů v původním HTML; druh je "text",
+        # "attribute" (hodnota v uvozovkách) nebo "unquoted" (hodnota bez uvozovek)
+        self.spans: List[Tuple[int, int, str, str]] = []
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def _close_pending(self) -> None:
+        if self._pending is not None:
+            start, path = self._pending
+            self.spans.append((start, self._offset(), path, "text"))
+            self._pending = None
+
+    def _collect_attributes(self, tag: str) -> None:
+        """Zaznamená pozice hodnot atributů právě zpracované počáteční značky."""
+        if any(skipped in HTML_SKIPPED_TAGS for skipped in self._stack + [tag]):
+            return
+        tag_start = self._offset()
+        raw = self.get_starttag_text()
+        path = "/".join(self._stack + [tag])
+        # Atributy začínají za názvem elementu
+        for match in _HTML_ATTRIBUTE_REGEX.finditer(raw, 1 + len(tag)):
+            name = match.group(1).lower()
+            if name in HTML_SKIPPED_ATTRIBUTES:
+                continue
+            for group, kind in ((2, "attribute"), (3, "attribute"), (4, "unquoted")):
+                if match.group(group) is not None:
+                    self.spans.append(
+                        (tag_start + match.start(group), tag_start + match.end(group), f"{path}/@{name}", kind)
+                    )
+                    break
+
+    def handle_data(self, data: str) -> None:
+        self._close_pending()
+        if any(tag in HTML_SKIPPED_TAGS for tag in self._stack):
+            return
+        self._pending = (self._offset(), "/".join(self._stack))
+
+    def handle_starttag(self, tag, attrs) -> None:
+        self._close_pending()
+        self._collect_attributes(tag)
+        if tag not in HTML_VOID_TAGS:
+            self._stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs) -> None:
+        self._close_pending()
+        self._collect_attributes(tag)
+
+    def handle_endtag(self, tag) -> None:
+        self._close_pending()
+        if tag in self._stack:
+            while self._stack.pop() != tag:
+                pass
+
+    def handle_comment(self, data) -> None:
+        self._close_pending()
+
+    def handle_decl(self, decl) -> None:
+        self._close_pending()
+
+    def handle_pi(self, data) -> None:
+        self._close_pending()
+
+    def unknown_decl(self, data) -> None:
+        self._close_pending()
+
+    def close(self) -> None:
+        super().close()
+        if self._pending is not None:
+            start, path = self._pending
+            self.spans.append((start, len(self.content), path, "text"))
+            self._pending = None
+
+
+class HtmlDocumentFormat:
+    """
+    Textové uzly dokumentu HTML - text mezi značkami mimo skripty a styly
+    a hodnoty atributů (kromě HTML_SKIPPED_ATTRIBUTES).
+
+    Značky, komentáře a nezměněné hodnoty se do výstupu kopírují beze změny
+    z původního dokumentu, nahrazují se jen změněné uzly. Cesta uzlu jsou
+    otevřené elementy oddělené lomítkem, např. `html/body/p`, atribut má
+    cestu `html/body/img/@alt`.
+    """
+
+    def __init__(self, content: str):
+        collector = _HtmlTextCollector(content)
+        collector.feed(content)
+        collector.close()
+        self._content = content
+        self._spans = collector.spans
+        self.nodes = [TextNode(path, html.unescape(content[start:end])) for start, end, path, _ in self._spans]
+
+    def serialize(self, replacements: Dict[int, str]) -> str:
+        parts = []
+        position = 0
+        for index in sorted(replacements):
+            start, end, _, kind = self._spans[index]
+            parts.append(self._content[position:start])
+            if kind == "text":
+                parts.append(html.escape(replacements[index], quote=False))
+            elif kind == "attribute":
+                parts.append(html.escape(replacements[index], quote=True))
+            else:
+                # Hodnota bez uvozovek - náhrada může obsahovat mezery
+                parts.append(f'"{html.escape(replacements[index], quote=True)}"')
+            position = end
+        parts.append(self._content[position:])
+        return "".join(parts)
+
+
+# Podporované typy obsahu a jejich formáty
+STRUCTURED_FORMATS = {
+    "application/json": JsonDocumentFormat,
+    "application/xml": XmlDocumentFormat,
+    "text/xml": XmlDocumentFormat,
+    "text/html": HtmlDocumentFormat,
+}
+
+
+class StructuredProcessor:
+    """
+    Anonymizace strukturovaných dokumentů (JSON, XML, HTML) po textových uzlech.
+
+    Dokument se jednou rozparsuje, všechny vybrané textové uzly se spojí do
+    jednoho textu a analyzují jedním voláním (včetně směrování jazyka
+    a řešení překryvů) s mapováním pozic zpět na uzly. Hodnoty atributů
+    XML/HTML jsou samostatné uzly s cestou `.../@atribut`. Klíče JSON
+    a značky se neanalyzují, takže se nemohou poškodit. Výsledek se
+    zapíše zpět jedinou serializací.
+
+    Cesty uzlů lze omezit vzory (fnmatch): uzly vyhovující `deny_paths` se
+    přeskočí, a pokud je zadané `allow_paths`, analyzují se jen uzly, které
+    mu vyhovují. Vzory lze pro jednotlivý dokument přepsat v metadatech
+    (`allow_paths`, `deny_paths`).
+    """
+
+    def __init__(
+        self,
+        presidio_service,
+        allow_paths: Optional[Sequence[str]] = None,
+        deny_paths: Optional[Sequence[str]] = None,
+    ):
+        """
+        Inicializace procesoru.
+
+        Args:
+            presidio_service: Služba PresidioService pro analýzu a anonymizaci
+            allow_paths: Vzory cest uzlů k analýze (None = všechny)
+            deny_paths: Vzory cest uzlů, které se nikdy neanalyzují
+        """
+        self.presidio_service = presidio_service
+        self.allow_paths = list(allow_paths) if allow_paths else None
+        self.deny_paths = list(deny_paths or [])
+
+    @staticmethod
+    def supports(content_type: Optional[str]) -> bool:
+        """Vrátí True, pokud je typ obsahu zpracován po textových uzlech."""
+        return content_type in STRUCTURED_FORMATS
+
+    def _select_nodes(self, nodes: List[TextNode], metadata: Dict) -> List[int]:
+        """
+        Vybere indexy uzlů k analýze podle vzorů cest.
+
+        Args:
+            nodes: Textové uzly dokumentu
+            metadata: Metadata dokumentu (mohou přepsat vzory)
+
+        Returns:
+            Indexy vybraných uzlů
+        """
+        allow_paths = metadata.get("allow_paths", self.allow_paths)
+        deny_paths = metadata.get("deny_paths", self.deny_paths) or []
+        selected = []
+        for index, node in enumerate(nodes):
+            if not node.text.strip():
+                continue
+            if allow_paths and not any(fnmatchcase(node.path, pattern) for pattern in allow_paths):
+                continue
+            if any(fnmatchcase(node.path, pattern) for pattern in deny_paths):
+                continue
+            selected.append(index)
+        return selected
+
+    @staticmethod
+    def _split_to_nodes(store: EntityStore, starts: List[int], ends: List[int]) -> Tuple[EntityStore, List[int]]:
+        """
+        Ořízne entity na hranice uzlů ve spojeném textu.
+
+        Entita přesahující oddělovač se rozdělí na části v jednotlivých uzlech,
+        takže náhrada nikdy nezasáhne do struktury dokumentu.
+
+        Args:
+            store: Entity ve spojeném textu
+            starts: Počáteční pozice uzlů ve spojeném textu
+            ends: Koncové pozice uzlů ve spojeném textu
+
+        Returns:
+            Úložiště entit uvnitř uzlů a pro každou entitu pořadí jejího uzlu
+        """
+        result = EntityStore(store.text)
+        node_positions = []
+        for index in range(len(store)):
+            start, end = store.starts[index], store.ends[index]
+            position = max(bisect.bisect_right(starts, start) - 1, 0)
+            while position < len(starts) and starts[position] < end:
+                clipped_start, clipped_end = max(start, starts[position]), min(end, ends[position])
+                if clipped_start < clipped_end:
+                    result.add(store.entity_type(index), clipped_start, clipped_end, store.scores[index])
+                    node_positions.append(position)
+                position += 1
+        return result, node_positions
+
+    def anonymize_nodes(self, texts: Sequence[str], analyze: Callable[[str], EntityStore]) -> NodeAnonymization:
+        """
+        Anonymizuje textové uzly jednou analýzou a jedním průchodem operátorů.
+
+        Uzly se spojí oddělovačem, spojený text se analyzuje funkcí `analyze`,
+        překryvy se vyřeší a entity se oříznou na hranice uzlů. Náhrady se
+        spočítají dávkově pro všechny uzly a složí zpět po uzlech.
+
+        Args:
+            texts: Texty uzlů
+            analyze: Funkce, která spojený text analyzuje a vrátí úložiště entit
+
+        Returns:
+            Anonymizované texty uzlů, entity a provedené náhrady
+        """
+        starts, ends = [], []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text)
+            ends.append(position)
+            position += len(NODE_SEPARATOR)
+        joined = NODE_SEPARATOR.join(texts)
+
+        detected = analyze(joined)
+        resolved = self.presidio_service._resolve_conflicts(detected)
+        store, node_positions = self._split_to_nodes(resolved, starts, ends)
+        result = self.presidio_service.fast_anonymizer.anonymize(joined, store)
+
+        node_parts: Dict[int, List[str]] = {}
+        node_cursor: Dict[int, int] = {}
+        items = []
+        for store_index, start, end, replacement, operator_name in result.items:
+            node = node_positions[store_index]
+            parts = node_parts.setdefault(node, [])
+            parts.append(joined[node_cursor.get(node, starts[node]):start])
+            parts.append(replacement)
+            node_cursor[node] = end
+            items.append((node, store_index, start - starts[node], end - starts[node], replacement, operator_name))
+
+        anonymized_texts = list(texts)
+        for node, parts in node_parts.items():
+            parts.append(joined[node_cursor[node]:ends[node]])
+            anonymized_texts[node] = "".join(parts)
+
+        return NodeAnonymization(
+            texts=anonymized_texts,
+            changed=sorted(node_parts),
+            store=store,
+            items=items,
+            conflicts_resolved=len(detected) - len(resolved),
+        )
+
+    def process(self, document: Document) -> AnonymizedDocument:
+        """
+        Anonymizuje strukturovaný dokument.
+
+        Args:
+            document: Dokument s typem obsahu JSON, XML nebo HTML
+
+        Returns:
+            Anonymizovaný dokument se zachovanou strukturou
+        """
+        service = self.presidio_service
+        document_format = STRUCTURED_FORMATS[document.content_type](document.content)
+        nodes = document_format.nodes
+        selected = self._select_nodes(nodes, document.metadata or {})
+        routing: Dict = {}
+
+        def analyze(joined: str) -> EntityStore:
+            # Jedna analýza celého dokumentu včetně směrování jazyka
+            routing.update(service._route_document(
+                Document(id=document.id, content=joined, metadata=document.metadata)
+            ))
+            return service._analyze_segments(joined, routing["segments"])
+
+        result = self.anonymize_nodes([nodes[index].text for index in selected], analyze)
+
+        anonymized_entities = [
+            AnonymizedEntity.model_construct(
+                original_entity=DetectedEntity.model_construct(
+                    entity_type=result.store.entity_type(store_index),
+                    start=start,
+                    end=end,
+                    score=result.store.scores[store_index],
+                    text=nodes[selected[node]].text[start:end],
+                    context="",
+                    metadata={"path": nodes[selected[node]].path},
+                ),
+                anonymized_text=replacement,
+                operator_name=operator_name,
+                metadata={},
+            )
+            for node, store_index, start, end, replacement, operator_name in result.items
+        ]
+        replacements = {selected[node]: result.texts[node] for node in result.changed}
+        anonymized_content = document_format.serialize(replacements) if replacements else document.content
+
+        logger.info(
+            f"Structured document {document.id} processed: {len(selected)}/{len(nodes)} text nodes analyzed, "
+            f"{len(replacements)} rewritten"
+        )
+        return AnonymizedDocument(
+            id=f"anon_{document.id}" if document.id else None,
+            content=anonymized_content,
+            content_type=document.content_type,
+            original_document_id=document.id,
+            entities=anonymized_entities,
+            metadata=document.metadata,
+            statistics={
+                "total_entities_detected": len(result.store),
+                "entities_by_type": result.store.count_by_type(),
+                "conflicts_resolved": result.conflicts_resolved,
+                "language_routing": routing,
+                "text_nodes_total": len(nodes),
+                "text_nodes_analyzed": len(selected),
+                "text_nodes_rewritten": len(replacements),
+                "processing_time_ms": 0
+            }
+        )
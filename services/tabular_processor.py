@@ -0,0 +1,299 @@
+import logging
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.entity_store import EntityStore
+from services.structured_processor import NODE_SEPARATOR
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Výchozí počet řádků jednoho bloku
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Maximální délka spojeného textu jedné analýzy (spaCy má limit 1 000 000 znaků)
+MAX_ANALYSIS_CHARS = 100_000
+
+# Plány podle názvu sloupce: regulární výraz -> typy entit k detekci.
+# Sloupce bez shody se analyzují všemi rozpoznávači.
+COLUMN_NAME_PLANS = [
+    (re.compile(r"^(rc|r\.?c\.?|rodne_?cislo|birth_?number)$", re.IGNORECASE), ["CZECH_BIRTH_NUMBER"]),
+    (re.compile(r"^(cp|cislo_?pojistence|insurance_?number)$", re.IGNORECASE), ["CZECH_HEALTH_INSURANCE_NUMBER"]),
+    (re.compile(r"^(ico|ičo)$", re.IGNORECASE), ["CZECH_ICO"]),
+    (re.compile(r"^(dic|dič)$", re.IGNORECASE), ["CZECH_DIC"]),
+    (re.compile(r"e-?mail", re.IGNORECASE), ["EMAIL_ADDRESS"]),
+    (re.compile(r"(telefon|phone|mobil)", re.IGNORECASE), ["CZECH_PHONE_NUMBER", "PHONE_NUMBER"]),
+    (re.compile(r"(diagnoz|diagnóz|diagnos|mkn|icd)", re.IGNORECASE), ["CZECH_DIAGNOSIS_CODE"]),
+    (re.compile(r"(adresa|address|ulice|street)", re.IGNORECASE), ["CZECH_ADDRESS"]),
+    (re.compile(r"^(jmeno|jméno|prijmeni|příjmení|name|first_?name|last_?name|lekar|lékař)$", re.IGNORECASE), ["PERSON"]),
+]
+
+# Podporované tabulkové formáty podle přípony
+TABULAR_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+class TabularProcessor:
+    """
+    Anonymizace velkých tabulek (CSV, Parquet) po blocích a po sloupcích.
+
+    Každý sloupec dostane plán rozpoznávačů - seznam typů entit k detekci
+    (`None` = všechny, prázdný seznam = sloupec se neanalyzuje). Plán se
+    určí jednou z prvního bloku: explicitní plán má přednost, pak plán
+    podle názvu sloupce; číselné sloupce bez plánu se přeskočí.
+
+    V každém bloku se hodnoty sloupce deduplikují (`pd.factorize`), takže
+    každá unikátní hodnota se analyzuje jen jednou; unikátní hodnoty se
+    analyzují společně jako textové uzly (viz `StructuredProcessor`)
+    a výsledek se do sloupce rozloží vektorově přes kódy. Výstup se
+    zapisuje průběžně po blocích.
+    """
+
+    def __init__(
+        self,
+        presidio_service,
+        column_plans: Optional[Dict[str, Optional[List[str]]]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        language: str = "cs",
+    ):
+        """
+        Inicializace procesoru.
+
+        Args:
+            presidio_service: Služba PresidioService pro analýzu a anonymizaci
+            column_plans: Explicitní plány sloupců: název -> typy entit
+                (None = všechny rozpoznávače, [] = sloupec přeskočit)
+            chunk_size: Počet řádků jednoho bloku
+            language: Jazyk analyzační pipeline
+        """
+        self.presidio_service = presidio_service
+        self.column_plans = dict(column_plans or {})
+        self.chunk_size = chunk_size
+        self.language = language
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        """
+        Určí tabulkový formát podle přípony souboru.
+
+        Args:
+            path: Cesta k souboru
+
+        Returns:
+            "csv" nebo "parquet"
+
+        Raises:
+            ValueError: Pokud přípona není podporována
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in TABULAR_FORMATS:
+            raise ValueError(f"Unsupported tabular format: {extension}")
+        return TABULAR_FORMATS[extension]
+
+    def plan_columns(self, chunk: pd.DataFrame) -> Dict[str, Optional[List[str]]]:
+        """
+        Přiřadí každému sloupci plán rozpoznávačů.
+
+        Args:
+            chunk: První blok tabulky
+
+        Returns:
+            Slovník název sloupce -> typy entit (None = všechny, [] = přeskočit)
+        """
+        supported = set(self.presidio_service.analyzer.get_supported_entities(self.language))
+        plans = {}
+        for column in chunk.columns:
+            name = str(column)
+            if name in self.column_plans:
+                entities = self.column_plans[name]
+            else:
+                # Plán podle názvu má přednost před číselnou kontrolou - rodná
+                # čísla bez lomítka, IČO či telefony jsou v CSV jen číslice
+                entities = next(
+                    (entities for pattern, entities in COLUMN_NAME_PLANS if pattern.search(name)), None
+                )
+                if entities is None and self._is_numeric(chunk[column]):
+                    entities = []
+
+            if entities:
+                available = [entity for entity in entities if entity in supported]
+                if not available:
+                    # Bez rozpoznávače by sloupec zůstal neanonymizovaný
+                    logger.warning(
+                        f"No recognizer for {entities} in language '{self.language}', "
+                        f"column '{name}' will be analyzed by all recognizers"
+                    )
+                entities = available or None
+            plans[name] = entities
+        return plans
+
+    @staticmethod
+    def _is_numeric(series: pd.Series) -> bool:
+        """Vrátí True pro sloupce s čísly, daty nebo logickými hodnotami."""
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            return True
+        values = series[series.notna() & (series != "")]
+        if values.empty:
+            return False
+        # Čísla s desetinnou čárkou (české exporty) se považují také za čísla
+        normalized = values.astype(str).str.replace(",", ".", regex=False).str.strip()
+        return bool(pd.to_numeric(normalized, errors="coerce").notna().all())
+
+    def _read_chunks(self, path: str, file_format: str) -> Iterator[pd.DataFrame]:
+        """Načítá tabulku po blocích."""
+        if file_format == "csv":
+            # Vše jako text, aby se výstup neměnil převodem typů (např. "007")
+            yield from pd.read_csv(path, chunksize=self.chunk_size, dtype=str, keep_default_na=False)
+        else:
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+
+    def _anonymize_values(self, values: List[str], entities: Optional[List[str]], stats: Dict) -> List[str]:
+        """
+        Anonymizuje unikátní hodnoty sloupce po skupinách omezené délky.
+
+        Args:
+            values: Unikátní hodnoty
+            entities: Typy entit k detekci (None = všechny)
+            stats: Statistiky k aktualizaci
+
+        Returns:
+            Anonymizované hodnoty ve stejném pořadí
+        """
+        service = self.presidio_service
+        language = self.language
+
+        def analyze(joined: str) -> EntityStore:
+            return EntityStore.from_results(joined, service._run_analyzer(joined, language, entities))
+
+        groups: List[List[str]] = []
+        group: List[str] = []
+        group_chars = 0
+        for value in values:
+            if group and group_chars + len(value) > MAX_ANALYSIS_CHARS:
+                groups.append(group)
+                group, group_chars = [], 0
+            group.append(value)
+            group_chars += len(value) + len(NODE_SEPARATOR)
+        if group:
+            groups.append(group)
+
+        anonymized: List[str] = []
+        for group in groups:
+            result = service.structured_processor.anonymize_nodes(group, analyze)
+            anonymized.extend(result.texts)
+            stats["analysis_calls"] += 1
+            for entity_type, count in result.store.count_by_type().items():
+                stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + count
+        return anonymized
+
+    def _anonymize_chunk(self, chunk: pd.DataFrame, plans: Dict[str, Optional[List[str]]], stats: Dict) -> pd.DataFrame:
+        """
+        Anonymizuje jeden blok tabulky.
+
+        Args:
+            chunk: Blok tabulky
+            plans: Plány sloupců
+            stats: Statistiky k aktualizaci
+
+        Returns:
+            Anonymizovaný blok
+        """
+        for column in chunk.columns:
+            entities = plans.get(str(column))
+            if entities == []:
+                continue
+            series = chunk[column]
+            mask = series.notna().to_numpy() & (series.astype(str).str.strip() != "").to_numpy()
+            if not mask.any():
+                continue
+
+            codes, uniques = pd.factorize(series[mask].astype(str))
+            stats["cells_analyzed"] += int(mask.sum())
+            stats["unique_values_analyzed"] += len(uniques)
+
+            anonymized = np.asarray(self._anonymize_values(list(uniques), entities, stats), dtype=object)
+            values = series.to_numpy(dtype=object, copy=True)
+            values[mask] = anonymized[codes]
+            chunk[column] = values
+        return chunk
+
+    def process_file(
+        self,
+        input_path: str,
+        output_path: str,
+        input_format: Optional[str] = None,
+        output_format: Optional[str] = None,
+    ) -> Dict:
+        """
+        Anonymizuje tabulkový soubor a výsledek zapisuje průběžně po blocích.
+
+        Args:
+            input_path: Cesta ke vstupnímu souboru
+            output_path: Cesta k výstupnímu souboru
+            input_format: Formát vstupu (None = podle přípony)
+            output_format: Formát výstupu (None = podle přípony)
+
+        Returns:
+            Statistiky zpracování
+        """
+        start_time = time.time()
+        input_format = input_format or self.detect_format(input_path)
+        output_format = output_format or self.detect_format(output_path)
+        stats = {
+            "input_file": input_path,
+            "output_file": output_path,
+            "rows": 0,
+            "chunks": 0,
+            "cells_analyzed": 0,
+            "unique_values_analyzed": 0,
+            "analysis_calls": 0,
+            "entities_by_type": {},
+            "column_plans": None,
+            "processing_time_ms": 0,
+        }
+
+        plans = None
+        parquet_writer = None
+        try:
+            for chunk in self._read_chunks(input_path, input_format):
+                if plans is None:
+                    plans = self.plan_columns(chunk)
+                    stats["column_plans"] = plans
+                    logger.info(f"Column plans for {input_path}: {plans}")
+
+                chunk = self._anonymize_chunk(chunk, plans, stats)
+
+                if output_format == "csv":
+                    chunk.to_csv(output_path, mode="w" if stats["chunks"] == 0 else "a", header=stats["chunks"] == 0, index=False)
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if parquet_writer is None:
+                        parquet_writer = pq.ParquetWriter(output_path, table.schema)
+                    parquet_writer.write_table(table)
+
+                stats["rows"] += len(chunk)
+                stats["chunks"] += 1
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+        stats["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        logger.info(
+            f"Table {input_path} anonymized: {stats['rows']} rows, {stats['cells_analyzed']} cells, "
+            f"{stats['unique_values_analyzed']} unique values analyzed"
+        )
+        return stats
@@ -0,0 +1,212 @@
+import codecs
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Velikost bloku čteného z nahraného souboru
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Horní odhad režie objektu str nad jeho znaky
+_STR_OVERHEAD = 80
+
+
+class UploadTooLargeError(Exception):
+    """Nahraný soubor překročil povolenou velikost."""
+
+
+class UploadBudgetExceededError(Exception):
+    """Nahrávané soubory všech požadavků by překročily paměťový rozpočet."""
+
+
+class UploadBudget:
+    """
+    Společný paměťový rozpočet pro obsah nahraných souborů.
+
+    Každý požadavek si rezervuje paměť po blocích, jak soubor čte, i pro text
+    z něj dekódovaný, a uvolní ji po zpracování. Pokud by rezervace překročila limit, požadavek se
+    odmítne (místo čekání, které by drželo spojení i už načtená data), takže
+    souběh velkých uploadů nemůže vyčerpat paměť procesu.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Inicializace rozpočtu.
+
+        Args:
+            max_bytes: Maximální součet rezervací všech požadavků v bajtech
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"peak_bytes": 0, "rejected": 0, "leases": 0}
+
+    def _reserve(self, size: int) -> None:
+        """Rezervuje paměť, nebo vyvolá UploadBudgetExceededError."""
+        with self._lock:
+            if self._in_flight + size > self.max_bytes:
+                self._stats["rejected"] += 1
+                raise UploadBudgetExceededError(
+                    f"Upload memory budget exhausted ({self._in_flight} of {self.max_bytes} bytes in flight)"
+                )
+            self._in_flight += size
+            self._stats["peak_bytes"] = max(self._stats["peak_bytes"], self._in_flight)
+
+    def _release(self, size: int) -> None:
+        """Uvolní rezervovanou paměť."""
+        with self._lock:
+            self._in_flight -= size
+
+    @contextmanager
+    def lease(self) -> Iterator["UploadLease"]:
+        """
+        Otevře rezervaci pro jeden požadavek; po skončení se celá uvolní.
+
+        Yields:
+            Rezervace požadavku
+        """
+        lease = UploadLease(self)
+        with self._lock:
+            self._stats["leases"] += 1
+        try:
+            yield lease
+        finally:
+            self._release(lease.reserved)
+            lease.reserved = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky rozpočtu.
+
+        Returns:
+            Slovník s limitem, aktuální a nejvyšší rezervací a počtem odmítnutí
+        """
+        with self._lock:
+            return {"max_bytes": self.max_bytes, "in_flight_bytes": self._in_flight, **self._stats}
+
+
+class UploadLease:
+    """Rezervace paměti jednoho požadavku v UploadBudget."""
+
+    def __init__(self, budget: UploadBudget):
+        self.budget = budget
+        self.reserved = 0
+        # Velikost načtených souborů v bajtech
+        self.uploaded = 0
+
+    def reserve(self, size: int) -> None:
+        """
+        Rezervuje další paměť pro požadavek.
+
+        Args:
+            size: Velikost v bajtech
+
+        Raises:
+            UploadBudgetExceededError: Pokud by rezervace překročila rozpočet
+        """
+        self.budget._reserve(size)
+        self.reserved += size
+
+    def release(self, size: int) -> None:
+        """
+        Vrátí část rezervace (např. po uvolnění dočasných dat).
+
+        Args:
+            size: Velikost v bajtech
+        """
+        size = min(size, self.reserved)
+        self.budget._release(size)
+        self.reserved -= size
+
+
+def _decoded_size_bound(data: bytearray, encoding: str) -> int:
+    """
+    Horní odhad paměti textu dekódovaného z `data`.
+
+    str má podle nejvyššího znaku 1, 2 nebo 4 bajty na znak a znaků není víc
+    než bajtů; u UTF-8 šířku určí nejvyšší bajt (úvodní bajt 0xC4 a vyšší
+    znamená znak nad Latin-1, 0xF0 a vyšší znak mimo BMP).
+    """
+    name = codecs.lookup(encoding).name
+    top = max(data, default=0)
+    if name in ("ascii", "iso8859-1") or (name == "utf-8" and top < 0xC4):
+        width = 1
+    elif name == "utf-8" and top < 0xF0:
+        width = 2
+    else:
+        width = 4
+    return len(data) * width + _STR_OVERHEAD
+
+
+async def read_upload(
+    upload,
+    max_bytes: int,
+    lease: Optional[UploadLease] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> str:
+    """
+    Načte nahraný soubor po blocích a na konci ho jednou dekóduje.
+
+    Soubor s velikostí známou předem se nad limit vůbec nečte, jinak se čtení
+    přeruší hned po bloku, kterým velikost limit překročí. Bajty se rezervují
+    v rozpočtu průběžně, text se rezervuje podle horního odhadu dřív, než
+    vznikne, a po dekódování se rezervace srovná na skutečnou velikost textu
+    (bajty se uvolní). Špička paměti požadavku tak v rozpočtu je celá.
+
+    Tělo multipart požadavku Starlette přijme a uloží do SpooledTemporaryFile
+    (malé soubory v paměti, větší na disku) ještě před voláním endpointu;
+    rozpočet hlídá jen paměť, kterou drží aplikace, velikost těla požadavku
+    je potřeba omezit před aplikací (např. `client_max_body_size` v nginx).
+
+    Args:
+        upload: Nahraný soubor (objekt s asynchronní metodou read(size),
+            např. fastapi.UploadFile)
+        max_bytes: Maximální velikost souboru v bajtech
+        lease: Rezervace paměťového rozpočtu požadavku (None = bez rozpočtu)
+        encoding: Kódování obsahu
+        chunk_size: Velikost čteného bloku v bajtech
+
+    Returns:
+        Dekódovaný obsah souboru
+
+    Raises:
+        UploadTooLargeError: Pokud soubor překročí max_bytes
+        UploadBudgetExceededError: Pokud by obsah překročil paměťový rozpočet
+        UnicodeDecodeError: Pokud obsah není platný text v daném kódování
+    """
+    declared_size = getattr(upload, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise UploadTooLargeError(f"Upload of {declared_size} bytes exceeds limit of {max_bytes} bytes")
+
+    data = bytearray()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds limit of {max_bytes} bytes")
+        if lease is not None:
+            lease.reserve(len(chunk))
+        data += chunk
+
+    size = len(data)
+    bound = _decoded_size_bound(data, encoding)
+    if lease is not None:
+        lease.reserve(bound)
+    text = data.decode(encoding)
+    del data
+    if lease is not None:
+        lease.release(size + bound - sys.getsizeof(text))
+        lease.uploaded += size
+    return text
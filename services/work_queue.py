@@ -0,0 +1,348 @@
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services.sqlite_connections import SqliteConnections
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Stavy zprávy ve frontě
+PENDING = "pending"
+DONE = "done"
+DEAD = "dead"
+
+
+@dataclass
+class QueueMessage:
+    """Doručená zpráva fronty s potvrzenkou aktuálního doručení."""
+    id: str
+    payload: Dict
+    attempts: int
+    receipt: str
+
+
+class WorkQueue:
+    """
+    Rozhraní fronty práce pro distribuované anonymizační workery.
+
+    Doručení je alespoň jednou (at-least-once): vyzvednutá zpráva je po dobu
+    viditelnosti skrytá ostatním workerům a pokud ji worker do té doby
+    nepotvrdí (spadl, zasekl se), doručí se znovu. Zápis výsledku je proto
+    idempotentní - platí první zapsaný výsledek zprávy, opakované doručení
+    nic nepřepíše. Potvrzenka (receipt) identifikuje jedno doručení;
+    vrácení a prodloužení viditelnosti se starou potvrzenkou se ignoruje.
+
+    Rozhraní odpovídá běžným brokerům: `dequeue` je receive s visibility
+    timeoutem (SQS) nebo XREADGROUP + XAUTOCLAIM (Redis Streams), potvrzenka
+    je receipt handle nebo delivery tag (AMQP), výsledky se ukládají do
+    úložiště s podmíněným zápisem (SETNX, INSERT OR IGNORE).
+    """
+
+    def enqueue(self, message_id: str, payload: Dict) -> bool:
+        """
+        Zařadí zprávu do fronty.
+
+        Args:
+            message_id: Jednoznačné ID zprávy (opakované zařazení se ignoruje)
+            payload: Obsah zprávy (serializovatelný do JSON)
+
+        Returns:
+            True, pokud byla zpráva nově zařazena
+        """
+        return self.enqueue_many([(message_id, payload)]) == 1
+
+    def enqueue_many(self, messages: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        Zařadí více zpráv najednou.
+
+        Args:
+            messages: Dvojice (ID zprávy, obsah)
+
+        Returns:
+            Počet nově zařazených zpráv
+        """
+        raise NotImplementedError
+
+    def dequeue(self, max_messages: int, visibility_timeout: float) -> List[QueueMessage]:
+        """
+        Vyzvedne dávku zpráv a skryje je ostatním workerům.
+
+        Args:
+            max_messages: Maximální počet vyzvednutých zpráv
+            visibility_timeout: Doba v sekundách, po které se nepotvrzená
+                zpráva doručí znovu
+
+        Returns:
+            Vyzvednuté zprávy (prázdný seznam, pokud fronta nemá viditelné zprávy)
+        """
+        raise NotImplementedError
+
+    def complete(self, message: QueueMessage, result: Dict) -> bool:
+        """
+        Zapíše výsledek zprávy a potvrdí ji.
+
+        Args:
+            message: Zpracovaná zpráva
+            result: Výsledek zpracování (serializovatelný do JSON)
+
+        Returns:
+            True, pokud byl výsledek zapsán (False = výsledek už existoval)
+        """
+        raise NotImplementedError
+
+    def fail(self, message: QueueMessage, error: BaseException, retry: bool, delay: float = 0.0) -> str:
+        """
+        Zaznamená neúspěšné zpracování zprávy.
+
+        Args:
+            message: Zpráva, jejíž zpracování selhalo
+            error: Výjimka ze zpracování (ukládá se jen její typ)
+            retry: Zda zprávu doručit znovu
+            delay: Prodleva před dalším doručením v sekundách
+
+        Returns:
+            Nový stav zprávy ("pending" nebo "dead")
+        """
+        raise NotImplementedError
+
+    def extend(self, message: QueueMessage, visibility_timeout: float) -> bool:
+        """
+        Prodlouží viditelnost rozpracované zprávy.
+
+        Args:
+            message: Rozpracovaná zpráva
+            visibility_timeout: Nová doba skrytí od teď v sekundách
+
+        Returns:
+            True, pokud zprávu worker stále drží
+        """
+        raise NotImplementedError
+
+    def get_result(self, message_id: str) -> Optional[Dict]:
+        """
+        Vrátí výsledek zprávy.
+
+        Args:
+            message_id: ID zprávy
+
+        Returns:
+            Výsledek, nebo None, pokud zpráva ještě nebyla zpracována
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí statistiky fronty.
+
+        Returns:
+            Slovník s počty zpráv podle stavu
+        """
+        raise NotImplementedError
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    Lokální fronta práce v SQLite (WAL) pro workery na jednom stroji.
+
+    Vyzvednutí dávky je jedna zápisová transakce (BEGIN IMMEDIATE), takže
+    dva workery nikdy nedostanou tutéž zprávu v rámci jedné viditelnosti.
+    Zámek databáze se drží jen po dobu výběru dávky, ne během zpracování -
+    při dávkách desítek dokumentů je režie fronty zanedbatelná proti NLP
+    a propustnost roste s počtem procesů. Zpráva doručená `max_attempts`-krát
+    bez potvrzení (worker pokaždé spadl) se přesune mezi mrtvé. Spojení se
+    vytváří zvlášť pro každé vlákno a proces.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5):
+        """
+        Inicializace fronty.
+
+        Args:
+            path: Cesta k SQLite souboru
+            max_attempts: Maximální počet doručení zprávy
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.path = path
+        self.max_attempts = max_attempts
+        self._connections = SqliteConnections(path)
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connections.get()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " visible_at REAL NOT NULL,"
+            " receipt TEXT,"
+            " enqueued_at REAL NOT NULL,"
+            " last_error TEXT"
+            ")"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS messages_visible ON messages (state, visible_at)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " completed_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def _transaction(self, statements: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Provede funkci nad spojením v jedné zápisové transakci."""
+        connection = self._connections.get()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return result
+
+    def enqueue_many(self, messages: Iterable[Tuple[str, Dict]]) -> int:
+        now = time.time()
+        rows = [
+            (message_id, json.dumps(payload, ensure_ascii=False), PENDING, now, now)
+            for message_id, payload in messages
+        ]
+
+        def insert(connection: sqlite3.Connection) -> int:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO messages (id, payload, state, visible_at, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return connection.total_changes - before
+
+        inserted = self._transaction(insert)
+        logger.info(f"Enqueued {inserted} of {len(rows)} messages")
+        return inserted
+
+    def dequeue(self, max_messages: int, visibility_timeout: float) -> List[QueueMessage]:
+        if max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+
+        def claim(connection: sqlite3.Connection) -> List[QueueMessage]:
+            now = time.time()
+            receipt = uuid.uuid4().hex
+            while True:
+                rows = connection.execute(
+                    "SELECT id, payload, attempts FROM messages"
+                    " WHERE state = ? AND visible_at <= ? ORDER BY visible_at, rowid LIMIT ?",
+                    [PENDING, now, max_messages],
+                ).fetchall()
+                # Zpráva, jejíž doručení opakovaně skončilo pádem workeru
+                exhausted = [(DEAD, message_id) for message_id, _, attempts in rows if attempts >= self.max_attempts]
+                if exhausted:
+                    connection.executemany("UPDATE messages SET state = ?, receipt = NULL WHERE id = ?", exhausted)
+                    logger.warning(f"{len(exhausted)} messages exceeded {self.max_attempts} deliveries")
+                live = [row for row in rows if row[2] < self.max_attempts]
+                if live or not exhausted:
+                    break
+            connection.executemany(
+                "UPDATE messages SET attempts = attempts + 1, visible_at = ?, receipt = ? WHERE id = ?",
+                [(now + visibility_timeout, receipt, message_id) for message_id, _, _ in live],
+            )
+            return [
+                QueueMessage(message_id, json.loads(payload), attempts + 1, receipt)
+                for message_id, payload, attempts in live
+            ]
+
+        return self._transaction(claim)
+
+    def complete(self, message: QueueMessage, result: Dict) -> bool:
+        def store(connection: sqlite3.Connection) -> bool:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO results (id, result, completed_at) VALUES (?, ?, ?)",
+                [message.id, json.dumps(result, ensure_ascii=False), time.time()],
+            )
+            # Potvrzení platí i po vypršení viditelnosti - výsledek je hotový
+            connection.execute(
+                "UPDATE messages SET state = ?, receipt = NULL WHERE id = ? AND state = ?",
+                [DONE, message.id, PENDING],
+            )
+            return cursor.rowcount > 0
+
+        written = self._transaction(store)
+        if not written:
+            logger.info(f"Result of message {message.id} already written, duplicate delivery ignored")
+        return written
+
+    def fail(self, message: QueueMessage, error: BaseException, retry: bool, delay: float = 0.0) -> str:
+        state = PENDING if retry and message.attempts < self.max_attempts else DEAD
+        # Ukládá se jen typ chyby - zpráva může obsahovat osobní údaje
+        self._connections.get().execute(
+            "UPDATE messages SET state = ?, visible_at = ?, receipt = NULL, last_error = ?"
+            " WHERE id = ? AND receipt = ?",
+            [state, time.time() + delay, type(error).__name__, message.id, message.receipt],
+        )
+        if state == DEAD:
+            logger.warning(f"Message {message.id} failed permanently ({type(error).__name__})")
+        return state
+
+    def extend(self, message: QueueMessage, visibility_timeout: float) -> bool:
+        cursor = self._connections.get().execute(
+            "UPDATE messages SET visible_at = ? WHERE id = ? AND receipt = ? AND state = ?",
+            [time.time() + visibility_timeout, message.id, message.receipt, PENDING],
+        )
+        return cursor.rowcount > 0
+
+    def get_result(self, message_id: str) -> Optional[Dict]:
+        row = self._connections.get().execute("SELECT result FROM results WHERE id = ?", [message_id]).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def results(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Projde zapsané výsledky v pořadí ID zpráv.
+
+        Returns:
+            Iterátor dvojic (ID zprávy, výsledek)
+        """
+        for message_id, result in self._connections.get().execute("SELECT id, result FROM results ORDER BY id"):
+            yield message_id, json.loads(result)
+
+    def dead_messages(self, limit: int = 1000) -> List[Dict]:
+        """
+        Vrátí zprávy, které se nepodařilo zpracovat.
+
+        Args:
+            limit: Maximální počet záznamů
+
+        Returns:
+            Záznamy s ID, počtem doručení a typem poslední chyby
+        """
+        rows = self._connections.get().execute(
+            "SELECT id, attempts, last_error FROM messages WHERE state = ? LIMIT ?", [DEAD, limit]
+        ).fetchall()
+        return [{"id": message_id, "attempts": attempts, "last_error": error} for message_id, attempts, error in rows]
+
+    def get_stats(self) -> Dict:
+        connection = self._connections.get()
+        now = time.time()
+        counts = dict(connection.execute("SELECT state, COUNT(*) FROM messages GROUP BY state").fetchall())
+        in_flight = connection.execute(
+            "SELECT COUNT(*) FROM messages WHERE state = ? AND receipt IS NOT NULL AND visible_at > ?",
+            [PENDING, now],
+        ).fetchone()[0]
+        redelivered = connection.execute("SELECT COUNT(*) FROM messages WHERE attempts > 1").fetchone()[0]
+        return {
+            "pending": counts.get(PENDING, 0) - in_flight,
+            "in_flight": in_flight,
+            "done": counts.get(DONE, 0),
+            "dead": counts.get(DEAD, 0),
+            "results": connection.execute("SELECT COUNT(*) FROM results").fetchone()[0],
+            "redelivered": redelivered,
+        }
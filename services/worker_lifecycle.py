@@ -0,0 +1,296 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Nastavení loggeru
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Důvody recyklace
+RECYCLE_DOCUMENTS = "documents"
+RECYCLE_RSS = "rss"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes(pid: Optional[int] = None) -> int:
+    """
+    Vrátí aktuální velikost rezidentní paměti (RSS) procesu.
+
+    Čte se z /proc/<pid>/statm; bez procfs se pro vlastní proces vrátí
+    maximum RSS z `resource.getrusage` (horní odhad).
+
+    Args:
+        pid: ID procesu (None = aktuální proces)
+
+    Returns:
+        RSS v bajtech (0, pokud ji nelze zjistit)
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if pid not in (None, os.getpid()):
+        return 0
+    try:
+        import resource
+
+        # Linux vrací kilobajty, macOS bajty
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class WorkerLifecycle:
+    """
+    Pravidla recyklace dlouho běžícího workeru.
+
+    spaCy při zpracování přidává každý nový řetězec do StringStore slovníku
+    modelu a alokátor uvolněnou paměť často systému nevrací, takže RSS
+    procesu s modely během běhu jen roste. Worker se proto po `max_documents`
+    dokumentech nebo po překročení `max_rss_mb` nahradí čerstvým.
+    Samotnou výměnu provádí vlastník workeru (watchdog, pool, API);
+    tato třída jen rozhoduje a vede metriky.
+    """
+
+    def __init__(self, max_documents: Optional[int] = None, max_rss_mb: Optional[float] = None):
+        """
+        Inicializace pravidel recyklace.
+
+        Args:
+            max_documents: Recyklovat po tolika dokumentech (None = bez limitu)
+            max_rss_mb: Recyklovat po překročení RSS v MB (None = bez limitu)
+        """
+        if max_documents is not None and max_documents < 1:
+            raise ValueError("max_documents must be at least 1")
+        if max_rss_mb is not None and max_rss_mb <= 0:
+            raise ValueError("max_rss_mb must be positive")
+        self.max_documents = max_documents
+        self.max_rss_mb = max_rss_mb
+        self._lock = threading.Lock()
+        self._documents = 0
+        self._rss_bytes = 0
+        self._stats = {
+            "recycles": 0,
+            "recycles_by_reason": {RECYCLE_DOCUMENTS: 0, RECYCLE_RSS: 0},
+            "peak_rss_bytes": 0,
+            "last_recycled_at": None,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Zda je nastaven alespoň jeden limit."""
+        return self.max_documents is not None or self.max_rss_mb is not None
+
+    def record(self, rss_bytes: Optional[int] = None) -> Optional[str]:
+        """
+        Započítá zpracovaný dokument a rozhodne o recyklaci.
+
+        Args:
+            rss_bytes: RSS workeru po dokumentu (None = neměřeno)
+
+        Returns:
+            Důvod recyklace ("documents", "rss"), nebo None
+        """
+        with self._lock:
+            self._documents += 1
+            if rss_bytes is not None:
+                self._rss_bytes = rss_bytes
+                self._stats["peak_rss_bytes"] = max(self._stats["peak_rss_bytes"], rss_bytes)
+            if self.max_rss_mb is not None and self._rss_bytes > self.max_rss_mb * 1024 * 1024:
+                return RECYCLE_RSS
+            if self.max_documents is not None and self._documents >= self.max_documents:
+                return RECYCLE_DOCUMENTS
+            return None
+
+    def recycled(self, reason: str) -> None:
+        """
+        Zaznamená provedenou recyklaci a začne počítat znovu.
+
+        Args:
+            reason: Důvod recyklace
+        """
+        with self._lock:
+            logger.info(
+                f"Worker recycled ({reason}) after {self._documents} documents, "
+                f"RSS {self._rss_bytes / (1024 * 1024):.0f} MB"
+            )
+            self._documents = 0
+            self._rss_bytes = 0
+            self._stats["recycles"] += 1
+            self._stats["recycles_by_reason"][reason] = self._stats["recycles_by_reason"].get(reason, 0) + 1
+            self._stats["last_recycled_at"] = datetime.now().isoformat()
+
+    def reset(self) -> None:
+        """Začne počítat znovu po náhradě workeru z jiného důvodu (pád, časový limit)."""
+        with self._lock:
+            self._documents = 0
+            self._rss_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí metriky recyklace.
+
+        Returns:
+            Slovník s počty recyklací, dokumenty aktuálního workeru a jeho RSS
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "recycles_by_reason": dict(self._stats["recycles_by_reason"]),
+                "documents_since_recycle": self._documents,
+                "rss_bytes": self._rss_bytes,
+                "max_documents": self.max_documents,
+                "max_rss_mb": self.max_rss_mb,
+            }
+
+
+class RecyclingService:
+    """
+    Služba v procesu API, která se po limitu nahradí předem zahřátou kopií.
+
+    Náhrada se sestaví a zahřeje ve vlákně na pozadí, zatímco požadavky dál
+    obsluhuje stávající instance; teprve hotová náhrada se atomicky vymění.
+    Rozpracované požadavky doběhnou na staré instanci (drží na ni odkaz)
+    a ta se uvolní po posledním z nich, takže výměna nezpůsobí výkyv latence.
+    Nová instance má nový spaCy slovník, takže StringStore nepřerůstá; RSS
+    procesu ale alokátor vrátit nemusí a stará instance se uvolní až po
+    doběhnutí požadavků. Recyklace se proto řídí jen počtem požadavků
+    (`max_documents`), limit RSS z `lifecycle` se v procesu nepoužije: RSS
+    by po výměně neklesla a každý další požadavek by spustil další sestavení.
+    Pro tvrdý limit paměti je potřeba recyklovat celé procesy (např.
+    `--max-requests` gunicornu).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        lifecycle: Optional[WorkerLifecycle] = None,
+        warmup: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Inicializace služby.
+
+        Args:
+            factory: Funkce, která vytvoří novou instanci služby
+            lifecycle: Pravidla recyklace (None = bez recyklace)
+            warmup: Funkce, která novou instanci zahřeje před nasazením
+        """
+        self.factory = factory
+        self.lifecycle = lifecycle or WorkerLifecycle()
+        self.warmup = warmup
+        if self.lifecycle.max_rss_mb is not None:
+            logger.warning(
+                "RSS limit is not enforced for in-process service recycling, "
+                "recycle processes instead (e.g. gunicorn --max-requests)"
+            )
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._in_flight: Dict[int, int] = {}
+        self._replacement_thread: Optional[threading.Thread] = None
+        self._stats = {"replacement_failures": 0, "last_replacement_seconds": None}
+        self._service = self._build()
+
+    def _build(self) -> Any:
+        """Vytvoří a zahřeje novou instanci služby."""
+        service = self.factory()
+        if self.warmup is not None:
+            self.warmup(service)
+        return service
+
+    @property
+    def service(self) -> Any:
+        """Aktuální instance služby."""
+        return self._service
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Zapůjčí aktuální instanci služby na dobu jednoho požadavku.
+
+        Yields:
+            Instance služby
+        """
+        with self._lock:
+            service = self._service
+            generation = self._generation
+            self._in_flight[generation] = self._in_flight.get(generation, 0) + 1
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self._in_flight[generation] -= 1
+                if not self._in_flight[generation] and generation != self._generation:
+                    # Poslední požadavek staré instance - instance je vyprázdněná
+                    del self._in_flight[generation]
+            if generation == self._generation:
+                # Bez RSS - výměna instance RSS procesu nesníží
+                reason = self.lifecycle.record()
+                if reason:
+                    self._schedule_replacement(reason)
+
+    def _schedule_replacement(self, reason: str) -> None:
+        """Spustí sestavení náhrady na pozadí (nejvýše jedno současně)."""
+        with self._lock:
+            if self._replacement_thread is not None and self._replacement_thread.is_alive():
+                return
+            self._replacement_thread = threading.Thread(
+                target=self._replace, args=(reason,), name="service-recycler", daemon=True
+            )
+            self._replacement_thread.start()
+
+    def _replace(self, reason: str) -> None:
+        """Sestaví náhradu a vymění ji za aktuální instanci."""
+        start_time = time.monotonic()
+        try:
+            replacement = self._build()
+        except Exception as e:
+            # Obsluha pokračuje se stávající instancí, pokus se zopakuje po dalším požadavku
+            self._stats["replacement_failures"] += 1
+            logger.error(f"Cannot build replacement service: {str(e)}")
+            return
+        with self._lock:
+            previous = self._generation
+            self._service = replacement
+            self._generation += 1
+            if not self._in_flight.get(previous):
+                self._in_flight.pop(previous, None)
+        self._stats["last_replacement_seconds"] = round(time.monotonic() - start_time, 3)
+        self.lifecycle.recycled(reason)
+
+    def wait_for_replacement(self, timeout: Optional[float] = None) -> None:
+        """Počká na dokončení rozpracované výměny (pro testy a ukončení)."""
+        thread = self._replacement_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """
+        Vrátí metriky služby.
+
+        Returns:
+            Slovník s metrikami recyklace, generací instance a RSS procesu
+        """
+        with self._lock:
+            in_flight = sum(self._in_flight.values())
+            draining = sum(1 for generation in self._in_flight if generation != self._generation)
+            replacing = self._replacement_thread is not None and self._replacement_thread.is_alive()
+        return {
+            **self.lifecycle.get_stats(),
+            **self._stats,
+            "generation": self._generation,
+            "in_flight": in_flight,
+            "draining_instances": draining,
+            "replacement_pending": replacing,
+            "process_rss_bytes": current_rss_bytes(),
+        }
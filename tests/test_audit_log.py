@@ -0,0 +1,91 @@
+"""
+Testy pro append-only auditní log
+"""
+import pytest
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.audit_log import AuditLog
+
+
+class TestAuditLog:
+    """Testy pro AuditLog"""
+
+    @pytest.fixture
+    def audit_log(self, tmp_path):
+        """Fixture pro auditní log v dočasném adresáři"""
+        audit_log = AuditLog(str(tmp_path), flush_interval=0.05, batch_size=50)
+        yield audit_log
+        audit_log.close()
+
+    def test_batched_writes_and_query(self, audit_log):
+        """Test dávkového zápisu a vyhledání podle ID dokumentu"""
+        for i in range(120):
+            audit_log.record(f"doc{i % 10}.txt", True, entities_detected=i, details={"entities_by_type": {"PERSON": i}})
+        audit_log.record("doc3.txt", False, error_message="timeout")
+        assert audit_log.flush(timeout=10)
+
+        stats = audit_log.get_stats()
+        assert stats["records_written"] == 121
+        assert stats["batches"] < 121
+
+        records = audit_log.query(document_id="doc3.txt")
+        assert len(records) == 13
+        assert records[0]["success"] is False and records[0]["error_message"] == "timeout"
+        assert records[1]["details"] == {"entities_by_type": {"PERSON": 113}}
+        assert len(audit_log.query(success=False)) == 1
+        assert len(audit_log.query(limit=5)) == 5
+
+    def test_document_index_is_used(self, audit_log):
+        """Test, že dotaz podle ID dokumentu používá index"""
+        audit_log.record("doc.txt", True)
+        audit_log.flush(timeout=10)
+
+        connection = sqlite3.connect(audit_log.segments()[0])
+        plan = " ".join(
+            str(row) for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM audit_records WHERE document_id = ?", ["doc.txt"]
+            )
+        )
+        connection.close()
+        assert "idx_audit_document" in plan
+
+    def test_rotation_across_segments(self, tmp_path):
+        """Test rotace segmentů a dotazu přes všechny segmenty"""
+        audit_log = AuditLog(str(tmp_path), flush_interval=0.05, batch_size=10, max_segment_records=25)
+        for i in range(3):
+            for j in range(10):
+                audit_log.record(f"doc{j}.txt", True, details={"round": i})
+            audit_log.flush(timeout=10)
+        audit_log.close()
+
+        reopened = AuditLog(str(tmp_path))
+        assert len(reopened.segments()) == 2
+        assert [record["details"]["round"] for record in reopened.query(document_id="doc0.txt")] == [2, 1, 0]
+        reopened.close()
+
+    def test_concurrent_producers(self, audit_log):
+        """Test zápisu z více vláken najednou"""
+        def producer(thread_id):
+            for i in range(200):
+                audit_log.record(f"t{thread_id}-{i}", True)
+
+        threads = [threading.Thread(target=producer, args=(thread_id,)) for thread_id in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        audit_log.flush(timeout=10)
+
+        assert audit_log.get_stats()["records_written"] == 800
+
+    def test_invalid_durability(self, tmp_path):
+        """Test neplatné politiky trvanlivosti"""
+        with pytest.raises(ValueError):
+            AuditLog(str(tmp_path), durability="sometimes")
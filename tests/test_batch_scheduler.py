@@ -0,0 +1,226 @@
+"""
+Testy pro plánování paralelní dávky podle velikosti souborů
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, AnonymizedEntity, BatchProcessingConfig, DetectedEntity, Document
+from services.batch_processor import BatchProcessor
+from services.batch_scheduler import (
+    BatchScheduler,
+    core_utilization,
+    merge_documents,
+    split_document,
+    split_text,
+)
+from services.file_enumerator import FileEntry
+from services.worker_lifecycle import WorkerLifecycle
+
+# Výraz s vnořenými kvantifikátory a vstup, na kterém backtrackuje exponenciálně
+BACKTRACKING_PATTERN = re.compile(r"^(\w+\s?)+$")
+ADVERSARIAL_TEXT = "Nemocnice Na Homolce " * 4 + "!"
+
+
+def make_entry(name: str, size: int) -> FileEntry:
+    """Vytvoří záznam výčtu souboru dané velikosti"""
+    return FileEntry(f"/data/{name}", name, size, 0.0, 0.0)
+
+
+class NameService:
+    """Náhrada PresidioService: nahradí jméno "Novak" a převede text na velká písmena"""
+
+    def process_document(self, document):
+        if "FAIL" in document.content:
+            raise ValueError("cannot process")
+        text = document.content
+        entities = []
+        position = text.find("Novak")
+        while position != -1:
+            entities.append(AnonymizedEntity.model_construct(
+                original_entity=DetectedEntity.model_construct(
+                    entity_type="PERSON", start=position, end=position + 5, score=1.0, text="Novak"
+                ),
+                anonymized_text="[PERSON]",
+                operator_name="replace",
+                metadata={},
+            ))
+            position = text.find("Novak", position + 1)
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=text.replace("Novak", "[PERSON]").upper(),
+            original_document_id=document.id,
+            entities=entities,
+            statistics={"total_entities_detected": len(entities), "entities_by_type": {"PERSON": len(entities)}},
+        )
+
+
+class TestBatchScheduler:
+    """Testy pro BatchScheduler"""
+
+    def test_largest_first_packing_and_splitting(self):
+        """Test rozdělení velkého souboru, zabalení malých a pořadí od největší jednotky"""
+        entries = [make_entry(f"small{i}.txt", 600) for i in range(20)]
+        entries += [make_entry("big.txt", 60_000), make_entry("big.json", 60_000), make_entry("medium.txt", 9_000)]
+        plan = BatchScheduler(workers=2, unit_tokens=2_000, min_unit_tokens=100).plan(entries)
+
+        tokens = [unit.tokens for unit in plan.units]
+        assert tokens == sorted(tokens, reverse=True)
+
+        big_parts = [unit for unit in plan.units if unit.entries[0].name == "big.txt"]
+        assert len(big_parts) == 5 and all(unit.is_split for unit in big_parts)
+        assert sorted(unit.part for unit in big_parts) == list(range(5))
+        # Strukturovaný dokument se nerozděluje
+        assert [unit.parts for unit in plan.units if unit.entries[0].name == "big.json"] == [1]
+
+        # Malé soubory po 100 tokenech se balí do jednotek v rozpočtu
+        small_units = [unit for unit in plan.units if any(entry.name.startswith("small") for entry in unit.entries)]
+        assert all(unit.tokens <= plan.stats["unit_tokens"] for unit in small_units)
+        assert sum(entry.name.startswith("small") for unit in small_units for entry in unit.entries) == 20
+        assert len(small_units) <= 2
+        assert plan.stats["split_files"] == 1 and plan.stats["packed_files"] >= 2
+
+    def test_budget_shrinks_for_small_batch(self):
+        """Test zmenšení rozpočtu, aby na každý worker připadlo více jednotek"""
+        entries = [make_entry(f"doc{i}.txt", 6_000) for i in range(16)]
+        plan = BatchScheduler(workers=4, unit_tokens=1_000_000, min_unit_tokens=100).plan(entries)
+        assert len(plan.units) >= 4 * 2
+
+    def test_split_text_prefers_paragraphs(self):
+        """Test řezu na hranici odstavce a pokrytí celého textu"""
+        text = "Pacient Jan Novak.\n\nBydliste Praha 5.\n\nLekar MUDr. Svoboda."
+        bounds = split_text(text, 3)
+        assert bounds[0][0] == 0 and bounds[-1][1] == len(text)
+        assert all(previous[1] == current[0] for previous, current in zip(bounds, bounds[1:]))
+        assert all(text[start - 2:start] == "\n\n" for start, _ in bounds[1:])
+
+    def test_merge_shifts_entity_offsets(self):
+        """Test spojení částí s posunem pozic entit"""
+        service = NameService()
+        document = Document(id="a.txt", content="Jan Novak\n\nMarie Novak\n\nPetr Novak")
+        parts = [split_document(document, part, 3) for part in range(3)]
+        merged = merge_documents(document, [(service.process_document(piece), offset) for piece, offset in parts])
+
+        assert merged.content == service.process_document(document).content
+        assert [entity.original_entity.start for entity in merged.entities] == [
+            position for position in range(len(document.content)) if document.content.startswith("Novak", position)
+        ]
+        assert merged.statistics["total_entities_detected"] == 3
+
+    def test_core_utilization(self):
+        """Test výpočtu využití workerů"""
+        assert core_utilization(6.0, 2.0, 4) == 0.75
+        assert core_utilization(1.0, 0.0, 4) == 0.0
+
+
+class HangingService(NameService):
+    """Náhrada PresidioService, která na adversariálním vstupu uvízne v regulárním výrazu"""
+
+    def process_document(self, document):
+        BACKTRACKING_PATTERN.search(document.content)
+        return super().process_document(document)
+
+
+class FailingUnitProcessor(BatchProcessor):
+    """BatchProcessor, jehož worker selže na jednotce se souborem "boom" mimo zpracování souboru"""
+
+    def _process_unit(self, unit, deadline):
+        if any(entry.name.startswith("boom") for entry in unit.entries):
+            raise RuntimeError("audit flush failed")
+        return super()._process_unit(unit, deadline)
+
+
+class TestParallelBatch:
+    """Testy paralelní dávky v BatchProcessor"""
+
+    def test_parallel_batch_with_split_document(self, tmp_path):
+        """Test paralelního zpracování s rozdělením velkého souboru"""
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        big_text = "\n\n".join(f"Odstavec {i}: pacient Novak, kontrola." for i in range(400))
+        (input_dir / "big.txt").write_text(big_text, encoding="utf-8")
+        for i in range(10):
+            (input_dir / f"small{i}.txt").write_text(f"Pan Novak {i}", encoding="utf-8")
+        (input_dir / "bad.txt").write_text("FAIL", encoding="utf-8")
+
+        processor = BatchProcessor(
+            NameService(),
+            input_dir=str(input_dir),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+        )
+        stats = processor.process_batch(BatchProcessingConfig(workers=3, unit_tokens=500, timeout_seconds=0))
+        processor.audit_log.close()
+
+        assert stats["total_files"] == 12
+        assert stats["successful_files"] == 11 and stats["failed_files"] == 1
+        assert stats["total_entities_detected"] == 410
+        assert (tmp_path / "out" / "big.txt").read_text(encoding="utf-8") == big_text.replace("Novak", "[PERSON]").upper()
+        assert (tmp_path / "out" / "small3.txt").read_text(encoding="utf-8") == "PAN [PERSON] 3"
+        assert (tmp_path / "errors" / "bad.txt").exists()
+
+        scheduling = stats["scheduling"]
+        assert scheduling["split_files"] == 1 and scheduling["units"] > 3
+        assert 0 < scheduling["core_utilization"] <= 1
+
+    def test_parallel_batch_enforces_document_timeout(self, tmp_path):
+        """Test, že uvízlý dokument v paralelní dávce skončí po limitu a ostatní se zpracují"""
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        (input_dir / "evil.txt").write_text(ADVERSARIAL_TEXT, encoding="utf-8")
+        for i in range(6):
+            (input_dir / f"small{i}.txt").write_text(f"Pan Novak {i}", encoding="utf-8")
+
+        processor = BatchProcessor(
+            HangingService(),
+            input_dir=str(input_dir),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+            worker_lifecycle=WorkerLifecycle(max_documents=2),
+        )
+        start_time = time.monotonic()
+        stats = processor.process_batch(BatchProcessingConfig(workers=2, unit_tokens=10, timeout_seconds=1))
+        processor.watchdog.close()
+        processor.audit_log.close()
+
+        assert time.monotonic() - start_time < 30
+        assert stats["total_files"] == 7
+        assert stats["successful_files"] == 6 and stats["timed_out_files"] == 1
+        assert stats["scheduling"]["timed_out_units"] >= 1
+        assert (tmp_path / "errors" / "evil.txt").exists()
+        assert (tmp_path / "out" / "small3.txt").read_text(encoding="utf-8") == "PAN [PERSON] 3"
+
+    def test_failed_unit_does_not_abort_batch(self, tmp_path):
+        """Test, že chyba jednotky vedle uvízlé jednotky dávku neukončí ani nezasekne"""
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        (input_dir / "evil.txt").write_text(ADVERSARIAL_TEXT, encoding="utf-8")
+        (input_dir / "boom.txt").write_text("Pan Novak", encoding="utf-8")
+        for i in range(3):
+            (input_dir / f"small{i}.txt").write_text(f"Pan Novak {i}", encoding="utf-8")
+
+        processor = FailingUnitProcessor(
+            HangingService(),
+            input_dir=str(input_dir),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+        )
+        start_time = time.monotonic()
+        stats = processor.process_batch(BatchProcessingConfig(workers=2, unit_tokens=10, timeout_seconds=1))
+        processor.watchdog.close()
+        processor.audit_log.close()
+
+        assert time.monotonic() - start_time < 30
+        assert stats["total_files"] == 5
+        assert stats["successful_files"] == 4 and stats["timed_out_files"] == 1
+        assert stats["scheduling"]["failed_units"] >= 1
+        # Soubor selhané jednotky zpracoval rodič
+        assert (tmp_path / "out" / "boom.txt").read_text(encoding="utf-8") == "PAN [PERSON]"
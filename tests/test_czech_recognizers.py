@@ -16,6 +16,11 @@ from recognizers.health_insurance import CzechHealthInsuranceNumberRecognizer
 from recognizers.diagnosis_codes import CzechMedicalDiagnosisCodeRecognizer
 from recognizers.medical_facilities import CzechMedicalFacilityRecognizer
 from recognizers.czech_ico_recognizer import CzechICORecognizer # Import pro IČO
+from recognizers.checksum_validators import (
+    BATCH_VALIDATION_THRESHOLD,
+    validate_birth_numbers,
+    validate_icos,
+)
 
 class TestCzechBirthNumberRecognizer:
     """Testy pro rozpoznávač českých rodných čísel"""
@@ -188,3 +193,38 @@ class TestCzechICORecognizer:
         # Předpokládáme, že tato čísla nejsou validní IČO (což pro 12345678 a 87654321 platí)
         results = recognizer.analyze(text, entities=["CZECH_ICO"], nlp_artifacts=None)
         assert len(results) == 0
+
+
+class TestChecksumValidators:
+    """Testy pro dávkovou validaci kontrolních součtů"""
+
+    BIRTH_NUMBERS = ["7605061234", "760506/1234", "761306/1234", "760532/1234", "856215/123", "8562151234", "12345/67890"]
+    ICOS = ["00027383", "00023221", "27082440", "12345678", "00000000", "1234567X", "1234567"]
+
+    def test_birth_numbers_match_single_validation(self):
+        """Test shody dávkové validace rodných čísel s jednotlivou validací"""
+        recognizer = CzechBirthNumberRecognizer()
+        mask = validate_birth_numbers(self.BIRTH_NUMBERS)
+        assert list(mask) == [recognizer._is_valid_birth_number(value) for value in self.BIRTH_NUMBERS]
+
+    def test_icos_match_single_validation(self):
+        """Test shody dávkové validace IČO s jednotlivou validací"""
+        recognizer = CzechICORecognizer()
+        mask = validate_icos(self.ICOS)
+        assert list(mask) == [recognizer._is_valid_ico(value) for value in self.ICOS]
+
+    def test_empty_input(self):
+        """Test prázdného vstupu"""
+        assert len(validate_birth_numbers([])) == 0
+        assert len(validate_icos([])) == 0
+
+    def test_recognizer_uses_batch_above_threshold(self):
+        """Test, že rozpoznávač nad prahem vrací stejné výsledky jako jednotlivá validace"""
+        recognizer = CzechICORecognizer()
+        values = (self.ICOS[:5] * BATCH_VALIDATION_THRESHOLD)[:BATCH_VALIDATION_THRESHOLD + 1]
+        text = ", ".join(values)
+
+        results = recognizer.analyze(text, entities=["CZECH_ICO"], nlp_artifacts=None)
+
+        expected = [value for value in values if recognizer._is_valid_ico(value)]
+        assert [text[result.start:result.end] for result in results] == expected
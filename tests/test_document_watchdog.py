@@ -0,0 +1,177 @@
+"""
+Testy pro časové limity zpracování dokumentů
+"""
+import re
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, AnonymizedEntity, BatchProcessingConfig, DetectedEntity, Document
+from services.batch_processor import BatchProcessor
+from services.document_watchdog import DocumentTimeoutError, DocumentWatchdog
+from services.pseudonym_store import PseudonymStore
+
+# Výraz s vnořenými kvantifikátory - na textu bez shody backtrackuje exponenciálně
+BACKTRACKING_PATTERN = re.compile(r"^(\w+\s?)+$")
+
+# Adversariální vstup: dlouhý sled slov zakončený znakem, který shodu znemožní
+ADVERSARIAL_TEXT = "Nemocnice Na Homolce " * 4 + "!"
+
+
+class RegexService:
+    """Náhrada PresidioService, která text prohledá zranitelným výrazem"""
+
+    def process_document(self, document):
+        if "CRASH" in document.content:
+            sys.exit(3)
+        if "BAD" in document.content:
+            raise ValueError("invalid document")
+        BACKTRACKING_PATTERN.search(document.content)
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.upper(),
+            original_document_id=document.id,
+            statistics={"total_entities_detected": 0, "entities_by_type": {}},
+        )
+
+
+class PseudonymizingService:
+    """Náhrada PresidioService, která každé slovo dokumentu pseudonymizuje"""
+
+    def __init__(self, pseudonym_store):
+        self.pseudonym_store = pseudonym_store
+        self.remembered = []
+
+    def process_document(self, document):
+        words = document.content.split()
+        pseudonyms = self.pseudonym_store.bulk_get_or_create("PERSON", words)
+        entities = [
+            AnonymizedEntity(
+                original_entity=DetectedEntity(entity_type="PERSON", start=0, end=len(word), score=0.85, text=word),
+                anonymized_text=pseudonym,
+                operator_name="pseudonymize",
+            )
+            for word, pseudonym in zip(words, pseudonyms)
+        ]
+        return AnonymizedDocument(
+            content=" ".join(pseudonyms),
+            original_document_id=document.id,
+            entities=entities,
+            statistics={"total_entities_detected": len(entities), "entities_by_type": {"PERSON": len(entities)}},
+        )
+
+    def remember_result(self, document, anonymized_document):
+        for entity in anonymized_document.entities:
+            original = entity.original_entity
+            self.pseudonym_store.remember(original.entity_type, original.text, entity.anonymized_text)
+        self.remembered.append(document.id)
+
+
+class TestDocumentWatchdog:
+    """Testy pro DocumentWatchdog"""
+
+    @pytest.fixture
+    def watchdog(self):
+        """Fixture pro watchdog nad zranitelnou službou"""
+        watchdog = DocumentWatchdog(RegexService())
+        yield watchdog
+        watchdog.close()
+
+    def test_runaway_document_killed_and_worker_restarted(self, watchdog):
+        """Test ukončení uvízlého workeru a pokračování s novým"""
+        start_time = time.monotonic()
+        with pytest.raises(DocumentTimeoutError):
+            watchdog.process_document(Document(id="evil.txt", content=ADVERSARIAL_TEXT), timeout=0.5)
+        assert time.monotonic() - start_time < 5
+
+        result = watchdog.process_document(Document(id="ok.txt", content="Jan Novak"), timeout=5)
+        assert result.content == "JAN NOVAK"
+        stats = watchdog.get_stats()
+        assert stats["timeouts"] == 1 and stats["restarts"] == 1 and stats["worker_alive"]
+
+    def test_errors_and_crashes_propagate(self, watchdog):
+        """Test předání výjimky z workeru a zotavení po pádu workeru"""
+        with pytest.raises(ValueError, match="invalid document"):
+            watchdog.process_document(Document(id="bad.txt", content="BAD"), timeout=5)
+        with pytest.raises(ChildProcessError):
+            watchdog.process_document(Document(id="crash.txt", content="CRASH"), timeout=5)
+        assert watchdog.process_document(Document(id="ok.txt", content="ok"), timeout=5).content == "OK"
+        assert watchdog.get_stats()["crashes"] == 1
+
+    def test_batch_records_timeout_status(self, tmp_path):
+        """Test stavu timed_out ve statistikách a auditu dávky"""
+        processor = BatchProcessor(
+            RegexService(),
+            input_dir=str(tmp_path / "in"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+        )
+        (tmp_path / "in" / "a_evil.txt").write_text(ADVERSARIAL_TEXT, encoding="utf-8")
+        (tmp_path / "in" / "b_ok.txt").write_text("Jan Novak", encoding="utf-8")
+
+        stats = processor.process_batch(BatchProcessingConfig(timeout_seconds=1, file_order="name"))
+        processor.watchdog.close()
+
+        assert stats["timed_out_files"] == 1 and stats["successful_files"] == 1
+        assert (tmp_path / "errors" / "a_evil.txt").exists()
+        assert (tmp_path / "out" / "b_ok.txt").read_text(encoding="utf-8") == "JAN NOVAK"
+        processor.audit_log.flush(timeout=10)
+        assert processor.audit_log.query(document_id="a_evil.txt")[0]["details"]["status"] == "timed_out"
+        processor.audit_log.close()
+
+    def test_batch_deadline_stops_new_files(self, tmp_path):
+        """Test, že po limitu dávky zůstanou další soubory ve vstupním adresáři"""
+        processor = BatchProcessor(
+            RegexService(),
+            input_dir=str(tmp_path / "in"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+        )
+        (tmp_path / "in" / "a_evil.txt").write_text(ADVERSARIAL_TEXT, encoding="utf-8")
+        (tmp_path / "in" / "b_ok.txt").write_text("Jan Novak", encoding="utf-8")
+
+        stats = processor.process_batch(
+            BatchProcessingConfig(timeout_seconds=1, batch_timeout_seconds=1, file_order="name")
+        )
+        processor.watchdog.close()
+        processor.audit_log.close()
+
+        assert stats["batch_deadline_exceeded"] and stats["total_files"] == 1
+        assert (tmp_path / "in" / "b_ok.txt").exists()
+
+    def test_batch_reports_worker_pseudonymization_stats(self, tmp_path):
+        """Test, že statistiky a cache pseudonymů z workeru dojdou do rodiče (výchozí konfigurace)"""
+        store = PseudonymStore(str(tmp_path / "pseudonyms.db"), secret_key="test-secret")
+        service = PseudonymizingService(store)
+        processor = BatchProcessor(
+            service,
+            input_dir=str(tmp_path / "in"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+        )
+        (tmp_path / "in" / "a.txt").write_text("Jan Petr Jan", encoding="utf-8")
+        (tmp_path / "in" / "b.txt").write_text("Marie Jan Eva", encoding="utf-8")
+
+        config = BatchProcessingConfig(file_order="name")
+        assert config.timeout_seconds
+        stats = processor.process_batch(config)
+        processor.watchdog.close()
+        processor.audit_log.close()
+
+        assert stats["successful_files"] == 2 and processor.watchdog.get_stats()["documents"] == 2
+        pseudonymization = stats["pseudonymization"]
+        assert (pseudonymization["lookups"], pseudonymization["misses"], pseudonymization["bulk_calls"]) == (6, 4, 2)
+        assert service.remembered == ["a.txt", "b.txt"]
+        # Pseudonymy z workeru jsou v cache rodiče - další vyhledání nejde do úložiště
+        before = store.get_stats()
+        store.get_or_create("PERSON", "Eva")
+        assert store.get_stats(since=before)["cache_hits"] == 1
+        store.close()
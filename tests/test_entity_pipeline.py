@@ -0,0 +1,201 @@
+"""
+Testy pro interní zpracování entit (úložiště entit, řešení konfliktů, anonymizace)
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from presidio_analyzer import RecognizerResult
+
+from models.document import DetectedEntity
+from models.entity_store import EntityStore
+from services.conflict_resolver import ConflictResolver
+from services.fast_anonymizer import FastAnonymizer
+
+
+class TestEntityStore:
+    """Testy pro EntityStore"""
+
+    @pytest.fixture
+    def text(self):
+        """Fixture pro ukázkový text"""
+        return "Jan Novák, rodné číslo 760506/1234, IČO 00027383"
+
+    @pytest.fixture
+    def store(self, text):
+        """Fixture pro naplněné úložiště"""
+        return EntityStore.from_results(text, [
+            RecognizerResult("PERSON", 0, 9, 0.85),
+            RecognizerResult("CZECH_BIRTH_NUMBER", 23, 34, 0.9),
+            RecognizerResult("CZECH_ICO", 40, 48, 0.8),
+            RecognizerResult("PERSON", 4, 9, 0.5),
+        ])
+
+    def test_parallel_arrays(self, store):
+        """Test uložení entit do paralelních polí se sdílenou tabulkou typů"""
+        assert len(store) == 4
+        assert store.type_names == ["PERSON", "CZECH_BIRTH_NUMBER", "CZECH_ICO"]
+        assert list(store.type_ids) == [0, 1, 2, 0]
+        assert list(store.starts) == [0, 23, 40, 4]
+
+    def test_lazy_view(self, store, text):
+        """Test, že pohled na entitu dopočítá text a kontext až při přístupu"""
+        view = store[1]
+        assert view.entity_type == "CZECH_BIRTH_NUMBER"
+        assert view.text == "760506/1234"
+        assert view.context == text[3:48]
+
+    def test_count_by_type(self, store):
+        """Test počítání entit podle typu"""
+        assert store.count_by_type() == {"PERSON": 2, "CZECH_BIRTH_NUMBER": 1, "CZECH_ICO": 1}
+
+    def test_offset_and_select(self, text):
+        """Test posunu pozic a výběru podmnožiny entit"""
+        store = EntityStore(text)
+        store.extend_results([RecognizerResult("CZECH_ICO", 4, 12, 0.8)], offset=36)
+        store.add("PERSON", 0, 9, 0.85)
+
+        selected = store.select([1])
+
+        assert store[0].text == "00027383"
+        assert len(selected) == 1
+        assert selected[0].entity_type == "PERSON"
+
+    def test_materialization(self, store):
+        """Test materializace pydantic modelů na hranici API"""
+        entities = store.to_detected_entities()
+        assert all(isinstance(entity, DetectedEntity) for entity in entities)
+        assert entities[0].text == "Jan Novák"
+        assert store.to_detected_entity(0, with_context=False).context == ""
+
+        results = store.to_results(RecognizerResult, indices=[2])
+        assert (results[0].entity_type, results[0].start, results[0].end) == ("CZECH_ICO", 40, 48)
+
+
+class TestFastAnonymizer:
+    """Testy pro FastAnonymizer"""
+
+    def test_default_replacement(self):
+        """Test výchozí náhrady <TYP_ENTITY> a zachování textu mezi entitami"""
+        text = "Jan Novák, IČO 00027383."
+        store = EntityStore(text)
+        store.add("CZECH_ICO", 15, 23, 0.8)
+        store.add("PERSON", 0, 9, 0.85)
+
+        result = FastAnonymizer().anonymize(text, store)
+
+        assert result.text == "<PERSON>, IČO <CZECH_ICO>."
+        assert [(item[0], item[1], item[2]) for item in result.items] == [(1, 0, 9), (0, 15, 23)]
+
+    def test_conflicts_match_presidio_strategy(self):
+        """Test slučování stejných typů a zahazování obsažených entit"""
+        text = "Jan Novák  Praha 5"
+        store = EntityStore(text)
+        store.add("PERSON", 0, 3, 0.85)
+        store.add("PERSON", 4, 9, 0.85)
+        store.add("PERSON", 2, 6, 0.5)
+        store.add("LOCATION", 11, 18, 0.6)
+        store.add("PERSON", 11, 16, 0.4)
+
+        result = FastAnonymizer().anonymize(text, store)
+
+        assert result.text == "<PERSON>  <LOCATION>"
+        assert [(item[1], item[2]) for item in result.items] == [(0, 9), (11, 18)]
+
+    def test_batch_operator_called_once_per_unique_value(self):
+        """Test, že dávkový operátor dostane každou hodnotu jen jednou"""
+        calls = []
+
+        def upper(values):
+            calls.append(list(values))
+            return [value.upper() for value in values]
+
+        text = "jan, petr, jan"
+        store = EntityStore(text)
+        for start, end in [(0, 3), (5, 9), (11, 14)]:
+            store.add("PERSON", start, end, 0.85)
+
+        result = FastAnonymizer({"PERSON": ("upper", upper)}).anonymize(text, store)
+
+        assert result.text == "JAN, PETR, JAN"
+        assert calls == [["jan", "petr"]]
+        assert {item[4] for item in result.items} == {"upper"}
+
+    def test_empty_store(self):
+        """Test textu bez entit"""
+        assert FastAnonymizer().anonymize("bez entit", EntityStore("bez entit")).text == "bez entit"
+
+
+class TestConflictResolver:
+    """Testy pro ConflictResolver"""
+
+    @pytest.fixture
+    def store(self):
+        """Fixture pro úložiště s kolidujícími entitami"""
+        text = "Rodné číslo 760506/1234, FN Motol, Praha"
+        store = EntityStore(text)
+        store.add("CZECH_HEALTH_INSURANCE_NUMBER", 12, 23, 0.85)
+        store.add("CZECH_BIRTH_NUMBER", 12, 23, 0.85)
+        store.add("CZECH_MEDICAL_FACILITY", 25, 40, 0.6)
+        store.add("LOCATION", 28, 33, 0.85)
+        store.add("LOCATION", 35, 40, 0.85)
+        return store
+
+    def test_highest_score_policy(self, store):
+        """Test politiky nejvyššího skóre s prioritou typu při shodě"""
+        resolved = ConflictResolver("highest_score").resolve(store)
+        assert [(entity.entity_type, entity.start) for entity in resolved] == [
+            ("CZECH_BIRTH_NUMBER", 12),
+            ("LOCATION", 28),
+            ("LOCATION", 35),
+        ]
+
+    def test_longest_span_policy(self, store):
+        """Test politiky nejdelšího úseku"""
+        resolved = ConflictResolver("longest_span").resolve(store)
+        assert [entity.entity_type for entity in resolved] == ["CZECH_BIRTH_NUMBER", "CZECH_MEDICAL_FACILITY"]
+
+    def test_entity_priority_policy(self, store):
+        """Test politiky priority typů entit"""
+        resolver = ConflictResolver("entity_priority", entity_priority=["CZECH_HEALTH_INSURANCE_NUMBER", "LOCATION"])
+        resolved = resolver.resolve(store)
+        assert [entity.entity_type for entity in resolved] == ["CZECH_HEALTH_INSURANCE_NUMBER", "LOCATION", "LOCATION"]
+
+    def test_chained_overlaps_form_one_cluster(self):
+        """Test, že řetězec překryvů se řeší jako jeden shluk"""
+        store = EntityStore("x" * 30)
+        store.add("A", 0, 10, 0.5)
+        store.add("B", 8, 18, 0.9)
+        store.add("C", 16, 26, 0.5)
+        store.add("D", 26, 30, 0.1)
+        assert ConflictResolver().select_indices(store) == [1, 3]
+
+    def test_unknown_policy(self):
+        """Test odmítnutí neznámé politiky"""
+        with pytest.raises(ValueError):
+            ConflictResolver("random")
+
+    def test_large_single_cluster_matches_greedy(self):
+        """Test, že velký shluk vzájemných překryvů dá stejný výsledek jako přímý greedy výběr"""
+        import random
+
+        generator = random.Random(7)
+        store = EntityStore("x" * 5000)
+        for _ in range(3000):
+            start = generator.randrange(0, 4900)
+            store.add("PERSON", start, start + generator.randrange(1, 100), generator.random())
+        # Jedna entita přes celý text spojí všechny do jednoho shluku
+        store.add("LOCATION", 0, 5000, 0.0)
+
+        accepted = []
+        for index in sorted(range(len(store)), key=lambda i: (-store.scores[i], -(store.ends[i] - store.starts[i]), store.starts[i])):
+            start, end = store.starts[index], store.ends[index]
+            if all(end <= store.starts[other] or store.ends[other] <= start for other in accepted):
+                accepted.append(index)
+        expected = sorted(accepted, key=lambda i: store.starts[i])
+
+        assert ConflictResolver().select_indices(store) == expected
@@ -0,0 +1,61 @@
+"""
+Testy pro průběžný výčet vstupních souborů
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.file_enumerator import FileEnumerator
+
+
+class TestFileEnumerator:
+    """Testy pro FileEnumerator"""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        """Fixture pro strom adresářů se soubory různého stáří"""
+        files = {
+            "b.txt": 300,
+            "a.txt": 100,
+            "c.json": 200,
+            "sub/d.txt": 50,
+            "sub/deeper/e.txt": 400,
+        }
+        for relative_path, mtime in files.items():
+            path = tmp_path / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(relative_path, encoding="utf-8")
+            os.utime(path, (mtime, mtime))
+        (tmp_path / "dir.txt").mkdir()
+        return tmp_path
+
+    def test_pattern_and_order_by_name(self, tree):
+        """Test filtrování podle vzoru bez podadresářů a řazení podle názvu"""
+        entries = list(FileEnumerator(str(tree), "*.txt", order="name"))
+        assert [entry.name for entry in entries] == ["a.txt", "b.txt"]
+        assert entries[0].size == len("a.txt")
+        assert entries[0].mtime == 100
+
+    def test_recursive_pattern(self, tree):
+        """Test rekurzivního vzoru a pořadí podle názvu v každém adresáři"""
+        entries = FileEnumerator(str(tree), "**/*.txt", order="name")
+        assert [os.path.relpath(entry.path, tree) for entry in entries] == [
+            "a.txt", "b.txt", os.path.join("sub", "d.txt"), os.path.join("sub", "deeper", "e.txt"),
+        ]
+
+    def test_order_by_mtime(self, tree):
+        """Test řazení od nejstarších souborů napříč stromem"""
+        entries = FileEnumerator(str(tree), "**/*", order="mtime")
+        assert [entry.name for entry in entries] == ["d.txt", "a.txt", "c.json", "b.txt", "e.txt"]
+
+    def test_streaming_and_invalid_order(self, tree):
+        """Test, že výčet je líný, a neplatného pořadí"""
+        iterator = iter(FileEnumerator(str(tree), "**/*.txt"))
+        assert next(iterator).name.endswith(".txt")
+        with pytest.raises(ValueError):
+            FileEnumerator(str(tree), order="size")
@@ -0,0 +1,125 @@
+"""
+Testy pro démona průběžného zpracování inboxu
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument
+from services.batch_processor import BatchProcessor
+from services.inbox_daemon import InboxDaemon
+
+
+class UppercaseService:
+    """Jednoduchá náhrada PresidioService: dokument převede na velká písmena"""
+
+    def process_document(self, document):
+        if "FAIL" in document.content:
+            raise ValueError("cannot process")
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.upper(),
+            original_document_id=document.id,
+            statistics={"total_entities_detected": 1, "entities_by_type": {"PERSON": 1}},
+        )
+
+
+class TestInboxDaemon:
+    """Testy pro InboxDaemon"""
+
+    @pytest.fixture
+    def processor(self, tmp_path):
+        """Fixture pro BatchProcessor nad dočasnými adresáři"""
+        processor = BatchProcessor(
+            UppercaseService(),
+            input_dir=str(tmp_path / "inbox"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+            max_retries=1,
+        )
+        yield processor
+        processor.audit_log.close()
+
+    def test_stable_files_processed_and_retired(self, processor, tmp_path):
+        """Test zpracování zapsaných souborů, přesunu chybných a archivace vstupů"""
+        inbox = tmp_path / "inbox"
+        (inbox / "a.txt").write_text("jan novak", encoding="utf-8")
+        (inbox / "b.txt").write_text("FAIL", encoding="utf-8")
+        daemon = InboxDaemon(
+            processor, stable_seconds=0, archive_dir=str(tmp_path / "done"), use_inotify=False
+        )
+
+        # První kontrola soubor jen zaznamená, druhá ověří, že se nemění
+        assert daemon.run_once() == 0
+        assert daemon.run_once() == 2
+
+        assert (tmp_path / "out" / "a.txt").read_text(encoding="utf-8") == "JAN NOVAK"
+        assert (tmp_path / "out" / "a.txt.meta.json").exists()
+        assert (tmp_path / "done" / "a.txt").exists()
+        assert (tmp_path / "errors" / "b.txt").exists()
+        assert list(inbox.iterdir()) == []
+        assert not list((tmp_path / "out").glob("*.tmp"))
+
+        stats = daemon.get_stats()
+        assert stats["successful_files"] == 1 and stats["failed_files"] == 1
+        processor.audit_log.flush(timeout=10)
+        assert processor.audit_log.query(document_id="b.txt")[0]["success"] is False
+
+    def test_growing_file_waits(self, processor, tmp_path):
+        """Test, že soubor měnící se mezi kontrolami se ještě nezpracuje"""
+        path = tmp_path / "inbox" / "growing.txt"
+        path.write_text("part", encoding="utf-8")
+        daemon = InboxDaemon(processor, stable_seconds=0, use_inotify=False)
+
+        assert daemon.run_once() == 0
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(" more")
+        assert daemon.run_once() == 0
+        assert daemon.get_stats()["pending_files"] == 1
+        assert daemon.run_once() == 1
+        assert (tmp_path / "out" / "growing.txt").read_text(encoding="utf-8") == "PART MORE"
+        assert not path.exists()
+
+    def test_ready_marker(self, processor, tmp_path):
+        """Test režimu se značkou .ready"""
+        inbox = tmp_path / "inbox"
+        (inbox / "c.txt").write_text("c", encoding="utf-8")
+        daemon = InboxDaemon(processor, require_ready_marker=True, use_inotify=False)
+
+        assert daemon.run_once() == 0
+        assert daemon.run_once() == 0
+        (inbox / "c.txt.ready").touch()
+        assert daemon.run_once() == 1
+        assert list(inbox.iterdir()) == []
+
+    def test_markers_are_not_documents(self, processor, tmp_path):
+        """Test, že vzor zahrnující i značky zpracuje jen dokumenty"""
+        inbox = tmp_path / "inbox"
+        (inbox / "e.txt").write_text("e", encoding="utf-8")
+        (inbox / "e.txt.ready").touch()
+        # Značka, jejíž soubor producent ještě nepřesunul do inboxu
+        (inbox / "f.txt.ready").touch()
+        daemon = InboxDaemon(processor, file_pattern="*", stable_seconds=0, use_inotify=False)
+
+        assert daemon.run_once() == 1
+        assert daemon.run_once() == 0
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["e.txt", "e.txt.meta.json"]
+        assert [path.name for path in inbox.iterdir()] == ["f.txt.ready"]
+
+    def test_run_until_idle_and_invalid_setup(self, processor, tmp_path):
+        """Test hlavní smyčky s ukončením po nečinnosti a neplatné konfigurace"""
+        (tmp_path / "inbox" / "d.txt").write_text("d", encoding="utf-8")
+        daemon = InboxDaemon(processor, poll_interval=0.01, stable_seconds=0, use_inotify=False)
+        stats = daemon.run(max_idle_cycles=3)
+        assert stats["successful_files"] == 1
+
+        with pytest.raises(ValueError):
+            InboxDaemon(processor, file_pattern="*.ready")
+        processor.output_mode = "shards"
+        with pytest.raises(ValueError):
+            InboxDaemon(processor)
@@ -0,0 +1,72 @@
+"""
+Testy pro vstupní zdroj JSONL s indexem pozic záznamů
+"""
+import json
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.jsonl_source import JsonlSource
+
+
+class TestJsonlSource:
+    """Testy pro JsonlSource"""
+
+    @pytest.fixture
+    def corpus(self, tmp_path):
+        """Fixture pro JSONL soubor s prázdnými řádky a zakončením CRLF"""
+        path = tmp_path / "corpus.jsonl"
+        with open(path, "wb") as f:
+            for i in range(10):
+                f.write(json.dumps({"id": f"r{i}", "text": f"Záznam {i}"}, ensure_ascii=False).encode("utf-8"))
+                f.write(b"\r\n" if i % 2 else b"\n")
+                if i == 4:
+                    f.write(b"\n")
+            f.write(json.dumps({"id": "last"}).encode("utf-8"))
+        return str(path)
+
+    def test_index_and_random_access(self, corpus):
+        """Test indexu záznamů a přímého čtení podle pořadí"""
+        with JsonlSource(corpus) as source:
+            assert len(source) == 11
+            assert source.read_record(7) == {"id": "r7", "text": "Záznam 7"}
+            assert source.read_record(10) == {"id": "last"}
+            assert [index for index, _ in source.iter_records(8)] == [8, 9, 10]
+
+    def test_disjoint_ranges(self, corpus):
+        """Test rozdělení záznamů na disjunktní rozsahy"""
+        with JsonlSource(corpus) as source:
+            ranges = source.ranges(4)
+            assert ranges == [(0, 4), (4, 8), (8, 11)]
+            ids = [record["id"] for start, stop in ranges for _, record in source.iter_records(start, stop)]
+            assert ids == [f"r{i}" for i in range(10)] + ["last"]
+
+    def test_index_cached_and_invalidated(self, corpus):
+        """Test uložení indexu vedle souboru a jeho přestavby po změně souboru"""
+        with JsonlSource(corpus) as source:
+            index_path = source.index_path
+        assert index_path == f"{corpus}.idx"
+        cached_mtime = os.path.getmtime(index_path)
+
+        with JsonlSource(corpus) as source:
+            assert len(source) == 11
+        assert os.path.getmtime(index_path) == cached_mtime
+
+        with open(corpus, "a", encoding="utf-8") as f:
+            f.write('\n{"id": "appended"}\n')
+        with JsonlSource(corpus) as source:
+            assert len(source) == 12
+            assert source.read_record(11) == {"id": "appended"}
+
+    def test_empty_file(self, tmp_path):
+        """Test prázdného souboru"""
+        path = tmp_path / "empty.jsonl"
+        path.write_bytes(b"")
+        with JsonlSource(str(path)) as source:
+            assert len(source) == 0
+            assert source.ranges(10) == []
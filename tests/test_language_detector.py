@@ -0,0 +1,67 @@
+"""
+Testy pro detekci jazyka a směrování dokumentů
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from services.language_detector import LanguageDetector
+
+
+class TestLanguageDetector:
+    """Testy pro LanguageDetector"""
+
+    @pytest.fixture
+    def detector(self):
+        """Fixture pro detektor jazyka"""
+        return LanguageDetector()
+
+    @pytest.mark.parametrize(
+        "text, expected_language",
+        [
+            ("Pacient byl přijat do Fakultní nemocnice v Motole s diagnózou astma.", "cs"),
+            ("Patient John Doe was admitted to General Hospital with diagnosis of diabetes.", "en"),
+            ("Pacientka bola hospitalizovaná v nemocnici, kde jej lekár predpísal lieky.", "sk"),
+            ("Pacient má horúčku a kašeľ už tri dni.", "sk"),
+        ],
+    )
+    def test_detect_language(self, detector, text, expected_language):
+        """Test detekce jazyka celého textu"""
+        language, confidence = detector.detect(text)
+        assert language == expected_language
+        assert 0.0 < confidence <= 1.0
+
+    def test_detect_without_letters_returns_default(self, detector):
+        """Test, že text bez písmen vrací výchozí jazyk"""
+        assert detector.detect("123 456 / 789", default="en") == ("en", 0.0)
+
+    def test_single_language_document_has_one_segment(self, detector):
+        """Test, že jednojazyčný dokument tvoří jediný segment"""
+        text = (
+            "Pacient byl přijat pro bolesti na hrudi.\n\n"
+            "Rodné číslo: 760506/1234\n\n"
+            "Doporučujeme kontrolu u praktického lékaře za čtrnáct dní."
+        )
+        segments = detector.detect_segments(text)
+        assert len(segments) == 1
+        assert segments[0].language == "cs"
+        assert (segments[0].start, segments[0].end) == (0, len(text))
+
+    def test_mixed_document_segments(self, detector):
+        """Test rozdělení smíšeného dokumentu na segmenty podle odstavců"""
+        english = "The patient was admitted yesterday with severe chest pain.\n\n"
+        czech = "Pacient byl přijat včera s těžkou bolestí na hrudi a dušností.\n\n"
+        short = "Name: X"
+        text = english + czech + short
+
+        segments = detector.detect_segments(text)
+
+        assert [segment.language for segment in segments] == ["en", "cs"]
+        assert segments[0].start == 0
+        assert segments[0].end == len(english)
+        # Krátký poslední odstavec se připojí k předchozímu segmentu
+        assert segments[1].end == len(text)
@@ -0,0 +1,142 @@
+"""
+Testy pro koordinaci více uzlů pomocí lease souborů
+"""
+import multiprocessing
+import os
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, BatchProcessingConfig
+from services.batch_processor import BatchProcessor
+from services.lease_manager import LeaseManager, merge_node_stats
+
+
+class SlowUppercaseService:
+    """Náhrada PresidioService: dokument převede na velká písmena s malým zpožděním"""
+
+    def process_document(self, document):
+        time.sleep(0.01)
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.upper(),
+            original_document_id=document.id,
+            statistics={"total_entities_detected": 1, "entities_by_type": {"PERSON": 1}},
+        )
+
+
+def run_node(tmp_path: str, node_id: str, workers: int) -> None:
+    """Spustí dávku jednoho uzlu (v samostatném procesu)"""
+    processor = BatchProcessor(
+        SlowUppercaseService(),
+        input_dir=os.path.join(tmp_path, "in"),
+        output_dir=os.path.join(tmp_path, "out"),
+        error_dir=os.path.join(tmp_path, "errors"),
+        audit_dir=os.path.join(tmp_path, "audit", node_id),
+        lease_manager=LeaseManager(os.path.join(tmp_path, "run"), node_id=node_id, ttl=2.0, heartbeat_interval=0.2),
+    )
+    processor.process_batch(BatchProcessingConfig(max_files=0, workers=workers, timeout_seconds=0))
+    processor.audit_log.close()
+
+
+class TestLeaseManager:
+    """Testy pro LeaseManager"""
+
+    def test_claim_complete_and_release(self, tmp_path):
+        """Test výlučného převzetí, dokončení a uvolnění položky"""
+        node_a = LeaseManager(str(tmp_path), node_id="a")
+        node_b = LeaseManager(str(tmp_path), node_id="b")
+
+        assert node_a.claim("x.txt") == "claimed"
+        assert node_b.claim("x.txt") == "held"
+        node_a.complete("x.txt")
+        assert node_b.claim("x.txt") == "done"
+
+        assert node_a.claim("y.txt") == "claimed"
+        node_a.release("y.txt")
+        assert node_b.claim("y.txt") == "claimed"
+        node_a.release_all()
+        node_b.release_all()
+
+    def test_expired_lease_is_stolen(self, tmp_path):
+        """Test převzetí lease uzlu, který přestal posílat heartbeat"""
+        dead = LeaseManager(str(tmp_path), node_id="dead", ttl=0.2, heartbeat_interval=60)
+        alive = LeaseManager(str(tmp_path), node_id="alive", ttl=0.2)
+        assert dead.claim("x.txt") == "claimed"
+        time.sleep(0.3)
+
+        assert alive.claim("x.txt") == "claimed"
+        assert alive.get_stats()["stolen"] == 1
+        # Původní držitel při heartbeatu zjistí, že o lease přišel
+        dead.heartbeat()
+        assert not dead.holds("x.txt") and dead.get_stats()["lost"] == 1
+        alive.release_all()
+        dead.release_all()
+
+    def test_heartbeat_keeps_lease(self, tmp_path):
+        """Test, že živý uzel o lease nepřijde"""
+        owner = LeaseManager(str(tmp_path), node_id="owner", ttl=0.5, heartbeat_interval=0.1)
+        other = LeaseManager(str(tmp_path), node_id="other", ttl=0.5)
+        assert owner.claim("x.txt") == "claimed"
+        time.sleep(1.0)
+        assert other.claim("x.txt") == "held"
+        owner.release_all()
+
+    def test_merge_node_stats(self):
+        """Test sloučení statistik uzlů do souhrnu běhu"""
+        summary = merge_node_stats([
+            {"processed_files": 2, "successful_files": 2, "entities_by_type": {"PERSON": 3},
+             "start_time": "2024-01-01T10:00:00", "coordination": {"node_id": "a", "stolen": 1}},
+            {"processed_files": 1, "failed_files": 1, "entities_by_type": {"PERSON": 1, "EMAIL": 1},
+             "end_time": "2024-01-01T10:05:00", "coordination": {"node_id": "b"}},
+        ])
+        assert summary["processed_files"] == 3 and summary["failed_files"] == 1
+        assert summary["entities_by_type"] == {"PERSON": 4, "EMAIL": 1}
+        assert set(summary["nodes"]) == {"a", "b"} and summary["stolen_leases"] == 1
+        assert summary["start_time"] == "2024-01-01T10:00:00"
+
+
+class TestMultiNodeBatch:
+    """Testy dávky na více uzlech nad jedním vstupním adresářem"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_nodes_share_work_exactly_once(self, tmp_path, workers):
+        """Test, že uzly zpracují každý soubor jednou a převezmou práci mrtvého uzlu"""
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        for i in range(30):
+            (input_dir / f"doc{i:02d}.txt").write_text(f"pacient {i}", encoding="utf-8")
+
+        # Lease mrtvého uzlu bez heartbeatu
+        dead = LeaseManager(str(tmp_path / "run"), node_id="dead", ttl=2.0, heartbeat_interval=60)
+        assert dead.claim("doc07.txt") == "claimed"
+        stale_time = time.time() - 60
+        for lease in (tmp_path / "run").glob("*.lease"):
+            os.utime(lease, (stale_time, stale_time))
+
+        context = multiprocessing.get_context("fork")
+        nodes = [
+            context.Process(target=run_node, args=(str(tmp_path), f"node{i}", workers))
+            for i in range(3)
+        ]
+        for node in nodes:
+            node.start()
+        for node in nodes:
+            node.join(60)
+            assert node.exitcode == 0
+
+        assert (tmp_path / "run" / "run_summary.json").exists()
+        # Souhrn lze kdykoli přepočítat ze statistik uzlů
+        summary = LeaseManager(str(tmp_path / "run"), node_id="report").merge_run_summary()
+        assert summary["successful_files"] == 30 and summary["failed_files"] == 0
+        assert summary["processed_files"] == 30
+        assert summary["stolen_leases"] == 1
+        assert set(summary["nodes"]) == {"node0", "node1", "node2"}
+        assert len(list((tmp_path / "out").glob("*.txt"))) == 30
+        assert (tmp_path / "out" / "doc07.txt").read_text(encoding="utf-8") == "PACIENT 7"
+        assert not list((tmp_path / "run").glob("*.lease"))
@@ -0,0 +1,200 @@
+"""
+Testy pro české anonymizační operátory, plán operátorů a pseudonymizaci
+"""
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import RecognizerResult
+
+from models.entity_store import EntityStore
+from operators.czech_address_operator import CzechAddressOperator
+from operators.czech_birth_number_operator import CzechBirthNumberOperator
+from operators.czech_medical_diagnosis_operator import CzechMedicalDiagnosisOperator
+from operators.czech_medical_facility_operator import CzechMedicalFacilityOperator
+from recognizers.birth_number import CzechBirthNumberRecognizer
+from services.fast_anonymizer import FastAnonymizer
+from services.operator_plan import OperatorPlan
+from services.pseudonym_store import PseudonymStore
+
+
+class TestCzechOperators:
+    """Testy pro české operátory"""
+
+    @pytest.mark.parametrize("birth_number", ["7605061234", "7655061234", "785212/3453"])
+    def test_birth_number_has_valid_check_digit(self, birth_number):
+        """Test, že anonymizované rodné číslo je validní a zachovává rok a pohlaví"""
+        operator = CzechBirthNumberOperator()
+        recognizer = CzechBirthNumberRecognizer()
+        for _ in range(200):
+            anonymized = operator.operate(birth_number)
+            assert recognizer._is_valid_birth_number(anonymized)
+            assert anonymized[:2] == birth_number[:2]
+            assert (int(anonymized[2:4]) > 50) == (int(birth_number[2:4]) > 50)
+
+    def test_birth_number_short_and_invalid(self):
+        """Test 9místného a neplatného rodného čísla"""
+        operator = CzechBirthNumberOperator()
+        assert len(operator.operate("450101/123")) == 10
+        assert operator.operate("12345") == "[RODNÉ ČÍSLO]"
+        assert operator.operate("76AB061234") == "[RODNÉ ČÍSLO]"
+
+    @pytest.mark.parametrize(
+        "address, expected",
+        [
+            ("Vinohradská ulice 12, 120 00 Praha", "[ULICE XXX, PSČ XXX XX]"),
+            ("náměstí Míru 5", "[NÁMĚSTÍ XXX]"),
+            ("Dlouhá 5, 602 00 Brno", "[ADRESA, PSČ XXX XX]"),
+            ("Dlouhá 5", "[ADRESA]"),
+        ],
+    )
+    def test_address(self, address, expected):
+        """Test anonymizace adres se zachováním typu"""
+        assert CzechAddressOperator().operate(address) == expected
+
+    def test_facility_and_diagnosis(self):
+        """Test anonymizace zařízení a diagnóz"""
+        assert CzechMedicalFacilityOperator().operate("Poliklinika Budějovická") == "[KLINIKA]"
+        assert CzechMedicalFacilityOperator().operate("Dům pokojného stáří") == "[ZDRAVOTNICKÉ ZAŘÍZENÍ]"
+        assert CzechMedicalDiagnosisOperator().operate("J45.0") == "J4X.X"
+        assert CzechMedicalDiagnosisOperator().operate("J") == "[DIAGNÓZA]"
+
+
+class TestOperatorPlan:
+    """Testy pro OperatorPlan"""
+
+    TEXT = "Dg. J45.0, Fakultní nemocnice Motol, Jan Novák"
+
+    @pytest.fixture
+    def plan(self):
+        """Fixture pro výchozí plán operátorů"""
+        return OperatorPlan()
+
+    def test_plan_with_fast_anonymizer(self, plan):
+        """Test použití plánu v interním FastAnonymizer"""
+        store = EntityStore(self.TEXT)
+        store.add("CZECH_DIAGNOSIS_CODE", 4, 9, 0.9)
+        store.add("CZECH_MEDICAL_FACILITY", 11, 35, 0.6)
+        store.add("PERSON", 37, 46, 0.85)
+
+        result = FastAnonymizer(plan.batch_operators).anonymize(self.TEXT, store)
+
+        assert result.text == "Dg. J4X.X, [NEMOCNICE], <PERSON>"
+        assert [item[4] for item in result.items] == ["czech_medical_diagnosis", "czech_medical_facility", "replace"]
+
+    def test_plan_registered_in_presidio(self, plan):
+        """Test registrace plánu do Presidio AnonymizerEngine"""
+        engine = AnonymizerEngine()
+        plan.register(engine)
+
+        result = engine.anonymize(
+            text=self.TEXT,
+            analyzer_results=[
+                RecognizerResult("CZECH_DIAGNOSIS_CODE", 4, 9, 0.9),
+                RecognizerResult("CZECH_MEDICAL_FACILITY", 11, 35, 0.6),
+            ],
+            operators=plan.operator_configs,
+        )
+
+        assert result.text == "Dg. J4X.X, [NEMOCNICE], Jan Novák"
+
+
+class TestPseudonymization:
+    """Testy pro PseudonymStore a operátor pseudonymize"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Fixture pro úložiště pseudonymů v dočasném adresáři"""
+        store = PseudonymStore(str(tmp_path / "pseudonyms.db"), secret_key="test-secret", cache_size=2)
+        yield store
+        store.close()
+
+    def test_consistent_across_formats_and_instances(self, store, tmp_path):
+        """Test, že stejná hodnota má stejný pseudonym i v jiném zápisu a v jiné instanci"""
+        first = store.bulk_get_or_create("CZECH_BIRTH_NUMBER", ["760506/1234", "7605061234", "8001010009"])
+        assert first[0] == first[1] != first[2]
+        assert first[0].startswith("CZECH_BIRTH_NUMBER_")
+
+        reopened = PseudonymStore(str(tmp_path / "pseudonyms.db"), secret_key="test-secret")
+        assert reopened.get_or_create("CZECH_BIRTH_NUMBER", "760506 / 1234") == first[0]
+        assert len(reopened) == 2
+        reopened.close()
+
+    def test_stats_and_lru_cache(self, store):
+        """Test statistik zásahů cache, úložiště a nových pseudonymů"""
+        store.bulk_get_or_create("PERSON", ["Jan Novák", "Petr Dvořák", "Jan Novák"])
+        store.bulk_get_or_create("PERSON", ["jan novák", "Marie Svobodová"])
+        snapshot = store.get_stats()
+        # Cache má kapacitu 2, "Petr Dvořák" z ní byl vytlačen a načte se z úložiště
+        store.get_or_create("PERSON", "Petr Dvořák")
+
+        stats = store.get_stats()
+        assert (stats["lookups"], stats["misses"], stats["bulk_calls"]) == (6, 3, 3)
+        assert stats["cache_hits"] + stats["store_hits"] == 2
+        assert store.get_stats(since=snapshot)["store_hits"] == 1
+        assert stats["avg_lookup_ms"] > 0
+
+    def test_concurrent_writers(self, store, tmp_path):
+        """Test souběžných zapisovatelů se samostatnými instancemi úložiště"""
+        values = [f"Pacient {i}" for i in range(300)]
+        results = []
+
+        def worker():
+            worker_store = PseudonymStore(str(tmp_path / "pseudonyms.db"), secret_key="test-secret")
+            results.append(worker_store.bulk_get_or_create("PERSON", values))
+            worker_store.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 4
+        assert all(result == results[0] for result in results)
+        assert len(store) == 300
+
+    def test_truncated_hash_collisions_get_distinct_pseudonyms(self, tmp_path):
+        """Test, že kolize zkráceného hashe nesloučí dvě hodnoty pod jeden pseudonym"""
+        path = str(tmp_path / "collisions.db")
+        # Jeden hexadecimální znak = jen 16 zkrácených pseudonymů
+        store = PseudonymStore(path, secret_key="test-secret", token_length=1)
+        values = [f"Pacient {i}" for i in range(40)]
+        pseudonyms = store.bulk_get_or_create("PERSON", values)
+
+        assert len(set(pseudonyms)) == 40
+        assert store.get_stats()["collisions"] > 0
+        store.close()
+
+        reopened = PseudonymStore(path, secret_key="test-secret", token_length=1)
+        assert reopened.bulk_get_or_create("PERSON", list(reversed(values))) == list(reversed(pseudonyms))
+        assert reopened.get_stats()["misses"] == 0
+        reopened.close()
+
+    def test_pseudonymize_operator_in_plan(self, store):
+        """Test operátoru pseudonymize v plánu pro FastAnonymizer i Presidio"""
+        plan = OperatorPlan(pseudonym_store=store, pseudonymized_entities=["PERSON"])
+        text = "Jan Novák a Jan Novák"
+        entity_store = EntityStore(text)
+        entity_store.add("PERSON", 0, 9, 0.85)
+        entity_store.add("PERSON", 12, 21, 0.85)
+
+        fast_result = FastAnonymizer(plan.batch_operators).anonymize(text, entity_store)
+
+        engine = AnonymizerEngine()
+        plan.register(engine)
+        presidio_result = engine.anonymize(
+            text=text,
+            analyzer_results=[RecognizerResult("PERSON", 0, 9, 0.85)],
+            operators=plan.operator_configs,
+        )
+
+        pseudonym = store.get_or_create("PERSON", "Jan Novák")
+        assert fast_result.text == f"{pseudonym} a {pseudonym}"
+        assert presidio_result.text == f"{pseudonym} a Jan Novák"
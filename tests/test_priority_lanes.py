@@ -0,0 +1,147 @@
+"""
+Testy pro oddělení interaktivního a hromadného provozu API
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument
+from services.priority_lanes import BULK, INTERACTIVE, LaneFullError, PriorityLanes, latency_percentiles
+from services.worker_lifecycle import RecyclingService
+
+
+class UppercaseService:
+    """Náhrada PresidioService: dokument převede na velká písmena"""
+
+    def process_document(self, document):
+        if "FAIL" in document.content:
+            raise ValueError("cannot process")
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.upper(),
+            original_document_id=document.id,
+        )
+
+
+class TestPriorityLanes:
+    """Testy pro PriorityLanes"""
+
+    @pytest.fixture
+    def lanes(self):
+        """Fixture pro pruhy s jedním hromadným workerem"""
+        lanes = PriorityLanes(interactive_workers=2, interactive_queue=2, bulk_workers=1, bulk_queue=1, max_bulk_pause=2.0)
+        yield lanes
+        lanes.shutdown()
+
+    def test_full_lane_rejects_only_its_requests(self, lanes):
+        """Test, že plný hromadný pruh odmítá hromadné, ne interaktivní požadavky"""
+        release = threading.Event()
+        running = lanes.submit(BULK, release.wait, 5)
+        queued = lanes.submit(BULK, lambda: "queued")
+        with pytest.raises(LaneFullError):
+            lanes.submit(BULK, lambda: "rejected")
+
+        # Interaktivní požadavek nečeká na hromadnou práci
+        assert lanes.submit(INTERACTIVE, lambda: "interactive").result(1) == "interactive"
+        release.set()
+        assert running.result(5) and queued.result(5) == "queued"
+
+        stats = lanes.get_stats()
+        assert stats[BULK]["rejected"] == 1 and stats[BULK]["completed"] == 2
+        assert stats[INTERACTIVE]["completed"] == 1
+        assert stats[INTERACTIVE]["latency_ms"]["p99"] < 1000
+
+    def test_bulk_pauses_between_documents(self, lanes):
+        """Test pozastavení hromadné práce, dokud běží interaktivní požadavek"""
+        events = []
+        interactive_started = threading.Event()
+
+        def bulk():
+            for index in range(4):
+                lanes.checkpoint()
+                events.append(f"bulk{index}")
+                if index == 1:
+                    # Během dávky přijde interaktivní požadavek
+                    lanes.submit(INTERACTIVE, interactive)
+                    interactive_started.wait(5)
+                time.sleep(0.01)
+
+        def interactive():
+            interactive_started.set()
+            time.sleep(0.2)
+            events.append("interactive")
+
+        lanes.submit(BULK, bulk).result(5)
+
+        assert events == ["bulk0", "bulk1", "interactive", "bulk2", "bulk3"]
+        stats = lanes.get_stats()[BULK]
+        assert stats["preemptions"] == 1
+        assert stats["preempted_seconds"] >= 0.1
+
+    def test_bulk_pause_is_bounded(self):
+        """Test, že trvalá interaktivní zátěž hromadnou práci jen zpomalí"""
+        lanes = PriorityLanes(max_bulk_pause=0.1)
+        release = threading.Event()
+        try:
+            lanes.submit(INTERACTIVE, release.wait, 5)
+            paused = lanes.submit(BULK, lanes.checkpoint).result(5)
+        finally:
+            release.set()
+            lanes.shutdown()
+        assert 0.09 <= paused < 1.0
+
+    def test_cancelled_request_leaves_lane(self, lanes):
+        """Test, že zrušený čekající požadavek neblokuje frontu pruhu"""
+        release = threading.Event()
+        lanes.submit(BULK, release.wait, 5)
+        queued = lanes.submit(BULK, lambda: "queued")
+        assert queued.cancel()
+        assert lanes.lanes[BULK].pending == 1
+        assert lanes.submit(BULK, lambda: "next")
+        release.set()
+
+    def test_latency_percentiles(self):
+        """Test výpočtu percentilů latence"""
+        samples = [index / 1000 for index in range(1, 101)]
+        assert latency_percentiles(samples) == {"p50": 50.0, "p95": 95.0, "p99": 99.0}
+        assert latency_percentiles([]) == {}
+
+
+class TestBatchEndpoint:
+    """Testy pro endpoint POST /batch/process"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture pro testovacího klienta s náhradní službou a pruhy"""
+        from api.main import app, get_priority_lanes, get_service_pool
+
+        lanes = PriorityLanes(bulk_workers=1, bulk_queue=0)
+        app.dependency_overrides[get_service_pool] = lambda: RecyclingService(UppercaseService)
+        app.dependency_overrides[get_priority_lanes] = lambda: lanes
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+        lanes.shutdown()
+
+    def test_batch_runs_in_bulk_lane(self, client):
+        """Test zpracování dávky v hromadném pruhu"""
+        response = client.post(
+            "/batch/process",
+            files=[
+                ("files", ("a.txt", "Jan Novak".encode("utf-8"), "text/plain")),
+                ("files", ("b.txt", "FAIL".encode("utf-8"), "text/plain")),
+            ],
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["processed_files"] == 2
+        assert [result["status"] for result in data["results"]] == ["success", "error"]
+        assert data["results"][1]["error"] == "cannot process"
@@ -0,0 +1,85 @@
+"""
+Testy pro analýzu regulárních výrazů na katastrofický backtracking
+"""
+import re
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from presidio_analyzer import RecognizerRegistry
+
+from recognizers.addresses import CzechAddressRecognizer
+from recognizers.regex_safety import (
+    CompiledPattern,
+    analyze_recognizers,
+    benchmark_recognizers,
+    find_ambiguous_quantifiers,
+    measure_worst_case,
+)
+from recognizers.registry import CzechRecognizerRegistry
+
+# Původní vzor ulice s číslem, který backtrackoval kvadraticky
+LEGACY_STREET_REGEX = r"([a-zA-ZáčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ\s.-]+?)\s+(\d+[a-zA-Z]?(\s?/\s?\d+[a-zA-Z]?)?)\b"
+
+
+class TestRegexSafety:
+    """Testy pro statickou analýzu a harness nejhoršího času"""
+
+    @pytest.fixture(scope="class")
+    def recognizers(self):
+        """Fixture pro rozpoznávače registrované CzechRecognizerRegistry"""
+        registry = RecognizerRegistry(supported_languages=["cs"])
+        CzechRecognizerRegistry.register_czech_recognizers(registry)
+        return registry.recognizers
+
+    @pytest.mark.parametrize("pattern,kind", [
+        (r"^(\w+\s?)+$", "nested_quantifier"),
+        (r"(a*)*b", "nested_quantifier"),
+        (LEGACY_STREET_REGEX, "overlapping_quantifiers"),
+        (r"\b([A-Z][a-z\s.-]*(?:\s+[IVX]+)?)\b", "overlapping_quantifiers"),
+    ])
+    def test_ambiguous_patterns_detected(self, pattern, kind):
+        """Test odhalení vnořených a soupeřících kvantifikátorů"""
+        assert kind in [found_kind for found_kind, _ in find_ambiguous_quantifiers(pattern)]
+
+    @pytest.mark.parametrize("pattern", [
+        r"([a-z]+\s)+",
+        r"\w+(?:-+\w+)*",
+        r"[a-z\s]{0,60}\s{1,10}\d",
+        r"\b(\d{6}/?[0-9]{3,4})\b",
+    ])
+    def test_unambiguous_patterns_pass(self, pattern):
+        """Test, že jednoznačné nebo omezené vzory se nehlásí"""
+        assert find_ambiguous_quantifiers(pattern) == []
+
+    def test_registered_patterns_are_unambiguous(self, recognizers):
+        """Test, že žádný registrovaný vzor nemá nejednoznačné kvantifikátory"""
+        assert analyze_recognizers(recognizers) == []
+
+    def test_registered_patterns_within_linear_budget(self, recognizers):
+        """Test, že všechny registrované vzory zvládnou adversariální vstupy lineárně"""
+        failed = [timing for timing in benchmark_recognizers(recognizers) if not timing.passed]
+        assert failed == [], [(timing.name, timing.worst_input, timing.worst_seconds) for timing in failed]
+
+    def test_harness_catches_legacy_street_pattern(self):
+        """Regrese: původní vzor ulice překročí lineární rozpočet"""
+        compiled = CompiledPattern("legacy", "street", LEGACY_STREET_REGEX, 0, re.compile(LEGACY_STREET_REGEX))
+        timing = measure_worst_case(compiled)
+        assert not timing.passed
+        assert timing.worst_length < 20_000
+
+    def test_fixed_street_pattern_still_matches(self):
+        """Test, že omezený vzor ulice najde běžné adresy"""
+        pattern = re.compile(CzechAddressRecognizer.STREET_WITH_NUMBER_REGEX)
+        for text, street, number in [
+            ("Bydliště: Dlouhá 5", "Dlouhá", "5"),
+            ("nám. Míru  12/3a", "nám. Míru", "12/3a"),
+            ("Nábřeží Kapitána Jaroše 1000/7", "Nábřeží Kapitána Jaroše", "1000/7"),
+        ]:
+            match = pattern.search(text)
+            assert (match.group(1).strip(), match.group(2)) == (street, number)
+        assert re.search(CzechAddressRecognizer.CITY_REGEX, "Albrechtice I").group(1) == "Albrechtice I"
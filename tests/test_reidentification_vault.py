@@ -0,0 +1,197 @@
+"""
+Testy pro šifrovaný trezor zpětné identifikace a endpoint /reidentify
+"""
+import pytest
+import sqlite3
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from fastapi.testclient import TestClient
+
+from models.document import AnonymizedDocument, AnonymizedEntity, DetectedEntity
+from services.reidentification_vault import ApprovalError, ReidentificationVault
+
+
+def make_document(document_id: str, values, operator_name: str = "pseudonymize"):
+    """Vytvoří anonymizovaný dokument s pseudonymizovanými osobami"""
+    entities = []
+    position = 0
+    for value, token in values:
+        entities.append(AnonymizedEntity(
+            original_entity=DetectedEntity(
+                entity_type="PERSON", start=position, end=position + len(value), score=0.85, text=value
+            ),
+            anonymized_text=token,
+            operator_name=operator_name,
+        ))
+        position += len(value) + 2
+    return AnonymizedDocument(
+        content=", ".join(token for _, token in values),
+        original_document_id=document_id,
+        entities=entities,
+    )
+
+
+class TestReidentificationVault:
+    """Testy pro ReidentificationVault"""
+
+    @pytest.fixture
+    def vault(self, tmp_path):
+        """Fixture pro trezor v dočasném adresáři"""
+        vault = ReidentificationVault(str(tmp_path / "vault.db"), ReidentificationVault.generate_key(), flush_size=3)
+        yield vault
+        vault.close()
+
+    def test_batched_writes_and_lookup(self, vault):
+        """Test dávkového zápisu a hromadného vyhledání"""
+        vault.record_document(make_document("doc1", [("Jan Novák", "PERSON_aaa"), ("Petr Dvořák", "PERSON_bbb")]))
+        assert vault.get_stats()["records_written"] == 0
+
+        vault.record_document(make_document("doc2", [("Jan Novák", "PERSON_aaa")]))
+        stats = vault.get_stats()
+        assert (stats["records_written"], stats["flushes"], stats["records_pending"]) == (3, 1, 0)
+
+        results = vault.lookup(["PERSON_aaa", "PERSON_bbb", "PERSON_zzz"])
+        assert [record["document_id"] for record in results["PERSON_aaa"]] == ["doc1", "doc2"]
+        assert results["PERSON_bbb"][0]["value"] == "Petr Dvořák"
+        assert results["PERSON_zzz"] == []
+
+        only_doc2 = vault.lookup(["PERSON_aaa"], document_id="doc2")
+        assert len(only_doc2["PERSON_aaa"]) == 1
+
+    def test_values_are_encrypted_and_indexed(self, vault):
+        """Test, že hodnoty jsou šifrované a vyhledávání používá index"""
+        vault.record_document(make_document("doc1", [("Jan Novák", "PERSON_aaa")]))
+        vault.flush()
+
+        connection = sqlite3.connect(vault.path)
+        stored = connection.execute("SELECT value FROM vault_entries").fetchone()[0]
+        plan = " ".join(
+            str(row) for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM vault_entries WHERE token IN (?, ?)", ["a", "b"]
+            )
+        )
+        connection.close()
+
+        assert "Jan Novák".encode("utf-8") not in stored
+        assert "idx_vault_token" in plan
+
+    def test_generic_tokens_are_not_stored(self, vault):
+        """Test, že entity nahrazené obecným tokenem se do trezoru neukládají"""
+        vault.record_document(make_document("doc1", [("Jan Novák", "<PERSON>"), ("Petr Dvořák", "<PERSON>")], "replace"))
+        vault.flush()
+
+        assert vault.lookup(["<PERSON>"]) == {"<PERSON>": []}
+        assert vault.get_stats()["records_skipped"] == 2
+
+    def test_approval_scope(self, vault):
+        """Test omezení vyhledání na dokumenty, žadatele a platnost schválení"""
+        vault.record_document(make_document("doc1", [("Jan Novák", "PERSON_aaa")]))
+        vault.record_document(make_document("doc2", [("Jan Novák", "PERSON_aaa")]))
+        vault.flush()
+        vault.grant_approval("IRB-1", "researcher", ["doc1"], valid_seconds=60, max_tokens=2)
+
+        assert vault.check_approval("IRB-1", "researcher", 2)["max_tokens"] == 2
+        results = vault.lookup(["PERSON_aaa"], approval_id="IRB-1")
+        assert [record["document_id"] for record in results["PERSON_aaa"]] == ["doc1"]
+
+        with pytest.raises(ApprovalError):
+            vault.check_approval("IRB-1", "someone-else", 1)
+        with pytest.raises(ApprovalError):
+            vault.check_approval("IRB-1", "researcher", 3)
+        with pytest.raises(ApprovalError):
+            vault.check_approval("IRB-unknown", "researcher", 1)
+
+        vault.grant_approval("IRB-2", "researcher", ["doc1"], valid_seconds=-1)
+        with pytest.raises(ApprovalError):
+            vault.check_approval("IRB-2", "researcher", 1)
+        assert vault.revoke_approval("IRB-1")
+        with pytest.raises(ApprovalError):
+            vault.check_approval("IRB-1", "researcher", 1)
+
+    def test_approval_requires_documents(self, vault):
+        """Test, že schválení bez výčtu dokumentů nelze vytvořit"""
+        with pytest.raises(ValueError):
+            vault.grant_approval("IRB-1", "researcher", [], valid_seconds=60)
+
+    def test_large_lookup_is_chunked(self, vault):
+        """Test vyhledání více tokenů, než je limit parametrů jednoho dotazu"""
+        vault.flush_size = 10000
+        for i in range(1200):
+            vault.record(f"doc{i}", "PERSON", 0, 5, f"PERSON_{i}", f"Osoba {i}")
+        vault.flush()
+
+        results = vault.lookup([f"PERSON_{i}" for i in range(1200)])
+
+        assert all(results[f"PERSON_{i}"][0]["value"] == f"Osoba {i}" for i in range(1200))
+
+
+class TestReidentifyEndpoint:
+    """Testy pro endpoint POST /reidentify"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        """Fixture pro testovacího klienta s dočasným trezorem, API klíči a schválením"""
+        from api.main import app, config, get_reidentification_vault
+
+        vault = ReidentificationVault(str(tmp_path / "vault.db"), ReidentificationVault.generate_key())
+        vault.record_document(make_document("doc1", [("Jan Novák", "PERSON_aaa")]))
+        vault.record_document(make_document("doc2", [("Petr Dvořák", "PERSON_bbb")]))
+        vault.flush()
+        vault.grant_approval("IRB-2024-001", "researcher", ["doc1"], valid_seconds=3600, max_tokens=10)
+        monkeypatch.setattr(config.security, "reidentify_api_keys", {"researcher": "key-1", "auditor": "key-2"})
+        app.dependency_overrides[get_reidentification_vault] = lambda: vault
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+        vault.close()
+
+    def test_reidentify(self, client):
+        """Test hromadné zpětné identifikace přes API v rozsahu schválení"""
+        response = client.post(
+            "/reidentify",
+            json={"approval_id": "IRB-2024-001", "tokens": ["PERSON_aaa", "PERSON_bbb", "PERSON_zzz"]},
+            headers={"Authorization": "Bearer key-1"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resolved"] == 1
+        # PERSON_bbb je v dokumentu mimo schválení
+        assert data["unresolved"] == ["PERSON_bbb", "PERSON_zzz"]
+        assert data["results"]["PERSON_aaa"][0]["value"] == "Jan Novák"
+
+    def test_reidentify_requires_api_key(self, client):
+        """Test odmítnutí požadavku bez platného API klíče"""
+        body = {"approval_id": "IRB-2024-001", "tokens": ["PERSON_aaa"]}
+        assert client.post("/reidentify", json=body).status_code == 401
+        response = client.post("/reidentify", json=body, headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+
+    def test_reidentify_checks_approval(self, client):
+        """Test odmítnutí neznámého, cizího nebo překročeného schválení"""
+        headers = {"Authorization": "Bearer key-1"}
+        unknown = client.post("/reidentify", json={"approval_id": "made-up", "tokens": ["PERSON_aaa"]}, headers=headers)
+        assert unknown.status_code == 403
+
+        foreign = client.post(
+            "/reidentify",
+            json={"approval_id": "IRB-2024-001", "tokens": ["PERSON_aaa"]},
+            headers={"Authorization": "Bearer key-2"},
+        )
+        assert foreign.status_code == 403
+
+        too_many = client.post(
+            "/reidentify",
+            json={"approval_id": "IRB-2024-001", "tokens": [f"PERSON_{i}" for i in range(11)]},
+            headers=headers,
+        )
+        assert too_many.status_code == 403
+
+    def test_reidentify_requires_approval(self, client):
+        """Test, že požadavek bez ID schválené žádosti je odmítnut"""
+        response = client.post("/reidentify", json={"tokens": ["PERSON_aaa"]}, headers={"Authorization": "Bearer key-1"})
+        assert response.status_code == 422
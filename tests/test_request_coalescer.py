@@ -0,0 +1,147 @@
+"""
+Testy pro slučování souběžných požadavků do dávek
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, AnonymizedEntity, DetectedEntity
+from services.request_coalescer import RequestCoalescer
+
+
+class BatchRecorder:
+    """Handler, který zaznamená velikosti dávek a texty převede na velká písmena"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, requests):
+        self.batches.append(len(requests))
+        time.sleep(self.delay)
+        if any(request == "FAIL" for request in requests):
+            raise ValueError("cannot process")
+        return [request.upper() for request in requests]
+
+
+class TestRequestCoalescer:
+    """Testy pro RequestCoalescer"""
+
+    def test_concurrent_requests_are_batched(self):
+        """Test sloučení souběžných požadavků do dávek omezených velikostí"""
+        handler = BatchRecorder(delay=0.02)
+        coalescer = RequestCoalescer(handler, max_batch_size=8, max_wait_ms=50)
+        try:
+            futures = [coalescer.submit(f"text {i}") for i in range(20)]
+            assert [future.result(5) for future in futures] == [f"TEXT {i}" for i in range(20)]
+            stats = coalescer.get_stats()
+        finally:
+            coalescer.close(5)
+
+        assert handler.batches == [8, 8, 4]
+        assert stats["requests"] == 20 and stats["batches"] == 3
+        assert stats["batch_sizes"] == {4: 1, 8: 2}
+        assert stats["average_batch_size"] == pytest.approx(6.67)
+
+    def test_single_request_waits_at_most_max_wait(self):
+        """Test, že osamocený požadavek čeká na dávku nejvýše max_wait_ms"""
+        coalescer = RequestCoalescer(BatchRecorder(), max_batch_size=8, max_wait_ms=30)
+        try:
+            started = time.monotonic()
+            assert coalescer.submit("a").result(5) == "A"
+            elapsed_ms = (time.monotonic() - started) * 1000
+            stats = coalescer.get_stats()
+        finally:
+            coalescer.close(5)
+
+        assert 25 <= elapsed_ms < 500
+        assert stats["batch_sizes"] == {1: 1}
+        assert stats["wait_ms_max"] >= 25
+
+    def test_threads_share_batches(self):
+        """Test sloučení požadavků z více vláken"""
+        handler = BatchRecorder(delay=0.05)
+        coalescer = RequestCoalescer(handler, max_batch_size=16, max_wait_ms=20)
+        results = {}
+
+        def call(index):
+            results[index] = coalescer.submit(f"t{index}").result(5)
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(12)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        finally:
+            coalescer.close(5)
+
+        assert results == {index: f"T{index}" for index in range(12)}
+        assert len(handler.batches) < 12
+
+    def test_failed_batch_isolates_request(self):
+        """Test, že chybný požadavek neshodí ostatní požadavky dávky"""
+        coalescer = RequestCoalescer(BatchRecorder(), max_batch_size=8, max_wait_ms=50)
+        try:
+            futures = [coalescer.submit(text) for text in ("a", "FAIL", "b")]
+            assert futures[0].result(5) == "A" and futures[2].result(5) == "B"
+            with pytest.raises(ValueError):
+                futures[1].result(5)
+            assert coalescer.get_stats()["failed_batches"] >= 1
+        finally:
+            coalescer.close(5)
+
+    def test_invalid_configuration(self):
+        """Test neplatné konfigurace"""
+        with pytest.raises(ValueError):
+            RequestCoalescer(BatchRecorder(), max_batch_size=0)
+        with pytest.raises(ValueError):
+            RequestCoalescer(BatchRecorder(), max_wait_ms=-1)
+
+
+class TestAnonymizeTextEndpoint:
+    """Testy pro endpoint POST /anonymize/text"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture pro testovacího klienta se slučovačem nad náhradní službou"""
+        from api.main import app, get_text_coalescer
+
+        def anonymize_batch(requests):
+            results = []
+            for text, _ in requests:
+                position = text.find("Novak")
+                entity = AnonymizedEntity.model_construct(
+                    original_entity=DetectedEntity.model_construct(
+                        entity_type="PERSON", start=position, end=position + 5, score=0.9, text="Novak"
+                    ),
+                    anonymized_text="[PERSON]",
+                    operator_name="replace",
+                    metadata={},
+                )
+                results.append(AnonymizedDocument(content=text.replace("Novak", "[PERSON]"), entities=[entity]))
+            return results
+
+        coalescer = RequestCoalescer(anonymize_batch, max_wait_ms=1)
+        app.dependency_overrides[get_text_coalescer] = lambda: coalescer
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+        coalescer.close(5)
+
+    def test_anonymize_text(self, client):
+        """Test anonymizace textu přes slučovač"""
+        response = client.post("/anonymize/text", params={"text": "Pacient Jan Novak"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["anonymized_text"] == "Pacient Jan [PERSON]"
+        assert data["metadata"]["entities_count"] == 1
+        assert data["entities_found"][0]["original_entity"]["entity_type"] == "PERSON"
@@ -0,0 +1,127 @@
+"""
+Testy pro politiku opakování a karanténu dokumentů
+"""
+import sqlite3
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, BatchProcessingConfig
+from services.batch_processor import BatchProcessor
+from services.retry_policy import Quarantine, RetryPolicy, content_hash, failure_fingerprint
+
+
+class FlakyService:
+    """Náhrada PresidioService s řízenými chybami podle obsahu dokumentu"""
+
+    def __init__(self):
+        self.calls = []
+        self.transient_failures = 1
+
+    def process_document(self, document):
+        self.calls.append(document.id)
+        if "POISON" in document.content:
+            raise ValueError(f"cannot parse offset {len(self.calls)}")
+        if "FLAKY" in document.content and self.transient_failures:
+            self.transient_failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.lower(),
+            original_document_id=document.id,
+            statistics={"total_entities_detected": 0, "entities_by_type": {}},
+        )
+
+
+class TestRetryPolicy:
+    """Testy pro RetryPolicy"""
+
+    def test_classification(self):
+        """Test rozdělení chyb na přechodné a deterministické"""
+        policy = RetryPolicy(max_attempts=3)
+        assert policy.classify(TimeoutError()) == "transient"
+        assert policy.classify(sqlite3.OperationalError("locked")) == "transient"
+        assert policy.classify(FileNotFoundError()) == "deterministic"
+        assert policy.classify(ValueError()) == "deterministic"
+        assert policy.should_retry(ConnectionError(), 2)
+        assert not policy.should_retry(ConnectionError(), 3)
+        assert not policy.should_retry(KeyError("x"), 1)
+
+    def test_backoff_is_exponential_with_jitter(self):
+        """Test exponenciální prodlevy s rozptylem a horní mezí"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.5)
+        for attempt, delay in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)]:
+            assert all(delay * 0.5 <= policy.backoff(attempt) <= delay for _ in range(20))
+        assert RetryPolicy(base_delay=2.0, jitter=0).backoff(2) == 4.0
+
+    def test_fingerprint_ignores_numbers(self):
+        """Test, že otisk chyby nezávisí na číslech ve zprávě"""
+        assert failure_fingerprint(ValueError("bad span 10-20")) == failure_fingerprint(ValueError("bad span 3-4"))
+        assert failure_fingerprint(ValueError("x")) != failure_fingerprint(TypeError("x"))
+
+
+class TestQuarantine:
+    """Testy pro Quarantine a jejich použití v BatchProcessor"""
+
+    @pytest.fixture
+    def processor(self, tmp_path):
+        """Fixture pro BatchProcessor s rychlou politikou opakování"""
+        processor = BatchProcessor(
+            FlakyService(),
+            input_dir=str(tmp_path / "in"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0.05),
+        )
+        yield processor
+        processor.audit_log.close()
+
+    def test_store_and_release(self, tmp_path):
+        """Test zařazení, opakovaného výskytu a propuštění z karantény"""
+        quarantine = Quarantine(str(tmp_path / "q.db"))
+        document_hash = content_hash("obsah")
+        quarantine.add(document_hash, "a.txt", ValueError("x"))
+        quarantine.add(document_hash, "b.txt", ValueError("x"))
+
+        record = quarantine.get(document_hash)
+        assert record["occurrences"] == 2 and record["document_id"] == "b.txt"
+        assert quarantine.get_stats() == {"documents": 1, "by_error_type": {"ValueError": 1}}
+        assert quarantine.release(document_hash)
+        assert not quarantine.contains(document_hash)
+
+    def test_poison_quarantined_and_transient_deferred(self, processor, tmp_path):
+        """Test karantény deterministické chyby a odloženého opakování přechodné chyby"""
+        for name, content in [("a.txt", "FLAKY"), ("b.txt", "POISON"), ("c.txt", "OK")]:
+            (tmp_path / "in" / name).write_text(content, encoding="utf-8")
+        # Bez limitu na dokument, aby služba běžela v tomto procesu
+        stats = processor.process_batch(BatchProcessingConfig(timeout_seconds=0))
+
+        # Otrávený dokument se zkusil jen jednou, opakování nezdrželo další soubory
+        service = processor.presidio_service
+        assert service.calls.count("b.txt") == 1
+        assert service.calls[-1] == "a.txt"
+        assert stats["successful_files"] == 2
+        assert stats["quarantined_files"] == 1 and stats["retried_attempts"] == 1
+        assert (tmp_path / "out" / "a.txt").read_text(encoding="utf-8") == "flaky"
+        assert processor.quarantine.contains(content_hash("POISON"))
+
+        processor.audit_log.flush(timeout=10)
+        details = processor.audit_log.query(document_id="b.txt")[0]["details"]
+        assert details["error_class"] == "deterministic" and details["quarantined"] is True
+
+    def test_quarantined_copy_skipped_in_next_run(self, processor, tmp_path):
+        """Test, že kopie dokumentu v karanténě se v dalším běhu nezpracuje"""
+        (tmp_path / "in" / "b.txt").write_text("POISON", encoding="utf-8")
+        config = BatchProcessingConfig(timeout_seconds=0)
+        processor.process_batch(config)
+        (tmp_path / "in" / "b_copy.txt").write_text("POISON", encoding="utf-8")
+        stats = processor.process_batch(config)
+
+        assert "b_copy.txt" not in processor.presidio_service.calls
+        assert stats["quarantined_files"] == 1
+        assert (tmp_path / "errors" / "b_copy.txt").exists()
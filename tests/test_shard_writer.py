@@ -0,0 +1,71 @@
+"""
+Testy pro výstup anonymizovaných dokumentů do shardů
+"""
+import json
+import tarfile
+import pandas as pd
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument
+from services.shard_writer import ShardWriter
+
+
+def make_document(document_id: str, content: str) -> AnonymizedDocument:
+    """Vytvoří anonymizovaný dokument se statistikami"""
+    return AnonymizedDocument(
+        id=f"anon_{document_id}",
+        content=content,
+        original_document_id=document_id,
+        metadata={"source_file": f"/data/{document_id}"},
+        statistics={"total_entities_detected": 1, "entities_by_type": {"PERSON": 1}},
+    )
+
+
+class TestShardWriter:
+    """Testy pro ShardWriter"""
+
+    @pytest.fixture
+    def documents(self):
+        """Fixture pro dokumenty s obsahem různé délky"""
+        return [make_document(f"zprava {i}.txt", f"Pacient <PERSON> č. {i}. " * (i * 40 + 1)) for i in range(6)]
+
+    def test_rollover_index_and_manifest(self, documents, tmp_path):
+        """Test rozdělení do shardů podle velikosti, indexu a manifestu"""
+        writer = ShardWriter(str(tmp_path), run_id="test", max_shard_bytes=8 * 1024)
+        locations = [writer.write(document) for document in documents]
+        manifest_path = writer.close()
+
+        assert len(writer.shards) > 1
+        assert locations[0] == "shard-test-00000.tar:000000_zprava_0.txt"
+
+        manifest = pd.read_parquet(manifest_path)
+        assert list(manifest["original_document_id"]) == [document.original_document_id for document in documents]
+        assert json.loads(manifest["entities_by_type"][0]) == {"PERSON": 1}
+
+        for document, row in zip(documents, manifest.itertuples()):
+            shard_path = str(tmp_path / row.shard)
+            assert ShardWriter.read_document(shard_path, row.offset, row.size) == document.content
+
+        for shard_path in writer.shards:
+            with open(f"{shard_path}.index.json", encoding="utf-8") as f:
+                index = json.load(f)
+            with tarfile.open(shard_path) as tar:
+                assert [entry["member"] for entry in index["documents"]] == tar.getnames()
+
+    def test_document_count_limit_and_empty_run(self, documents, tmp_path):
+        """Test omezení počtu dokumentů ve shardu a běhu bez dokumentů"""
+        writer = ShardWriter(str(tmp_path), run_id="count", max_shard_documents=4)
+        for document in documents:
+            writer.write(document)
+        writer.close()
+        assert writer.get_stats()["shards"] == 2
+
+        empty = ShardWriter(str(tmp_path), run_id="empty")
+        assert empty.close() is None
+        assert empty.shards == []
@@ -0,0 +1,159 @@
+"""
+Testy pro anonymizaci strukturovaných dokumentů (JSON, XML, HTML)
+"""
+import json
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import Document
+from models.entity_store import EntityStore
+from services.structured_processor import (
+    HtmlDocumentFormat,
+    JsonDocumentFormat,
+    StructuredProcessor,
+    TextNode,
+    XmlDocumentFormat,
+)
+
+
+class TestDocumentFormats:
+    """Testy pro parsování textových uzlů a zpětnou serializaci"""
+
+    def test_json_string_leaves(self):
+        """Test, že se analyzují jen řetězcové hodnoty, ne klíče a čísla"""
+        content = json.dumps({"patient": {"name": "Jan Novák", "age": 42}, "notes": ["a", {"text": "b"}]})
+        document_format = JsonDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("patient.name", "Jan Novák"), ("notes.0", "a"), ("notes.1.text", "b"),
+        ]
+        result = json.loads(document_format.serialize({0: "<PERSON>"}))
+        assert result == {"patient": {"name": "<PERSON>", "age": 42}, "notes": ["a", {"text": "b"}]}
+
+    def test_json_keeps_original_formatting(self):
+        """Test, že se přepíšou jen změněné řetězce a zápis čísel a mezer zůstane"""
+        content = '{"dose" : 1.0e5,\n  "name": "Jan \\u004eovák", "tags": [ "x\\"y", true, null ]}'
+        document_format = JsonDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("name", "Jan Novák"), ("tags.0", 'x"y'),
+        ]
+        assert document_format.serialize({0: '<PERSON> "P"'}) == content.replace(
+            '"Jan \\u004eovák"', '"<PERSON> \\"P\\""'
+        )
+
+    def test_xml_text_and_tail(self):
+        """Test textu a konců elementů XML se zachováním atributů a deklarace"""
+        content = '<?xml version="1.0"?>\n<record id="7"><name>Jan Novák</name> tel. 603123456<!-- x --></record>'
+        document_format = XmlDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("record/@id", "7"), ("record/name", "Jan Novák"), ("record", " tel. 603123456"),
+        ]
+        result = document_format.serialize({1: "<PERSON>"})
+        assert result.startswith('<?xml version="1.0"?>\n<record id="7">')
+        assert "<name>&lt;PERSON&gt;</name> tel. 603123456<!-- x -->" in result
+
+    def test_xml_attributes_namespaces_and_doctype(self):
+        """Test hodnot atributů, zachování prefixů jmenných prostorů a DOCTYPE"""
+        content = (
+            '<?xml version="1.0"?>\n<!DOCTYPE Patient>\n'
+            '<h:Patient xmlns:h="http://hl7.org/fhir" xmlns:x="urn:x">'
+            '<h:name h:use="official" x:note="pacient"><h:family value="Novák"/></h:name>'
+            '<h:telecom value="603123456" title="Jan Novák"/></h:Patient>'
+        )
+        document_format = XmlDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("Patient/name/@use", "official"),
+            ("Patient/name/@note", "pacient"),
+            ("Patient/name/family/@value", "Novák"),
+            ("Patient/telecom/@value", "603123456"),
+            ("Patient/telecom/@title", "Jan Novák"),
+        ]
+        result = document_format.serialize({2: "<PERSON>", 4: "<PERSON>"})
+        assert result.startswith('<?xml version="1.0"?>\n<!DOCTYPE Patient>\n<h:Patient ')
+        assert 'xmlns:h="http://hl7.org/fhir"' in result and "ns0" not in result
+        assert '<h:name h:use="official" x:note="pacient"><h:family value="&lt;PERSON&gt;" /></h:name>' in result
+        assert '<h:telecom value="603123456" title="&lt;PERSON&gt;" />' in result
+
+    def test_html_attributes(self):
+        """Test hodnot atributů HTML v uvozovkách i bez nich"""
+        content = '<p title="Jan Novák" class="osoba"><img alt=Petr src="f.png"></p>'
+        document_format = HtmlDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("p/@title", "Jan Novák"), ("p/img/@alt", "Petr"), ("p/img/@src", "f.png"),
+        ]
+        assert document_format.serialize({0: "<PERSON>", 1: "<PERSON> \"P\""}) == (
+            '<p title="&lt;PERSON&gt;" class="osoba"><img alt="&lt;PERSON&gt; &quot;P&quot;" src="f.png"></p>'
+        )
+
+    def test_html_preserves_markup(self):
+        """Test, že HTML značky, atributy a skripty zůstanou beze změny"""
+        content = (
+            '<html><head><script>var email = "a@b.cz";</script></head>'
+            '<body><p class="x">Jan &amp; Marie</p><br>konec</body></html>'
+        )
+        document_format = HtmlDocumentFormat(content)
+
+        assert [(node.path, node.text) for node in document_format.nodes] == [
+            ("html/body/p", "Jan & Marie"), ("html/body", "konec"),
+        ]
+        assert document_format.serialize({}) == content
+        assert document_format.serialize({0: "<PERSON> & Marie"}) == content.replace(
+            "Jan &amp; Marie", "&lt;PERSON&gt; &amp; Marie"
+        )
+
+
+class TestStructuredProcessor:
+    """Testy pro výběr uzlů a mapování entit na uzly"""
+
+    def test_allow_and_deny_paths(self):
+        """Test výběru uzlů podle vzorů cest a jejich přepsání v metadatech"""
+        processor = StructuredProcessor(None, deny_paths=["*.code", "meta.*"])
+        nodes = [
+            TextNode("patient.name", "Jan"),
+            TextNode("patient.code", "J45"),
+            TextNode("meta.version", "1"),
+            TextNode("notes.0", "   "),
+            TextNode("notes.1", "text"),
+        ]
+
+        assert processor._select_nodes(nodes, {}) == [0, 4]
+        assert processor._select_nodes(nodes, {"allow_paths": ["patient.*"]}) == [0]
+        assert processor._select_nodes(nodes, {"deny_paths": []}) == [0, 1, 2, 4]
+
+    def test_entities_are_clipped_to_nodes(self):
+        """Test, že entita přes oddělovač uzlů se rozdělí na části v uzlech"""
+        text = "Jan Novák\n\nPraha 4"
+        store = EntityStore(text)
+        store.add("PERSON", 0, 9, 0.85)
+        store.add("CZECH_ADDRESS", 4, 18, 0.5)
+
+        result, node_positions = StructuredProcessor._split_to_nodes(store, [0, 11], [9, 18])
+
+        assert [(entity.entity_type, entity.start, entity.end) for entity in result] == [
+            ("PERSON", 0, 9), ("CZECH_ADDRESS", 4, 9), ("CZECH_ADDRESS", 11, 18),
+        ]
+        assert node_positions == [0, 0, 1]
+
+    def test_process_json_document(self):
+        """Test anonymizace JSON dokumentu přes PresidioService"""
+        from services.presidio_service import PresidioService
+
+        content = json.dumps({"email": "jan.novak@email.com", "id": "jan.novak@email.com"})
+        document = Document(
+            id="doc.json", content=content, content_type="application/json", metadata={"deny_paths": ["id"]}
+        )
+
+        result = PresidioService().process_document(document)
+
+        data = json.loads(result.content)
+        assert data == {"email": "<EMAIL_ADDRESS>", "id": "jan.novak@email.com"}
+        assert result.entities[0].original_entity.metadata["path"] == "email"
+        assert result.statistics["text_nodes_analyzed"] == 1
@@ -0,0 +1,118 @@
+"""
+Testy pro anonymizaci tabulek (CSV, Parquet)
+"""
+import pandas as pd
+import pytest
+import sys
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from scripts.anonymize_table import parse_column_plans
+from services.tabular_processor import TabularProcessor
+
+
+class StubAnalyzer:
+    """Náhrada AnalyzerEngine se seznamem podporovaných entit"""
+
+    def get_supported_entities(self, language):
+        return ["CZECH_BIRTH_NUMBER", "CZECH_ICO", "CZECH_PHONE_NUMBER", "PERSON"]
+
+
+class StubService:
+    """Náhrada PresidioService pro plánování sloupců bez modelů"""
+
+    analyzer = StubAnalyzer()
+
+
+class TestTabularHelpers:
+    """Testy pro pomocné funkce tabulkového režimu"""
+
+    @pytest.mark.parametrize(
+        "values, expected",
+        [
+            (["13,5", "14.1", "12", ""], True),
+            (["760506/1234", "12"], False),
+            (["", ""], False),
+        ],
+    )
+    def test_numeric_columns(self, values, expected):
+        """Test rozpoznání číselných sloupců (včetně desetinné čárky)"""
+        assert TabularProcessor._is_numeric(pd.Series(values, dtype=object)) is expected
+        assert TabularProcessor._is_numeric(pd.Series([1.5, 2.0])) is True
+
+    def test_digit_only_columns_use_name_plans(self):
+        """Test, že sloupce s číslicemi a plánem podle názvu se analyzují"""
+        chunk = pd.DataFrame(
+            {
+                "rc": ["7605061234"],
+                "ico": ["25596641"],
+                "telefon": ["603123456"],
+                "hemoglobin": ["13,5"],
+                "poznamka": ["Jan Novák"],
+            },
+            dtype=str,
+        )
+
+        plans = TabularProcessor(StubService()).plan_columns(chunk)
+
+        assert plans == {
+            "rc": ["CZECH_BIRTH_NUMBER"],
+            "ico": ["CZECH_ICO"],
+            "telefon": ["CZECH_PHONE_NUMBER"],
+            "hemoglobin": [],
+            "poznamka": None,
+        }
+
+    def test_detect_format(self):
+        """Test určení formátu podle přípony"""
+        assert TabularProcessor.detect_format("export.CSV") == "csv"
+        assert TabularProcessor.detect_format("export.parquet") == "parquet"
+        with pytest.raises(ValueError):
+            TabularProcessor.detect_format("export.xlsx")
+
+    def test_cli_column_plans(self):
+        """Test sestavení plánů sloupců z argumentů CLI"""
+        plans = parse_column_plans(["rc=CZECH_BIRTH_NUMBER", "poznamka=*", "kontakt=EMAIL_ADDRESS, PHONE_NUMBER"], ["hb"])
+        assert plans == {
+            "rc": ["CZECH_BIRTH_NUMBER"],
+            "poznamka": None,
+            "kontakt": ["EMAIL_ADDRESS", "PHONE_NUMBER"],
+            "hb": [],
+        }
+
+
+class TestTabularProcessor:
+    """Testy pro TabularProcessor s PresidioService"""
+
+    @pytest.fixture
+    def processor(self):
+        """Fixture pro procesor s malými bloky"""
+        from services.presidio_service import PresidioService
+
+        return TabularProcessor(PresidioService(), chunk_size=2)
+
+    def test_csv_chunks_and_deduplication(self, processor, tmp_path):
+        """Test zpracování CSV po blocích s deduplikací hodnot"""
+        input_path = tmp_path / "export.csv"
+        input_path.write_text(
+            "email,hemoglobin,kod\n"
+            "jan.novak@email.com,\"13,5\",007\n"
+            "jan.novak@email.com,14.1,007\n"
+            "petr@email.cz,12,008\n",
+            encoding="utf-8",
+        )
+
+        stats = processor.process_file(str(input_path), str(tmp_path / "export_anon.csv"))
+
+        output = pd.read_csv(tmp_path / "export_anon.csv", dtype=str, keep_default_na=False)
+        assert list(output["email"]) == ["<EMAIL_ADDRESS>"] * 3
+        assert list(output["hemoglobin"]) == ["13,5", "14.1", "12"]
+        assert list(output["kod"]) == ["007", "007", "008"]
+        assert stats["column_plans"]["email"] == ["EMAIL_ADDRESS"]
+        assert stats["column_plans"]["hemoglobin"] == []
+        assert (stats["rows"], stats["chunks"]) == (3, 2)
+        # První blok obsahuje e-mail dvakrát, analyzuje se jen jednou
+        assert stats["unique_values_analyzed"] == 2
@@ -0,0 +1,151 @@
+"""
+Testy pro čtení nahraných souborů po blocích a paměťový rozpočet uploadů
+"""
+import asyncio
+import io
+import pytest
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument
+from services.upload_reader import UploadBudget, UploadBudgetExceededError, UploadTooLargeError, read_upload
+
+
+class ChunkedUpload:
+    """Náhrada UploadFile, která počítá přečtené bajty"""
+
+    def __init__(self, content: bytes, size=None):
+        self.stream = io.BytesIO(content)
+        self.size = size
+        self.bytes_read = 0
+
+    async def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestReadUpload:
+    """Testy pro read_upload"""
+
+    def test_decodes_multibyte_characters_across_chunks(self):
+        """Test dekódování znaků rozdělených na hranici bloku"""
+        text = "Pacientka Žofie Řezníčková, Ústí nad Labem"
+        upload = ChunkedUpload(text.encode("utf-8"))
+        assert asyncio.run(read_upload(upload, 1000, chunk_size=3)) == text
+
+    def test_aborts_as_soon_as_limit_is_exceeded(self):
+        """Test přerušení čtení hned po překročení limitu"""
+        upload = ChunkedUpload(b"x" * 10_000)
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(read_upload(upload, 1_000, chunk_size=256))
+        assert upload.bytes_read <= 1_024
+
+    def test_declared_size_is_rejected_without_reading(self):
+        """Test odmítnutí souboru podle známé velikosti bez čtení obsahu"""
+        upload = ChunkedUpload(b"x" * 10_000, size=10_000)
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(read_upload(upload, 1_000))
+        assert upload.bytes_read == 0
+
+    def test_invalid_utf8(self):
+        """Test chyby dekódování binárního obsahu"""
+        with pytest.raises(UnicodeDecodeError):
+            asyncio.run(read_upload(ChunkedUpload(b"PK\x03\x04\xff\xfe"), 1_000))
+
+
+class TestUploadBudget:
+    """Testy pro UploadBudget"""
+
+    def test_concurrent_leases_share_budget(self):
+        """Test odmítnutí požadavku nad společný rozpočet a uvolnění rezervací"""
+        budget = UploadBudget(2_000)
+        text_size = sys.getsizeof("a" * 600)
+        with budget.lease() as first:
+            asyncio.run(read_upload(ChunkedUpload(b"a" * 600), 10_000, first, chunk_size=100))
+            assert budget.get_stats()["in_flight_bytes"] == text_size
+            with budget.lease() as second:
+                # Bajty se vejdou, text dekódovaný z nich už ne
+                with pytest.raises(UploadBudgetExceededError):
+                    asyncio.run(read_upload(ChunkedUpload(b"b" * 1_000), 10_000, second, chunk_size=100))
+                assert budget.get_stats()["in_flight_bytes"] == text_size + 1_000
+            assert budget.get_stats()["in_flight_bytes"] == text_size
+
+        stats = budget.get_stats()
+        assert stats["in_flight_bytes"] == 0 and stats["peak_bytes"] == text_size + 1_000
+        assert stats["rejected"] == 1 and stats["leases"] == 2
+
+    def test_decoded_text_is_reserved(self):
+        """Test, že špička rezervace zahrnuje bajty i text (i mimo Latin-1) a zůstane jen text"""
+        budget = UploadBudget(1024 * 1024)
+        content = "Řezníčková, Ústí nad Labem 🏥 ".encode("utf-8") * 100
+        with budget.lease() as lease:
+            text = asyncio.run(read_upload(ChunkedUpload(content), 1024 * 1024, lease, chunk_size=1000))
+            assert budget.get_stats()["in_flight_bytes"] == lease.reserved == sys.getsizeof(text)
+            assert lease.uploaded == len(content)
+
+        assert budget.get_stats()["peak_bytes"] >= len(content) + sys.getsizeof(text)
+
+    def test_invalid_budget(self):
+        """Test neplatného rozpočtu"""
+        with pytest.raises(ValueError):
+            UploadBudget(0)
+
+
+class UppercaseService:
+    """Náhrada PresidioService: dokument převede na velká písmena"""
+
+    def process_document(self, document):
+        return AnonymizedDocument(content=document.content.upper(), original_document_id=document.id)
+
+
+class TestFileEndpoint:
+    """Testy pro endpoint POST /anonymize/file"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture pro testovacího klienta s náhradní službou a malým rozpočtem"""
+        from api.main import app, get_presidio_service, get_upload_budget
+
+        budget = UploadBudget(4 * 1024 * 1024)
+        app.dependency_overrides[get_presidio_service] = UppercaseService
+        app.dependency_overrides[get_upload_budget] = lambda: budget
+        yield TestClient(app), budget
+        app.dependency_overrides.clear()
+
+    def test_anonymize_file(self, client):
+        """Test anonymizace nahraného textového souboru"""
+        client, budget = client
+        response = client.post("/anonymize/file", files={"file": ("zprava.txt", "Žofie Nováková".encode("utf-8"))})
+
+        assert response.status_code == 200
+        assert response.json()["anonymized_content"] == "ŽOFIE NOVÁKOVÁ"
+        assert response.json()["metadata"]["original_size"] == len("Žofie Nováková".encode("utf-8"))
+        assert budget.get_stats()["in_flight_bytes"] == 0
+
+    def test_too_large_file(self, client, monkeypatch):
+        """Test odmítnutí souboru nad limit velikosti"""
+        from api.main import config
+
+        client, budget = client
+        monkeypatch.setattr(config.security, "max_upload_size_mb", 1)
+        response = client.post("/anonymize/file", files={"file": ("velky.txt", b"x" * (2 * 1024 * 1024))})
+
+        assert response.status_code == 413
+        assert budget.get_stats()["in_flight_bytes"] == 0
+
+    def test_budget_exhausted(self, client, monkeypatch):
+        """Test odmítnutí uploadu, který by překročil paměťový rozpočet"""
+        client, budget = client
+        monkeypatch.setattr(budget, "max_bytes", 1024)
+        response = client.post("/anonymize/file", files={"file": ("zprava.txt", b"x" * 4096)})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert budget.get_stats()["rejected"] == 1
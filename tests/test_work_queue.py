@@ -0,0 +1,191 @@
+"""
+Testy pro frontu práce a workery distribuované anonymizace
+"""
+import os
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument
+from services.queue_worker import QueueWorker, run_worker_processes
+from services.retry_policy import RetryPolicy
+from services.work_queue import SqliteWorkQueue
+
+
+class BatchUppercaseService:
+    """Náhrada PresidioService s dávkovým zpracováním (text převede na velká písmena)"""
+
+    def __init__(self, batch_delay: float = 0.0):
+        self.batch_delay = batch_delay
+        self.batch_sizes = []
+
+    def process_documents(self, documents, batch_size=32):
+        self.batch_sizes.append(len(documents))
+        time.sleep(self.batch_delay)
+        return [self.process_document(document) for document in documents]
+
+    def process_document(self, document):
+        if "FAIL" in document.content:
+            raise ValueError("cannot process")
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=document.content.upper(),
+            original_document_id=document.id,
+            metadata={"pid": os.getpid()},
+            statistics={"total_entities_detected": 0, "entities_by_type": {}},
+        )
+
+
+class TestSqliteWorkQueue:
+    """Testy pro SqliteWorkQueue"""
+
+    @pytest.fixture
+    def queue(self, tmp_path):
+        """Fixture pro frontu se třemi zprávami"""
+        queue = SqliteWorkQueue(str(tmp_path / "queue.db"), max_attempts=3)
+        assert queue.enqueue_many([(f"m{i}", {"id": f"m{i}", "content": f"text {i}"}) for i in range(3)]) == 3
+        return queue
+
+    def test_enqueue_is_idempotent(self, queue):
+        """Test, že opakované zařazení stejné zprávy nic nepřidá"""
+        assert not queue.enqueue("m0", {"id": "m0", "content": "jiný"})
+        assert queue.enqueue("m3", {"id": "m3", "content": "text 3"})
+        assert queue.get_stats()["pending"] == 4
+
+    def test_visibility_timeout_redelivers(self, queue):
+        """Test skrytí vyzvednuté dávky a opětovného doručení po vypršení"""
+        first = queue.dequeue(2, visibility_timeout=0.3)
+        assert [message.id for message in first] == ["m0", "m1"]
+        assert [message.id for message in queue.dequeue(10, visibility_timeout=0.3)] == ["m2"]
+        assert queue.dequeue(10, visibility_timeout=0.3) == []
+        assert queue.get_stats()["in_flight"] == 3
+
+        time.sleep(0.4)
+        again = queue.dequeue(2, visibility_timeout=60)
+        assert [message.id for message in again] == ["m0", "m1"]
+        assert all(message.attempts == 2 for message in again)
+        # Původní doručení už zprávu nedrží
+        assert not queue.extend(first[0], 60)
+        assert queue.extend(again[0], 60)
+
+    def test_result_write_is_idempotent(self, queue):
+        """Test, že výsledek opakovaného doručení nepřepíše první výsledek"""
+        stale = queue.dequeue(3, visibility_timeout=0.1)[0]
+        time.sleep(0.2)
+        redelivered = queue.dequeue(1, visibility_timeout=60)[0]
+        assert redelivered.id == stale.id
+
+        assert queue.complete(stale, {"content": "první"})
+        assert not queue.complete(redelivered, {"content": "druhý"})
+        assert queue.get_result("m0") == {"content": "první"}
+        assert queue.get_stats()["done"] == 1 and queue.get_stats()["results"] == 1
+
+    def test_fail_retries_and_dead_letters(self, queue):
+        """Test vrácení zprávy s prodlevou a přesunu mezi mrtvé"""
+        message = queue.dequeue(1, visibility_timeout=60)[0]
+        assert queue.fail(message, OSError("disk"), retry=True, delay=0.2) == "pending"
+        assert [m.id for m in queue.dequeue(3, visibility_timeout=60)] == ["m1", "m2"]
+        time.sleep(0.3)
+        message = queue.dequeue(1, visibility_timeout=60)[0]
+        assert message.id == "m0" and message.attempts == 2
+
+        assert queue.fail(message, ValueError("obsah"), retry=False) == "dead"
+        assert queue.dead_messages() == [{"id": "m0", "attempts": 2, "last_error": "ValueError"}]
+
+    def test_crashing_message_is_dead_after_max_attempts(self, queue):
+        """Test, že zpráva doručená max_attempts-krát bez potvrzení už se nedoručí"""
+        for _ in range(3):
+            assert queue.dequeue(3, visibility_timeout=0)
+        assert queue.dequeue(3, visibility_timeout=0) == []
+        assert queue.get_stats()["dead"] == 3
+
+
+class TestQueueWorker:
+    """Testy pro QueueWorker"""
+
+    def test_batches_and_isolates_failures(self, tmp_path):
+        """Test dávkového zpracování a izolace vadného dokumentu"""
+        queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+        queue.enqueue_many([(f"m{i}", {"id": f"m{i}", "content": f"pacient {i}"}) for i in range(7)])
+        queue.enqueue("bad", {"id": "bad", "content": "FAIL"})
+        service = BatchUppercaseService()
+
+        stats = QueueWorker(service, queue, batch_size=4).run(until_empty=True)
+
+        assert service.batch_sizes == [4, 4]
+        assert stats["batches"] == 2 and stats["average_batch_size"] == 4.0
+        assert stats["completed"] == 7 and stats["dead"] == 1 and stats["batch_fallbacks"] == 1
+        assert queue.get_result("m5")["content"] == "PACIENT 5"
+        assert queue.get_stats()["dead"] == 1
+
+    def test_invalid_payload_is_dead_and_batch_continues(self, tmp_path):
+        """Test, že neplatná zpráva skončí mezi mrtvými a ostatní zprávy dávky se dokončí"""
+        queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+        queue.enqueue("m0", {"id": "m0", "content": "hello"})
+        queue.enqueue("bad", {"contentx": 1})
+        queue.enqueue("m1", {"id": "m1", "content": "world"})
+        service = BatchUppercaseService()
+
+        stats = QueueWorker(service, queue, batch_size=4).run(until_empty=True)
+
+        assert service.batch_sizes == [2]
+        assert stats["completed"] == 2 and stats["dead"] == 1
+        assert queue.get_result("m1")["content"] == "WORLD"
+        queue_stats = queue.get_stats()
+        assert queue_stats["in_flight"] == 0 and queue_stats["dead"] == 1
+        assert queue.dead_messages()[0]["id"] == "bad"
+
+    def test_transient_failure_is_retried(self, tmp_path):
+        """Test opakování dokumentu po přechodné chybě"""
+
+        class FlakyService(BatchUppercaseService):
+            calls = 0
+
+            def process_document(self, document):
+                FlakyService.calls += 1
+                # Selže dávka i samostatný pokus, projde až opakované doručení
+                if FlakyService.calls <= 2:
+                    raise OSError("temporary")
+                return super().process_document(document)
+
+        queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+        queue.enqueue("m0", {"id": "m0", "content": "text"})
+        worker = QueueWorker(FlakyService(), queue, retry_policy=RetryPolicy(base_delay=0.0))
+
+        stats = worker.run(until_empty=True)
+        assert stats["retried"] == 1 and stats["completed"] == 1 and stats["batches"] == 2
+        assert queue.get_result("m0")["content"] == "TEXT"
+
+
+class TestWorkerProcesses:
+    """Testy více procesů workerů nad jednou frontou"""
+
+    def run_workers(self, tmp_path, name, processes):
+        """Zpracuje 48 zpráv daným počtem procesů a vrátí dobu běhu"""
+        path = str(tmp_path / f"{name}.db")
+        SqliteWorkQueue(path).enqueue_many([(f"m{i:02d}", {"id": f"m{i:02d}", "content": f"doc {i}"}) for i in range(48)])
+        service = BatchUppercaseService(batch_delay=0.1)
+        started = time.time()
+        stats = run_worker_processes(
+            lambda: QueueWorker(service, SqliteWorkQueue(path), batch_size=4), processes, until_empty=True
+        )
+        return time.time() - started, stats, SqliteWorkQueue(path)
+
+    def test_processes_share_queue_and_scale(self, tmp_path):
+        """Test, že procesy zpracují každou zprávu jednou a propustnost roste s jejich počtem"""
+        single_seconds, _, _ = self.run_workers(tmp_path, "single", 1)
+        parallel_seconds, stats, queue = self.run_workers(tmp_path, "parallel", 4)
+
+        assert len(stats) == 4
+        assert sum(worker["completed"] for worker in stats) == 48
+        assert sum(worker["duplicates"] for worker in stats) == 0
+        assert queue.get_stats()["done"] == 48 and queue.get_stats()["redelivered"] == 0
+        assert len({result["metadata"]["pid"] for _, result in queue.results()}) > 1
+        assert [message_id for message_id, _ in queue.results()] == [f"m{i:02d}" for i in range(48)]
+        # 12 dávek po 0,1 s: jeden proces ~1,2 s, čtyři procesy ~0,3 s
+        assert single_seconds / parallel_seconds > 2.5
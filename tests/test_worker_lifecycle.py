@@ -0,0 +1,203 @@
+"""
+Testy pro recyklaci workerů a anonymizační služby
+"""
+import json
+import os
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Přidání kořenového adresáře projektu do sys.path
+root_path = Path(__file__).parent.parent
+sys.path.append(str(root_path))
+
+from models.document import AnonymizedDocument, Document
+from services.batch_processor import BatchProcessor
+from services.document_watchdog import DocumentWatchdog
+from services.worker_lifecycle import RecyclingService, WorkerLifecycle, current_rss_bytes
+
+
+class PidService:
+    """Náhrada PresidioService, která do výstupu zapíše PID zpracujícího procesu"""
+
+    def process_document(self, document):
+        return AnonymizedDocument(
+            id=f"anon_{document.id}",
+            content=f"{os.getpid()}",
+            original_document_id=document.id,
+            statistics={"total_entities_detected": 0, "entities_by_type": {}},
+        )
+
+
+class TestWorkerLifecycle:
+    """Testy pro WorkerLifecycle"""
+
+    def test_document_and_rss_limits(self):
+        """Test rozhodnutí o recyklaci podle počtu dokumentů a RSS"""
+        lifecycle = WorkerLifecycle(max_documents=3, max_rss_mb=100)
+        assert lifecycle.record(10 * 1024 * 1024) is None
+        assert lifecycle.record(200 * 1024 * 1024) == "rss"
+        lifecycle.recycled("rss")
+        assert lifecycle.record() is None
+        assert lifecycle.record() is None
+        assert lifecycle.record() == "documents"
+        lifecycle.recycled("documents")
+
+        stats = lifecycle.get_stats()
+        assert stats["recycles"] == 2
+        assert stats["recycles_by_reason"] == {"documents": 1, "rss": 1}
+        assert stats["peak_rss_bytes"] == 200 * 1024 * 1024
+        assert stats["documents_since_recycle"] == 0
+
+    def test_unlimited_and_invalid(self):
+        """Test režimu bez limitů a neplatných limitů"""
+        lifecycle = WorkerLifecycle()
+        assert not lifecycle.enabled
+        assert all(lifecycle.record(10 ** 12) is None for _ in range(100))
+        with pytest.raises(ValueError):
+            WorkerLifecycle(max_documents=0)
+        with pytest.raises(ValueError):
+            WorkerLifecycle(max_rss_mb=-1)
+
+    def test_current_rss(self):
+        """Test měření RSS aktuálního procesu"""
+        assert current_rss_bytes() > 1024 * 1024
+
+
+class TestWatchdogRecycling:
+    """Testy recyklace workeru watchdogu"""
+
+    def test_recycles_after_documents(self):
+        """Test výměny workeru po počtu dokumentů bez ztráty dokumentu"""
+        watchdog = DocumentWatchdog(PidService(), WorkerLifecycle(max_documents=2))
+        try:
+            pids = [
+                watchdog.process_document(Document(id=f"{i}.txt", content="x"), timeout=5).content
+                for i in range(5)
+            ]
+            stats = watchdog.get_stats()
+        finally:
+            watchdog.close()
+
+        # Dva dokumenty na worker, pak nový proces
+        assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+        assert str(os.getpid()) not in pids
+        assert stats["lifecycle"]["recycles_by_reason"]["documents"] == 2
+        assert stats["timeouts"] == 0 and stats["restarts"] == 0 and stats["worker_alive"]
+
+    def test_recycles_above_rss(self):
+        """Test výměny workeru po překročení RSS"""
+        watchdog = DocumentWatchdog(PidService(), WorkerLifecycle(max_rss_mb=1))
+        try:
+            first = watchdog.process_document(Document(id="a.txt", content="x"), timeout=5).content
+            second = watchdog.process_document(Document(id="b.txt", content="x"), timeout=5).content
+            stats = watchdog.get_stats()["lifecycle"]
+        finally:
+            watchdog.close()
+
+        assert first != second
+        assert stats["recycles_by_reason"]["rss"] == 2
+        assert stats["peak_rss_bytes"] > 1024 * 1024
+
+    def test_jsonl_pool_recycles_workers(self, tmp_path):
+        """Test recyklace procesů poolu při paralelním zpracování JSONL"""
+        input_path = tmp_path / "records.jsonl"
+        input_path.write_text(
+            "".join(json.dumps({"id": str(i), "text": "x"}) + "\n" for i in range(40)), encoding="utf-8"
+        )
+        processor = BatchProcessor(
+            PidService(),
+            input_dir=str(tmp_path / "in"),
+            output_dir=str(tmp_path / "out"),
+            error_dir=str(tmp_path / "errors"),
+            audit_dir=str(tmp_path / "audit"),
+            worker_lifecycle=WorkerLifecycle(max_documents=10),
+        )
+        stats = processor.process_jsonl(str(input_path), workers=2, range_size=5)
+        processor.audit_log.close()
+
+        assert stats["successful_records"] == 40
+        # Každý proces zpracuje nejvýše dva rozsahy (10 dokumentů)
+        assert stats["worker_processes"] >= 4
+        assert stats["worker_rss_bytes_max"] > 0
+
+
+class CountingService:
+    """Náhrada PresidioService, která počítá vytvořené instance a zahřátí"""
+
+    created = 0
+
+    def __init__(self):
+        CountingService.created += 1
+        self.number = CountingService.created
+        self.warmed = False
+
+
+class TestRecyclingService:
+    """Testy pro RecyclingService"""
+
+    @pytest.fixture
+    def pool(self):
+        """Fixture pro službu recyklovanou po dvou požadavcích"""
+        CountingService.created = 0
+        return RecyclingService(
+            CountingService,
+            WorkerLifecycle(max_documents=2),
+            warmup=lambda service: setattr(service, "warmed", True),
+        )
+
+    def test_replacement_is_prewarmed(self, pool):
+        """Test výměny za zahřátou instanci po limitu požadavků"""
+        for _ in range(2):
+            with pool.acquire() as service:
+                assert service.number == 1
+        pool.wait_for_replacement(timeout=5)
+
+        with pool.acquire() as service:
+            assert service.number == 2 and service.warmed
+        stats = pool.get_stats()
+        assert stats["generation"] == 1
+        assert stats["recycles"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["process_rss_bytes"] > 0
+
+    def test_in_flight_request_drains_on_old_instance(self, pool):
+        """Test dokončení rozpracovaného požadavku na staré instanci"""
+        with pool.acquire():
+            pass
+        release = threading.Event()
+        acquired = threading.Event()
+
+        def slow_request():
+            with pool.acquire() as service:
+                acquired.set()
+                release.wait(5)
+                assert service.number == 1
+
+        thread = threading.Thread(target=slow_request)
+        thread.start()
+        acquired.wait(5)
+        # Druhý požadavek dosáhne limitu, náhrada se vymění během běžícího požadavku
+        with pool.acquire() as service:
+            assert service.number == 1
+        pool.wait_for_replacement(timeout=5)
+        assert pool.service.number == 2
+        assert pool.get_stats()["draining_instances"] == 1
+
+        release.set()
+        thread.join(5)
+        stats = pool.get_stats()
+        assert stats["draining_instances"] == 0 and stats["in_flight"] == 0
+
+    def test_rss_limit_does_not_trigger_in_process_rebuilds(self):
+        """Test, že RSS procesu nad limitem nespouští opakované sestavování instance"""
+        CountingService.created = 0
+        pool = RecyclingService(CountingService, WorkerLifecycle(max_documents=50, max_rss_mb=1))
+        for _ in range(20):
+            with pool.acquire():
+                pass
+        pool.wait_for_replacement(timeout=5)
+
+        assert CountingService.created == 1
+        assert pool.get_stats()["recycles"] == 0